@@ -1,19 +1,67 @@
 """CLI entry point: ``uv run python -m ingestion``."""
 
+import argparse
 import asyncio
 import sys
 
 from dotenv import load_dotenv
 
 from ingestion.config import IngestionSettings
-from ingestion.pipeline import run_pipeline
+from ingestion.pipeline import replay_from_lake, run_pipeline
 
 
-def main() -> None:
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m ingestion", description=main.__doc__)
+    parser.add_argument(
+        "--tickers",
+        nargs="+",
+        metavar="TICKER",
+        help="Symbols to ingest (default: MAG 7 + top crypto)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        metavar="N",
+        help="Tickers ingested at once (default: INGESTION_CONCURRENCY or 4)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only ingest dates after each ticker's latest stored date (plus an overlap)",
+    )
+    parser.add_argument(
+        "--from-lake",
+        action="store_true",
+        help="Replay bars and local indicators from INGESTION_LAKE_PATH without API calls",
+    )
+    args = parser.parse_args(argv)
+    if args.from_lake and args.incremental:
+        parser.error("--from-lake cannot be combined with --incremental")
+    if args.concurrency is not None and args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
     """Run the ingestion pipeline with settings from environment variables."""
+    args = _parse_args(argv)
     load_dotenv()
     settings = IngestionSettings()
-    report = asyncio.run(run_pipeline(settings))
+    if args.from_lake:
+        if settings.lake_path is None:
+            sys.exit("--from-lake requires INGESTION_LAKE_PATH")
+        report = asyncio.run(
+            replay_from_lake(settings, tickers=args.tickers, concurrency=args.concurrency)
+        )
+    else:
+        report = asyncio.run(
+            run_pipeline(
+                settings,
+                tickers=args.tickers,
+                concurrency=args.concurrency,
+                incremental=args.incremental,
+            )
+        )
 
     for r in report.results:
         status = "OK" if r.error is None else f"FAILED: {r.error}"
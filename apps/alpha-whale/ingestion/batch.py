@@ -0,0 +1,247 @@
+"""Columnar OHLCV data for one ticker.
+
+``OHLCVBatch`` holds a ticker's bars as NumPy columns, from the Massive
+response through indicator computation to the Supabase payload. That avoids
+building a Pydantic model with five ``Decimal`` fields for every bar.
+Columns are validated once each when the batch is built, not once per bar.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from ingestion.schemas import OHLCVBar
+
+_MS_PER_DAY = 86_400_000
+
+# Sentinel for a missing transaction count (integer columns have no NaN)
+MISSING_COUNT = -1
+
+_COLUMNS = (
+    "dates",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "vwap",
+    "num_transactions",
+)
+
+
+@dataclass(frozen=True)
+class OHLCVBatch:
+    """Daily bars of one ticker as equal-length columns sorted by date.
+
+    ``vwap`` is NaN and ``num_transactions`` is ``MISSING_COUNT`` where
+    Massive omitted them.
+
+    Raises:
+        ValueError: If columns differ in length, prices are not finite or
+            dates are not strictly increasing.
+    """
+
+    ticker: str
+    asset_type: str
+    dates: npt.NDArray[np.datetime64]
+    open: npt.NDArray[np.float64]
+    high: npt.NDArray[np.float64]
+    low: npt.NDArray[np.float64]
+    close: npt.NDArray[np.float64]
+    volume: npt.NDArray[np.int64]
+    vwap: npt.NDArray[np.float64]
+    num_transactions: npt.NDArray[np.int64]
+
+    def __post_init__(self) -> None:
+        count = len(self.dates)
+        columns = (
+            self.open,
+            self.high,
+            self.low,
+            self.close,
+            self.volume,
+            self.vwap,
+            self.num_transactions,
+        )
+        if any(len(column) != count for column in columns):
+            raise ValueError(f"OHLCV columns for {self.ticker} differ in length")
+        prices = (self.open, self.high, self.low, self.close)
+        if not all(np.isfinite(column).all() for column in prices):
+            raise ValueError(f"OHLCV prices for {self.ticker} must be finite")
+        if count > 1 and not (np.diff(self.dates) > np.timedelta64(0, "D")).all():
+            raise ValueError(f"OHLCV dates for {self.ticker} must be strictly increasing")
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @classmethod
+    def from_results(
+        cls,
+        ticker: str,
+        asset_type: str,
+        results: Sequence[Mapping[str, Any]],
+    ) -> OHLCVBatch:
+        """Build a batch from Massive aggregate results (``t``, ``o``, ``h``, ...)."""
+
+        def column(key: str, dtype: type, default: float | None = None) -> Any:
+            values: Iterable[Any] = (
+                (r[key] for r in results)
+                if default is None
+                else (r.get(key, default) for r in results)
+            )
+            return np.fromiter(values, dtype=dtype, count=len(results))
+
+        millis = column("t", np.int64)
+        return cls(
+            ticker=ticker,
+            asset_type=asset_type,
+            dates=(millis // _MS_PER_DAY).astype("datetime64[D]"),
+            open=column("o", np.float64),
+            high=column("h", np.float64),
+            low=column("l", np.float64),
+            close=column("c", np.float64),
+            # Crypto volumes are fractional; the table stores whole units
+            volume=column("v", np.float64).astype(np.int64),
+            vwap=column("vw", np.float64, default=np.nan),
+            num_transactions=column("n", np.int64, default=MISSING_COUNT),
+        )
+
+    @classmethod
+    def from_records(
+        cls,
+        ticker: str,
+        asset_type: str,
+        records: Sequence[Mapping[str, Any]],
+    ) -> OHLCVBatch:
+        """Build a batch from stored table rows, the inverse of ``to_records``.
+
+        Prices may arrive as JSON numbers or as numeric strings.
+        """
+        return cls(
+            ticker=ticker,
+            asset_type=asset_type,
+            dates=np.array([r["date"] for r in records], dtype="datetime64[D]"),
+            open=np.array([r["open"] for r in records], dtype=np.float64),
+            high=np.array([r["high"] for r in records], dtype=np.float64),
+            low=np.array([r["low"] for r in records], dtype=np.float64),
+            close=np.array([r["close"] for r in records], dtype=np.float64),
+            volume=np.array([r["volume"] for r in records], dtype=np.int64),
+            vwap=np.array(
+                [np.nan if r.get("vwap") is None else r["vwap"] for r in records], dtype=np.float64
+            ),
+            num_transactions=np.array(
+                [
+                    MISSING_COUNT if r.get("num_transactions") is None else r["num_transactions"]
+                    for r in records
+                ],
+                dtype=np.int64,
+            ),
+        )
+
+    @classmethod
+    def from_bars(cls, bars: list[OHLCVBar]) -> OHLCVBatch:
+        """Build a batch from ``OHLCVBar`` models of a single ticker."""
+        if not bars:
+            raise ValueError("Cannot build an OHLCVBatch from no bars")
+        return cls(
+            ticker=bars[0].ticker,
+            asset_type=bars[0].asset_type,
+            dates=np.array([b.date for b in bars], dtype="datetime64[D]"),
+            open=np.array([b.open for b in bars], dtype=np.float64),
+            high=np.array([b.high for b in bars], dtype=np.float64),
+            low=np.array([b.low for b in bars], dtype=np.float64),
+            close=np.array([b.close for b in bars], dtype=np.float64),
+            volume=np.array([b.volume for b in bars], dtype=np.int64),
+            vwap=np.array([np.nan if b.vwap is None else b.vwap for b in bars], dtype=np.float64),
+            num_transactions=np.array(
+                [MISSING_COUNT if b.num_transactions is None else b.num_transactions for b in bars],
+                dtype=np.int64,
+            ),
+        )
+
+    @classmethod
+    def concat(cls, ticker: str, asset_type: str, batches: Sequence[OHLCVBatch]) -> OHLCVBatch:
+        """Join consecutive batches of one ticker (e.g. response pages) in order."""
+        if not batches:
+            return cls.from_results(ticker, asset_type, [])
+        if len(batches) == 1:
+            return batches[0]
+        return cls(
+            ticker=ticker,
+            asset_type=asset_type,
+            **{name: np.concatenate([getattr(b, name) for b in batches]) for name in _COLUMNS},
+        )
+
+    def since(self, day: date) -> OHLCVBatch:
+        """Bars dated on or after ``day``."""
+        start = int(np.searchsorted(self.dates, np.datetime64(day, "D")))
+        return self[start:]
+
+    def until(self, day: date) -> OHLCVBatch:
+        """Bars dated on or before ``day``."""
+        end = int(np.searchsorted(self.dates, np.datetime64(day, "D"), side="right"))
+        return self[:end]
+
+    def __getitem__(self, rows: slice | npt.NDArray[np.intp] | npt.NDArray[np.bool_]) -> OHLCVBatch:
+        """Rows selected by a slice, an index array or a boolean mask."""
+        return OHLCVBatch(
+            ticker=self.ticker,
+            asset_type=self.asset_type,
+            **{name: getattr(self, name)[rows] for name in _COLUMNS},
+        )
+
+    def columns(self) -> dict[str, npt.NDArray[Any]]:
+        """Column name -> array, in declaration order."""
+        return {name: getattr(self, name) for name in _COLUMNS}
+
+    def date_list(self) -> list[date]:
+        """Dates as ``datetime.date`` objects."""
+        return list(self.dates.astype(object))
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """JSON-ready rows for the ``market_data_daily`` table.
+
+        Prices are emitted as JSON numbers. ``repr`` of a float parsed from
+        Massive's JSON gives back the same digits, so no precision is lost
+        compared with the earlier ``Decimal(str(x))`` path.
+        """
+        vwap = [None if v != v else v for v in self.vwap.tolist()]  # NaN != NaN
+        transactions = [None if n == MISSING_COUNT else n for n in self.num_transactions.tolist()]
+        return [
+            {
+                "ticker": self.ticker,
+                "asset_type": self.asset_type,
+                "date": day,
+                "open": o,
+                "high": h,
+                "low": lo,
+                "close": c,
+                "volume": v,
+                "vwap": vw,
+                "num_transactions": n,
+            }
+            for day, o, h, lo, c, v, vw, n in zip(
+                np.datetime_as_string(self.dates).tolist(),
+                self.open.tolist(),
+                self.high.tolist(),
+                self.low.tolist(),
+                self.close.tolist(),
+                self.volume.tolist(),
+                vwap,
+                transactions,
+                strict=True,
+            )
+        ]
+
+    def to_bars(self) -> list[OHLCVBar]:
+        """``OHLCVBar`` models, for callers that still need per-bar objects."""
+        return [
+            OHLCVBar(**{**record, "date": day})
+            for record, day in zip(self.to_records(), self.date_list(), strict=True)
+        ]
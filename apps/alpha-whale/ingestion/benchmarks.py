@@ -0,0 +1,287 @@
+"""Ingestion benchmarks over synthetic OHLCV series.
+
+Run with ``python -m ingestion.benchmarks stochastic`` or ``... decode``.
+Prices are a seeded random walk rounded to cents, so runs are comparable
+across machines and commits.
+
+- ``stochastic`` times the previous per-window slicing implementation
+  (``sliced_stochastic``), the O(n) deque-based ``compute_stochastic``
+  and the float64 ``indicators.stochastic``.
+- ``decode`` times parsing one Massive aggregates page: stdlib JSON into
+  ``Decimal(str(x))`` models (the previous path), orjson into an
+  ``OHLCVBatch``, and exact-decimal JSON into models.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import numpy.typing as npt
+
+from ingestion.batch import OHLCVBatch
+from ingestion.indicators import stochastic
+from ingestion.massive import _ts_to_date, decode_json
+from ingestion.schemas import OHLCVBar
+from ingestion.stochastic import D_PERIOD, K_PERIOD, compute_stochastic
+
+# Bars per year: 252 sessions, 390 regular-hours minutes per session
+BARS_PER_YEAR = {"daily": 252, "minute": 252 * 390}
+
+
+def synthetic_prices(
+    count: int, seed: int = 0
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """High, low and close in integer cents from a seeded random walk."""
+    rng = np.random.default_rng(seed)
+    close = 10_000 + np.cumsum(rng.integers(-50, 51, count))
+    close = np.maximum(close, 100)
+    high = close + rng.integers(0, 40, count)
+    low = np.maximum(close - rng.integers(0, 40, count), 1)
+    return high, low, close
+
+
+def synthetic_bars(
+    high: npt.NDArray[np.int64], low: npt.NDArray[np.int64], close: npt.NDArray[np.int64]
+) -> list[OHLCVBar]:
+    """Wrap cent prices in ``OHLCVBar`` objects, one calendar day apart."""
+    start = date(2000, 1, 1)
+    bars = []
+    for i, (h, lo, c) in enumerate(zip(high.tolist(), low.tolist(), close.tolist(), strict=True)):
+        price = Decimal(c).scaleb(-2)
+        bars.append(
+            OHLCVBar.model_construct(
+                ticker="BENCH",
+                asset_type="stock",
+                date=start + timedelta(days=i),
+                open=price,
+                high=Decimal(h).scaleb(-2),
+                low=Decimal(lo).scaleb(-2),
+                close=price,
+                volume=0,
+            )
+        )
+    return bars
+
+
+def sliced_stochastic(
+    bars: list[OHLCVBar],
+    k_period: int = K_PERIOD,
+    d_period: int = D_PERIOD,
+) -> dict[date, tuple[Decimal, Decimal | None]]:
+    """Reference O(n * k) implementation that re-scans every window."""
+    if len(bars) < k_period:
+        return {}
+    k_values: list[tuple[date, Decimal]] = []
+    for i in range(k_period - 1, len(bars)):
+        window = bars[i - k_period + 1 : i + 1]
+        highest_high = max(b.high for b in window)
+        lowest_low = min(b.low for b in window)
+        spread = highest_high - lowest_low
+        if spread == 0:
+            k = Decimal(50)
+        else:
+            k = (bars[i].close - lowest_low) / spread * 100
+        k_values.append((bars[i].date, k))
+
+    result: dict[date, tuple[Decimal, Decimal | None]] = {}
+    for idx, (dt, k) in enumerate(k_values):
+        if idx < d_period - 1:
+            result[dt] = (k, None)
+        else:
+            d_window = [k_values[j][1] for j in range(idx - d_period + 1, idx + 1)]
+            result[dt] = (k, sum(d_window, start=Decimal("0")) / Decimal(d_period))
+    return result
+
+
+@dataclass
+class StochasticBenchmark:
+    """Wall-clock seconds per implementation for one series."""
+
+    label: str
+    bars: int
+    k_period: int
+    sliced_seconds: float | None
+    deque_seconds: float | None
+    numpy_seconds: float
+
+
+def _timed(function: Callable[..., object], *args: object) -> float:
+    started = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - started
+
+
+def benchmark_stochastic(
+    label: str,
+    count: int,
+    k_period: int = K_PERIOD,
+    d_period: int = D_PERIOD,
+    max_decimal_bars: int = 250_000,
+) -> StochasticBenchmark:
+    """Time every stochastic implementation on ``count`` synthetic bars.
+
+    Decimal implementations need one ``OHLCVBar`` per bar, so they are
+    skipped above ``max_decimal_bars`` to keep memory bounded.
+    """
+    high, low, close = synthetic_prices(count)
+    numpy_seconds = _timed(stochastic, high / 100, low / 100, close / 100, k_period, d_period)
+    sliced_seconds = deque_seconds = None
+    if count <= max_decimal_bars:
+        bars = synthetic_bars(high, low, close)
+        sliced_seconds = _timed(sliced_stochastic, bars, k_period, d_period)
+        deque_seconds = _timed(compute_stochastic, bars, k_period, d_period)
+    return StochasticBenchmark(label, count, k_period, sliced_seconds, deque_seconds, numpy_seconds)
+
+
+def synthetic_page(count: int, seed: int = 0) -> bytes:
+    """A Massive aggregates response body with ``count`` daily results."""
+    high, low, close = synthetic_prices(count, seed)
+    start_ms = 946_684_800_000  # 2000-01-01
+    results = [
+        {
+            "t": start_ms + i * 86_400_000,
+            "o": c / 100,
+            "h": h / 100,
+            "l": lo / 100,
+            "c": c / 100,
+            "v": 1_000_000 + i,
+            "vw": (h + lo) / 200,
+            "n": 5000,
+        }
+        for i, (h, lo, c) in enumerate(
+            zip(high.tolist(), low.tolist(), close.tolist(), strict=True)
+        )
+    ]
+    return json.dumps({"results": results, "status": "OK"}).encode()
+
+
+def _decimal_models(content: bytes) -> list[OHLCVBar]:
+    """The previous parsing path: stdlib JSON, then ``Decimal(str(x))`` per field."""
+    return [
+        OHLCVBar(
+            ticker="BENCH",
+            asset_type="stock",
+            date=_ts_to_date(r["t"]),
+            open=Decimal(str(r["o"])),
+            high=Decimal(str(r["h"])),
+            low=Decimal(str(r["l"])),
+            close=Decimal(str(r["c"])),
+            volume=int(r["v"]),
+            vwap=Decimal(str(r["vw"])) if "vw" in r else None,
+            num_transactions=r.get("n"),
+        )
+        for r in json.loads(content)["results"]
+    ]
+
+
+def _orjson_batch(content: bytes) -> OHLCVBatch:
+    return OHLCVBatch.from_results("BENCH", "stock", decode_json(content)["results"])
+
+
+def _exact_models(content: bytes) -> list[OHLCVBar]:
+    return [
+        OHLCVBar(
+            ticker="BENCH",
+            asset_type="stock",
+            date=_ts_to_date(r["t"]),
+            open=r["o"],
+            high=r["h"],
+            low=r["l"],
+            close=r["c"],
+            volume=int(r["v"]),
+            vwap=r.get("vw"),
+            num_transactions=r.get("n"),
+        )
+        for r in decode_json(content, exact=True)["results"]
+    ]
+
+
+@dataclass
+class DecodeBenchmark:
+    """Wall-clock seconds to parse one page of ``bars`` results."""
+
+    bars: int
+    page_bytes: int
+    decimal_seconds: float
+    batch_seconds: float
+    exact_seconds: float
+
+
+def benchmark_decode(count: int) -> DecodeBenchmark:
+    """Time each parsing path on a synthetic page of ``count`` bars."""
+    content = synthetic_page(count)
+    return DecodeBenchmark(
+        count,
+        len(content),
+        _timed(_decimal_models, content),
+        _timed(_orjson_batch, content),
+        _timed(_exact_models, content),
+    )
+
+
+def _seconds(value: float | None) -> str:
+    return "skipped" if value is None else f"{value:.3f}s"
+
+
+def _run_stochastic(args: argparse.Namespace) -> None:
+    for frequency in args.frequency:
+        count = int(args.years * BARS_PER_YEAR[frequency])
+        for k_period in args.k_period:
+            result = benchmark_stochastic(
+                frequency, count, k_period, args.d_period, args.max_decimal_bars
+            )
+            print(
+                f"stochastic {result.label:<7} n={result.bars:>9} k={result.k_period:<4} "
+                f"sliced {_seconds(result.sliced_seconds):>8}  "
+                f"deque {_seconds(result.deque_seconds):>8}  "
+                f"numpy {_seconds(result.numpy_seconds):>8}"
+            )
+
+
+def _run_decode(args: argparse.Namespace) -> None:
+    for count in args.bars:
+        result = benchmark_decode(count)
+        print(
+            f"decode n={result.bars:>7} {result.page_bytes / 1e6:>6.1f} MB  "
+            f"decimal {_seconds(result.decimal_seconds):>8}  "
+            f"batch {_seconds(result.batch_seconds):>8}  "
+            f"exact {_seconds(result.exact_seconds):>8}"
+        )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark ingestion hot paths.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stoch = commands.add_parser("stochastic", help="sliced vs deque vs NumPy stochastic")
+    stoch.add_argument("--years", type=float, default=20.0)
+    stoch.add_argument(
+        "--frequency", nargs="+", choices=sorted(BARS_PER_YEAR), default=["daily", "minute"]
+    )
+    stoch.add_argument("--k-period", type=int, nargs="+", default=[K_PERIOD])
+    stoch.add_argument("--d-period", type=int, default=D_PERIOD)
+    stoch.add_argument(
+        "--max-decimal-bars",
+        type=int,
+        default=250_000,
+        help="skip the Decimal implementations above this many bars",
+    )
+
+    decode = commands.add_parser("decode", help="Massive page parsing paths")
+    decode.add_argument("--bars", type=int, nargs="+", default=[5_000, 50_000])
+
+    args = parser.parse_args(argv)
+    runners = {"stochastic": _run_stochastic, "decode": _run_decode}
+    runners[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
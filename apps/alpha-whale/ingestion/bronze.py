@@ -1,13 +1,154 @@
-"""Bronze layer: upsert raw market data and indicators into Supabase."""
+"""Bronze layer: upsert raw market data and indicators into Supabase.
 
+Rows are written in chunks bounded by row count and by encoded JSON size,
+so years of history never hit PostgREST payload limits or statement
+timeouts in one request. Chunks are sent concurrently with
+``Prefer: return=minimal`` (nothing is echoed back), and a chunk that fails
+transiently is retried on its own; writes are idempotent on
+``(ticker, date)``, so a retry cannot duplicate rows. Client errors (a
+missing table, a constraint or type violation, an oversized payload) fail
+on the first attempt.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+import httpx
+from postgrest import APIError
+from postgrest.types import ReturnMethod
 from supabase import AsyncClient
 
+from ingestion.batch import OHLCVBatch
+from ingestion.resample import Timeframe
 from ingestion.schemas import IndicatorRow, OHLCVBar
+from py_core.async_utils import RETRYABLE_STATUS_CODES, gather_with_concurrency
+from py_core.logging import get_logger
+
+logger = get_logger("ingestion.bronze")
+
+
+@dataclass(frozen=True)
+class UpsertPolicy:
+    """How bronze writers split rows into requests and send them.
+
+    Attributes:
+        chunk_rows: Maximum rows per request.
+        chunk_bytes: Maximum encoded JSON bytes per request; a single larger
+            row is still sent, alone.
+        concurrency: Chunks of one table write in flight at once.
+        max_attempts: Attempts per chunk before a transient failure is raised.
+        backoff: Seconds before the first retry, doubled on each further one.
+    """
+
+    chunk_rows: int = 1000
+    chunk_bytes: int = 1_000_000
+    concurrency: int = 4
+    max_attempts: int = 3
+    backoff: float = 1.0
+
+
+DEFAULT_UPSERT_POLICY = UpsertPolicy()
+
+# PostgREST cannot reach the database or its schema cache (served as 503/504)
+_TRANSIENT_POSTGREST_CODES = frozenset({"PGRST000", "PGRST001", "PGRST002", "PGRST003"})
+# SQLSTATEs worth retrying: serialization failure and deadlock, plus the
+# connection (08), insufficient resources (53) and operator intervention
+# (57, including statement timeouts) classes
+_TRANSIENT_SQLSTATES = frozenset({"40001", "40P01"})
+_TRANSIENT_SQLSTATE_CLASSES = frozenset({"08", "53", "57"})
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Check if a failed upsert is worth retrying (transport error, 429 or 5xx)."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if not isinstance(exc, APIError):
+        return False
+    code = str(exc.code or "")
+    if code.isdigit() and len(code) == 3:
+        # Non-JSON error bodies (e.g. from a gateway) carry the HTTP status
+        return int(code) in RETRYABLE_STATUS_CODES
+    return (
+        code in _TRANSIENT_POSTGREST_CODES
+        or code in _TRANSIENT_SQLSTATES
+        or code[:2] in _TRANSIENT_SQLSTATE_CLASSES
+    )
+
+
+def chunk_rows(
+    rows: list[dict[str, Any]], max_rows: int, max_bytes: int
+) -> list[list[dict[str, Any]]]:
+    """Split rows into consecutive chunks within both the row and byte bounds."""
+    chunks: list[list[dict[str, Any]]] = []
+    current: list[dict[str, Any]] = []
+    size = 2  # the enclosing []
+    for row in rows:
+        row_size = len(json.dumps(row, separators=(",", ":"))) + 1
+        if current and (len(current) >= max_rows or size + row_size > max_bytes):
+            chunks.append(current)
+            current, size = [], 2
+        current.append(row)
+        size += row_size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def _upsert_chunk(
+    client: AsyncClient,
+    table: str,
+    rows: list[dict[str, Any]],
+    index: int,
+    policy: UpsertPolicy,
+) -> int:
+    """Upsert one chunk, retrying transient failures alone with exponential backoff."""
+    for attempt in range(1, policy.max_attempts + 1):
+        try:
+            await (
+                client.table(table)
+                .upsert(rows, on_conflict="ticker,date", returning=ReturnMethod.minimal)
+                .execute()
+            )
+        except Exception as exc:
+            if attempt == policy.max_attempts or not _is_transient(exc):
+                raise
+            logger.warning(
+                "upsert_chunk_retrying", table=table, chunk=index, attempt=attempt, error=str(exc)
+            )
+            await asyncio.sleep(policy.backoff * 2 ** (attempt - 1))
+        else:
+            break
+    logger.debug("upsert_chunk_written", table=table, chunk=index, rows=len(rows))
+    return len(rows)
+
+
+async def _upsert_rows(
+    client: AsyncClient,
+    table: str,
+    rows: list[dict[str, Any]],
+    policy: UpsertPolicy,
+) -> int:
+    """Upsert JSON rows in bounded chunks and return the number written."""
+    if not rows:
+        return 0
+    chunks = chunk_rows(rows, policy.chunk_rows, policy.chunk_bytes)
+    written = await gather_with_concurrency(
+        policy.concurrency,
+        *(_upsert_chunk(client, table, chunk, i, policy) for i, chunk in enumerate(chunks)),
+    )
+    logger.info("upsert_complete", table=table, rows=sum(written), chunk_rows=written)
+    return sum(written)
 
 
 async def upsert_market_data(
     client: AsyncClient,
     bars: list[OHLCVBar],
+    policy: UpsertPolicy = DEFAULT_UPSERT_POLICY,
 ) -> int:
     """Upsert OHLCV bars into the ``market_data_daily`` table.
 
@@ -16,21 +157,39 @@ async def upsert_market_data(
     Args:
         client: Authenticated async Supabase client.
         bars: OHLCV bars to upsert.
+        policy: Chunking, concurrency and retry settings.
 
     Returns:
         Number of rows upserted.
     """
-    if not bars:
-        return 0
-
     rows = [bar.model_dump(mode="json") for bar in bars]
-    await client.table("market_data_daily").upsert(rows, on_conflict="ticker,date").execute()
-    return len(rows)
+    return await _upsert_rows(client, "market_data_daily", rows, policy)
+
+
+async def upsert_market_batch(
+    client: AsyncClient,
+    batch: OHLCVBatch,
+    policy: UpsertPolicy = DEFAULT_UPSERT_POLICY,
+) -> int:
+    """Upsert a columnar OHLCV batch into the ``market_data_daily`` table.
+
+    Rows are serialised straight from the columns, without per-bar models.
+
+    Args:
+        client: Authenticated async Supabase client.
+        batch: OHLCV columns to upsert.
+        policy: Chunking, concurrency and retry settings.
+
+    Returns:
+        Number of rows upserted.
+    """
+    return await _upsert_rows(client, "market_data_daily", batch.to_records(), policy)
 
 
 async def upsert_indicators(
     client: AsyncClient,
     indicators: list[IndicatorRow],
+    policy: UpsertPolicy = DEFAULT_UPSERT_POLICY,
 ) -> int:
     """Upsert indicator rows into the ``technical_indicators_daily`` table.
 
@@ -39,15 +198,100 @@ async def upsert_indicators(
     Args:
         client: Authenticated async Supabase client.
         indicators: Indicator rows to upsert.
+        policy: Chunking, concurrency and retry settings.
 
     Returns:
         Number of rows upserted.
     """
-    if not indicators:
-        return 0
+    rows = [row.model_dump(mode="json") for row in indicators]
+    return await _upsert_rows(client, "technical_indicators_daily", rows, policy)
+
 
+async def upsert_resampled(
+    client: AsyncClient,
+    timeframe: Timeframe,
+    batch: OHLCVBatch,
+    indicators: list[IndicatorRow],
+    policy: UpsertPolicy = DEFAULT_UPSERT_POLICY,
+) -> tuple[int, int]:
+    """Upsert resampled bars and their indicators into the ``timeframe`` tables.
+
+    Writes ``market_data_<timeframe>`` and ``technical_indicators_<timeframe>``
+    (see ``migrations/002_create_resampled_tables.sql``), keyed like the daily
+    tables on ``(ticker, date)`` with ``date`` the period start.
+
+    Args:
+        client: Authenticated async Supabase client.
+        timeframe: ``"weekly"`` or ``"monthly"``.
+        batch: Resampled bars to upsert.
+        indicators: Indicator rows computed over the resampled bars.
+        policy: Chunking, concurrency and retry settings.
+
+    Returns:
+        Number of bar rows and indicator rows upserted.
+    """
+    bars = await _upsert_rows(client, f"market_data_{timeframe}", batch.to_records(), policy)
     rows = [row.model_dump(mode="json") for row in indicators]
-    await (
-        client.table("technical_indicators_daily").upsert(rows, on_conflict="ticker,date").execute()
+    return bars, await _upsert_rows(client, f"technical_indicators_{timeframe}", rows, policy)
+
+
+async def resampled_history(
+    client: AsyncClient,
+    timeframe: Timeframe,
+    ticker: str,
+    asset_type: str,
+    before: date,
+    limit: int = 1000,
+) -> OHLCVBatch:
+    """Read the stored ``market_data_<timeframe>`` bars of ``ticker`` dated before ``before``.
+
+    Incremental runs resample only the daily bars they fetched; the earlier
+    periods come from here so recursive indicators see the whole series.
+
+    Args:
+        client: Authenticated async Supabase client.
+        timeframe: ``"weekly"`` or ``"monthly"``.
+        ticker: Symbol to read.
+        asset_type: Asset type of the returned batch.
+        before: Exclusive upper bound on the period start date.
+        limit: Most recent periods to read (1000 weeks is over 19 years).
+
+    Returns:
+        The stored bars, sorted by date ascending.
+    """
+    response = await (
+        client.table(f"market_data_{timeframe}")
+        .select("date,open,high,low,close,volume,vwap,num_transactions")
+        .eq("ticker", ticker)
+        .lt("date", before.isoformat())
+        .order("date", desc=True)
+        .limit(limit)
+        .execute()
     )
-    return len(rows)
+    rows: list[dict[str, Any]] = list(reversed(response.data))  # type: ignore[arg-type]
+    return OHLCVBatch.from_records(ticker, asset_type, rows)
+
+
+async def latest_market_date(client: AsyncClient, ticker: str) -> date | None:
+    """Return the most recent date stored in ``market_data_daily`` for ``ticker``.
+
+    Served by the ``(ticker, date DESC)`` index, so it reads a single row.
+
+    Args:
+        client: Authenticated async Supabase client.
+        ticker: Symbol to look up.
+
+    Returns:
+        The latest stored date, or ``None`` if the ticker has no rows.
+    """
+    response = await (
+        client.table("market_data_daily")
+        .select("date")
+        .eq("ticker", ticker)
+        .order("date", desc=True)
+        .limit(1)
+        .execute()
+    )
+    if not response.data:
+        return None
+    return date.fromisoformat(str(response.data[0]["date"]))  # type: ignore[index, call-overload]
@@ -1,5 +1,7 @@
 """Configuration for AlphaWhale ingestion pipeline."""
 
+from typing import Literal
+
 from pydantic import Field, SecretStr
 from pydantic_settings import BaseSettings
 
@@ -17,5 +19,36 @@ class IngestionSettings(BaseSettings):
     massive_base_url: str = Field(
         default="https://api.polygon.io", validation_alias="INGESTION_MASSIVE_BASE_URL"
     )
+    # Shared across all ticker workers; 0 disables the budget (paid plans)
+    massive_requests_per_minute: int = Field(
+        default=5, ge=0, validation_alias="INGESTION_MASSIVE_REQUESTS_PER_MINUTE"
+    )
+    concurrency: int = Field(default=4, ge=1, validation_alias="INGESTION_CONCURRENCY")
+    # Incremental runs re-fetch this many days before each ticker's high-water mark
+    overlap_days: int = Field(default=3, ge=0, validation_alias="INGESTION_OVERLAP_DAYS")
+    # Local high-water marks; when unset, incremental runs ask Supabase instead
+    watermark_path: str | None = Field(default=None, validation_alias="INGESTION_WATERMARK_PATH")
+    # "local" computes indicators from OHLCV; "massive" fetches them from the API
+    indicator_source: Literal["local", "massive"] = Field(
+        default="local", validation_alias="INGESTION_INDICATOR_SOURCE"
+    )
+    # Supabase upserts are split into chunks bounded by rows and JSON bytes;
+    # each ticker writes up to upsert_concurrency chunks at once
+    upsert_chunk_rows: int = Field(
+        default=1000, ge=1, validation_alias="INGESTION_UPSERT_CHUNK_ROWS"
+    )
+    upsert_chunk_bytes: int = Field(
+        default=1_000_000, ge=1, validation_alias="INGESTION_UPSERT_CHUNK_BYTES"
+    )
+    upsert_concurrency: int = Field(
+        default=4, ge=1, validation_alias="INGESTION_UPSERT_CONCURRENCY"
+    )
+    # Local columnar copy of every fetched batch (see ingestion.lake); unset disables it
+    lake_path: str | None = Field(default=None, validation_alias="INGESTION_LAKE_PATH")
+    # Coarser bars (and their indicators) derived from the daily bars; needs migration 002.
+    # Set INGESTION_RESAMPLE_TIMEFRAMES='[]' to skip the stage
+    resample_timeframes: list[Literal["weekly", "monthly"]] = Field(
+        default=["weekly", "monthly"], validation_alias="INGESTION_RESAMPLE_TIMEFRAMES"
+    )
 
     model_config = {"env_prefix": "INGESTION_", "populate_by_name": True}
@@ -0,0 +1,245 @@
+"""Local technical indicator engine over whole OHLCV columns.
+
+Computes every column of ``technical_indicators_daily`` from the bars the
+pipeline already holds, replacing one paginated Massive request (and a
+rate-limit wait) per indicator with milliseconds of NumPy.
+
+Conventions are the standard (TA-Lib style) definitions:
+
+- SMA: arithmetic mean of the last ``window`` closes.
+- EMA: ``alpha = 2 / (window + 1)``, seeded with the SMA of the first
+  ``window`` values.
+- RSI: Wilder smoothing (``alpha = 1 / window``) of gains and losses,
+  seeded with their simple average over the first ``window`` changes.
+- MACD: ``EMA(short) - EMA(long)``; the signal line is an EMA of MACD, and
+  the histogram is MACD minus signal.
+- Stochastic: %K is the close's position in the ``k_period`` high-low
+  range (50 when the range is flat); %D is the ``d_period`` SMA of %K.
+
+Every function returns a float64 array aligned with its input, with NaN
+wherever the window is not yet full. EMA and RSI are recursive, so their
+values depend on the history before the first date written: callers must
+pass the full series, or a warm-up long enough for the seed to decay, not
+just the new dates.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import numpy.typing as npt
+
+from ingestion.batch import OHLCVBatch
+from ingestion.schemas import IndicatorRow
+
+FloatArray = npt.NDArray[np.float64]
+
+
+@dataclass(frozen=True)
+class IndicatorWindows:
+    """Window lengths behind each ``technical_indicators_daily`` column."""
+
+    ema_fast: int = 8
+    ema_slow: int = 80
+    sma: int = 200
+    rsi: int = 14
+    macd_short: int = 12
+    macd_long: int = 26
+    macd_signal: int = 9
+    stoch_k: int = 14
+    stoch_d: int = 3
+
+
+DEFAULT_WINDOWS = IndicatorWindows()
+
+
+def _as_float(values: npt.ArrayLike) -> FloatArray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def sma(values: npt.ArrayLike, window: int) -> FloatArray:
+    """Simple moving average of ``values`` over ``window`` points."""
+    series = _as_float(values)
+    out = np.full(len(series), np.nan)
+    if window <= len(series):
+        sums = np.cumsum(np.concatenate(([0.0], series)))
+        out[window - 1 :] = (sums[window:] - sums[:-window]) / window
+    return out
+
+
+def _smooth(series: FloatArray, window: int, alpha: float) -> FloatArray:
+    """Exponential smoothing seeded with the mean of the first ``window`` valid points.
+
+    Leading NaNs (e.g. a MACD line before its slow EMA is defined) are
+    skipped, so smoothing starts at the first full window of real values.
+    """
+    out = np.full(len(series), np.nan)
+    valid = np.flatnonzero(~np.isnan(series))
+    if len(valid) < window:
+        return out
+    start = int(valid[0])
+    seed = start + window - 1
+    value = float(series[start : seed + 1].mean())
+    out[seed] = value
+    # The recurrence is inherently sequential; plain floats keep it ~50 ns per step
+    tail = series[seed + 1 :].tolist()
+    smoothed = []
+    for x in tail:
+        value += alpha * (x - value)
+        smoothed.append(value)
+    out[seed + 1 :] = smoothed
+    return out
+
+
+def ema(values: npt.ArrayLike, window: int) -> FloatArray:
+    """Exponential moving average with ``alpha = 2 / (window + 1)``."""
+    return _smooth(_as_float(values), window, 2.0 / (window + 1))
+
+
+def rsi(close: npt.ArrayLike, window: int = 14) -> FloatArray:
+    """Wilder's Relative Strength Index (0-100) of a close series."""
+    series = _as_float(close)
+    out = np.full(len(series), np.nan)
+    if len(series) <= window:
+        return out
+    deltas = np.diff(series)
+    alpha = 1.0 / window
+    average_gain = _smooth(np.maximum(deltas, 0.0), window, alpha)
+    average_loss = _smooth(np.maximum(-deltas, 0.0), window, alpha)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        strength = 100.0 - 100.0 / (1.0 + average_gain / average_loss)
+    # No losses: 100 by definition; a completely flat window is neutral
+    strength = np.where(average_loss == 0.0, np.where(average_gain == 0.0, 50.0, 100.0), strength)
+    out[1:] = strength
+    return out
+
+
+def macd(
+    close: npt.ArrayLike,
+    short_window: int = 12,
+    long_window: int = 26,
+    signal_window: int = 9,
+) -> tuple[FloatArray, FloatArray, FloatArray]:
+    """MACD line, signal line and histogram of a close series."""
+    series = _as_float(close)
+    line = ema(series, short_window) - ema(series, long_window)
+    signal = _smooth(line, signal_window, 2.0 / (signal_window + 1))
+    return line, signal, line - signal
+
+
+def rolling_max(values: npt.ArrayLike, window: int) -> FloatArray:
+    """Maximum of each full ``window``-point window, in O(n) for any window.
+
+    Van Herk/Gil-Werman: within fixed blocks of ``window`` points take
+    running maxima forwards and backwards; every window spans at most two
+    blocks, so its maximum is the backward maximum at its start combined
+    with the forward maximum at its end. The result is exact and has
+    ``len(values) - window + 1`` entries.
+    """
+    series = _as_float(values)
+    count = len(series)
+    if count < window:
+        return np.empty(0)
+    padded = np.full(-(-count // window) * window, -np.inf)
+    padded[:count] = series
+    blocks = padded.reshape(-1, window)
+    forward = np.maximum.accumulate(blocks, axis=1).ravel()
+    backward = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return np.maximum(backward[: count - window + 1], forward[window - 1 : count])
+
+
+def rolling_min(values: npt.ArrayLike, window: int) -> FloatArray:
+    """Minimum of each full ``window``-point window (see ``rolling_max``)."""
+    return -rolling_max(-_as_float(values), window)
+
+
+def stochastic(
+    high: npt.ArrayLike,
+    low: npt.ArrayLike,
+    close: npt.ArrayLike,
+    k_period: int = 14,
+    d_period: int = 3,
+) -> tuple[FloatArray, FloatArray]:
+    """Stochastic %K and %D (0-100)."""
+    highs, lows, closes = _as_float(high), _as_float(low), _as_float(close)
+    k = np.full(len(closes), np.nan)
+    if len(closes) < k_period:
+        return k, np.full(len(closes), np.nan)
+    highest = rolling_max(highs, k_period)
+    lowest = rolling_min(lows, k_period)
+    spread = highest - lowest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        position = (closes[k_period - 1 :] - lowest) / spread * 100.0
+    k[k_period - 1 :] = np.where(spread == 0.0, 50.0, position)
+    d = np.full(len(closes), np.nan)
+    d[k_period - 1 :] = sma(k[k_period - 1 :], d_period)
+    return k, d
+
+
+def compute_indicators(
+    high: npt.ArrayLike,
+    low: npt.ArrayLike,
+    close: npt.ArrayLike,
+    windows: IndicatorWindows = DEFAULT_WINDOWS,
+) -> dict[str, FloatArray]:
+    """Every ``IndicatorRow`` column for one ticker's bars, sorted by date.
+
+    Returns:
+        Column name -> float64 array aligned with the bars (NaN where undefined).
+    """
+    closes = _as_float(close)
+    macd_line, macd_signal, macd_histogram = macd(
+        closes, windows.macd_short, windows.macd_long, windows.macd_signal
+    )
+    stoch_k, stoch_d = stochastic(high, low, closes, windows.stoch_k, windows.stoch_d)
+    return {
+        "ema_8": ema(closes, windows.ema_fast),
+        "ema_80": ema(closes, windows.ema_slow),
+        "sma_200": sma(closes, windows.sma),
+        "macd_value": macd_line,
+        "macd_signal": macd_signal,
+        "macd_histogram": macd_histogram,
+        "rsi_14": rsi(closes, windows.rsi),
+        "stoch_k": stoch_k,
+        "stoch_d": stoch_d,
+    }
+
+
+def compute_indicator_rows(
+    batch: OHLCVBatch,
+    windows: IndicatorWindows = DEFAULT_WINDOWS,
+    since: date | None = None,
+) -> list[IndicatorRow]:
+    """Build ``IndicatorRow`` objects from one ticker's OHLCV columns.
+
+    Args:
+        batch: Full available history; recursive indicators need it all.
+        windows: Window lengths for each column.
+        since: Only emit rows on or after this date (history before it is
+            still used for the computation).
+
+    Returns:
+        One row per date with at least one defined indicator.
+    """
+    if not len(batch):
+        return []
+    columns = compute_indicators(batch.high, batch.low, batch.close, windows)
+    names = list(columns)
+    matrix = np.column_stack([columns[name] for name in names])
+    defined = ~np.isnan(matrix)
+    defined_rows = defined.any(axis=1)
+    if since is not None:
+        defined_rows &= batch.dates >= np.datetime64(since, "D")
+
+    dates = batch.date_list()
+    rows = []
+    for i in np.flatnonzero(defined_rows).tolist():
+        values = {
+            name: value
+            for name, value, ok in zip(names, matrix[i].tolist(), defined[i].tolist(), strict=True)
+            if ok
+        }
+        rows.append(IndicatorRow(ticker=batch.ticker, date=dates[i], **values))
+    return rows
@@ -0,0 +1,140 @@
+"""Local columnar bronze lake of OHLCV batches.
+
+Every fetched batch is also kept on disk, so indicator recomputation,
+backtests and Supabase replays can read history at disk speed instead of
+going back to the Massive API. The layout is Hive-style, one uncompressed
+NumPy ``.npz`` file of columns per ticker and calendar year::
+
+    <root>/ticker=AAPL/year=2024.npz
+    <root>/ticker=X%3ABTCUSD/year=2024.npz
+
+Reads only open the partitions whose year overlaps the requested range,
+then bisect the sorted dates inside them.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from ingestion.batch import OHLCVBatch
+
+
+class BronzeLake:
+    """OHLCV columns partitioned by ticker and year under ``root``.
+
+    Writes merge into existing partitions: a date already stored is
+    replaced by the newly written bar, so re-ingesting an overlap window
+    picks up revisions. Each partition is replaced atomically.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _ticker_dir(self, ticker: str) -> Path:
+        # Tickers such as X:BTCUSD are not portable path names
+        return self.root / f"ticker={quote(ticker, safe='')}"
+
+    def _partition(self, ticker: str, year: int) -> Path:
+        return self._ticker_dir(ticker) / f"year={year}.npz"
+
+    def tickers(self) -> list[str]:
+        """Tickers with at least one stored partition, sorted."""
+        if not self.root.exists():
+            return []
+        return sorted(
+            unquote(path.name.removeprefix("ticker="))
+            for path in self.root.glob("ticker=*")
+            if any(path.glob("year=*.npz"))
+        )
+
+    def years(self, ticker: str) -> list[int]:
+        """Years stored for ``ticker``, ascending."""
+        return sorted(
+            int(path.stem.removeprefix("year="))
+            for path in self._ticker_dir(ticker).glob("year=*.npz")
+        )
+
+    def _load(self, ticker: str, year: int) -> OHLCVBatch | None:
+        path = self._partition(ticker, year)
+        if not path.exists():
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            columns = {name: data[name] for name in data.files if name != "asset_type"}
+            return OHLCVBatch(ticker=ticker, asset_type=str(data["asset_type"]), **columns)
+
+    def _save(self, batch: OHLCVBatch, year: int) -> None:
+        path = self._partition(batch.ticker, year)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                arrays: dict[str, Any] = {"asset_type": np.array(batch.asset_type)}
+                arrays.update(batch.columns())
+                np.savez(handle, **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def write(self, batch: OHLCVBatch) -> int:
+        """Merge ``batch`` into its ticker's year partitions.
+
+        Returns:
+            Number of bars written.
+        """
+        if not len(batch):
+            return 0
+        years = batch.dates.astype("datetime64[Y]").astype(int) + 1970
+        # Dates are sorted, so each year is one contiguous run
+        starts = np.flatnonzero(np.diff(years, prepend=-1))
+        ends = [*starts[1:].tolist(), len(batch)]
+        for start, end in zip(starts.tolist(), ends, strict=True):
+            year = int(years[start])
+            new = batch[start:end]
+            existing = self._load(batch.ticker, year)
+            if existing is not None:
+                kept = existing[~np.isin(existing.dates, new.dates)]
+                dates = np.concatenate([kept.dates, new.dates])
+                order = np.argsort(dates, kind="stable")
+                new = OHLCVBatch.concat(batch.ticker, batch.asset_type, [kept, new])[order]
+            self._save(new, year)
+        return len(batch)
+
+    def read(
+        self,
+        ticker: str,
+        from_date: date | None = None,
+        to_date: date | None = None,
+    ) -> OHLCVBatch:
+        """Stored bars of ``ticker`` between two inclusive dates, sorted by date.
+
+        Raises:
+            KeyError: If the lake holds no data for ``ticker``.
+        """
+        stored = self.years(ticker)
+        if not stored:
+            raise KeyError(f"No lake partitions for ticker {ticker!r}")
+        parts = [
+            part
+            for year in stored
+            if (from_date is None or year >= from_date.year)
+            and (to_date is None or year <= to_date.year)
+            and (part := self._load(ticker, year)) is not None
+        ]
+        if not parts:
+            # Empty range: keep the ticker's asset type from any partition
+            first = self._load(ticker, stored[0])
+            return (first or OHLCVBatch.from_results(ticker, "stock", []))[:0]
+        batch = OHLCVBatch.concat(ticker, parts[0].asset_type, parts)
+        if from_date is not None:
+            batch = batch.since(from_date)
+        if to_date is not None:
+            batch = batch.until(to_date)
+        return batch
@@ -1,11 +1,27 @@
-"""Massive (Polygon-compatible) API client for market data and indicators."""
+"""Massive (Polygon-compatible) API client for market data and indicators.
+
+Response bodies are decoded with orjson, and numbers stay native floats
+until they reach NumPy columns or a model field: no ``Decimal(str(x))``
+round trip per value. Clients built with ``exact_decimals=True`` instead
+parse every non-integer straight from the JSON text into ``Decimal`` for
+the model-returning methods, for callers that need the digits exactly as
+sent.
+"""
 
 from __future__ import annotations
 
 import asyncio
+import json
+from collections.abc import AsyncIterator
 from datetime import UTC, date, datetime
 from decimal import Decimal
+from typing import Any
+
+import httpx
+import orjson
 
+from ingestion.batch import OHLCVBatch
+from ingestion.rate_limit import RateLimiter
 from ingestion.schemas import IndicatorValue, MACDValue, OHLCVBar
 from py_core.async_utils import AsyncHTTPClient
 
@@ -20,17 +36,50 @@ def _asset_type(ticker: str) -> str:
     return "crypto" if ticker.startswith("X:") else "stock"
 
 
+def decode_json(content: bytes, exact: bool = False) -> Any:
+    """Decode a JSON body.
+
+    Args:
+        content: Raw response bytes.
+        exact: Parse non-integer numbers from their text into ``Decimal``
+            (stdlib ``json``, slower) instead of floats (orjson).
+    """
+    if exact:
+        return json.loads(content, parse_float=Decimal)
+    return orjson.loads(content)
+
+
+def _since(params: dict[str, str | int], from_date: date | None) -> dict[str, str | int]:
+    """Add an inclusive lower timestamp bound to indicator query params."""
+    if from_date is None:
+        return params
+    return {**params, "timestamp.gte": from_date.isoformat()}
+
+
 class MassiveClient:
     """Async client for the Massive market-data API.
 
     Args:
         http: Initialised ``AsyncHTTPClient`` (caller manages lifecycle).
         api_key: Massive API key (plain string, not SecretStr).
+        rate_limiter: Optional request budget shared with other clients on
+            the same API key; every request (including each page) waits on it.
+        exact_decimals: Build ``OHLCVBar`` and indicator models from decimals
+            parsed out of the JSON text rather than from floats. Columnar
+            ``OHLCVBatch`` results are float64 either way.
     """
 
-    def __init__(self, http: AsyncHTTPClient, api_key: str) -> None:
+    def __init__(
+        self,
+        http: AsyncHTTPClient,
+        api_key: str,
+        rate_limiter: RateLimiter | None = None,
+        exact_decimals: bool = False,
+    ) -> None:
         self._http = http
         self._api_key = api_key
+        self._rate_limiter = rate_limiter
+        self._exact = exact_decimals
 
     def _params(self, extra: dict[str, str | int] | None = None) -> dict[str, str | int]:
         """Build query params with API key included."""
@@ -39,17 +88,75 @@ class MassiveClient:
             params.update(extra)
         return params
 
+    async def _get(self, url: str, params: dict[str, str | int]) -> httpx.Response:
+        """Send a GET request once the rate budget allows it."""
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire()
+        return await self._http.get(url, params=params)
+
+    async def _pages(
+        self, url: str, params: dict[str, str | int], exact: bool = False
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield decoded response pages, following ``next_url`` until exhausted.
+
+        The request for the next page is started before the current page is
+        yielded, so it downloads while the caller processes this one. At
+        most one page beyond the caller's is held in memory. ``exact`` is
+        passed to ``decode_json``.
+        """
+        pending: asyncio.Task[httpx.Response] | None = asyncio.ensure_future(self._get(url, params))
+        try:
+            while pending is not None:
+                data = decode_json((await pending).content, exact)
+                next_url = data.get("next_url")
+                # next_url already carries the cursor and query; only the key is re-sent
+                pending = (
+                    asyncio.ensure_future(self._get(next_url, {"apiKey": self._api_key}))
+                    if next_url is not None
+                    else None
+                )
+                yield data
+        finally:
+            if pending is not None:
+                pending.cancel()
+
     # ------------------------------------------------------------------
     # OHLCV
     # ------------------------------------------------------------------
 
-    async def fetch_ohlcv(
+    def _ohlcv_request(
+        self, ticker: str, from_date: date, to_date: date
+    ) -> tuple[str, dict[str, str | int]]:
+        url = f"/v2/aggs/ticker/{ticker}/range/1/day/{from_date.isoformat()}/{to_date.isoformat()}"
+        return url, self._params({"adjusted": "true", "limit": 50000, "sort": "asc"})
+
+    async def iter_ohlcv_batches(
         self,
         ticker: str,
         from_date: date,
         to_date: date,
-    ) -> list[OHLCVBar]:
-        """Fetch daily OHLCV bars with automatic pagination.
+    ) -> AsyncIterator[OHLCVBatch]:
+        """Stream daily OHLCV bars one response page at a time.
+
+        Args:
+            ticker: Symbol (e.g. ``"AAPL"`` or ``"X:BTCUSD"``).
+            from_date: Start date (inclusive).
+            to_date: End date (inclusive).
+
+        Yields:
+            One ``OHLCVBatch`` per page, in ascending date order.
+        """
+        url, params = self._ohlcv_request(ticker, from_date, to_date)
+        async for data in self._pages(url, params):
+            yield OHLCVBatch.from_results(ticker, _asset_type(ticker), data.get("results", []))
+
+    async def fetch_ohlcv_batch(
+        self,
+        ticker: str,
+        from_date: date,
+        to_date: date,
+    ) -> OHLCVBatch:
+        """Fetch daily OHLCV bars as columns, with automatic pagination.
 
         Args:
             ticker: Symbol (e.g. ``"AAPL"`` or ``"X:BTCUSD"``).
@@ -57,40 +164,43 @@ class MassiveClient:
             to_date: End date (inclusive).
 
         Returns:
-            List of ``OHLCVBar`` sorted by date ascending.
+            ``OHLCVBatch`` sorted by date ascending.
         """
-        url = f"/v2/aggs/ticker/{ticker}/range/1/day/{from_date.isoformat()}/{to_date.isoformat()}"
-        params = self._params({"adjusted": "true", "limit": 50000, "sort": "asc"})
-
-        bars: list[OHLCVBar] = []
-        next_url: str | None = url
-
-        while next_url is not None:
-            resp = await self._http.get(next_url, params=params)
-            data = resp.json()
-
-            for r in data.get("results", []):
-                bars.append(
-                    OHLCVBar(
-                        ticker=ticker,
-                        asset_type=_asset_type(ticker),
-                        date=_ts_to_date(r["t"]),
-                        open=Decimal(str(r["o"])),
-                        high=Decimal(str(r["h"])),
-                        low=Decimal(str(r["l"])),
-                        close=Decimal(str(r["c"])),
-                        volume=int(r["v"]),
-                        vwap=Decimal(str(r["vw"])) if "vw" in r else None,
-                        num_transactions=r.get("n"),
-                    )
-                )
+        pages = [page async for page in self.iter_ohlcv_batches(ticker, from_date, to_date)]
+        return OHLCVBatch.concat(ticker, _asset_type(ticker), pages)
 
-            next_url = data.get("next_url")
-            # After first request, next_url is a full URL with cursor.
-            # Keep only apiKey since the URL already has other params.
-            params = {"apiKey": self._api_key}
+    async def fetch_ohlcv(
+        self,
+        ticker: str,
+        from_date: date,
+        to_date: date,
+    ) -> list[OHLCVBar]:
+        """Fetch daily OHLCV bars as ``OHLCVBar`` models (see ``fetch_ohlcv_batch``).
 
-        return bars
+        Returns:
+            List of ``OHLCVBar`` sorted by date ascending.
+        """
+        if not self._exact:
+            batch = await self.fetch_ohlcv_batch(ticker, from_date, to_date)
+            return batch.to_bars()
+        url, params = self._ohlcv_request(ticker, from_date, to_date)
+        asset_type = _asset_type(ticker)
+        return [
+            OHLCVBar(
+                ticker=ticker,
+                asset_type=asset_type,
+                date=_ts_to_date(r["t"]),
+                open=r["o"],
+                high=r["h"],
+                low=r["l"],
+                close=r["c"],
+                volume=int(r["v"]),
+                vwap=r.get("vw"),
+                num_transactions=r.get("n"),
+            )
+            async for data in self._pages(url, params, exact=True)
+            for r in data.get("results", [])
+        ]
 
     # ------------------------------------------------------------------
     # Single-value indicators (SMA, EMA, RSI)
@@ -101,52 +211,48 @@ class MassiveClient:
         path: str,
         ticker: str,
         extra_params: dict[str, str | int],
+        from_date: date | None = None,
     ) -> list[IndicatorValue]:
         """Fetch a single-value indicator (SMA, EMA, or RSI) with pagination."""
         url = f"{path}/{ticker}"
-        params = self._params(extra_params)
-        all_values: list[IndicatorValue] = []
-        next_url: str | None = url
-
-        while next_url is not None:
-            resp = await self._http.get(next_url, params=params)
-            data = resp.json()
-
-            for v in data.get("results", {}).get("values", []):
-                all_values.append(
-                    IndicatorValue(
-                        timestamp=_ts_to_date(v["timestamp"]),
-                        value=Decimal(str(v["value"])),
-                    )
-                )
-
-            next_url = data.get("next_url")
-            params = {"apiKey": self._api_key}
-
-        return all_values
-
-    async def fetch_sma(self, ticker: str, window: int = 200) -> list[IndicatorValue]:
-        """Fetch Simple Moving Average values."""
+        params = self._params(_since(extra_params, from_date))
+        return [
+            IndicatorValue(timestamp=_ts_to_date(v["timestamp"]), value=v["value"])
+            async for data in self._pages(url, params, self._exact)
+            for v in data.get("results", {}).get("values", [])
+        ]
+
+    async def fetch_sma(
+        self, ticker: str, window: int = 200, from_date: date | None = None
+    ) -> list[IndicatorValue]:
+        """Fetch Simple Moving Average values (from ``from_date`` when given)."""
         return await self._fetch_single_indicator(
             "/v1/indicators/sma",
             ticker,
             {"timespan": "day", "window": window, "series_type": "close", "limit": 5000},
+            from_date,
         )
 
-    async def fetch_ema(self, ticker: str, window: int = 8) -> list[IndicatorValue]:
-        """Fetch Exponential Moving Average values."""
+    async def fetch_ema(
+        self, ticker: str, window: int = 8, from_date: date | None = None
+    ) -> list[IndicatorValue]:
+        """Fetch Exponential Moving Average values (from ``from_date`` when given)."""
         return await self._fetch_single_indicator(
             "/v1/indicators/ema",
             ticker,
             {"timespan": "day", "window": window, "series_type": "close", "limit": 5000},
+            from_date,
         )
 
-    async def fetch_rsi(self, ticker: str, window: int = 14) -> list[IndicatorValue]:
-        """Fetch Relative Strength Index values."""
+    async def fetch_rsi(
+        self, ticker: str, window: int = 14, from_date: date | None = None
+    ) -> list[IndicatorValue]:
+        """Fetch Relative Strength Index values (from ``from_date`` when given)."""
         return await self._fetch_single_indicator(
             "/v1/indicators/rsi",
             ticker,
             {"timespan": "day", "window": window, "series_type": "close", "limit": 5000},
+            from_date,
         )
 
     # ------------------------------------------------------------------
@@ -159,41 +265,34 @@ class MassiveClient:
         short_window: int = 12,
         long_window: int = 26,
         signal_window: int = 9,
+        from_date: date | None = None,
     ) -> list[MACDValue]:
-        """Fetch MACD indicator values with pagination."""
+        """Fetch MACD indicator values with pagination (from ``from_date`` when given)."""
         url = f"/v1/indicators/macd/{ticker}"
         params = self._params(
-            {
-                "timespan": "day",
-                "short_window": short_window,
-                "long_window": long_window,
-                "signal_window": signal_window,
-                "series_type": "close",
-                "limit": 5000,
-            }
+            _since(
+                {
+                    "timespan": "day",
+                    "short_window": short_window,
+                    "long_window": long_window,
+                    "signal_window": signal_window,
+                    "series_type": "close",
+                    "limit": 5000,
+                },
+                from_date,
+            )
         )
 
-        all_values: list[MACDValue] = []
-        next_url: str | None = url
-
-        while next_url is not None:
-            resp = await self._http.get(next_url, params=params)
-            data = resp.json()
-
-            for v in data.get("results", {}).get("values", []):
-                all_values.append(
-                    MACDValue(
-                        timestamp=_ts_to_date(v["timestamp"]),
-                        value=Decimal(str(v["value"])),
-                        signal=Decimal(str(v["signal"])),
-                        histogram=Decimal(str(v["histogram"])),
-                    )
-                )
-
-            next_url = data.get("next_url")
-            params = {"apiKey": self._api_key}
-
-        return all_values
+        return [
+            MACDValue(
+                timestamp=_ts_to_date(v["timestamp"]),
+                value=v["value"],
+                signal=v["signal"],
+                histogram=v["histogram"],
+            )
+            async for data in self._pages(url, params, self._exact)
+            for v in data.get("results", {}).get("values", [])
+        ]
 
     # ------------------------------------------------------------------
     # All indicators (fetched sequentially with rate-limit delays)
@@ -203,6 +302,7 @@ class MassiveClient:
         self,
         ticker: str,
         delay: float = 12.0,
+        from_date: date | None = None,
     ) -> tuple[
         list[IndicatorValue],  # sma_200
         list[IndicatorValue],  # ema_8
@@ -215,14 +315,18 @@ class MassiveClient:
         Args:
             ticker: Symbol to fetch indicators for.
             delay: Seconds to wait between API calls (free tier: 5 req/min).
+                Pass ``0`` when the client has a ``rate_limiter``, which
+                already spaces requests.
+            from_date: Only return values on or after this date. Values are
+                still computed by Massive over the full history.
         """
-        sma = await self.fetch_sma(ticker, window=200)
+        sma = await self.fetch_sma(ticker, window=200, from_date=from_date)
         await asyncio.sleep(delay)
-        ema_8 = await self.fetch_ema(ticker, window=8)
+        ema_8 = await self.fetch_ema(ticker, window=8, from_date=from_date)
         await asyncio.sleep(delay)
-        ema_80 = await self.fetch_ema(ticker, window=80)
+        ema_80 = await self.fetch_ema(ticker, window=80, from_date=from_date)
         await asyncio.sleep(delay)
-        macd = await self.fetch_macd(ticker)
+        macd = await self.fetch_macd(ticker, from_date=from_date)
         await asyncio.sleep(delay)
-        rsi = await self.fetch_rsi(ticker, window=14)
+        rsi = await self.fetch_rsi(ticker, window=14, from_date=from_date)
         return (sma, ema_8, ema_80, macd, rsi)
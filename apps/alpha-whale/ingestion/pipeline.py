@@ -2,18 +2,34 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Sequence
 from dataclasses import dataclass, field
-from datetime import UTC, date, datetime
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 
 from supabase import AsyncClient
 
-from ingestion.bronze import upsert_indicators, upsert_market_data
+from ingestion.batch import OHLCVBatch
+from ingestion.bronze import (
+    DEFAULT_UPSERT_POLICY,
+    UpsertPolicy,
+    latest_market_date,
+    resampled_history,
+    upsert_indicators,
+    upsert_market_batch,
+    upsert_resampled,
+)
 from ingestion.config import IngestionSettings
+from ingestion.indicators import compute_indicator_rows
+from ingestion.lake import BronzeLake
 from ingestion.massive import MassiveClient
+from ingestion.rate_limit import RateLimiter
+from ingestion.resample import Timeframe, period_start, resample
 from ingestion.schemas import IndicatorRow, IndicatorValue, MACDValue
-from ingestion.stochastic import compute_stochastic
-from py_core.async_utils import AsyncHTTPClient
+from ingestion.stochastic import D_PERIOD, K_PERIOD, compute_stochastic
+from ingestion.watermark import WatermarkFile
+from py_core.async_utils import AsyncHTTPClient, gather_with_concurrency
 from py_core.logging import get_logger
 
 logger = get_logger("ingestion.pipeline")
@@ -32,6 +48,16 @@ DEFAULT_TICKERS = [
     "X:SOLUSD",
 ]
 
+# Calendar days of bars fetched before an incremental start with remote indicators,
+# so the stochastic windows ending on the first new date are full
+_STOCHASTIC_WARMUP = timedelta(days=2 * (K_PERIOD + D_PERIOD))
+# Calendar days of bars fetched before an incremental start with local indicators
+# when the lake cannot supply the history: ~750 trading days fill SMA(200) and leave
+# EMA(80), the slowest recursion, with under 1e-7 of its seed's weight
+_LOCAL_WARMUP = timedelta(days=3 * 365)
+# Largest gap (weekends, holidays) the lake history may leave at either end
+_LAKE_SLACK = timedelta(days=7)
+
 
 @dataclass
 class TickerResult:
@@ -41,6 +67,8 @@ class TickerResult:
     ohlcv_rows: int = 0
     indicator_rows: int = 0
     error: str | None = None
+    since: date | None = None  # first date written by an incremental run
+    resampled_rows: int = 0  # weekly/monthly bars written
 
 
 @dataclass
@@ -66,26 +94,108 @@ async def _ingest_ticker(
     supabase: AsyncClient,
     from_date: date,
     to_date: date,
+    overlap_days: int | None = None,
+    watermarks: WatermarkFile | None = None,
+    indicator_source: str = "local",
+    upsert_policy: UpsertPolicy = DEFAULT_UPSERT_POLICY,
+    lake: BronzeLake | None = None,
+    timeframes: Sequence[Timeframe] = (),
 ) -> TickerResult:
-    """Run the full ingestion flow for a single ticker."""
+    """Run the ingestion flow for a single ticker.
+
+    With ``overlap_days`` set, only dates from ``overlap_days`` before the
+    ticker's high-water mark are written; ``watermarks`` supplies the marks
+    (and is advanced on success), otherwise Supabase is asked.
+
+    ``indicator_source="local"`` computes every indicator from the OHLCV
+    bars; ``"massive"`` fetches SMA/EMA/MACD/RSI from the API instead.
+    OHLCV pages are upserted (in chunks bounded by ``upsert_policy``) and
+    merged into ``lake``, when one is given, as they arrive. Each of
+    ``timeframes`` gets resampled bars and indicators from the period
+    containing the first new date.
+
+    Incremental local runs fetch only from the incremental start when
+    ``lake`` holds every earlier bar, and from ``_LOCAL_WARMUP`` before it
+    otherwise, instead of the whole history.
+    """
+    local = indicator_source == "local"
     result = TickerResult(ticker=ticker)
+    logger.info("ingesting_ticker", ticker=ticker)
 
     try:
-        # Step 1: fetch OHLCV bars
-        bars = await massive.fetch_ohlcv(ticker, from_date, to_date)
-        result.ohlcv_rows = await upsert_market_data(supabase, bars)
-        logger.info("ohlcv_upserted", ticker=ticker, rows=result.ohlcv_rows)
-
-        # Step 2: fetch all indicators concurrently
-        sma_200, ema_8, ema_80, macd, rsi = await massive.fetch_all_indicators(ticker)
+        # Step 0: resolve the incremental start date from the high-water mark
+        since = None
+        if overlap_days is not None:
+            since = await _incremental_start(ticker, supabase, watermarks, from_date, overlap_days)
+            result.since = since
+
+        # Step 1: stream OHLCV pages. Local EMA/RSI are recursive and need the full
+        # history: an incremental run reads the bars before its start from the lake
+        # when it holds them, and otherwise fetches a converging warm-up. Remote
+        # indicators only need the stochastic warm-up. Each page is written to the
+        # lake and upserted while the next one downloads.
+        fetch_from = from_date
+        history = None
+        if since is not None and local:
+            if lake is not None:
+                history = await asyncio.to_thread(_lake_history, lake, ticker, from_date, since)
+            fetch_from = since if history is not None else max(from_date, since - _LOCAL_WARMUP)
+        elif since is not None:
+            fetch_from = max(from_date, since - _STOCHASTIC_WARMUP)
+        pages: list[OHLCVBatch] = [] if history is None else [history]
+        async for page in massive.iter_ohlcv_batches(ticker, fetch_from, to_date):
+            if lake is not None:
+                lake_rows = await asyncio.to_thread(lake.write, page)
+                logger.info("lake_written", ticker=ticker, rows=lake_rows)
+            new_bars = page if since is None else page.since(since)
+            result.ohlcv_rows += await upsert_market_batch(supabase, new_bars, upsert_policy)
+            pages.append(page)
+        logger.info(
+            "ohlcv_upserted",
+            ticker=ticker,
+            rows=result.ohlcv_rows,
+            since=since,
+            fetched_from=fetch_from,
+            lake_history=0 if history is None else len(history),
+        )
+        if not pages:
+            return result
+        # Indicators and resampling need the lake history and fetched pages as one batch
+        batch = OHLCVBatch.concat(ticker, pages[0].asset_type, pages)
+        covered_from = from_date if history is not None else fetch_from
+
+        if local:
+            # Step 2: compute every indicator over the bars at hand
+            indicator_rows = compute_indicator_rows(batch, since=since)
+        else:
+            # Step 2: fetch remote indicators; the shared rate limiter spaces the requests
+            sma_200, ema_8, ema_80, macd, rsi = await massive.fetch_all_indicators(
+                ticker, delay=0, from_date=since
+            )
+
+            # Step 3: compute stochastic from OHLCV bars
+            stoch = compute_stochastic(batch.to_bars())
+
+            # Step 4: merge indicators into rows keyed by date
+            indicator_rows = _merge_indicators(ticker, sma_200, ema_8, ema_80, macd, rsi, stoch)
+            if since is not None:
+                indicator_rows = [row for row in indicator_rows if row.date >= since]
+        result.indicator_rows = await upsert_indicators(supabase, indicator_rows, upsert_policy)
+        logger.info("indicators_upserted", ticker=ticker, rows=result.indicator_rows)
 
-        # Step 3: compute stochastic from OHLCV bars
-        stoch = compute_stochastic(bars)
+        # Step 5: roll the daily bars up into coarser timeframes
+        result.resampled_rows = await _upsert_timeframes(
+            supabase,
+            batch,
+            covered_from,
+            since,
+            timeframes,
+            complete=covered_from == from_date,
+            upsert_policy=upsert_policy,
+        )
 
-        # Step 4: merge indicators into rows keyed by date
-        indicator_rows = _merge_indicators(ticker, sma_200, ema_8, ema_80, macd, rsi, stoch)
-        result.indicator_rows = await upsert_indicators(supabase, indicator_rows)
-        logger.info("indicators_upserted", ticker=ticker, rows=result.indicator_rows)
+        if watermarks is not None and len(batch):
+            watermarks.advance(ticker, batch.date_list()[-1])
 
     except Exception as exc:
         result.error = str(exc)
@@ -94,6 +204,90 @@ async def _ingest_ticker(
     return result
 
 
+async def _upsert_timeframes(
+    supabase: AsyncClient,
+    batch: OHLCVBatch,
+    covered_from: date,
+    since: date | None,
+    timeframes: Sequence[Timeframe],
+    complete: bool,
+    upsert_policy: UpsertPolicy,
+) -> int:
+    """Resample ``batch`` and upsert the periods touched since ``since``.
+
+    Only periods starting on or after ``covered_from`` (the first date
+    fetched) are kept, so a partly fetched first period never overwrites a
+    complete one. Unless ``batch`` is the ``complete`` history, the earlier
+    periods are read back from the timeframe's table and prepended, so the
+    indicators are computed over the whole period series.
+
+    Returns:
+        Number of resampled bars written across all timeframes.
+    """
+    written = 0
+    for timeframe in timeframes:
+        bars = resample(batch, timeframe).since(covered_from)
+        start = covered_from if since is None else max(covered_from, period_start(since, timeframe))
+        series = bars
+        if not complete and len(bars):
+            stored = await resampled_history(
+                supabase, timeframe, batch.ticker, batch.asset_type, bars.dates[0].item()
+            )
+            series = OHLCVBatch.concat(batch.ticker, batch.asset_type, [stored, bars])
+        bar_rows, indicator_rows = await upsert_resampled(
+            supabase,
+            timeframe,
+            bars.since(start),
+            compute_indicator_rows(series, since=start),
+            upsert_policy,
+        )
+        logger.info(
+            "timeframe_upserted",
+            ticker=batch.ticker,
+            timeframe=timeframe,
+            rows=bar_rows,
+            indicator_rows=indicator_rows,
+        )
+        written += bar_rows
+    return written
+
+
+def _lake_history(lake: BronzeLake, ticker: str, from_date: date, since: date) -> OHLCVBatch | None:
+    """Lake bars from ``from_date`` up to (excluding) ``since``, if the lake holds them all.
+
+    The history counts as complete when it starts within a week of
+    ``from_date`` and ends within a week of ``since``; a ticker listed later,
+    or a lake enabled after its first runs, returns ``None``.
+    """
+    try:
+        history = lake.read(ticker, from_date, since - timedelta(days=1))
+    except KeyError:
+        return None
+    if not len(history):
+        return None
+    first, last = history.dates[[0, -1]].astype(object)
+    if first > from_date + _LAKE_SLACK or last < since - _LAKE_SLACK:
+        return None
+    return history
+
+
+async def _incremental_start(
+    ticker: str,
+    supabase: AsyncClient,
+    watermarks: WatermarkFile | None,
+    from_date: date,
+    overlap_days: int,
+) -> date:
+    """First date to re-ingest: the high-water mark minus the revision overlap."""
+    if watermarks is not None:
+        latest = watermarks.get(ticker)
+    else:
+        latest = await latest_market_date(supabase, ticker)
+    if latest is None:
+        return from_date
+    return max(from_date, latest - timedelta(days=overlap_days))
+
+
 def _merge_indicators(
     ticker: str,
     sma_200: list[IndicatorValue],
@@ -132,25 +326,84 @@ def _merge_indicators(
     return [IndicatorRow(ticker=ticker, date=dt, **fields) for dt, fields in data.items()]
 
 
+async def _replay_ticker(
+    ticker: str,
+    lake: BronzeLake,
+    supabase: AsyncClient,
+    from_date: date,
+    to_date: date,
+    upsert_policy: UpsertPolicy,
+    timeframes: Sequence[Timeframe] = (),
+) -> TickerResult:
+    """Upsert one ticker's lake history and its locally computed indicators."""
+    result = TickerResult(ticker=ticker)
+    try:
+        batch = await asyncio.to_thread(lake.read, ticker, from_date, to_date)
+        result.ohlcv_rows = await upsert_market_batch(supabase, batch, upsert_policy)
+        result.indicator_rows = await upsert_indicators(
+            supabase, compute_indicator_rows(batch), upsert_policy
+        )
+        result.resampled_rows = await _upsert_timeframes(
+            supabase, batch, from_date, None, timeframes, True, upsert_policy
+        )
+        logger.info(
+            "ticker_replayed",
+            ticker=ticker,
+            ohlcv_rows=result.ohlcv_rows,
+            indicator_rows=result.indicator_rows,
+        )
+    except Exception as exc:
+        result.error = str(exc)
+        logger.error("ticker_failed", ticker=ticker, error=str(exc))
+    return result
+
+
+def _upsert_policy(settings: IngestionSettings) -> UpsertPolicy:
+    return UpsertPolicy(
+        chunk_rows=settings.upsert_chunk_rows,
+        chunk_bytes=settings.upsert_chunk_bytes,
+        concurrency=settings.upsert_concurrency,
+    )
+
+
 async def run_pipeline(
     settings: IngestionSettings,
     tickers: list[str] | None = None,
     from_date: date = date(2020, 1, 1),
     to_date: date | None = None,
+    concurrency: int | None = None,
+    incremental: bool = False,
 ) -> IngestionReport:
     """Run the full ingestion pipeline for all tickers.
 
+    Tickers are ingested by up to ``concurrency`` workers that share one
+    Massive request budget, so wall-clock time is bound by the API quota
+    rather than by per-ticker waits. A failing ticker is recorded in its
+    ``TickerResult`` and does not affect the others.
+
+    Incremental runs fetch and write only the range after each ticker's
+    high-water mark (latest stored date, or ``settings.watermark_path``),
+    re-fetching ``settings.overlap_days`` days to pick up revisions.
+
     Args:
         settings: Pipeline configuration with API keys and URLs.
         tickers: Override default ticker list (useful for testing).
         from_date: Start date for OHLCV data.
         to_date: End date (defaults to today).
+        concurrency: Tickers ingested at once (defaults to ``settings.concurrency``).
+        incremental: Only ingest dates after each ticker's high-water mark;
+            ``from_date`` still bounds tickers that have no data yet.
 
     Returns:
         Report with per-ticker results and timing.
     """
     tickers = tickers or DEFAULT_TICKERS
     to_date = to_date or date.today()
+    concurrency = concurrency or settings.concurrency
+    overlap_days = settings.overlap_days if incremental else None
+    watermarks = None
+    if incremental and settings.watermark_path is not None:
+        watermarks = WatermarkFile.load(settings.watermark_path)
     report = IngestionReport()
 
     from ingestion.supabase_client import create_supabase_client
@@ -165,20 +418,105 @@ async def run_pipeline(
         timeout=60.0,
         max_retries=5,
     ) as http:
+        rate_limiter = None
+        if settings.massive_requests_per_minute > 0:
+            rate_limiter = RateLimiter(settings.massive_requests_per_minute)
+        upsert_policy = _upsert_policy(settings)
+        lake = None if settings.lake_path is None else BronzeLake(settings.lake_path)
         massive = MassiveClient(
             http=http,
             api_key=settings.massive_api_key.get_secret_value(),
+            rate_limiter=rate_limiter,
         )
 
-        for ticker in tickers:
-            logger.info("ingesting_ticker", ticker=ticker)
-            result = await _ingest_ticker(ticker, massive, supabase, from_date, to_date)
-            report.results.append(result)
+        report.results = await gather_with_concurrency(
+            concurrency,
+            *(
+                _ingest_ticker(
+                    ticker,
+                    massive,
+                    supabase,
+                    from_date,
+                    to_date,
+                    overlap_days,
+                    watermarks,
+                    settings.indicator_source,
+                    upsert_policy,
+                    lake,
+                    settings.resample_timeframes,
+                )
+                for ticker in tickers
+            ),
+        )
+
+    if watermarks is not None:
+        watermarks.save()
 
     report.finished_at = datetime.now(UTC)
     logger.info(
         "pipeline_complete",
+        concurrency=concurrency,
+        incremental=incremental,
+        indicator_source=settings.indicator_source,
         succeeded=report.succeeded,
         failed=report.failed,
     )
     return report
+
+
+async def replay_from_lake(
+    settings: IngestionSettings,
+    tickers: list[str] | None = None,
+    from_date: date = date(2020, 1, 1),
+    to_date: date | None = None,
+    concurrency: int | None = None,
+) -> IngestionReport:
+    """Re-upsert bars and local indicators from the bronze lake, without API calls.
+
+    Args:
+        settings: Pipeline configuration; ``settings.lake_path`` must be set.
+        tickers: Tickers to replay (defaults to every ticker in the lake).
+        from_date: Start date of the replayed range.
+        to_date: End date (defaults to today).
+        concurrency: Tickers replayed at once (defaults to ``settings.concurrency``).
+
+    Returns:
+        Report with per-ticker results and timing.
+
+    Raises:
+        ValueError: If no lake path is configured.
+    """
+    if settings.lake_path is None:
+        raise ValueError("Replaying requires INGESTION_LAKE_PATH")
+    lake = BronzeLake(settings.lake_path)
+    tickers = tickers or lake.tickers()
+    to_date = to_date or date.today()
+    concurrency = concurrency or settings.concurrency
+    report = IngestionReport()
+
+    from ingestion.supabase_client import create_supabase_client
+
+    supabase = await create_supabase_client(
+        settings.supabase_url,
+        settings.supabase_key.get_secret_value(),
+    )
+    upsert_policy = _upsert_policy(settings)
+    report.results = await gather_with_concurrency(
+        concurrency,
+        *(
+            _replay_ticker(
+                ticker,
+                lake,
+                supabase,
+                from_date,
+                to_date,
+                upsert_policy,
+                settings.resample_timeframes,
+            )
+            for ticker in tickers
+        ),
+    )
+
+    report.finished_at = datetime.now(UTC)
+    logger.info("replay_complete", succeeded=report.succeeded, failed=report.failed)
+    return report
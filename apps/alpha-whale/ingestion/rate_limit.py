@@ -0,0 +1,51 @@
+"""Shared request budget for the Massive API.
+
+The Massive quota is counted per API key, not per ticker, so every
+concurrent ticker worker draws from one ``RateLimiter``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable
+
+
+class RateLimiter:
+    """Sliding-window limiter allowing ``max_requests`` per ``period`` seconds.
+
+    Callers wait in FIFO order, so no worker starves while others keep
+    taking freed slots.
+
+    Args:
+        max_requests: Requests allowed in any window of ``period`` seconds.
+        period: Window length in seconds.
+        clock: Monotonic time source (overridable in tests).
+    """
+
+    def __init__(
+        self,
+        max_requests: int,
+        period: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_requests <= 0:
+            raise ValueError(f"max_requests must be a positive integer, got {max_requests}")
+        self._max_requests = max_requests
+        self._period = period
+        self._clock = clock
+        self._sent: deque[float] = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request fits in the budget, then claim the slot."""
+        async with self._lock:
+            while True:
+                now = self._clock()
+                while self._sent and self._sent[0] <= now - self._period:
+                    self._sent.popleft()
+                if len(self._sent) < self._max_requests:
+                    self._sent.append(now)
+                    return
+                await asyncio.sleep(self._sent[0] + self._period - now)
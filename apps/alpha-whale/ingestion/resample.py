@@ -0,0 +1,92 @@
+"""Resample daily OHLCV batches into weekly and monthly bars.
+
+Each period is keyed by its first calendar day: the Monday of an ISO week
+or the 1st of a month, whether or not that day traded. Per period:
+
+- open is the first daily open and close the last daily close;
+- high and low are the extremes of the daily highs and lows;
+- volume and the transaction count are sums;
+- vwap is the volume-weighted mean of the daily vwaps over the days that
+  have one (NaN when those days have no volume).
+
+Daily dates are sorted, so every period is one contiguous run and each
+column is reduced with a single ``ufunc.reduceat`` over the run starts.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Literal
+
+import numpy as np
+import numpy.typing as npt
+
+from ingestion.batch import MISSING_COUNT, OHLCVBatch
+
+Timeframe = Literal["weekly", "monthly"]
+TIMEFRAMES: tuple[Timeframe, ...] = ("weekly", "monthly")
+
+# 1970-01-01 (day 0 of datetime64[D]) was a Thursday
+_MONDAY_OFFSET = 3
+
+
+def period_starts(
+    dates: npt.NDArray[np.datetime64], timeframe: Timeframe
+) -> npt.NDArray[np.datetime64]:
+    """First calendar day of the period containing each date."""
+    days = dates.astype("datetime64[D]")
+    if timeframe == "weekly":
+        weekday = (days.astype(np.int64) + _MONDAY_OFFSET) % 7
+        starts: npt.NDArray[np.datetime64] = days - weekday.astype("timedelta64[D]")
+        return starts
+    if timeframe == "monthly":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    raise ValueError(f"Unknown timeframe {timeframe!r}. Supported: {', '.join(TIMEFRAMES)}")
+
+
+def period_start(day: date, timeframe: Timeframe) -> date:
+    """First calendar day of the period containing ``day``."""
+    start = period_starts(np.array([day], dtype="datetime64[D]"), timeframe)[0]
+    return date.fromisoformat(str(start))
+
+
+def resample(batch: OHLCVBatch, timeframe: Timeframe) -> OHLCVBatch:
+    """Aggregate a daily batch into one bar per ``timeframe`` period.
+
+    Args:
+        batch: Daily bars sorted by date.
+        timeframe: ``"weekly"`` or ``"monthly"``.
+
+    Returns:
+        A batch of the same ticker whose dates are period start days. The
+        last period holds whatever days the input has so far.
+    """
+    keys = period_starts(batch.dates, timeframe)
+    if not len(batch):
+        return batch
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    ends = np.append(starts[1:], len(batch)) - 1
+
+    priced = ~np.isnan(batch.vwap)
+    weights = np.where(priced, batch.volume, 0).astype(np.float64)
+    weighted = np.add.reduceat(np.where(priced, batch.vwap, 0.0) * weights, starts)
+    total = np.add.reduceat(weights, starts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap = np.where(total > 0, weighted / total, np.nan)
+
+    counted = batch.num_transactions != MISSING_COUNT
+    transactions = np.add.reduceat(np.where(counted, batch.num_transactions, 0), starts)
+    transactions = np.where(np.add.reduceat(counted, starts) > 0, transactions, MISSING_COUNT)
+
+    return OHLCVBatch(
+        ticker=batch.ticker,
+        asset_type=batch.asset_type,
+        dates=keys[starts],
+        open=batch.open[starts],
+        high=np.maximum.reduceat(batch.high, starts),
+        low=np.minimum.reduceat(batch.low, starts),
+        close=batch.close[ends],
+        volume=np.add.reduceat(batch.volume, starts),
+        vwap=vwap,
+        num_transactions=transactions.astype(np.int64),
+    )
@@ -1,8 +1,15 @@
 """Stochastic Oscillator computation from OHLCV data.
 
 Computes %K and %D locally since Massive API does not provide this indicator.
+
+The rolling highest high and lowest low come from monotonic deques, so each
+bar is pushed and popped at most once: O(n) comparisons instead of the
+O(n * k) of re-scanning every window. %K and %D use exactly the same
+Decimal arithmetic as a direct per-window computation, so results are
+identical, not merely equal after rounding.
 """
 
+from collections import deque
 from datetime import date
 from decimal import Decimal
 
@@ -14,45 +21,63 @@ D_PERIOD = 3
 
 def compute_stochastic(
     bars: list[OHLCVBar],
+    k_period: int = K_PERIOD,
+    d_period: int = D_PERIOD,
 ) -> dict[date, tuple[Decimal, Decimal | None]]:
     """Compute Stochastic %K and %D from OHLCV bars.
 
     Args:
         bars: OHLCV bars sorted by date ascending. Bars with fewer than
-            ``K_PERIOD`` preceding bars are skipped.
+            ``k_period`` preceding bars are skipped.
+        k_period: Look-back window for the high-low range of %K.
+        d_period: Number of %K values averaged into %D.
 
     Returns:
         Mapping of date to (stoch_k, stoch_d). stoch_d is None when
-        fewer than ``D_PERIOD`` %K values are available.
+        fewer than ``d_period`` %K values are available.
     """
-    if len(bars) < K_PERIOD:
+    if len(bars) < k_period:
         return {}
 
-    # Phase 1: compute %K for each bar that has a full 14-day window
-    k_values: list[tuple[date, Decimal]] = []
+    high = [bar.high for bar in bars]
+    low = [bar.low for bar in bars]
+
+    # Indices of bars whose high (low) may still be the window maximum (minimum);
+    # their highs are strictly decreasing (lows strictly increasing) front to back
+    highs: deque[int] = deque()
+    lows: deque[int] = deque()
+    k_values: list[Decimal] = []
+    result: dict[date, tuple[Decimal, Decimal | None]] = {}
+    divisor = Decimal(d_period)
+
+    for i, bar in enumerate(bars):
+        while highs and high[highs[-1]] <= high[i]:
+            highs.pop()
+        highs.append(i)
+        while lows and low[lows[-1]] >= low[i]:
+            lows.pop()
+        lows.append(i)
 
-    for i in range(K_PERIOD - 1, len(bars)):
-        window = bars[i - K_PERIOD + 1 : i + 1]
-        highest_high = max(b.high for b in window)
-        lowest_low = min(b.low for b in window)
+        start = i - k_period + 1
+        if start < 0:
+            continue
+        if highs[0] < start:
+            highs.popleft()
+        if lows[0] < start:
+            lows.popleft()
 
-        spread = highest_high - lowest_low
+        lowest_low = low[lows[0]]
+        spread = high[highs[0]] - lowest_low
         if spread == 0:
             k = Decimal(50)
         else:
-            k = (bars[i].close - lowest_low) / spread * 100
+            k = (bar.close - lowest_low) / spread * 100
+        k_values.append(k)
 
-        k_values.append((bars[i].date, k))
-
-    # Phase 2: compute %D as 3-day SMA of %K
-    result: dict[date, tuple[Decimal, Decimal | None]] = {}
-
-    for idx, (dt, k) in enumerate(k_values):
-        if idx < D_PERIOD - 1:
-            result[dt] = (k, None)
-        else:
-            d_window = [k_values[j][1] for j in range(idx - D_PERIOD + 1, idx + 1)]
-            d = sum(d_window, start=Decimal("0")) / Decimal(D_PERIOD)
-            result[dt] = (k, d)
+        # %D as the d_period SMA of %K, summed afresh to match the direct computation
+        d = None
+        if len(k_values) >= d_period:
+            d = sum(k_values[-d_period:], start=Decimal("0")) / divisor
+        result[bar.date] = (k, d)
 
     return result
@@ -0,0 +1,54 @@
+"""Per-ticker high-water marks for incremental ingestion."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+
+
+class WatermarkFile:
+    """Latest ingested bar date per ticker, stored as JSON.
+
+    A local alternative to asking Supabase for each ticker's latest stored
+    date. Marks only move forward, and the file is replaced atomically on
+    ``save``.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.marks: dict[str, date] = {}
+
+    @classmethod
+    def load(cls, path: str | Path) -> WatermarkFile:
+        """Read the watermark file, returning an empty one if it does not exist."""
+        watermarks = cls(path)
+        if watermarks.path.exists():
+            data = json.loads(watermarks.path.read_text(encoding="utf-8"))
+            watermarks.marks = {ticker: date.fromisoformat(day) for ticker, day in data.items()}
+        return watermarks
+
+    def get(self, ticker: str) -> date | None:
+        """Latest ingested date for ``ticker``, or ``None`` if never ingested."""
+        return self.marks.get(ticker)
+
+    def advance(self, ticker: str, day: date) -> None:
+        """Record ``day`` as ingested unless a later mark already exists."""
+        current = self.marks.get(ticker)
+        if current is None or day > current:
+            self.marks[ticker] = day
+
+    def save(self) -> None:
+        """Write the marks through a temporary file and an atomic rename."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {ticker: day.isoformat() for ticker, day in self.marks.items()}
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, sort_keys=True, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
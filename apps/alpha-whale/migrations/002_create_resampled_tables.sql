@@ -0,0 +1,84 @@
+-- Weekly and monthly bars and indicators, resampled from market_data_daily by ingestion.resample
+-- Run this in the Supabase SQL Editor after 001_create_market_tables.sql
+-- "date" is the first calendar day of the period: the Monday of the week, the 1st of the month
+
+-- Weekly OHLCV
+CREATE TABLE market_data_weekly (
+    id               BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    ticker           TEXT        NOT NULL,
+    asset_type       TEXT        NOT NULL,
+    date             DATE        NOT NULL,
+    open             NUMERIC     NOT NULL,
+    high             NUMERIC     NOT NULL,
+    low              NUMERIC     NOT NULL,
+    close            NUMERIC     NOT NULL,
+    volume           BIGINT      NOT NULL,
+    vwap             NUMERIC,
+    num_transactions BIGINT,
+    ingested_at      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_market_weekly_ticker_date UNIQUE (ticker, date)
+);
+
+CREATE INDEX idx_market_weekly_ticker_date ON market_data_weekly (ticker, date DESC);
+
+
+-- Monthly OHLCV
+CREATE TABLE market_data_monthly (
+    id               BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    ticker           TEXT        NOT NULL,
+    asset_type       TEXT        NOT NULL,
+    date             DATE        NOT NULL,
+    open             NUMERIC     NOT NULL,
+    high             NUMERIC     NOT NULL,
+    low              NUMERIC     NOT NULL,
+    close            NUMERIC     NOT NULL,
+    volume           BIGINT      NOT NULL,
+    vwap             NUMERIC,
+    num_transactions BIGINT,
+    ingested_at      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_market_monthly_ticker_date UNIQUE (ticker, date)
+);
+
+CREATE INDEX idx_market_monthly_ticker_date ON market_data_monthly (ticker, date DESC);
+
+
+-- Weekly indicators (windows count weeks: ema_8 is an 8-week EMA)
+CREATE TABLE technical_indicators_weekly (
+    id               BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    ticker           TEXT        NOT NULL,
+    date             DATE        NOT NULL,
+    ema_8            NUMERIC,
+    ema_80           NUMERIC,
+    sma_200          NUMERIC,
+    macd_value       NUMERIC,
+    macd_signal      NUMERIC,
+    macd_histogram   NUMERIC,
+    rsi_14           NUMERIC,
+    stoch_k          NUMERIC,
+    stoch_d          NUMERIC,
+    ingested_at      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_indicator_weekly_ticker_date UNIQUE (ticker, date)
+);
+
+CREATE INDEX idx_indicator_weekly_ticker_date ON technical_indicators_weekly (ticker, date DESC);
+
+
+-- Monthly indicators (windows count months)
+CREATE TABLE technical_indicators_monthly (
+    id               BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    ticker           TEXT        NOT NULL,
+    date             DATE        NOT NULL,
+    ema_8            NUMERIC,
+    ema_80           NUMERIC,
+    sma_200          NUMERIC,
+    macd_value       NUMERIC,
+    macd_signal      NUMERIC,
+    macd_histogram   NUMERIC,
+    rsi_14           NUMERIC,
+    stoch_k          NUMERIC,
+    stoch_d          NUMERIC,
+    ingested_at      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_indicator_monthly_ticker_date UNIQUE (ticker, date)
+);
+
+CREATE INDEX idx_indicator_monthly_ticker_date ON technical_indicators_monthly (ticker, date DESC);
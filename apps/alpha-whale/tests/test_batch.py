@@ -0,0 +1,159 @@
+"""Tests for columnar OHLCV batches."""
+
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from ingestion.batch import MISSING_COUNT, OHLCVBatch
+from ingestion.schemas import OHLCVBar
+
+TS_JAN_15 = 1768435200000  # 2026-01-15 00:00 UTC
+DAY_MS = 86_400_000
+
+
+def _result(day_offset: int = 0, **overrides: float) -> dict[str, float]:
+    result: dict[str, float] = {
+        "t": TS_JAN_15 + day_offset * DAY_MS,
+        "o": 150.1,
+        "h": 155.25,
+        "l": 149.0,
+        "c": 154.3,
+        "v": 1000.7,
+    }
+    result.update(overrides)
+    return result
+
+
+class TestFromResults:
+    def test_builds_columns(self) -> None:
+        batch = OHLCVBatch.from_results("AAPL", "stock", [_result(0, vw=152.5, n=5000), _result(1)])
+
+        assert len(batch) == 2
+        assert batch.date_list() == [date(2026, 1, 15), date(2026, 1, 16)]
+        np.testing.assert_array_equal(batch.close, [154.3, 154.3])
+        # Fractional (crypto) volume is truncated like int()
+        np.testing.assert_array_equal(batch.volume, [1000, 1000])
+        assert batch.vwap[0] == 152.5 and np.isnan(batch.vwap[1])
+        assert batch.num_transactions.tolist() == [5000, MISSING_COUNT]
+
+    def test_empty_results(self) -> None:
+        batch = OHLCVBatch.from_results("AAPL", "stock", [])
+
+        assert len(batch) == 0
+        assert batch.to_records() == []
+
+    def test_rejects_unsorted_dates(self) -> None:
+        with pytest.raises(ValueError, match="strictly increasing"):
+            OHLCVBatch.from_results("AAPL", "stock", [_result(1), _result(0)])
+
+    def test_rejects_duplicate_dates(self) -> None:
+        with pytest.raises(ValueError, match="strictly increasing"):
+            OHLCVBatch.from_results("AAPL", "stock", [_result(0), _result(0)])
+
+    def test_rejects_non_finite_prices(self) -> None:
+        with pytest.raises(ValueError, match="finite"):
+            OHLCVBatch.from_results("AAPL", "stock", [_result(0, c=float("nan"))])
+
+    def test_rejects_ragged_columns(self) -> None:
+        batch = OHLCVBatch.from_results("AAPL", "stock", [_result(0), _result(1)])
+
+        with pytest.raises(ValueError, match="differ in length"):
+            OHLCVBatch(**{**batch.__dict__, "close": batch.close[:1]})
+
+
+class TestConversions:
+    def test_to_records_matches_model_dump_values(self) -> None:
+        batch = OHLCVBatch.from_results("AAPL", "stock", [_result(0, vw=152.5), _result(1, n=7)])
+
+        records = batch.to_records()
+        expected = [bar.model_dump(mode="json") for bar in batch.to_bars()]
+
+        assert [r["date"] for r in records] == [e["date"] for e in expected]
+        for record, dumped in zip(records, expected, strict=True):
+            assert record.keys() == dumped.keys()
+            for key in ("open", "high", "low", "close", "vwap"):
+                assert (record[key] is None) == (dumped[key] is None)
+                if record[key] is not None:
+                    assert Decimal(str(record[key])) == Decimal(dumped[key])
+        assert records[0]["num_transactions"] is None
+        assert records[1]["num_transactions"] == 7
+
+    def test_to_bars_matches_decimal_parsing(self) -> None:
+        bar = OHLCVBatch.from_results("AAPL", "stock", [_result(0, h=0.1 + 0.2)]).to_bars()[0]
+
+        assert bar.high == Decimal(str(0.1 + 0.2))
+        assert bar.open == Decimal("150.1")
+        assert bar.vwap is None
+
+    def test_from_bars_round_trip(self) -> None:
+        bars = [
+            OHLCVBar(
+                ticker="AAPL",
+                asset_type="stock",
+                date=date(2026, 1, day),
+                open=Decimal("150.1"),
+                high=Decimal("155.25"),
+                low=Decimal("149"),
+                close=Decimal("154.3"),
+                volume=1000,
+                vwap=Decimal("152.5") if day == 15 else None,
+                num_transactions=5000 if day == 15 else None,
+            )
+            for day in (15, 16)
+        ]
+
+        assert OHLCVBatch.from_bars(bars).to_bars() == bars
+
+    def test_from_records_round_trip(self) -> None:
+        batch = OHLCVBatch.from_bars(
+            [
+                OHLCVBar(
+                    ticker="AAPL",
+                    asset_type="stock",
+                    date=date(2026, 1, day),
+                    open=Decimal("150.1"),
+                    high=Decimal("155.25"),
+                    low=Decimal("149"),
+                    close=Decimal("154.3"),
+                    volume=1000,
+                    vwap=Decimal("152.5") if day == 15 else None,
+                    num_transactions=5000 if day == 15 else None,
+                )
+                for day in (15, 16)
+            ]
+        )
+        # PostgREST may serialise NUMERIC columns as strings
+        records = [{**r, "close": str(r["close"])} for r in batch.to_records()]
+
+        restored = OHLCVBatch.from_records("AAPL", "stock", records)
+
+        assert restored.to_records() == batch.to_records()
+
+    def test_since_slices_all_columns(self) -> None:
+        batch = OHLCVBatch.from_results("AAPL", "stock", [_result(i) for i in range(5)])
+
+        recent = batch.since(date(2026, 1, 17))
+
+        assert recent.date_list() == [date(2026, 1, 17), date(2026, 1, 18), date(2026, 1, 19)]
+        assert len(recent.volume) == len(recent.num_transactions) == 3
+        assert len(batch.since(date(2027, 1, 1))) == 0
+
+    def test_concat_joins_pages(self) -> None:
+        pages = [
+            OHLCVBatch.from_results("AAPL", "stock", [_result(0), _result(1)]),
+            OHLCVBatch.from_results("AAPL", "stock", [_result(2, n=9)]),
+        ]
+
+        joined = OHLCVBatch.concat("AAPL", "stock", pages)
+
+        assert joined.date_list() == [date(2026, 1, 15), date(2026, 1, 16), date(2026, 1, 17)]
+        assert joined.num_transactions.tolist() == [MISSING_COUNT, MISSING_COUNT, 9]
+        assert len(OHLCVBatch.concat("AAPL", "stock", [])) == 0
+
+    def test_concat_rejects_overlapping_pages(self) -> None:
+        page = OHLCVBatch.from_results("AAPL", "stock", [_result(0)])
+
+        with pytest.raises(ValueError, match="strictly increasing"):
+            OHLCVBatch.concat("AAPL", "stock", [page, page])
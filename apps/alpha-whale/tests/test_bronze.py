@@ -0,0 +1,139 @@
+"""Tests for chunked, concurrent bronze upserts."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+from postgrest import APIError
+from postgrest.types import ReturnMethod
+
+from ingestion.bronze import UpsertPolicy, _is_transient, _upsert_rows, chunk_rows
+
+
+def _rows(count: int) -> list[dict[str, object]]:
+    return [
+        {"ticker": "AAPL", "date": f"2026-01-{day + 1:02d}", "close": 154.0} for day in range(count)
+    ]
+
+
+def _client(execute: AsyncMock) -> MagicMock:
+    client = MagicMock()
+    table = client.table.return_value
+    table.upsert.return_value = table
+    table.execute = execute
+    return client
+
+
+class TestChunkRows:
+    def test_bounded_by_row_count(self) -> None:
+        chunks = chunk_rows(_rows(5), max_rows=2, max_bytes=1_000_000)
+
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert [row for chunk in chunks for row in chunk] == _rows(5)
+
+    def test_bounded_by_encoded_size(self) -> None:
+        rows = _rows(10)
+        row_bytes = len(json.dumps(rows[0], separators=(",", ":"))) + 1
+
+        chunks = chunk_rows(rows, max_rows=1000, max_bytes=2 + 3 * row_bytes)
+
+        assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+        assert all(
+            len(json.dumps(chunk, separators=(",", ":"))) <= 2 + 3 * row_bytes for chunk in chunks
+        )
+
+    def test_oversized_row_is_sent_alone(self) -> None:
+        assert [len(chunk) for chunk in chunk_rows(_rows(2), max_rows=10, max_bytes=1)] == [1, 1]
+
+    def test_no_rows(self) -> None:
+        assert chunk_rows([], max_rows=10, max_bytes=100) == []
+
+
+class TestUpsertRows:
+    @pytest.mark.asyncio()
+    async def test_writes_every_chunk_with_minimal_return(self) -> None:
+        client = _client(AsyncMock())
+
+        written = await _upsert_rows(
+            client, "market_data_daily", _rows(5), UpsertPolicy(chunk_rows=2, concurrency=2)
+        )
+
+        assert written == 5
+        upsert = client.table.return_value.upsert
+        assert [len(call.args[0]) for call in upsert.call_args_list] == [2, 2, 1]
+        assert all(
+            call.kwargs["returning"] == ReturnMethod.minimal for call in upsert.call_args_list
+        )
+        assert all(call.kwargs["on_conflict"] == "ticker,date" for call in upsert.call_args_list)
+
+    @pytest.mark.asyncio()
+    async def test_retries_only_the_failed_chunk(self) -> None:
+        timeout = APIError({"code": "57014", "message": "canceling statement due to timeout"})
+        execute = AsyncMock(side_effect=[None, timeout, None])
+        client = _client(execute)
+
+        written = await _upsert_rows(
+            client,
+            "market_data_daily",
+            _rows(4),
+            UpsertPolicy(chunk_rows=2, concurrency=1, backoff=0),
+        )
+
+        assert written == 4
+        assert execute.await_count == 3
+        upsert = client.table.return_value.upsert
+        # The second chunk is sent again, the first is not
+        assert [call.args[0][0]["date"] for call in upsert.call_args_list] == [
+            "2026-01-01",
+            "2026-01-03",
+            "2026-01-03",
+        ]
+
+    @pytest.mark.asyncio()
+    async def test_raises_after_max_attempts(self) -> None:
+        execute = AsyncMock(side_effect=httpx.ConnectError("connection refused"))
+        client = _client(execute)
+
+        with pytest.raises(httpx.ConnectError):
+            await _upsert_rows(
+                client, "market_data_daily", _rows(1), UpsertPolicy(max_attempts=2, backoff=0)
+            )
+        assert execute.await_count == 2
+
+    @pytest.mark.asyncio()
+    async def test_client_error_is_not_retried(self) -> None:
+        missing = APIError({"code": "PGRST205", "message": "Could not find the table"})
+        execute = AsyncMock(side_effect=missing)
+        client = _client(execute)
+
+        with pytest.raises(APIError, match="Could not find the table"):
+            await _upsert_rows(
+                client, "market_data_weekly", _rows(1), UpsertPolicy(max_attempts=3, backoff=0)
+            )
+        assert execute.await_count == 1
+
+    @pytest.mark.parametrize(
+        ("exc", "expected"),
+        [
+            (httpx.ReadTimeout("timed out"), True),
+            (APIError({"code": 503, "message": "JSON could not be generated"}), True),
+            (APIError({"code": 429, "message": "JSON could not be generated"}), True),
+            (APIError({"code": 413, "message": "JSON could not be generated"}), False),
+            (APIError({"code": "PGRST002", "message": "schema cache"}), True),
+            (APIError({"code": "57014", "message": "statement timeout"}), True),
+            (APIError({"code": "40P01", "message": "deadlock detected"}), True),
+            (APIError({"code": "23505", "message": "duplicate key"}), False),
+            (APIError({"code": "22P02", "message": "invalid input syntax"}), False),
+            (RuntimeError("bug"), False),
+        ],
+    )
+    def test_only_transient_errors_are_retried(self, exc: BaseException, expected: bool) -> None:
+        assert _is_transient(exc) is expected
+
+    @pytest.mark.asyncio()
+    async def test_no_rows_skips_request(self) -> None:
+        client = MagicMock()
+
+        assert await _upsert_rows(client, "market_data_daily", [], UpsertPolicy()) == 0
+        client.table.assert_not_called()
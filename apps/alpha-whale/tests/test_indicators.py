@@ -0,0 +1,189 @@
+"""Tests for the local indicator engine.
+
+Reference series are the published StockCharts worked examples (10-day EMA
+and 14-day Wilder RSI). Those tables round intermediate values to two
+decimals, hence the tolerances.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from ingestion.batch import OHLCVBatch
+from ingestion.indicators import (
+    IndicatorWindows,
+    compute_indicator_rows,
+    ema,
+    macd,
+    rolling_max,
+    rolling_min,
+    rsi,
+    sma,
+    stochastic,
+)
+from ingestion.schemas import OHLCVBar
+from ingestion.stochastic import compute_stochastic
+
+EMA_CLOSES = [
+    22.27, 22.19, 22.08, 22.17, 22.18, 22.13, 22.23, 22.43, 22.24, 22.29,
+    22.15, 22.39, 22.38, 22.61, 23.36, 24.05, 23.75, 23.83, 23.95, 23.63,
+    23.82, 23.87, 23.65, 23.19, 23.10, 23.33, 22.68, 23.10, 22.40, 22.17,
+]  # fmt: skip
+EMA_10 = [
+    22.22, 22.21, 22.24, 22.27, 22.33, 22.52, 22.80, 22.97, 23.13, 23.28, 23.34,
+    23.43, 23.51, 23.54, 23.47, 23.40, 23.39, 23.26, 23.23, 23.08, 22.92,
+]  # fmt: skip
+
+RSI_CLOSES = [
+    44.34, 44.09, 44.15, 43.61, 44.33, 44.83, 45.10, 45.42, 45.84, 46.08, 45.89,
+    46.03, 45.61, 46.28, 46.28, 46.00, 46.03, 46.41, 46.22, 45.64, 46.21, 46.25,
+    45.71, 46.45, 45.78, 45.35, 44.03, 44.18, 44.22, 44.57, 43.42, 42.66, 43.13,
+]  # fmt: skip
+RSI_14 = [
+    70.53, 66.32, 66.55, 69.41, 66.36, 57.97, 62.93, 63.26, 56.06, 62.38,
+    54.71, 50.42, 39.99, 41.46, 41.87, 45.46, 37.30, 33.08, 37.77,
+]  # fmt: skip
+
+
+def _bars(count: int, seed: int = 0) -> list[OHLCVBar]:
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1.5, count))
+    bars = []
+    for i, close in enumerate(closes):
+        high = close + abs(rng.normal(0, 1))
+        low = close - abs(rng.normal(0, 1))
+        bars.append(
+            OHLCVBar(
+                ticker="AAPL",
+                asset_type="stock",
+                date=date(2020, 1, 1) + timedelta(days=i),
+                open=Decimal(f"{close:.2f}"),
+                high=Decimal(f"{high:.2f}"),
+                low=Decimal(f"{low:.2f}"),
+                close=Decimal(f"{close:.2f}"),
+                volume=1000,
+            )
+        )
+    return bars
+
+
+class TestMovingAverages:
+    def test_sma_matches_window_means(self) -> None:
+        values = np.arange(1.0, 11.0)
+        result = sma(values, 4)
+
+        assert np.isnan(result[:3]).all()
+        np.testing.assert_allclose(result[3:], [values[i - 3 : i + 1].mean() for i in range(3, 10)])
+
+    def test_ema_matches_reference_table(self) -> None:
+        result = ema(EMA_CLOSES, 10)
+
+        assert np.isnan(result[:9]).all()
+        np.testing.assert_allclose(result[9:], EMA_10, atol=0.011)
+
+    def test_short_series_is_undefined(self) -> None:
+        assert np.isnan(sma([1.0, 2.0], 3)).all()
+        assert np.isnan(ema([1.0, 2.0], 3)).all()
+        assert np.isnan(rsi([1.0, 2.0], 3)).all()
+
+
+class TestRSI:
+    def test_matches_wilder_reference_table(self) -> None:
+        result = rsi(RSI_CLOSES, 14)
+
+        assert np.isnan(result[:14]).all()
+        np.testing.assert_allclose(result[14:], RSI_14, atol=0.1)
+
+    def test_only_gains_is_100(self) -> None:
+        assert rsi(np.arange(20.0), 14)[-1] == 100.0
+
+    def test_flat_series_is_neutral(self) -> None:
+        assert rsi(np.full(20, 5.0), 14)[-1] == 50.0
+
+
+class TestMACD:
+    def test_components_are_consistent(self) -> None:
+        closes = [float(b.close) for b in _bars(120)]
+
+        line, signal, histogram = macd(closes, 12, 26, 9)
+
+        np.testing.assert_allclose(line, ema(closes, 12) - ema(closes, 26))
+        # The signal line starts once nine MACD values exist
+        assert np.isnan(signal[:33]).all() and not np.isnan(signal[33])
+        np.testing.assert_allclose(signal[33:], ema(line[25:], 9)[8:])
+        np.testing.assert_allclose(histogram, line - signal)
+
+
+class TestStochastic:
+    def test_matches_decimal_implementation(self) -> None:
+        bars = _bars(300)
+        expected = compute_stochastic(bars)
+
+        k, d = stochastic(
+            [float(b.high) for b in bars],
+            [float(b.low) for b in bars],
+            [float(b.close) for b in bars],
+        )
+
+        for i, bar in enumerate(bars):
+            if bar.date not in expected:
+                assert np.isnan(k[i])
+                continue
+            expected_k, expected_d = expected[bar.date]
+            assert k[i] == pytest.approx(float(expected_k), abs=1e-9)
+            if expected_d is None:
+                assert np.isnan(d[i])
+            else:
+                assert d[i] == pytest.approx(float(expected_d), abs=1e-9)
+
+
+class TestRollingExtremes:
+    @pytest.mark.parametrize("window", [1, 2, 14, 37, 100])
+    def test_matches_window_scan(self, window: int) -> None:
+        values = np.random.default_rng(window).normal(size=1000)
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+
+        np.testing.assert_array_equal(rolling_max(values, window), windows.max(axis=1))
+        np.testing.assert_array_equal(rolling_min(values, window), windows.min(axis=1))
+
+    def test_short_series_is_empty(self) -> None:
+        assert len(rolling_max([1.0, 2.0], 3)) == 0
+
+
+class TestComputeIndicatorRows:
+    def test_fills_columns_as_windows_fill(self) -> None:
+        bars = _bars(250)
+
+        rows = compute_indicator_rows(OHLCVBatch.from_bars(bars))
+
+        # EMA(8) is the first indicator defined, on the 8th bar
+        assert rows[0].date == bars[7].date
+        assert rows[0].ema_8 is not None and rows[0].stoch_k is None
+        last = rows[-1]
+        assert None not in (last.sma_200, last.ema_80, last.macd_signal, last.rsi_14, last.stoch_d)
+        assert last.sma_200 == Decimal(f"{np.mean([float(b.close) for b in bars[-200:]]):.4f}")
+
+    def test_since_keeps_history_for_recursive_indicators(self) -> None:
+        bars = _bars(250)
+        since = bars[240].date
+
+        full = {row.date: row for row in compute_indicator_rows(OHLCVBatch.from_bars(bars))}
+        recent = compute_indicator_rows(OHLCVBatch.from_bars(bars), since=since)
+
+        assert [row.date for row in recent] == [bar.date for bar in bars[240:]]
+        assert all(row == full[row.date] for row in recent)
+
+    def test_custom_windows(self) -> None:
+        bars = _bars(40)
+
+        rows = compute_indicator_rows(
+            OHLCVBatch.from_bars(bars), IndicatorWindows(ema_fast=3, sma=5)
+        )
+
+        assert rows[0].date == bars[2].date
+        assert next(row for row in rows if row.sma_200 is not None).date == bars[4].date
+
+    def test_empty_batch(self) -> None:
+        assert compute_indicator_rows(OHLCVBatch.from_results("AAPL", "stock", [])) == []
@@ -32,6 +32,29 @@ class TestIngestionSettings:
     def test_default_base_url(self, settings: IngestionSettings) -> None:
         assert settings.massive_base_url == "https://api.polygon.io"
 
+    def test_default_rate_budget_and_concurrency(self, settings: IngestionSettings) -> None:
+        assert settings.massive_requests_per_minute == 5
+        assert settings.concurrency == 4
+
+    def test_default_upsert_chunking(self, settings: IngestionSettings) -> None:
+        assert settings.upsert_chunk_rows == 1000
+        assert settings.upsert_chunk_bytes == 1_000_000
+        assert settings.upsert_concurrency == 4
+
+    def test_resample_timeframes_from_env(
+        self, settings: IngestionSettings, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        assert settings.resample_timeframes == ["weekly", "monthly"]
+        monkeypatch.setenv("INGESTION_RESAMPLE_TIMEFRAMES", "[]")
+        assert IngestionSettings().resample_timeframes == []
+
+    def test_rejects_zero_concurrency(
+        self, settings: IngestionSettings, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setenv("INGESTION_CONCURRENCY", "0")
+        with pytest.raises(ValidationError):
+            IngestionSettings()
+
     def test_missing_required_field_raises(self, monkeypatch: pytest.MonkeyPatch) -> None:
         monkeypatch.delenv("SUPABASE_URL", raising=False)
         monkeypatch.delenv("SUPABASE_KEY", raising=False)
@@ -0,0 +1,98 @@
+"""Tests for the local bronze lake."""
+
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from ingestion.batch import OHLCVBatch
+from ingestion.lake import BronzeLake
+
+EPOCH_DAY_MS = 86_400_000
+
+
+def _batch(start: date, days: int, ticker: str = "AAPL", close: float = 100.0) -> OHLCVBatch:
+    first = (start - date(1970, 1, 1)).days
+    results = [
+        {
+            "t": (first + i) * EPOCH_DAY_MS,
+            "o": close,
+            "h": close + 1,
+            "l": close - 1,
+            "c": close + i,
+            "v": 1000 + i,
+            **({"vw": close} if i % 2 else {}),
+        }
+        for i in range(days)
+    ]
+    asset_type = "crypto" if ticker.startswith("X:") else "stock"
+    return OHLCVBatch.from_results(ticker, asset_type, results)
+
+
+def _assert_same(left: OHLCVBatch, right: OHLCVBatch) -> None:
+    assert (left.ticker, left.asset_type) == (right.ticker, right.asset_type)
+    for name, column in left.columns().items():
+        np.testing.assert_array_equal(column, right.columns()[name])
+
+
+class TestBronzeLake:
+    def test_round_trips_across_year_partitions(self, tmp_path: Path) -> None:
+        lake = BronzeLake(tmp_path)
+        batch = _batch(date(2023, 12, 20), 30)
+
+        assert lake.write(batch) == 30
+
+        assert lake.years("AAPL") == [2023, 2024]
+        assert (tmp_path / "ticker=AAPL" / "year=2024.npz").exists()
+        _assert_same(lake.read("AAPL"), batch)
+
+    def test_rewrite_replaces_overlapping_dates(self, tmp_path: Path) -> None:
+        lake = BronzeLake(tmp_path)
+        lake.write(_batch(date(2024, 1, 1), 10))
+
+        lake.write(_batch(date(2024, 1, 8), 5, close=200.0))
+
+        stored = lake.read("AAPL")
+        assert stored.date_list() == [date(2024, 1, 1) + timedelta(days=i) for i in range(12)]
+        assert stored.close[:7].tolist() == [100.0 + i for i in range(7)]
+        assert stored.close[7:].tolist() == [200.0 + i for i in range(5)]
+
+    def test_read_range_opens_only_overlapping_years(self, tmp_path: Path) -> None:
+        lake = BronzeLake(tmp_path)
+        lake.write(_batch(date(2022, 12, 1), 500))
+
+        with patch.object(lake, "_load", wraps=lake._load) as load:
+            recent = lake.read("AAPL", date(2024, 1, 2), date(2024, 1, 5))
+
+        assert [call.args[1] for call in load.call_args_list] == [2024]
+        assert recent.date_list() == [date(2024, 1, day) for day in range(2, 6)]
+
+    def test_crypto_ticker_is_path_safe(self, tmp_path: Path) -> None:
+        lake = BronzeLake(tmp_path)
+        lake.write(_batch(date(2024, 1, 1), 3, ticker="X:BTCUSD"))
+        lake.write(_batch(date(2024, 1, 1), 3))
+
+        assert (tmp_path / "ticker=X%3ABTCUSD").is_dir()
+        assert lake.tickers() == ["AAPL", "X:BTCUSD"]
+        assert lake.read("X:BTCUSD").asset_type == "crypto"
+
+    def test_empty_range_keeps_asset_type(self, tmp_path: Path) -> None:
+        lake = BronzeLake(tmp_path)
+        lake.write(_batch(date(2024, 1, 1), 3, ticker="X:BTCUSD"))
+
+        empty = lake.read("X:BTCUSD", date(2030, 1, 1))
+
+        assert len(empty) == 0
+        assert empty.asset_type == "crypto"
+
+    def test_unknown_ticker_raises(self, tmp_path: Path) -> None:
+        with pytest.raises(KeyError, match="MSFT"):
+            BronzeLake(tmp_path).read("MSFT")
+
+    def test_empty_batch_writes_nothing(self, tmp_path: Path) -> None:
+        lake = BronzeLake(tmp_path / "lake")
+
+        assert lake.write(OHLCVBatch.from_results("AAPL", "stock", [])) == 0
+        assert lake.tickers() == []
@@ -1,5 +1,6 @@
 """Tests for Massive API client."""
 
+import asyncio
 from datetime import date
 from decimal import Decimal
 from unittest.mock import AsyncMock
@@ -7,7 +8,8 @@ from unittest.mock import AsyncMock
 import httpx
 import pytest
 
-from ingestion.massive import MassiveClient, _asset_type, _ts_to_date
+from ingestion.benchmarks import _decimal_models, _exact_models, _orjson_batch, synthetic_page
+from ingestion.massive import MassiveClient, _asset_type, _ts_to_date, decode_json
 
 # --- Helpers ---
 
@@ -49,6 +51,103 @@ class TestHelpers:
         assert _asset_type("X:ETHUSD") == "crypto"
 
 
+# --- Decoding ---
+
+
+class TestDecodeJson:
+    def test_fast_path_yields_floats(self) -> None:
+        assert decode_json(b'{"c": 154.10, "v": 100}') == {"c": 154.1, "v": 100}
+
+    def test_exact_path_keeps_text_digits(self) -> None:
+        data = decode_json(b'{"c": 0.123456789012345678901, "v": 100}', exact=True)
+
+        assert data["c"] == Decimal("0.123456789012345678901")
+        assert data["v"] == 100 and isinstance(data["v"], int)
+
+    @pytest.mark.asyncio()
+    async def test_exact_client_builds_models_from_text(self, mock_http: AsyncMock) -> None:
+        body = (
+            b'{"results": [{"t": %d, "o": 0.000012345678901234567, "h": 2.10, '
+            b'"l": 1, "c": 1.50, "v": 10.9, "vw": 1.25}]}' % TS_JAN_15
+        )
+        mock_http.get.return_value = httpx.Response(status_code=200, content=body)
+        client = MassiveClient(http=mock_http, api_key="test-key", exact_decimals=True)
+
+        bars = await client.fetch_ohlcv("AAPL", date(2026, 1, 1), date(2026, 1, 31))
+
+        assert bars[0].open == Decimal("0.000012345678901234567")
+        assert str(bars[0].high) == "2.10"
+        assert bars[0].volume == 10
+        assert bars[0].date == date(2026, 1, 15)
+
+    def test_parsing_paths_agree(self) -> None:
+        content = synthetic_page(50)
+
+        reference = _decimal_models(content)
+
+        assert _orjson_batch(content).to_bars() == reference
+        assert _exact_models(content) == reference
+
+
+# --- Pagination ---
+
+
+class TestPages:
+    @pytest.mark.asyncio()
+    async def test_follows_next_url_with_only_api_key(
+        self, client: MassiveClient, mock_http: AsyncMock
+    ) -> None:
+        mock_http.get.side_effect = [
+            _json_response({"results": [1], "next_url": "https://api/next?cursor=abc"}),
+            _json_response({"results": [2]}),
+        ]
+
+        pages = [page async for page in client._pages("/v1/first", {"apiKey": "k", "limit": 10})]
+
+        assert [page["results"] for page in pages] == [[1], [2]]
+        second = mock_http.get.call_args_list[1]
+        assert second.args[0] == "https://api/next?cursor=abc"
+        assert second.kwargs["params"] == {"apiKey": "test-key"}
+
+    @pytest.mark.asyncio()
+    async def test_prefetches_next_page_while_caller_works(
+        self, client: MassiveClient, mock_http: AsyncMock
+    ) -> None:
+        mock_http.get.side_effect = [
+            _json_response({"results": [1], "next_url": "/page-2"}),
+            _json_response({"results": [2]}),
+        ]
+        pages = client._pages("/page-1", {})
+
+        await anext(pages)
+        await asyncio.sleep(0)  # the caller yields to the loop while processing page 1
+
+        assert mock_http.get.await_count == 2
+        await pages.aclose()
+
+    @pytest.mark.asyncio()
+    async def test_closing_early_cancels_prefetch(self, mock_http: AsyncMock) -> None:
+        cancelled = asyncio.Event()
+
+        async def get(url: str, params: dict) -> httpx.Response:
+            if url != "/page-1":
+                try:
+                    await asyncio.Event().wait()
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return _json_response({"results": [], "next_url": "/page-2"})
+
+        mock_http.get.side_effect = get
+        pages = MassiveClient(http=mock_http, api_key="test-key")._pages("/page-1", {})
+
+        await anext(pages)
+        await asyncio.sleep(0)
+        await pages.aclose()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
 # --- fetch_ohlcv ---
 
 
@@ -105,6 +204,19 @@ class TestFetchOHLCV:
         assert bars[1].date == date(2026, 1, 16)
         assert mock_http.get.call_count == 2
 
+    @pytest.mark.asyncio()
+    async def test_each_page_waits_on_rate_limiter(self, mock_http: AsyncMock) -> None:
+        limiter = AsyncMock()
+        client = MassiveClient(http=mock_http, api_key="test-key", rate_limiter=limiter)
+        mock_http.get.side_effect = [
+            _json_response({"results": [], "next_url": "/v2/aggs/next-page"}),
+            _json_response({"results": []}),
+        ]
+
+        await client.fetch_ohlcv("AAPL", date(2026, 1, 1), date(2026, 1, 31))
+
+        assert limiter.acquire.await_count == 2
+
     @pytest.mark.asyncio()
     async def test_empty_results(self, client: MassiveClient, mock_http: AsyncMock) -> None:
         mock_http.get.return_value = _json_response({"results": []})
@@ -126,6 +238,52 @@ class TestFetchOHLCV:
         assert bars[0].vwap is None
         assert bars[0].num_transactions is None
 
+    @pytest.mark.asyncio()
+    async def test_batch_collects_pages_into_columns(
+        self, client: MassiveClient, mock_http: AsyncMock
+    ) -> None:
+        mock_http.get.side_effect = [
+            _json_response(
+                {
+                    "results": [{"t": TS_JAN_15, "o": 150, "h": 155, "l": 149, "c": 154, "v": 100}],
+                    "next_url": "/v2/aggs/next-page",
+                }
+            ),
+            _json_response(
+                {"results": [{"t": TS_JAN_16, "o": 154, "h": 158, "l": 153, "c": 157, "v": 200}]}
+            ),
+        ]
+
+        batch = await client.fetch_ohlcv_batch("AAPL", date(2026, 1, 1), date(2026, 1, 31))
+
+        assert batch.ticker == "AAPL"
+        assert batch.date_list() == [date(2026, 1, 15), date(2026, 1, 16)]
+        assert batch.close.tolist() == [154.0, 157.0]
+        assert batch.volume.tolist() == [100, 200]
+
+    @pytest.mark.asyncio()
+    async def test_streams_one_batch_per_page(
+        self, client: MassiveClient, mock_http: AsyncMock
+    ) -> None:
+        mock_http.get.side_effect = [
+            _json_response(
+                {
+                    "results": [{"t": TS_JAN_15, "o": 150, "h": 155, "l": 149, "c": 154, "v": 100}],
+                    "next_url": "/v2/aggs/next-page",
+                }
+            ),
+            _json_response(
+                {"results": [{"t": TS_JAN_16, "o": 154, "h": 158, "l": 153, "c": 157, "v": 200}]}
+            ),
+        ]
+
+        pages = [
+            page.date_list()
+            async for page in client.iter_ohlcv_batches("AAPL", date(2026, 1, 1), date(2026, 1, 31))
+        ]
+
+        assert pages == [[date(2026, 1, 15)], [date(2026, 1, 16)]]
+
     @pytest.mark.asyncio()
     async def test_crypto_ticker(self, client: MassiveClient, mock_http: AsyncMock) -> None:
         mock_http.get.return_value = _json_response(
@@ -164,6 +322,30 @@ class TestSingleIndicators:
         assert values[0].timestamp == date(2026, 1, 15)
         assert values[0].value == Decimal("145.25")
 
+    @pytest.mark.asyncio()
+    async def test_values_match_decimal_of_float_text(
+        self, client: MassiveClient, mock_http: AsyncMock
+    ) -> None:
+        mock_http.get.return_value = _json_response(
+            {"results": {"values": [{"timestamp": TS_JAN_15, "value": 0.1 + 0.2}]}}
+        )
+
+        values = await client.fetch_sma("AAPL")
+
+        assert values[0].value == Decimal(str(0.1 + 0.2))
+
+    @pytest.mark.asyncio()
+    async def test_from_date_bounds_timestamps(
+        self, client: MassiveClient, mock_http: AsyncMock
+    ) -> None:
+        mock_http.get.return_value = _json_response({"results": {"values": []}})
+
+        await client.fetch_sma("AAPL", window=200, from_date=date(2026, 1, 15))
+        await client.fetch_macd("AAPL", from_date=date(2026, 1, 15))
+
+        for call in mock_http.get.call_args_list:
+            assert call.kwargs["params"]["timestamp.gte"] == "2026-01-15"
+
     @pytest.mark.asyncio()
     async def test_fetch_ema(self, client: MassiveClient, mock_http: AsyncMock) -> None:
         mock_http.get.return_value = _json_response(
@@ -1,20 +1,38 @@
 """Tests for ingestion pipeline, bronze upserts, and merge logic."""
 
-from datetime import date
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import date, timedelta
 from decimal import Decimal
+from pathlib import Path
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
-from ingestion.bronze import upsert_indicators, upsert_market_data
+from ingestion.batch import OHLCVBatch
+from ingestion.bronze import (
+    latest_market_date,
+    resampled_history,
+    upsert_indicators,
+    upsert_market_batch,
+    upsert_market_data,
+)
+from ingestion.indicators import compute_indicator_rows
+from ingestion.lake import BronzeLake
 from ingestion.pipeline import (
     DEFAULT_TICKERS,
     IngestionReport,
     TickerResult,
+    _ingest_ticker,
     _merge_indicators,
+    _replay_ticker,
     run_pipeline,
 )
+from ingestion.resample import Timeframe, resample
 from ingestion.schemas import IndicatorRow, IndicatorValue, MACDValue, OHLCVBar
+from ingestion.watermark import WatermarkFile
 
 # --- Fixtures ---
 
@@ -32,6 +50,18 @@ def _bar(day: int = 15, ticker: str = "AAPL") -> OHLCVBar:
     )
 
 
+def _massive(*pages: OHLCVBatch) -> AsyncMock:
+    """Massive client mock whose ``iter_ohlcv_batches`` streams ``pages``."""
+    massive = AsyncMock()
+
+    async def stream(*args: object) -> AsyncIterator[OHLCVBatch]:
+        for page in pages:
+            yield page
+
+    massive.iter_ohlcv_batches = MagicMock(side_effect=stream)
+    return massive
+
+
 def _indicator_row(day: int = 15, ticker: str = "AAPL") -> IndicatorRow:
     return IndicatorRow(
         ticker=ticker,
@@ -102,6 +132,30 @@ class TestUpsertMarketData:
         mock_client.table.assert_not_called()
 
 
+class TestUpsertMarketBatch:
+    @pytest.mark.asyncio()
+    async def test_upserts_rows_from_columns(self) -> None:
+        mock_client = MagicMock()
+        mock_table = MagicMock()
+        mock_client.table.return_value = mock_table
+        mock_table.upsert.return_value = mock_table
+        mock_table.execute = AsyncMock()
+
+        count = await upsert_market_batch(mock_client, OHLCVBatch.from_bars([_bar(15), _bar(16)]))
+
+        assert count == 2
+        rows = mock_table.upsert.call_args.args[0]
+        assert [row["date"] for row in rows] == ["2026-01-15", "2026-01-16"]
+        assert mock_table.upsert.call_args.kwargs["on_conflict"] == "ticker,date"
+
+    @pytest.mark.asyncio()
+    async def test_empty_batch_returns_zero(self) -> None:
+        mock_client = MagicMock()
+        count = await upsert_market_batch(mock_client, OHLCVBatch.from_results("AAPL", "stock", []))
+        assert count == 0
+        mock_client.table.assert_not_called()
+
+
 class TestUpsertIndicators:
     @pytest.mark.asyncio()
     async def test_upserts_indicators(self) -> None:
@@ -124,6 +178,375 @@ class TestUpsertIndicators:
         assert count == 0
 
 
+class TestLatestMarketDate:
+    @pytest.mark.asyncio()
+    async def test_returns_latest_date(self) -> None:
+        mock_client = MagicMock()
+        query = mock_client.table.return_value.select.return_value.eq.return_value
+        query.order.return_value.limit.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=[{"date": "2026-01-16"}])
+        )
+
+        latest = await latest_market_date(mock_client, "AAPL")
+
+        assert latest == date(2026, 1, 16)
+        query.order.assert_called_once_with("date", desc=True)
+
+    @pytest.mark.asyncio()
+    async def test_no_rows_returns_none(self) -> None:
+        mock_client = MagicMock()
+        query = mock_client.table.return_value.select.return_value.eq.return_value
+        query.order.return_value.limit.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=[])
+        )
+
+        assert await latest_market_date(mock_client, "AAPL") is None
+
+
+class TestResampledHistory:
+    @pytest.mark.asyncio()
+    async def test_reads_latest_periods_before_date_in_order(self) -> None:
+        mock_client = MagicMock()
+        query = mock_client.table.return_value.select.return_value.eq.return_value.lt.return_value
+        query.order.return_value.limit.return_value.execute = AsyncMock(
+            return_value=MagicMock(
+                data=[
+                    {"date": day, "open": 1, "high": 2, "low": 0.5, "close": "1.5", "volume": 10}
+                    for day in ("2026-01-05", "2025-12-29")
+                ]
+            )
+        )
+
+        history = await resampled_history(
+            mock_client, "weekly", "AAPL", "stock", before=date(2026, 1, 12)
+        )
+
+        mock_client.table.assert_called_once_with("market_data_weekly")
+        query.order.assert_called_once_with("date", desc=True)
+        assert history.date_list() == [date(2025, 12, 29), date(2026, 1, 5)]
+        assert history.close.tolist() == [1.5, 1.5]
+
+
+# --- Incremental ingestion ---
+
+
+class TestIncrementalIngest:
+    @pytest.mark.asyncio()
+    async def test_remote_indicators_fetch_only_dates_after_overlap(self, tmp_path: Path) -> None:
+        bars = [_bar(day) for day in range(1, 21)]
+        massive = _massive(OHLCVBatch.from_bars(bars))
+        massive.fetch_all_indicators.return_value = ([], [], [], [], [])
+        watermarks = WatermarkFile(tmp_path / "watermarks.json")
+        watermarks.advance("AAPL", date(2026, 1, 18))
+
+        with (
+            patch("ingestion.pipeline.upsert_market_batch", new_callable=AsyncMock) as upsert_bars,
+            patch("ingestion.pipeline.upsert_indicators", new_callable=AsyncMock) as upsert_rows,
+        ):
+            upsert_bars.side_effect = lambda client, rows, policy: len(rows)
+            upsert_rows.side_effect = lambda client, rows, policy: len(rows)
+            result = await _ingest_ticker(
+                "AAPL",
+                massive,
+                MagicMock(),
+                date(2020, 1, 1),
+                date(2026, 1, 20),
+                overlap_days=3,
+                watermarks=watermarks,
+                indicator_source="massive",
+            )
+
+        since = date(2026, 1, 15)
+        assert result.error is None
+        assert result.since == since
+        fetch_from = massive.iter_ohlcv_batches.call_args.args[1]
+        assert fetch_from < since - timedelta(days=14)
+        assert upsert_bars.call_args.args[1].date_list() == [
+            date(2026, 1, day) for day in range(15, 21)
+        ]
+        assert massive.fetch_all_indicators.call_args.kwargs["from_date"] == since
+        # Stochastic rows need the warm-up bars but only new dates are written
+        assert {row.date for row in upsert_rows.call_args.args[1]} == {
+            date(2026, 1, day) for day in range(15, 21)
+        }
+        assert watermarks.get("AAPL") == date(2026, 1, 20)
+
+    @staticmethod
+    async def _ingest_local(
+        massive: AsyncMock, from_date: date, tmp_path: Path, lake: BronzeLake | None = None
+    ) -> tuple[TickerResult, AsyncMock]:
+        watermarks = WatermarkFile(tmp_path / "watermarks.json")
+        watermarks.advance("AAPL", date(2026, 1, 18))
+
+        with (
+            patch("ingestion.pipeline.upsert_market_batch", new_callable=AsyncMock) as upsert_bars,
+            patch("ingestion.pipeline.upsert_indicators", new_callable=AsyncMock) as upsert_rows,
+        ):
+            upsert_bars.side_effect = lambda client, rows, policy: len(rows)
+            upsert_rows.side_effect = lambda client, rows, policy: len(rows)
+            result = await _ingest_ticker(
+                "AAPL",
+                massive,
+                MagicMock(),
+                from_date,
+                date(2026, 1, 20),
+                overlap_days=3,
+                watermarks=watermarks,
+                lake=lake,
+            )
+        return result, upsert_rows
+
+    @pytest.mark.asyncio()
+    async def test_local_indicators_fetch_warmup_without_lake(self, tmp_path: Path) -> None:
+        massive = _massive(OHLCVBatch.from_bars([_bar(day) for day in range(1, 21)]))
+
+        result, upsert_rows = await self._ingest_local(massive, date(2020, 1, 1), tmp_path)
+
+        since = date(2026, 1, 15)
+        assert result.error is None
+        assert massive.iter_ohlcv_batches.call_args.args[1] == since - timedelta(days=3 * 365)
+        massive.fetch_all_indicators.assert_not_called()
+        assert result.ohlcv_rows == 6
+        assert {row.date for row in upsert_rows.call_args.args[1]} == {
+            date(2026, 1, day) for day in range(15, 21)
+        }
+
+    @pytest.mark.asyncio()
+    async def test_local_indicators_read_history_from_lake(self, tmp_path: Path) -> None:
+        bars = [
+            _bar(day).model_copy(update={"close": Decimal(150 + day % 5)}) for day in range(1, 21)
+        ]
+        lake = BronzeLake(tmp_path / "lake")
+        lake.write(OHLCVBatch.from_bars(bars[:18]))  # the previous run
+        massive = _massive(OHLCVBatch.from_bars(bars[14:]))
+
+        result, upsert_rows = await self._ingest_local(massive, date(2026, 1, 1), tmp_path, lake)
+
+        since = date(2026, 1, 15)
+        assert result.error is None
+        assert massive.iter_ohlcv_batches.call_args.args[1] == since
+        assert result.ohlcv_rows == 6
+        # Same rows as computing over the whole history in one go
+        expected = compute_indicator_rows(OHLCVBatch.from_bars(bars), since=since)
+        assert upsert_rows.call_args.args[1] == expected
+
+    @pytest.mark.asyncio()
+    async def test_incomplete_lake_falls_back_to_warmup(self, tmp_path: Path) -> None:
+        lake = BronzeLake(tmp_path / "lake")
+        lake.write(OHLCVBatch.from_bars([_bar(day) for day in range(1, 19)]))
+        massive = _massive(OHLCVBatch.from_bars([_bar(day) for day in range(1, 21)]))
+
+        # The lake starts years after from_date, so it cannot seed the recursion
+        result, _ = await self._ingest_local(massive, date(2020, 1, 1), tmp_path, lake)
+
+        assert result.error is None
+        assert massive.iter_ohlcv_batches.call_args.args[1] == date(2023, 1, 16)
+
+    @pytest.mark.asyncio()
+    async def test_unknown_ticker_starts_at_from_date(self) -> None:
+        massive = _massive(OHLCVBatch.from_results("AAPL", "stock", []))
+        massive.fetch_all_indicators.return_value = ([], [], [], [], [])
+
+        with patch(
+            "ingestion.pipeline.latest_market_date", new_callable=AsyncMock, return_value=None
+        ):
+            result = await _ingest_ticker(
+                "AAPL", massive, MagicMock(), date(2020, 1, 1), date(2026, 1, 20), overlap_days=3
+            )
+
+        assert result.since == date(2020, 1, 1)
+        assert massive.iter_ohlcv_batches.call_args.args[1] == date(2020, 1, 1)
+
+
+# --- Resampling ---
+
+
+def _stored_periods(
+    client: object, timeframe: Timeframe, ticker: str, asset_type: str, before: date
+) -> OHLCVBatch:
+    """Periods an earlier run wrote, resampled from half a year of varying daily bars."""
+    days = [date(2025, 6, 1) + timedelta(days=i) for i in range(214)]
+    daily = OHLCVBatch.from_records(
+        ticker,
+        asset_type,
+        [
+            {"date": day, "open": 150, "high": 160, "low": 140, "close": 150 + i % 7, "volume": 10}
+            for i, day in enumerate(days)
+        ],
+    )
+    return resample(daily, timeframe).until(before - timedelta(days=1))
+
+
+class TestResampleStage:
+    @staticmethod
+    async def _ingest(from_date: date, **kwargs: Any) -> tuple[TickerResult, dict, AsyncMock]:
+        bars = [_bar(day) for day in range(1, 21)]
+        massive = _massive(OHLCVBatch.from_bars(bars))
+        massive.fetch_all_indicators.return_value = ([], [], [], [], [])
+        written: dict = {}
+
+        def record(client: object, timeframe: str, batch: OHLCVBatch, rows: list, policy: object):
+            written[timeframe] = (batch.date_list(), rows)
+            return len(batch), len(rows)
+
+        with (
+            patch("ingestion.pipeline.upsert_market_batch", new_callable=AsyncMock),
+            patch("ingestion.pipeline.upsert_indicators", new_callable=AsyncMock),
+            patch("ingestion.pipeline.upsert_resampled", new_callable=AsyncMock) as upsert,
+            patch("ingestion.pipeline.resampled_history", new_callable=AsyncMock) as history,
+        ):
+            upsert.side_effect = record
+            history.side_effect = _stored_periods
+            result = await _ingest_ticker(
+                "AAPL",
+                massive,
+                MagicMock(),
+                from_date,
+                date(2026, 1, 20),
+                timeframes=("weekly", "monthly"),
+                **kwargs,
+            )
+        return result, written, history
+
+    @pytest.mark.asyncio()
+    async def test_writes_periods_from_the_one_containing_since(self, tmp_path: Path) -> None:
+        watermarks = WatermarkFile(tmp_path / "watermarks.json")
+        watermarks.advance("AAPL", date(2026, 1, 18))
+
+        result, written, _ = await self._ingest(
+            date(2020, 1, 1), overlap_days=3, watermarks=watermarks
+        )
+
+        # since is Thursday 2026-01-15, inside the week starting Monday the 12th
+        assert result.error is None
+        assert written["weekly"][0] == [date(2026, 1, 12), date(2026, 1, 19)]
+        assert written["monthly"][0] == [date(2026, 1, 1)]
+        assert result.resampled_rows == 3
+
+    @pytest.mark.asyncio()
+    async def test_skips_partly_fetched_first_period(self) -> None:
+        # Fetching from Thursday 2026-01-01 covers only part of the week of Dec 29
+        result, written, history = await self._ingest(date(2026, 1, 1))
+
+        assert result.error is None
+        assert written["weekly"][0] == [date(2026, 1, 5), date(2026, 1, 12), date(2026, 1, 19)]
+        assert written["monthly"][0] == [date(2026, 1, 1)]
+        # A full run holds the whole history and reads nothing back
+        history.assert_not_called()
+
+    @pytest.mark.parametrize("indicator_source", ["local", "massive"])
+    @pytest.mark.asyncio()
+    async def test_incremental_run_without_lake_writes_indicators(
+        self, tmp_path: Path, indicator_source: str
+    ) -> None:
+        watermarks = WatermarkFile(tmp_path / "watermarks.json")
+        watermarks.advance("AAPL", date(2026, 1, 18))
+
+        result, written, history = await self._ingest(
+            date(2020, 1, 1),
+            overlap_days=3,
+            watermarks=watermarks,
+            indicator_source=indicator_source,
+        )
+
+        assert result.error is None
+        # The warm-up fetch starts after from_date; earlier weeks are read back
+        assert history.call_args_list[0].args[1:] == ("weekly", "AAPL", "stock", date(2025, 12, 29))
+        fresh = resample(OHLCVBatch.from_bars([_bar(day) for day in range(1, 21)]), "weekly")
+        series = OHLCVBatch.concat(
+            "AAPL",
+            "stock",
+            [_stored_periods(None, "weekly", "AAPL", "stock", fresh.dates[0].item()), fresh],
+        )
+        rows = written["weekly"][1]
+        assert [row.date for row in rows] == [date(2026, 1, 12), date(2026, 1, 19)]
+        assert all(row.ema_8 is not None for row in rows)
+        assert rows == compute_indicator_rows(series, since=date(2026, 1, 12))
+
+
+# --- Bronze lake ---
+
+
+class TestLake:
+    @pytest.mark.asyncio()
+    async def test_ingest_writes_fetched_batch_to_lake(self, tmp_path: Path) -> None:
+        bars = [_bar(day) for day in range(1, 21)]
+        massive = _massive(OHLCVBatch.from_bars(bars))
+        lake = BronzeLake(tmp_path)
+
+        with (
+            patch("ingestion.pipeline.upsert_market_batch", new_callable=AsyncMock),
+            patch("ingestion.pipeline.upsert_indicators", new_callable=AsyncMock),
+        ):
+            result = await _ingest_ticker(
+                "AAPL", massive, MagicMock(), date(2020, 1, 1), date(2026, 1, 20), lake=lake
+            )
+
+        assert result.error is None
+        assert lake.read("AAPL").date_list() == [bar.date for bar in bars]
+
+    @pytest.mark.asyncio()
+    async def test_streams_each_page_to_lake_and_upsert(self, tmp_path: Path) -> None:
+        first = OHLCVBatch.from_bars([_bar(day) for day in range(1, 11)])
+        second = OHLCVBatch.from_bars([_bar(day) for day in range(11, 21)])
+        lake = BronzeLake(tmp_path)
+
+        with (
+            patch("ingestion.pipeline.upsert_market_batch", new_callable=AsyncMock) as upsert_bars,
+            patch("ingestion.pipeline.upsert_indicators", new_callable=AsyncMock) as upsert_rows,
+        ):
+            upsert_bars.side_effect = lambda client, rows, policy: len(rows)
+            upsert_rows.side_effect = lambda client, rows, policy: len(rows)
+            result = await _ingest_ticker(
+                "AAPL",
+                _massive(first, second),
+                MagicMock(),
+                date(2020, 1, 1),
+                date(2026, 1, 20),
+                lake=lake,
+            )
+
+        assert result.error is None
+        assert [len(call.args[1]) for call in upsert_bars.call_args_list] == [10, 10]
+        assert result.ohlcv_rows == 20
+        assert len(lake.read("AAPL")) == 20
+        # EMA(8) spans the page boundary: defined from the 8th bar of the whole history
+        assert result.indicator_rows == 13
+
+    @pytest.mark.asyncio()
+    async def test_replay_upserts_lake_history(self, tmp_path: Path) -> None:
+        lake = BronzeLake(tmp_path)
+        lake.write(OHLCVBatch.from_bars([_bar(day) for day in range(1, 21)]))
+
+        with (
+            patch("ingestion.pipeline.upsert_market_batch", new_callable=AsyncMock) as upsert_bars,
+            patch("ingestion.pipeline.upsert_indicators", new_callable=AsyncMock) as upsert_rows,
+        ):
+            upsert_bars.side_effect = lambda client, rows, policy: len(rows)
+            upsert_rows.side_effect = lambda client, rows, policy: len(rows)
+            result = await _replay_ticker(
+                "AAPL", lake, MagicMock(), date(2026, 1, 5), date(2026, 1, 31), MagicMock()
+            )
+
+        assert result.error is None
+        assert result.ohlcv_rows == 16
+        # EMA(8) is defined from the 8th replayed bar on
+        assert result.indicator_rows == 9
+
+    @pytest.mark.asyncio()
+    async def test_replay_of_unknown_ticker_is_isolated(self, tmp_path: Path) -> None:
+        result = await _replay_ticker(
+            "MSFT",
+            BronzeLake(tmp_path),
+            MagicMock(),
+            date(2026, 1, 1),
+            date(2026, 1, 31),
+            MagicMock(),
+        )
+
+        assert result.error is not None and "MSFT" in result.error
+
+
 # --- Merge indicators ---
 
 
@@ -182,6 +605,7 @@ class TestRunPipeline:
         monkeypatch.setenv("SUPABASE_URL", "https://test.supabase.co")
         monkeypatch.setenv("SUPABASE_KEY", "test-key")
         monkeypatch.setenv("INGESTION_MASSIVE_API_KEY", "test-key")
+        monkeypatch.setenv("INGESTION_MASSIVE_REQUESTS_PER_MINUTE", "0")
 
         mock_supabase = MagicMock()
         mock_table = MagicMock()
@@ -192,26 +616,32 @@ class TestRunPipeline:
         mock_http = AsyncMock()
 
         # OHLCV response
-        ohlcv_resp = MagicMock()
-        ohlcv_resp.json.return_value = {
-            "results": [{"t": 1768435200000, "o": 150, "h": 155, "l": 149, "c": 154, "v": 1000}],
-        }
+        ohlcv_resp = httpx.Response(
+            200,
+            json={
+                "results": [
+                    {"t": 1768435200000, "o": 150, "h": 155, "l": 149, "c": 154, "v": 1000}
+                ],
+            },
+        )
 
         # Indicator response (single value)
-        ind_resp = MagicMock()
-        ind_resp.json.return_value = {
-            "results": {"values": [{"timestamp": 1768435200000, "value": 100.0}]},
-        }
+        ind_resp = httpx.Response(
+            200,
+            json={"results": {"values": [{"timestamp": 1768435200000, "value": 100.0}]}},
+        )
 
         # MACD response
-        macd_resp = MagicMock()
-        macd_resp.json.return_value = {
-            "results": {
-                "values": [
-                    {"timestamp": 1768435200000, "value": 1.0, "signal": 0.5, "histogram": 0.5}
-                ]
+        macd_resp = httpx.Response(
+            200,
+            json={
+                "results": {
+                    "values": [
+                        {"timestamp": 1768435200000, "value": 1.0, "signal": 0.5, "histogram": 0.5}
+                    ]
+                },
             },
-        }
+        )
 
         # Order: ohlcv, then sma, ema_8, ema_80, macd, rsi
         mock_http.get.side_effect = [ohlcv_resp, ind_resp, ind_resp, ind_resp, macd_resp, ind_resp]
@@ -239,6 +669,49 @@ class TestRunPipeline:
         assert report.succeeded == 1
         assert report.failed == 0
 
+    @pytest.mark.asyncio()
+    async def test_tickers_run_concurrently_and_fail_in_isolation(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setenv("SUPABASE_URL", "https://test.supabase.co")
+        monkeypatch.setenv("SUPABASE_KEY", "test-key")
+        monkeypatch.setenv("INGESTION_MASSIVE_API_KEY", "test-key")
+
+        running = 0
+        peak = 0
+
+        async def ingest(ticker: str, *args: object) -> TickerResult:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if ticker == "MSFT":
+                return TickerResult(ticker=ticker, error="API timeout")
+            return TickerResult(ticker=ticker, ohlcv_rows=1)
+
+        tickers = ["AAPL", "MSFT", "GOOGL", "AMZN", "META"]
+        with (
+            patch(
+                "ingestion.supabase_client.create_supabase_client",
+                new_callable=AsyncMock,
+                return_value=MagicMock(),
+            ),
+            patch("ingestion.pipeline.AsyncHTTPClient") as MockHTTP,
+            patch("ingestion.pipeline._ingest_ticker", side_effect=ingest),
+        ):
+            MockHTTP.return_value.__aenter__ = AsyncMock(return_value=AsyncMock())
+            MockHTTP.return_value.__aexit__ = AsyncMock(return_value=None)
+
+            from ingestion.config import IngestionSettings
+
+            report = await run_pipeline(IngestionSettings(), tickers=tickers, concurrency=2)
+
+        assert peak == 2
+        assert [r.ticker for r in report.results] == tickers
+        assert report.succeeded == 4
+        assert report.results[1].error == "API timeout"
+
     def test_default_tickers_has_10(self) -> None:
         assert len(DEFAULT_TICKERS) == 10
         assert "AAPL" in DEFAULT_TICKERS
@@ -0,0 +1,74 @@
+"""Tests for the shared Massive request budget."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from ingestion.rate_limit import RateLimiter
+
+
+class FakeClock:
+    """Monotonic clock advanced by the patched ``asyncio.sleep``."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio()
+    async def test_allows_burst_up_to_budget(self, clock: FakeClock) -> None:
+        limiter = RateLimiter(3, period=60.0, clock=clock)
+
+        with patch("ingestion.rate_limit.asyncio.sleep", clock.sleep):
+            for _ in range(3):
+                await limiter.acquire()
+
+        assert clock.sleeps == []
+
+    @pytest.mark.asyncio()
+    async def test_waits_for_oldest_request_to_leave_window(self, clock: FakeClock) -> None:
+        limiter = RateLimiter(2, period=60.0, clock=clock)
+
+        with patch("ingestion.rate_limit.asyncio.sleep", clock.sleep):
+            await limiter.acquire()
+            clock.now = 10.0
+            await limiter.acquire()
+            await limiter.acquire()  # first slot frees at t=60
+            await limiter.acquire()  # second slot frees at t=70
+
+        assert clock.sleeps == [50.0, 10.0]
+        assert clock.now == 70.0
+
+    @pytest.mark.asyncio()
+    async def test_concurrent_callers_share_one_budget(self, clock: FakeClock) -> None:
+        limiter = RateLimiter(5, period=60.0, clock=clock)
+        started: list[float] = []
+
+        async def worker() -> None:
+            for _ in range(3):
+                await limiter.acquire()
+                started.append(clock.now)
+
+        with patch("ingestion.rate_limit.asyncio.sleep", clock.sleep):
+            await asyncio.gather(*(worker() for _ in range(4)))
+
+        # 12 requests at 5 per minute: two full windows, then the last two
+        assert sorted(started) == [0.0] * 5 + [60.0] * 5 + [120.0] * 2
+
+    def test_rejects_non_positive_budget(self) -> None:
+        with pytest.raises(ValueError, match="max_requests"):
+            RateLimiter(0)
@@ -0,0 +1,115 @@
+"""Tests for weekly and monthly resampling."""
+
+from datetime import date, timedelta
+from itertools import groupby
+
+import numpy as np
+import pytest
+
+from ingestion.batch import MISSING_COUNT, OHLCVBatch
+from ingestion.resample import Timeframe, period_start, period_starts, resample
+
+EPOCH = date(1970, 1, 1)
+
+
+def _trading_days(start: date, count: int) -> list[date]:
+    days: list[date] = []
+    day = start
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def _batch(days: list[date], seed: int = 0) -> OHLCVBatch:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, len(days)))
+    results = []
+    for i, day in enumerate(days):
+        result = {
+            "t": (day - EPOCH).days * 86_400_000,
+            "o": float(close[i] + rng.normal(0, 0.5)),
+            "h": float(close[i] + 2),
+            "l": float(close[i] - 2),
+            "c": float(close[i]),
+            "v": int(rng.integers(0, 1000)),
+        }
+        if i % 5:
+            result["vw"] = float(close[i] + 0.1)
+        if i % 3:
+            result["n"] = int(rng.integers(1, 100))
+        results.append(result)
+    return OHLCVBatch.from_results("AAPL", "stock", results)
+
+
+class TestPeriodStarts:
+    def test_weekly_starts_on_monday(self) -> None:
+        days = np.array(["2026-10-18", "2026-10-19", "2026-10-23", "2026-10-25"], "datetime64[D]")
+
+        starts = period_starts(days, "weekly")
+
+        assert starts.astype(str).tolist() == [
+            "2026-10-12",
+            "2026-10-19",
+            "2026-10-19",
+            "2026-10-19",
+        ]
+
+    def test_monthly_starts_on_the_first(self) -> None:
+        assert period_start(date(2024, 2, 29), "monthly") == date(2024, 2, 1)
+        assert period_start(date(2024, 3, 1), "monthly") == date(2024, 3, 1)
+
+    def test_unknown_timeframe(self) -> None:
+        with pytest.raises(ValueError, match="Supported: weekly, monthly"):
+            period_start(date(2024, 1, 1), "yearly")  # type: ignore[arg-type]
+
+
+class TestResample:
+    @pytest.mark.parametrize("timeframe", ["weekly", "monthly"])
+    def test_matches_per_period_aggregation(self, timeframe: Timeframe) -> None:
+        daily = _batch(_trading_days(date(2023, 12, 27), 300))
+        rows = list(
+            zip(
+                period_starts(daily.dates, timeframe).astype(object),
+                daily.open,
+                daily.high,
+                daily.low,
+                daily.close,
+                daily.volume,
+                daily.vwap,
+                daily.num_transactions,
+                strict=True,
+            )
+        )
+
+        bars = resample(daily, timeframe)
+
+        groups = [list(group) for _, group in groupby(rows, key=lambda row: row[0])]
+        assert bars.date_list() == [group[0][0] for group in groups]
+        for i, group in enumerate(groups):
+            _, opens, highs, lows, closes, volumes, vwaps, counts = zip(*group, strict=True)
+            assert bars.open[i] == opens[0] and bars.close[i] == closes[-1]
+            assert bars.high[i] == max(highs) and bars.low[i] == min(lows)
+            assert bars.volume[i] == sum(volumes)
+            priced = [(v, w) for v, w in zip(vwaps, volumes, strict=True) if not np.isnan(v)]
+            weight = sum(w for _, w in priced)
+            if weight:
+                assert bars.vwap[i] == pytest.approx(sum(v * w for v, w in priced) / weight)
+            else:
+                assert np.isnan(bars.vwap[i])
+            known = [n for n in counts if n != MISSING_COUNT]
+            assert bars.num_transactions[i] == (sum(known) if known else MISSING_COUNT)
+
+    def test_weeks_skip_holidays_and_keep_partial_tail(self) -> None:
+        # Thursday 2026-01-01 is a holiday; the last week has only Monday
+        days = [date(2026, 1, 2), date(2026, 1, 5), date(2026, 1, 9), date(2026, 1, 12)]
+
+        bars = resample(_batch(days), "weekly")
+
+        assert bars.date_list() == [date(2025, 12, 29), date(2026, 1, 5), date(2026, 1, 12)]
+
+    def test_empty_batch(self) -> None:
+        empty = OHLCVBatch.from_results("AAPL", "stock", [])
+
+        assert len(resample(empty, "monthly")) == 0
@@ -3,6 +3,14 @@
 from datetime import date, timedelta
 from decimal import Decimal
 
+import pytest
+
+from ingestion.benchmarks import (
+    benchmark_stochastic,
+    sliced_stochastic,
+    synthetic_bars,
+    synthetic_prices,
+)
 from ingestion.schemas import OHLCVBar
 from ingestion.stochastic import D_PERIOD, K_PERIOD, compute_stochastic
 
@@ -109,3 +117,37 @@ class TestComputeStochastic:
 
     def test_empty_list_returns_empty(self) -> None:
         assert compute_stochastic([]) == {}
+
+    def test_custom_periods(self) -> None:
+        bars = [_make_bar(i, str(100 + i), str(90 + i), str(95 + i)) for i in range(10)]
+        result = compute_stochastic(bars, k_period=5, d_period=2)
+
+        dates = sorted(result)
+        assert dates[0] == bars[4].date
+        assert result[dates[0]][1] is None
+        assert result[dates[1]][1] is not None
+
+    @pytest.mark.parametrize(("k_period", "d_period"), [(K_PERIOD, D_PERIOD), (5, 1), (50, 7)])
+    def test_identical_to_window_rescan(self, k_period: int, d_period: int) -> None:
+        """Deque maxima give exactly the per-window rescan output, ties included."""
+        high, low, close = synthetic_prices(600, seed=k_period)
+        # Coarse prices force repeated highs and lows inside windows
+        bars = synthetic_bars(high // 50 * 50, low // 50 * 50, close)
+
+        assert compute_stochastic(bars, k_period, d_period) == sliced_stochastic(
+            bars, k_period, d_period
+        )
+
+
+class TestBenchmark:
+    def test_reports_every_implementation(self) -> None:
+        result = benchmark_stochastic("daily", 300)
+
+        assert result.bars == 300
+        assert result.sliced_seconds is not None and result.deque_seconds is not None
+        assert result.numpy_seconds >= 0
+
+    def test_skips_decimal_implementations_above_limit(self) -> None:
+        result = benchmark_stochastic("minute", 300, max_decimal_bars=100)
+
+        assert result.sliced_seconds is None and result.deque_seconds is None
@@ -0,0 +1,30 @@
+"""Tests for per-ticker ingestion watermarks."""
+
+from datetime import date
+from pathlib import Path
+
+from ingestion.watermark import WatermarkFile
+
+
+class TestWatermarkFile:
+    def test_missing_file_loads_empty(self, tmp_path: Path) -> None:
+        watermarks = WatermarkFile.load(tmp_path / "watermarks.json")
+        assert watermarks.get("AAPL") is None
+
+    def test_marks_only_move_forward(self, tmp_path: Path) -> None:
+        watermarks = WatermarkFile(tmp_path / "watermarks.json")
+        watermarks.advance("AAPL", date(2026, 1, 16))
+        watermarks.advance("AAPL", date(2026, 1, 15))
+        assert watermarks.get("AAPL") == date(2026, 1, 16)
+
+    def test_round_trips_through_save(self, tmp_path: Path) -> None:
+        path = tmp_path / "state" / "watermarks.json"
+        watermarks = WatermarkFile(path)
+        watermarks.advance("AAPL", date(2026, 1, 16))
+        watermarks.advance("X:BTCUSD", date(2026, 1, 17))
+        watermarks.save()
+
+        loaded = WatermarkFile.load(path)
+
+        assert loaded.marks == {"AAPL": date(2026, 1, 16), "X:BTCUSD": date(2026, 1, 17)}
+        assert list(path.parent.iterdir()) == [path]
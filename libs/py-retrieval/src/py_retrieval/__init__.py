@@ -1,22 +1,69 @@
-"""Provider-agnostic vector store abstraction with Pinecone implementation."""
+"""Provider-agnostic vector store abstraction with Pinecone and local implementations."""
 
-from py_retrieval.embeddings import OpenAIEmbeddingProvider
+from py_retrieval.embedding_cache import (
+    DiskEmbeddingCache,
+    InMemoryEmbeddingCache,
+    RedisEmbeddingCache,
+    embedding_cache_key,
+)
+from py_retrieval.embeddings import HashingEmbeddingProvider, OpenAIEmbeddingProvider
 from py_retrieval.exceptions import EmbeddingError, VectorStoreConnectionError, VectorStoreError
 from py_retrieval.factory import create_vector_store
+from py_retrieval.file_store import FileVectorStore
+from py_retrieval.filters import matches_filter
+from py_retrieval.hnsw import HNSWIndex, HNSWVectorStore
+from py_retrieval.manifest import (
+    IndexManifest,
+    SyncResult,
+    content_hash,
+    content_id,
+    sync_documents,
+)
+from py_retrieval.memory_store import InMemoryVectorStore
+from py_retrieval.metadata_index import MetadataIndex
 from py_retrieval.models import Document, QueryResult, VectorStoreConfig
 from py_retrieval.pinecone_store import PineconeVectorStore
-from py_retrieval.protocols import EmbeddingProvider, VectorStore
+from py_retrieval.protocols import EmbeddingCache, EmbeddingProvider, VectorStore
+from py_retrieval.quantization import ProductQuantizer, Quantizer, ScalarQuantizer
+from py_retrieval.quantized_store import QuantizedVectorStore
+from py_retrieval.semantic_cache import SemanticCachedVectorStore, SemanticQueryCache
+from py_retrieval.sparse import SparseIndex, fuse_scores
 
 __all__ = [
+    "DiskEmbeddingCache",
     "Document",
+    "EmbeddingCache",
     "EmbeddingError",
     "EmbeddingProvider",
+    "FileVectorStore",
+    "HNSWIndex",
+    "HNSWVectorStore",
+    "HashingEmbeddingProvider",
+    "InMemoryEmbeddingCache",
+    "IndexManifest",
+    "InMemoryVectorStore",
+    "MetadataIndex",
     "OpenAIEmbeddingProvider",
     "PineconeVectorStore",
+    "ProductQuantizer",
+    "QuantizedVectorStore",
+    "Quantizer",
     "QueryResult",
+    "RedisEmbeddingCache",
+    "ScalarQuantizer",
+    "SemanticCachedVectorStore",
+    "SemanticQueryCache",
+    "SparseIndex",
+    "SyncResult",
     "VectorStore",
     "VectorStoreConfig",
     "VectorStoreConnectionError",
     "VectorStoreError",
+    "content_hash",
+    "content_id",
     "create_vector_store",
+    "embedding_cache_key",
+    "fuse_scores",
+    "matches_filter",
+    "sync_documents",
 ]
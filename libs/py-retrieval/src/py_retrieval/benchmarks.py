@@ -0,0 +1,468 @@
+"""Recall, latency and throughput benchmarks for local vector indexes.
+
+Run with ``python -m py_retrieval.benchmarks {hnsw,quantization,stores}``. Index
+benchmarks use synthetic clustered vectors with low intrinsic dimension, which
+behave like real embeddings far better than uniform noise (where every ANN
+index and quantizer degrades towards brute force). Store benchmarks index a
+synthetic text corpus end to end through ``HashingEmbeddingProvider``, so
+they run offline and give the same numbers for the same code.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+from pydantic import SecretStr
+
+from py_core import configure_logging
+from py_retrieval.factory import create_vector_store
+from py_retrieval.hnsw import HNSWIndex
+from py_retrieval.models import Document, VectorStoreConfig
+from py_retrieval.protocols import VectorStore
+from py_retrieval.quantization import ProductQuantizer, Quantizer, ScalarQuantizer
+from py_retrieval.similarity import normalize, select_top_k
+
+
+def synthetic_vectors(
+    count: int,
+    dimensions: int,
+    clusters: int = 64,
+    intrinsic_dimensions: int = 32,
+    seed: int = 0,
+) -> npt.NDArray[np.float32]:
+    """Draw clustered unit vectors that lie near a low-dimensional subspace.
+
+    Points are sampled around ``clusters`` centroids in an
+    ``intrinsic_dimensions`` latent space, projected up to ``dimensions`` and
+    perturbed with a little isotropic noise, mimicking how real embeddings
+    concentrate on a low-dimensional manifold.
+    """
+    rng = np.random.default_rng(seed)
+    latent_dims = min(intrinsic_dimensions, dimensions)
+    centroids = rng.standard_normal((clusters, latent_dims))
+    assignment = rng.integers(0, clusters, size=count)
+    latent = centroids[assignment] + rng.standard_normal((count, latent_dims)) * 0.5
+    projection = rng.standard_normal((latent_dims, dimensions))
+    noise = rng.standard_normal((count, dimensions)) * 0.1
+    return normalize(latent @ projection + noise)
+
+
+def exact_top_k(
+    corpus: npt.NDArray[np.float32],
+    queries: npt.NDArray[np.float32],
+    k: int,
+) -> npt.NDArray[np.intp]:
+    """Ground-truth top-``k`` rows of ``corpus`` for each query, best first."""
+    scores = queries @ corpus.T
+    k = min(k, corpus.shape[0])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+def recall_at_k(approximate: Sequence[Sequence[int]], exact: npt.NDArray[np.intp]) -> float:
+    """Mean fraction of the true top-k found by the approximate search."""
+    if len(approximate) == 0:
+        return 1.0
+    hits = sum(
+        len(set(found) & set(truth.tolist()))
+        for found, truth in zip(approximate, exact, strict=True)
+    )
+    return hits / exact.size
+
+
+@dataclass
+class HNSWBenchmarkResult:
+    """Outcome of one HNSW benchmark run."""
+
+    corpus_size: int
+    dimensions: int
+    k: int
+    m: int
+    ef_construction: int
+    ef_search: int
+    build_seconds: float
+    recall: float
+    hnsw_query_ms: float
+    brute_force_query_ms: float
+
+
+def _brute_force_query_ms(
+    corpus: npt.NDArray[np.float32], queries: npt.NDArray[np.float32], k: int
+) -> float:
+    """Mean latency of a single-query exact scan."""
+    started = time.perf_counter()
+    for query in queries:
+        exact_top_k(corpus, query[np.newaxis, :], k)
+    return (time.perf_counter() - started) * 1000 / len(queries)
+
+
+def benchmark_hnsw(
+    corpus: npt.NDArray[np.float32],
+    queries: npt.NDArray[np.float32],
+    k: int = 10,
+    m: int = 16,
+    ef_construction: int = 200,
+    ef_search: Sequence[int] = (50,),
+) -> list[HNSWBenchmarkResult]:
+    """Build one HNSW index over ``corpus`` and compare it with exact search.
+
+    Returns:
+        One result per ``ef_search`` value: recall@k against brute force and
+        mean per-query latency of the graph search and of a brute-force scan.
+    """
+    index = HNSWIndex(corpus.shape[1], m=m, ef_construction=ef_construction)
+    started = time.perf_counter()
+    for vector in corpus:
+        index.add(vector)
+    build_seconds = time.perf_counter() - started
+
+    exact = exact_top_k(corpus, queries, k)
+    brute_force_ms = _brute_force_query_ms(corpus, queries, k)
+
+    results = []
+    for ef in ef_search:
+        started = time.perf_counter()
+        found = [[label for _, label in index.search(query, k, ef=ef)] for query in queries]
+        query_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        results.append(
+            HNSWBenchmarkResult(
+                corpus_size=corpus.shape[0],
+                dimensions=corpus.shape[1],
+                k=k,
+                m=m,
+                ef_construction=ef_construction,
+                ef_search=ef,
+                build_seconds=build_seconds,
+                recall=recall_at_k(found, exact),
+                hnsw_query_ms=query_ms,
+                brute_force_query_ms=brute_force_ms,
+            )
+        )
+    return results
+
+
+@dataclass
+class QuantizationBenchmarkResult:
+    """Outcome of one quantizer benchmark run."""
+
+    name: str
+    corpus_size: int
+    dimensions: int
+    k: int
+    rescore_factor: int
+    bytes_per_vector: int
+    compression: float
+    train_seconds: float
+    recall: float
+    query_ms: float
+    brute_force_query_ms: float
+
+
+def benchmark_quantization(
+    corpus: npt.NDArray[np.float32],
+    queries: npt.NDArray[np.float32],
+    quantizer: Quantizer,
+    k: int = 10,
+    train_size: int = 10_000,
+    rescore_factors: Sequence[int] = (0, 4),
+) -> list[QuantizationBenchmarkResult]:
+    """Train ``quantizer`` on a corpus sample and compare ADC search with exact search.
+
+    Returns:
+        One result per rescore factor (``0`` ranks by quantized scores only;
+        otherwise ``k * factor`` candidates are re-ranked at full precision).
+    """
+    started = time.perf_counter()
+    quantizer.fit(corpus[:train_size])
+    codes = np.asfortranarray(quantizer.encode(corpus))
+    train_seconds = time.perf_counter() - started
+
+    exact = exact_top_k(corpus, queries, k)
+    brute_force_ms = _brute_force_query_ms(corpus, queries, k)
+
+    results = []
+    for factor in rescore_factors:
+        found = []
+        started = time.perf_counter()
+        for query in queries:
+            scores = quantizer.score(query, codes)
+            if factor > 0:
+                shortlist = select_top_k(scores, k * factor)
+                found.append(shortlist[select_top_k(corpus[shortlist] @ query, k)].tolist())
+            else:
+                found.append(select_top_k(scores, k).tolist())
+        query_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        results.append(
+            QuantizationBenchmarkResult(
+                name=type(quantizer).__name__,
+                corpus_size=corpus.shape[0],
+                dimensions=corpus.shape[1],
+                k=k,
+                rescore_factor=factor,
+                bytes_per_vector=quantizer.code_size,
+                compression=corpus.shape[1] * 4 / quantizer.code_size,
+                train_seconds=train_seconds,
+                recall=recall_at_k(found, exact),
+                query_ms=query_ms,
+                brute_force_query_ms=brute_force_ms,
+            )
+        )
+    return results
+
+
+def synthetic_corpus(
+    count: int,
+    vocabulary_size: int = 5000,
+    min_words: int = 20,
+    max_words: int = 80,
+    seed: int = 0,
+) -> list[str]:
+    """Generate ``count`` pseudo-documents with Zipf-distributed word frequencies.
+
+    Words are drawn from a fixed vocabulary with a heavy-tailed frequency
+    distribution like natural language, so documents share common words
+    and differ in rare ones.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"w{i}" for i in range(vocabulary_size)])
+    lengths = rng.integers(min_words, max_words + 1, size=count)
+    words = (rng.zipf(1.3, size=int(lengths.sum())) - 1) % vocabulary_size
+    documents = np.split(vocabulary[words], np.cumsum(lengths)[:-1])
+    return [" ".join(document) for document in documents]
+
+
+def synthetic_queries(
+    corpus: Sequence[str], count: int, words: int = 8, seed: int = 1
+) -> list[str]:
+    """Draw queries as short word spans taken from random corpus documents."""
+    rng = np.random.default_rng(seed)
+    queries = []
+    for index in rng.integers(0, len(corpus), size=count):
+        tokens = corpus[index].split()
+        start = int(rng.integers(0, max(1, len(tokens) - words)))
+        queries.append(" ".join(tokens[start : start + words]))
+    return queries
+
+
+@dataclass
+class StoreBenchmarkResult:
+    """Outcome of indexing and querying one store provider."""
+
+    provider: str
+    corpus_size: int
+    dimensions: int
+    k: int
+    index_seconds: float
+    docs_per_second: float
+    query_p50_ms: float
+    query_p99_ms: float
+    memory_bytes: int | None
+
+
+def _percentile(samples: Sequence[float], percent: int) -> float:
+    """Percentile of ``samples`` using the inclusive method (exact for small lists)."""
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[percent - 1]
+
+
+async def _index_corpus(store: VectorStore, corpus: Sequence[str], batch_size: int) -> None:
+    """Upsert ``corpus`` in batches, using list positions as document IDs."""
+    for start in range(0, len(corpus), batch_size):
+        batch = corpus[start : start + batch_size]
+        await store.upsert([Document(id=str(start + i), text=text) for i, text in enumerate(batch)])
+
+
+async def benchmark_store(
+    provider: str,
+    corpus: Sequence[str],
+    queries: Sequence[str],
+    dimensions: int = 256,
+    k: int = 10,
+    batch_size: int = 500,
+    measure_memory: bool = True,
+    **overrides: object,
+) -> StoreBenchmarkResult:
+    """Index ``corpus`` into a fresh ``provider`` store, then time single queries.
+
+    Embeddings come from ``HashingEmbeddingProvider``, so the numbers cover
+    the store plus a fixed, cheap embedding cost. Memory is the growth in
+    Python-tracked allocations (NumPy buffers included) while indexing. It
+    is measured on a second, traced build because tracing slows indexing
+    down. Memory-mapped pages of the ``file`` store are not counted.
+
+    Args:
+        provider: Store provider name as accepted by ``create_vector_store``.
+        corpus: Documents to index.
+        queries: Query texts, each timed individually.
+        dimensions: Embedding dimensionality.
+        k: ``top_k`` for every query.
+        batch_size: Documents per ``upsert`` call.
+        measure_memory: Run the traced build that reports ``memory_bytes``.
+        **overrides: Extra ``VectorStoreConfig`` fields (e.g. ``hnsw_m``).
+    """
+    with tempfile.TemporaryDirectory(prefix="py-retrieval-bench-") as root:
+        settings: dict[str, object] = {
+            "provider": provider,
+            "api_key": SecretStr("offline"),
+            "index_name": "benchmark",
+            "embedding_dimensions": dimensions,
+            "embedding_provider": "hashing",
+            "storage_path": root,
+            "quantization_train_size": min(10_000, max(1, len(corpus))),
+        }
+        settings.update(overrides)
+        config = VectorStoreConfig.model_validate(settings)
+
+        latencies = []
+        async with create_vector_store(config) as store:
+            started = time.perf_counter()
+            await _index_corpus(store, corpus, batch_size)
+            index_seconds = time.perf_counter() - started
+            for query in queries:
+                started = time.perf_counter()
+                await store.query(query, top_k=k)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        memory_bytes = None
+        if measure_memory:
+            traced = config.model_copy(update={"index_name": "benchmark-traced"})
+            tracemalloc.start()
+            try:
+                baseline = tracemalloc.get_traced_memory()[0]
+                async with create_vector_store(traced) as store:
+                    await _index_corpus(store, corpus, batch_size)
+                    memory_bytes = tracemalloc.get_traced_memory()[0] - baseline
+            finally:
+                tracemalloc.stop()
+
+    return StoreBenchmarkResult(
+        provider=provider,
+        corpus_size=len(corpus),
+        dimensions=dimensions,
+        k=k,
+        index_seconds=index_seconds,
+        docs_per_second=len(corpus) / index_seconds if index_seconds else float("inf"),
+        query_p50_ms=_percentile(latencies, 50),
+        query_p99_ms=_percentile(latencies, 99),
+        memory_bytes=memory_bytes,
+    )
+
+
+def _vector_data(
+    args: argparse.Namespace,
+) -> tuple[npt.NDArray[np.float32], npt.NDArray[np.float32]]:
+    data = synthetic_vectors(args.count + args.queries, args.dimensions)
+    return data[: args.count], data[args.count :]
+
+
+def _run_hnsw(args: argparse.Namespace) -> None:
+    corpus, queries = _vector_data(args)
+    results = benchmark_hnsw(corpus, queries, args.k, args.m, args.ef_construction, args.ef_search)
+    first = results[0]
+    print(
+        f"hnsw n={first.corpus_size} d={first.dimensions} M={first.m} "
+        f"ef_construction={first.ef_construction}: built in {first.build_seconds:.1f}s, "
+        f"brute force {first.brute_force_query_ms:.3f} ms/query"
+    )
+    for result in results:
+        print(
+            f"  ef_search={result.ef_search:>4}  recall@{result.k}={result.recall:.3f}  "
+            f"{result.hnsw_query_ms:.3f} ms/query"
+        )
+
+
+def _run_quantization(args: argparse.Namespace) -> None:
+    corpus, queries = _vector_data(args)
+    quantizers: list[Quantizer] = [ScalarQuantizer(args.dimensions)]
+    quantizers += [ProductQuantizer(args.dimensions, s) for s in args.pq_subvectors]
+    for quantizer in quantizers:
+        results = benchmark_quantization(
+            corpus, queries, quantizer, args.k, args.train_size, args.rescore
+        )
+        first = results[0]
+        print(
+            f"{first.name} n={first.corpus_size} d={first.dimensions}: "
+            f"{first.bytes_per_vector} B/vector ({first.compression:.0f}x), "
+            f"trained in {first.train_seconds:.1f}s, "
+            f"brute force {first.brute_force_query_ms:.3f} ms/query"
+        )
+        for result in results:
+            print(
+                f"  rescore={result.rescore_factor:>3}  recall@{result.k}={result.recall:.3f}  "
+                f"{result.query_ms:.3f} ms/query"
+            )
+
+
+def _run_stores(args: argparse.Namespace) -> None:
+    # Stores log every upsert and query at INFO, which would swamp the report
+    configure_logging(level="WARNING", log_format="console")
+    corpus = synthetic_corpus(args.count)
+    queries = synthetic_queries(corpus, args.queries)
+    print(f"stores n={len(corpus)} d={args.dimensions} k={args.k} queries={len(queries)}")
+    for provider in args.providers:
+        result = asyncio.run(
+            benchmark_store(
+                provider,
+                corpus,
+                queries,
+                dimensions=args.dimensions,
+                k=args.k,
+                batch_size=args.batch_size,
+                measure_memory=not args.no_memory,
+            )
+        )
+        memory = "" if result.memory_bytes is None else f"  {result.memory_bytes / 2**20:.1f} MiB"
+        print(
+            f"  {result.provider:<10} {result.docs_per_second:>9.0f} docs/s  "
+            f"p50 {result.query_p50_ms:.3f} ms  p99 {result.query_p99_ms:.3f} ms{memory}"
+        )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark local vector indexes.")
+    parser.add_argument("--count", type=int, default=10_000, help="corpus size")
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    hnsw = commands.add_parser("hnsw", help="HNSW recall and latency")
+    hnsw.add_argument("--m", type=int, default=16)
+    hnsw.add_argument("--ef-construction", type=int, default=200)
+    hnsw.add_argument(
+        "--ef-search", type=int, nargs="+", default=[10, 50, 100], help="values to sweep"
+    )
+
+    quantization = commands.add_parser("quantization", help="int8 / PQ recall and latency")
+    quantization.add_argument("--pq-subvectors", type=int, nargs="+", default=[32])
+    quantization.add_argument("--train-size", type=int, default=10_000)
+    quantization.add_argument(
+        "--rescore", type=int, nargs="+", default=[0, 4], help="rescore factors to sweep"
+    )
+
+    stores = commands.add_parser(
+        "stores", help="end-to-end indexing throughput, query latency and memory per provider"
+    )
+    stores.add_argument("--providers", nargs="+", default=["memory", "file", "quantized", "hnsw"])
+    stores.add_argument("--batch-size", type=int, default=500)
+    stores.add_argument("--no-memory", action="store_true", help="skip the traced build")
+
+    args = parser.parse_args(argv)
+    runners = {"hnsw": _run_hnsw, "quantization": _run_quantization, "stores": _run_stores}
+    runners[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Content-addressed embedding caches.
+
+Entries are keyed by ``(model, dimensions, sha256(text))`` so the same text
+embedded with a different model or output size never collides.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from py_core import AsyncRedisClient
+
+
+def embedding_cache_key(model: str, dimensions: int, text: str) -> str:
+    """Build the cache key for a text embedded with a given model and size."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{model}:{dimensions}:{digest}"
+
+
+def _frozen_copy(vector: npt.ArrayLike) -> npt.NDArray[np.float32]:
+    """Return an owned, read-only float32 copy safe to hand out repeatedly."""
+    copy = np.array(vector, dtype=np.float32)
+    copy.flags.writeable = False
+    return copy
+
+
+class InMemoryEmbeddingCache:
+    """Process-local LRU embedding cache.
+
+    Vectors are stored as read-only float32 arrays, so hits are returned
+    without copying. Satisfies the ``EmbeddingCache`` protocol via
+    structural subtyping.
+    """
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        if max_entries <= 0:
+            raise ValueError(f"max_entries must be a positive integer, got {max_entries}")
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, npt.NDArray[np.float32]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_many(self, keys: list[str]) -> dict[str, npt.NDArray[np.float32]]:
+        """Return cached vectors for the keys that are present."""
+        found: dict[str, npt.NDArray[np.float32]] = {}
+        for key in keys:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                found[key] = vector
+        return found
+
+    async def set_many(self, entries: dict[str, npt.NDArray[np.float32]]) -> None:
+        """Store vectors, evicting the least recently used entries when full."""
+        for key, vector in entries.items():
+            # Copy so cached rows never pin the caller's whole batch matrix
+            self._entries[key] = _frozen_copy(vector)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class DiskEmbeddingCache:
+    """SQLite-backed embedding cache that survives process restarts.
+
+    Vectors are stored as packed little-endian float32 blobs and decoded with
+    ``np.frombuffer``. SQLite calls run in a worker thread via
+    ``asyncio.to_thread`` to keep the event loop responsive.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings_f32 "
+                "(key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _get_many_sync(self, keys: list[str]) -> dict[str, npt.NDArray[np.float32]]:
+        found: dict[str, npt.NDArray[np.float32]] = {}
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT vector FROM embeddings_f32 WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    found[key] = np.frombuffer(row[0], dtype="<f4")
+        return found
+
+    def _set_many_sync(self, entries: dict[str, npt.NDArray[np.float32]]) -> None:
+        rows = [(key, np.asarray(vector, dtype="<f4").tobytes()) for key, vector in entries.items()]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings_f32 (key, vector) VALUES (?, ?)", rows
+            )
+
+    async def get_many(self, keys: list[str]) -> dict[str, npt.NDArray[np.float32]]:
+        """Return cached vectors for the keys that are present."""
+        if not keys:
+            return {}
+        return await asyncio.to_thread(self._get_many_sync, keys)
+
+    async def set_many(self, entries: dict[str, npt.NDArray[np.float32]]) -> None:
+        """Persist vectors, replacing any existing entries."""
+        if not entries:
+            return
+        await asyncio.to_thread(self._set_many_sync, entries)
+
+
+def _encode_base64(vector: npt.ArrayLike) -> str:
+    return base64.b64encode(np.asarray(vector, dtype="<f4").tobytes()).decode("ascii")
+
+
+class RedisEmbeddingCache:
+    """Redis-backed embedding cache shared across processes.
+
+    Vectors are stored as base64-encoded little-endian float32 bytes (about
+    a third the size of a JSON float list) under an ``f32`` versioned key
+    prefix, so entries written in another format are never read back.
+    Entries that fail to decode, or whose length differs from
+    ``dimensions`` when it is set, are treated as misses one key at a time.
+    Builds on ``AsyncRedisClient``, so an unavailable Redis degrades to
+    cache misses instead of failing the embedding call.
+    """
+
+    def __init__(
+        self,
+        client: AsyncRedisClient,
+        ttl: int = 7 * 24 * 3600,
+        key_prefix: str = "emb:f32:",
+        dimensions: int | None = None,
+    ) -> None:
+        self._client = client
+        self._ttl = ttl
+        self._key_prefix = key_prefix
+        self._dimensions = dimensions
+
+    def _decode(self, value: str) -> npt.NDArray[np.float32] | None:
+        try:
+            vector = np.frombuffer(base64.b64decode(value, validate=True), dtype="<f4")
+        except (binascii.Error, ValueError):
+            return None
+        if self._dimensions is not None and len(vector) != self._dimensions:
+            return None
+        return vector
+
+    async def get_many(self, keys: list[str]) -> dict[str, npt.NDArray[np.float32]]:
+        """Return cached vectors for the keys that are present and well-formed."""
+        values = await asyncio.gather(*(self._client.get(self._key_prefix + k) for k in keys))
+        found: dict[str, npt.NDArray[np.float32]] = {}
+        for key, value in zip(keys, values, strict=True):
+            vector = self._decode(value) if value else None
+            if vector is not None:
+                found[key] = vector
+        return found
+
+    async def set_many(self, entries: dict[str, npt.NDArray[np.float32]]) -> None:
+        """Store vectors with the configured TTL."""
+        await asyncio.gather(
+            *(
+                self._client.set(self._key_prefix + key, _encode_base64(vector), ttl=self._ttl)
+                for key, vector in entries.items()
+            )
+        )
@@ -2,23 +2,162 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import functools
+import re
+import zlib
+from collections.abc import AsyncIterator, Callable, Sequence
+from contextlib import asynccontextmanager
+
+import numpy as np
+import numpy.typing as npt
 import openai
+import tenacity
+import tiktoken
 from pydantic import SecretStr
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+from tenacity import retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 
 from py_core import get_logger
+from py_retrieval.embedding_cache import embedding_cache_key
 from py_retrieval.exceptions import EmbeddingError
+from py_retrieval.protocols import EmbeddingCache
+from py_retrieval.similarity import normalize
 
 logger = get_logger("embeddings")
 
-# OpenAI allows up to 2048 texts per request
+# OpenAI allows up to 2048 texts and 300k tokens per request
 _MAX_BATCH_SIZE = 2048
+_MAX_TOKENS_PER_REQUEST = 300_000
+_DEFAULT_MAX_CONCURRENCY = 4
+
+TokenCounter = Callable[[list[str]], list[int]]
+
+
+def _count_utf8_bytes(texts: list[str]) -> list[int]:
+    """Upper-bound token counts by UTF-8 byte length."""
+    return [len(text.encode("utf-8")) for text in texts]
+
+
+def _load_token_counter(model: str) -> TokenCounter:
+    """Build a batch token counter for ``model`` using the local tiktoken BPE.
+
+    Falls back to UTF-8 byte length when the encoding cannot be loaded (e.g.
+    offline without a tiktoken cache). Every BPE token covers at least one
+    byte, so the fallback never under-counts.
+    """
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except Exception as exc:
+        logger.warning("tokenizer_unavailable", model=model, error_type=type(exc).__name__)
+        return _count_utf8_bytes
+
+    def _count(texts: list[str]) -> list[int]:
+        return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+
+    return _count
+
+
+def _decode_embeddings(embeddings: Sequence[str | Sequence[float]]) -> npt.NDArray[np.float32]:
+    """Stack API embeddings into an ``(n, dimensions)`` float32 matrix.
+
+    Base64 payloads (``encoding_format="base64"``) are little-endian float32
+    bytes and are decoded with one ``np.frombuffer`` over the joined buffer,
+    so no per-float Python objects are created. Plain float lists are
+    accepted as well.
+    """
+    if embeddings and isinstance(embeddings[0], str):
+        raw = b"".join(base64.b64decode(embedding) for embedding in embeddings)  # type: ignore[arg-type]
+        return (
+            np.frombuffer(raw, dtype="<f4")
+            .reshape(len(embeddings), -1)
+            .astype(np.float32, copy=False)
+        )
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def _plan_batches(
+    texts: list[str],
+    count_tokens: Callable[[], TokenCounter],
+    max_tokens: int,
+    max_items: int = _MAX_BATCH_SIZE,
+) -> list[list[str]]:
+    """Split texts into request batches bounded by item count and token budget.
+
+    The tokenizer is only consulted when the cheap byte-length upper bound
+    does not already prove that everything fits in a single request.
+
+    Args:
+        texts: Texts to embed, in output order.
+        count_tokens: Returns the token counter to use when one is needed.
+        max_tokens: Token ceiling for a single request.
+        max_items: Item ceiling for a single request.
+
+    Returns:
+        Consecutive slices of ``texts``. A text larger than the token budget
+        is sent on its own and left for the API to reject.
+    """
+    byte_sizes = _count_utf8_bytes(texts)
+    if len(texts) <= max_items and sum(byte_sizes) <= max_tokens:
+        return [texts]
+
+    sizes = count_tokens()(texts)
+    batches: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+    for text, size in zip(texts, sizes, strict=True):
+        if current and (len(current) >= max_items or current_tokens + size > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+class _AdaptiveLimiter:
+    """Concurrency limit that halves on rate limiting and grows back on success.
+
+    Additive-increase / multiplicative-decrease, as used for TCP congestion
+    control: a ``RateLimitError`` halves the number of in-flight requests,
+    and each successful request raises the limit by one up to ``max_limit``.
+    """
+
+    def __init__(self, limit: int, max_limit: int) -> None:
+        self.limit = limit
+        self.max_limit = max_limit
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one request slot for the duration of the block."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(self.max_limit, self.limit + 1)
+
+    def on_rate_limit(self) -> None:
+        self.limit = max(1, self.limit // 2)
+        logger.warning("embedding_concurrency_reduced", limit=self.limit)
 
 
 class OpenAIEmbeddingProvider:
     """Generate embeddings via OpenAI API.
 
     Satisfies the ``EmbeddingProvider`` protocol via structural subtyping.
+    When a ``cache`` is given, only texts missing from it are sent to the API.
+    Requests are packed by token budget and dispatched concurrently; the
+    concurrency limit adapts to rate limiting and carries over between calls.
     """
 
     def __init__(
@@ -26,67 +165,222 @@ class OpenAIEmbeddingProvider:
         api_key: SecretStr,
         model: str = "text-embedding-3-small",
         dimensions: int = 1536,
+        cache: EmbeddingCache | None = None,
+        max_concurrency: int = _DEFAULT_MAX_CONCURRENCY,
+        max_tokens_per_request: int = _MAX_TOKENS_PER_REQUEST,
+        token_counter: TokenCounter | None = None,
     ) -> None:
+        if max_concurrency <= 0:
+            raise ValueError(f"max_concurrency must be a positive integer, got {max_concurrency}")
         self._model = model
         self._dimensions = dimensions
+        self._cache = cache
+        self._max_concurrency = max_concurrency
+        self._concurrency = max_concurrency
+        self._max_tokens_per_request = max_tokens_per_request
+        self._token_counter = token_counter
         self._client = openai.AsyncOpenAI(api_key=api_key.get_secret_value())
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential_jitter(initial=0.5, max=5.0),
-        retry=retry_if_exception_type((openai.RateLimitError, openai.APITimeoutError)),
-        reraise=True,
-    )
-    async def _call_api(self, batch: list[str]) -> list[list[float]]:
-        """Call OpenAI embeddings API for a single batch with retry."""
-        response = await self._client.embeddings.create(
-            model=self._model,
-            input=batch,
-            dimensions=self._dimensions,
+    def _get_token_counter(self) -> TokenCounter:
+        """Return the token counter, loading the tokenizer on first use."""
+        if self._token_counter is None:
+            self._token_counter = _load_token_counter(self._model)
+        return self._token_counter
+
+    def _retry(self, limiter: _AdaptiveLimiter) -> tenacity.AsyncRetrying:
+        """Create a retry policy that also backs off concurrency on rate limits."""
+
+        def _before_sleep(retry_state: tenacity.RetryCallState) -> None:
+            exc = retry_state.outcome.exception() if retry_state.outcome else None
+            if isinstance(exc, openai.RateLimitError):
+                limiter.on_rate_limit()
+
+        return tenacity.AsyncRetrying(
+            stop=stop_after_attempt(3),
+            wait=wait_exponential_jitter(initial=0.5, max=5.0),
+            retry=retry_if_exception_type((openai.RateLimitError, openai.APITimeoutError)),
+            before_sleep=_before_sleep,
+            reraise=True,
         )
+
+    async def _call_api(
+        self, batch: list[str], limiter: _AdaptiveLimiter
+    ) -> npt.NDArray[np.float32]:
+        """Call OpenAI embeddings API for a single batch with retry."""
+        async with limiter.slot():
+            async for attempt in self._retry(limiter):
+                with attempt:
+                    response = await self._client.embeddings.create(
+                        model=self._model,
+                        input=batch,
+                        dimensions=self._dimensions,
+                        encoding_format="base64",
+                    )
+        limiter.on_success()
         sorted_data = sorted(response.data, key=lambda item: item.index)
-        return [item.embedding for item in sorted_data]
+        # With base64 encoding the SDK passes the payload through untouched
+        return _decode_embeddings([item.embedding for item in sorted_data])
 
-    async def embed(self, texts: list[str]) -> list[list[float]]:
+    async def _embed_batches(self, batches: list[list[str]]) -> list[npt.NDArray[np.float32]]:
+        """Embed batches concurrently, returning results in batch order."""
+        limiter = _AdaptiveLimiter(self._concurrency, self._max_concurrency)
+        tasks = [asyncio.ensure_future(self._call_api(batch, limiter)) for batch in batches]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            self._concurrency = limiter.limit
+
+    async def _cache_lookup(self, keys: list[str]) -> dict[str, npt.NDArray[np.float32]]:
+        """Fetch cached vectors, treating cache failures and malformed entries as misses."""
+        if self._cache is None:
+            return {}
+        try:
+            found = await self._cache.get_many(keys)
+        except Exception as exc:
+            logger.warning("embedding_cache_get_failed", error_type=type(exc).__name__)
+            return {}
+        return {key: vec for key, vec in found.items() if vec.shape == (self._dimensions,)}
+
+    async def _cache_store(self, entries: dict[str, npt.NDArray[np.float32]]) -> None:
+        """Write freshly generated vectors back to the cache."""
+        if self._cache is None or not entries:
+            return
+        try:
+            await self._cache.set_many(entries)
+        except Exception as exc:
+            logger.warning("embedding_cache_set_failed", error_type=type(exc).__name__)
+
+    async def embed(self, texts: list[str]) -> npt.NDArray[np.float32]:
         """Generate embeddings for a list of texts.
 
-        Handles batching automatically when input exceeds the API limit.
-        Retries on transient OpenAI errors.
+        Duplicate texts are embedded once, and texts already present in the
+        cache are served without an API call. Misses are split into batches
+        that respect the per-request item and token limits, and batches run
+        concurrently. Retries on transient OpenAI errors.
 
         Args:
             texts: Texts to embed.
 
         Returns:
-            Embedding vectors in the same order as input texts.
+            A ``(len(texts), dimensions)`` float32 matrix whose rows follow
+            the order of the input texts.
 
         Raises:
             EmbeddingError: If the OpenAI API call fails after retries.
         """
         if not texts:
-            return []
+            return np.empty((0, self._dimensions), dtype=np.float32)
 
-        all_embeddings: list[list[float]] = []
+        unique_texts = list(dict.fromkeys(texts))
+        keys = {
+            text: embedding_cache_key(self._model, self._dimensions, text) for text in unique_texts
+        }
+        cached = await self._cache_lookup(list(keys.values()))
+        vectors = {text: cached[keys[text]] for text in unique_texts if keys[text] in cached}
+        misses = [text for text in unique_texts if text not in vectors]
 
-        try:
-            for i in range(0, len(texts), _MAX_BATCH_SIZE):
-                batch = texts[i : i + _MAX_BATCH_SIZE]
-                embeddings = await self._call_api(batch)
-                all_embeddings.extend(embeddings)
-
-            logger.info(
-                "embeddings_generated",
-                total_texts=len(texts),
-                batches=len(range(0, len(texts), _MAX_BATCH_SIZE)),
-                model=self._model,
-                dimensions=self._dimensions,
-            )
-        except Exception as exc:
-            logger.error(
-                "embeddings_failed",
-                total_texts=len(texts),
-                model=self._model,
-                error_type=type(exc).__name__,
-            )
-            raise EmbeddingError("Failed to generate embeddings") from exc
-
-        return all_embeddings
+        if misses:
+            try:
+                batches = _plan_batches(
+                    misses, self._get_token_counter, self._max_tokens_per_request
+                )
+                results = await self._embed_batches(batches)
+                for batch, embeddings in zip(batches, results, strict=True):
+                    vectors.update(zip(batch, embeddings, strict=True))
+
+                logger.info(
+                    "embeddings_generated",
+                    total_texts=len(texts),
+                    cache_hits=len(unique_texts) - len(misses),
+                    batches=len(batches),
+                    concurrency=self._concurrency,
+                    model=self._model,
+                    dimensions=self._dimensions,
+                )
+            except Exception as exc:
+                logger.error(
+                    "embeddings_failed",
+                    total_texts=len(texts),
+                    model=self._model,
+                    error_type=type(exc).__name__,
+                )
+                raise EmbeddingError("Failed to generate embeddings") from exc
+
+            await self._cache_store({keys[text]: vectors[text] for text in misses})
+
+        return np.stack([vectors[text] for text in texts])
+
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _hash_feature(feature: str, seed: int) -> int:
+    """Stable 32-bit hash of a feature (unlike ``hash()``, not salted per process)."""
+    return zlib.crc32(feature.encode("utf-8"), seed)
+
+
+class HashingEmbeddingProvider:
+    """Deterministic offline embeddings using the signed hashing trick.
+
+    Lowercased words and, optionally, adjacent word pairs are hashed to a
+    bucket and a sign; a text's embedding is the L2-normalized sum of its
+    signed buckets. Texts that share words get similar vectors and the same
+    text gets the same vector in every process, with no network or model.
+    Intended for tests and repeatable benchmarks, not for semantic quality.
+
+    Satisfies the ``EmbeddingProvider`` protocol via structural subtyping.
+
+    Args:
+        dimensions: Output dimensionality.
+        seed: Hash seed; different seeds give unrelated embedding spaces.
+        bigrams: Also hash adjacent word pairs, which makes word order count.
+    """
+
+    def __init__(self, dimensions: int = 1536, seed: int = 0, bigrams: bool = True) -> None:
+        if dimensions <= 0:
+            raise ValueError(f"dimensions must be a positive integer, got {dimensions}")
+        self._dimensions = dimensions
+        self._seed = seed
+        self._bigrams = bigrams
+
+    def _features(self, text: str) -> list[str]:
+        words = _WORD_PATTERN.findall(text.lower())
+        if self._bigrams:
+            words += [f"{a} {b}" for a, b in zip(words, words[1:], strict=False)]
+        return words
+
+    def embed_sync(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        """Embed texts synchronously; ``embed`` is the protocol entry point."""
+        features = [self._features(text) for text in texts]
+        counts = np.fromiter((len(f) for f in features), dtype=np.intp, count=len(texts))
+        hashes = np.fromiter(
+            (_hash_feature(feature, self._seed) for group in features for feature in group),
+            dtype=np.int64,
+            count=int(counts.sum()),
+        )
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), counts)
+        signs = np.where(hashes & (1 << 31), -1.0, 1.0)
+        # One scatter-add over all texts: flat index = row * dimensions + bucket
+        totals = np.bincount(
+            rows * self._dimensions + hashes % self._dimensions,
+            weights=signs,
+            minlength=len(texts) * self._dimensions,
+        )
+        return normalize(totals.reshape(len(texts), self._dimensions))
+
+    async def embed(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        """Generate embeddings for a list of texts.
+
+        Args:
+            texts: Texts to embed.
+
+        Returns:
+            A ``(len(texts), dimensions)`` float32 matrix of unit vectors
+            (all-zero rows for texts without words).
+        """
+        return self.embed_sync(texts)
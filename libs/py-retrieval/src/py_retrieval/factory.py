@@ -2,42 +2,135 @@
 
 from __future__ import annotations
 
-from py_retrieval.embeddings import OpenAIEmbeddingProvider
+from collections.abc import Callable
+
+from py_retrieval.embeddings import HashingEmbeddingProvider, OpenAIEmbeddingProvider
 from py_retrieval.exceptions import VectorStoreError
+from py_retrieval.file_store import FileVectorStore
+from py_retrieval.hnsw import HNSWVectorStore
+from py_retrieval.memory_store import InMemoryVectorStore
 from py_retrieval.models import VectorStoreConfig
 from py_retrieval.pinecone_store import PineconeVectorStore
-from py_retrieval.protocols import VectorStore
+from py_retrieval.protocols import EmbeddingCache, EmbeddingProvider, VectorStore
+from py_retrieval.quantized_store import QuantizedVectorStore
+from py_retrieval.semantic_cache import SemanticCachedVectorStore, SemanticQueryCache
+
+# Stores that keep a BM25 index next to their vectors
+_HYBRID_PROVIDERS = ("file", "memory")
 
+# Stores that keep truncated vector prefixes for two-stage search
+_COARSE_PROVIDERS = ("file", "memory")
 
-def create_vector_store(config: VectorStoreConfig) -> VectorStore:
+
+def create_vector_store(
+    config: VectorStoreConfig,
+    embedding_cache: EmbeddingCache | None = None,
+    query_cache: SemanticQueryCache | None = None,
+) -> VectorStore:
     """Create a vector store instance based on configuration.
 
     Args:
         config: Vector store configuration specifying provider and credentials.
+        embedding_cache: Optional cache consulted before calling the embedding API.
+        query_cache: Optional semantic cache; when given, the store is wrapped
+            in a ``SemanticCachedVectorStore`` that serves near-duplicate
+            queries from it.
 
     Returns:
         A configured vector store instance (use as async context manager).
 
     Raises:
-        VectorStoreError: If the provider is not supported.
+        VectorStoreError: If the provider is not supported, or does not
+            support ``hybrid_search`` or ``coarse_dimensions`` when set.
     """
-    providers = {
+    providers: dict[str, Callable[[VectorStoreConfig, EmbeddingProvider], VectorStore]] = {
+        "file": _create_file,
+        "hnsw": _create_hnsw,
+        "memory": _create_memory,
         "pinecone": _create_pinecone,
+        "quantized": _create_quantized,
     }
 
     builder = providers.get(config.provider)
     if builder is None:
         supported = ", ".join(sorted(providers.keys()))
         raise VectorStoreError(f"Unknown provider: '{config.provider}'. Supported: {supported}")
+    if config.hybrid_search:
+        if config.provider not in _HYBRID_PROVIDERS:
+            supported = ", ".join(_HYBRID_PROVIDERS)
+            raise VectorStoreError(
+                f"Hybrid search is not supported by '{config.provider}'. Supported: {supported}"
+            )
+        if query_cache is not None:
+            # The cache searches by vector only and would silently drop the BM25 side
+            raise VectorStoreError("Hybrid search cannot be combined with a semantic query cache")
+    if config.coarse_dimensions is not None and config.provider not in _COARSE_PROVIDERS:
+        supported = ", ".join(_COARSE_PROVIDERS)
+        raise VectorStoreError(
+            f"Two-stage search is not supported by '{config.provider}'. Supported: {supported}"
+        )
+
+    embedding_provider = _create_embedding_provider(config, embedding_cache)
+    store = builder(config, embedding_provider)
+    if query_cache is not None:
+        return SemanticCachedVectorStore(store, embedding_provider, query_cache)
+    return store
 
-    return builder(config)
 
+def _create_embedding_provider(
+    config: VectorStoreConfig,
+    embedding_cache: EmbeddingCache | None,
+) -> EmbeddingProvider:
+    """Build the embedding provider described by the configuration.
 
-def _create_pinecone(config: VectorStoreConfig) -> PineconeVectorStore:
-    """Build a PineconeVectorStore with its embedding provider."""
-    embedding_provider = OpenAIEmbeddingProvider(
+    The embedding cache only applies to the OpenAI provider; hashing
+    embeddings are cheaper to recompute than to look up.
+    """
+    if config.embedding_provider == "hashing":
+        return HashingEmbeddingProvider(dimensions=config.embedding_dimensions)
+    return OpenAIEmbeddingProvider(
         api_key=config.api_key,
         model=config.embedding_model,
         dimensions=config.embedding_dimensions,
+        cache=embedding_cache,
     )
+
+
+def _create_pinecone(
+    config: VectorStoreConfig,
+    embedding_provider: EmbeddingProvider,
+) -> PineconeVectorStore:
+    """Build a PineconeVectorStore around the shared embedding provider."""
     return PineconeVectorStore(config=config, embedding_provider=embedding_provider)
+
+
+def _create_memory(
+    config: VectorStoreConfig,
+    embedding_provider: EmbeddingProvider,
+) -> InMemoryVectorStore:
+    """Build an InMemoryVectorStore around the shared embedding provider."""
+    return InMemoryVectorStore(config=config, embedding_provider=embedding_provider)
+
+
+def _create_file(
+    config: VectorStoreConfig,
+    embedding_provider: EmbeddingProvider,
+) -> FileVectorStore:
+    """Build a FileVectorStore around the shared embedding provider."""
+    return FileVectorStore(config=config, embedding_provider=embedding_provider)
+
+
+def _create_hnsw(
+    config: VectorStoreConfig,
+    embedding_provider: EmbeddingProvider,
+) -> HNSWVectorStore:
+    """Build an HNSWVectorStore around the shared embedding provider."""
+    return HNSWVectorStore(config=config, embedding_provider=embedding_provider)
+
+
+def _create_quantized(
+    config: VectorStoreConfig,
+    embedding_provider: EmbeddingProvider,
+) -> QuantizedVectorStore:
+    """Build a QuantizedVectorStore around the shared embedding provider."""
+    return QuantizedVectorStore(config=config, embedding_provider=embedding_provider)
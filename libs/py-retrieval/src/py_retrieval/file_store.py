@@ -0,0 +1,553 @@
+"""Memory-mapped, file-backed flat vector store implementation.
+
+On-disk layout under ``<storage_path>/<index_name>/``::
+
+    manifest.json            dimensions, dtype and the current generation
+    vectors-<gen>.bin        append-only rows of normalized vectors
+    records-<gen>.jsonl      append-only log of puts/deletes (id, row, text, metadata)
+
+Upserts append new rows and log records; overwritten and deleted rows stay
+in the segment as dead space until ``compact()`` rewrites the live rows into
+the next generation and atomically swaps the manifest.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Self
+
+import numpy as np
+import numpy.typing as npt
+
+from py_core import get_logger
+from py_retrieval.exceptions import VectorStoreConnectionError, VectorStoreError
+from py_retrieval.filters import matches_filter
+from py_retrieval.manifest import content_id
+from py_retrieval.metadata_index import MetadataIndex
+from py_retrieval.models import Document, QueryResult, VectorStoreConfig
+from py_retrieval.protocols import EmbeddingProvider
+from py_retrieval.similarity import normalize, select_top_k, two_stage_scores
+from py_retrieval.sparse import SparseIndex, fuse_scores
+
+logger = get_logger("file_store")
+
+_MANIFEST = "manifest.json"
+# Rows scored per chunk so float16 segments are upcast a slice at a time
+_SCORE_CHUNK_ROWS = 65_536
+
+
+class FileVectorStore:
+    """Persistent flat implementation of the VectorStore protocol.
+
+    Vectors are read through ``np.memmap``, so opening an index is instant
+    and every process that maps the same segment shares one copy in the OS
+    page cache. Use a single writer; any number of ``read_only`` readers can
+    pick up its changes with ``refresh()``.
+    """
+
+    def __init__(
+        self,
+        config: VectorStoreConfig,
+        embedding_provider: EmbeddingProvider,
+    ) -> None:
+        if config.storage_path is None:
+            raise VectorStoreError("The 'file' provider requires storage_path")
+        self._config = config
+        self._embedding_provider = embedding_provider
+        self._dimensions = config.embedding_dimensions
+        self._dtype = np.dtype(config.vector_dtype)
+        self._read_only = config.read_only
+        self._root = Path(config.storage_path) / config.index_name
+        self._lock = asyncio.Lock()
+        self._reset(generation=0)
+
+    def _reset(self, generation: int) -> None:
+        """Forget all loaded state and point at ``generation``."""
+        self._generation = generation
+        self._vectors: npt.NDArray[Any] = np.empty((0, self._dimensions), dtype=self._dtype)
+        self._log_offset = 0
+        self._rows: dict[str, int] = {}
+        self._records: dict[int, tuple[str, str, dict[str, Any]]] = {}
+        self._live: npt.NDArray[np.intp] | None = None
+        self._metadata_index = MetadataIndex()
+        self._sparse_index = SparseIndex() if self._config.hybrid_search else None
+        # Renormalized vector prefixes, held in memory for two-stage search
+        self._coarse: npt.NDArray[np.float32] | None = None
+        if self._config.coarse_dimensions is not None:
+            self._coarse = np.empty((0, self._config.coarse_dimensions), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def dead_rows(self) -> int:
+        """Rows in the segment file that are no longer referenced."""
+        return int(self._vectors.shape[0]) - len(self._rows)
+
+    def _vectors_path(self, generation: int) -> Path:
+        return self._root / f"vectors-{generation}.bin"
+
+    def _log_path(self, generation: int) -> Path:
+        return self._root / f"records-{generation}.jsonl"
+
+    @property
+    def _row_bytes(self) -> int:
+        return self._dimensions * self._dtype.itemsize
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _write_manifest(self, generation: int) -> None:
+        """Atomically replace the manifest."""
+        manifest = {
+            "dimensions": self._dimensions,
+            "dtype": self._dtype.name,
+            "generation": generation,
+        }
+        tmp_path = self._root / f"{_MANIFEST}.tmp"
+        tmp_path.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp_path, self._root / _MANIFEST)
+
+    def _load(self) -> None:
+        """Bring in-memory state up to date with the files on disk.
+
+        Reads only the log tail written since the last load, unless a
+        compaction moved the index to a new generation.
+        """
+        manifest_path = self._root / _MANIFEST
+        if not manifest_path.exists():
+            if self._read_only:
+                raise VectorStoreConnectionError(f"No vector index found at {self._root}")
+            self._root.mkdir(parents=True, exist_ok=True)
+            self._write_manifest(0)
+
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest["dimensions"] != self._dimensions or manifest["dtype"] != self._dtype.name:
+            raise VectorStoreConnectionError(
+                f"Index at {self._root} stores {manifest['dimensions']}-d {manifest['dtype']} "
+                f"vectors, configured for {self._dimensions}-d {self._dtype.name}"
+            )
+        if manifest["generation"] != self._generation:
+            self._reset(generation=manifest["generation"])
+
+        if not self._read_only:
+            self._truncate_partial_row()
+        self._replay_log()
+        self._remap()
+
+    def _truncate_partial_row(self) -> None:
+        """Drop a torn trailing row left by an interrupted append."""
+        path = self._vectors_path(self._generation)
+        if path.exists():
+            size = path.stat().st_size
+            if size % self._row_bytes:
+                os.truncate(path, size - size % self._row_bytes)
+
+    def _replay_log(self) -> None:
+        """Apply log records appended since the last replay."""
+        path = self._log_path(self._generation)
+        if not path.exists():
+            return
+        with path.open("rb") as log:
+            log.seek(self._log_offset)
+            for line in log:
+                if not line.endswith(b"\n"):
+                    break  # torn write; picked up again once complete
+                self._apply(json.loads(line))
+                self._log_offset += len(line)
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        """Apply one put/delete log record to the in-memory maps."""
+        previous = self._rows.pop(record["id"], None)
+        if previous is not None:
+            del self._records[previous]
+            self._metadata_index.remove(previous)
+            if self._sparse_index is not None:
+                self._sparse_index.remove(previous)
+        if record["op"] == "put":
+            self._rows[record["id"]] = record["row"]
+            self._records[record["row"]] = (record["id"], record["text"], record["metadata"])
+            self._metadata_index.set(record["row"], record["metadata"])
+            if self._sparse_index is not None:
+                self._sparse_index.set(record["row"], record["text"])
+        self._live = None
+
+    def _remap(self) -> None:
+        """Memory-map every complete row currently in the segment file."""
+        path = self._vectors_path(self._generation)
+        count = path.stat().st_size // self._row_bytes if path.exists() else 0
+        if count == 0:
+            self._vectors = np.empty((0, self._dimensions), dtype=self._dtype)
+        elif count != self._vectors.shape[0]:
+            self._vectors = np.memmap(
+                path, dtype=self._dtype, mode="r", shape=(count, self._dimensions)
+            )
+        if self._coarse is not None and len(self._coarse) != count:
+            # Segment rows are append-only within a generation, so only the tail is new
+            tail = self._vectors[len(self._coarse) : count, : self._coarse.shape[1]]
+            self._coarse = np.concatenate([self._coarse[:count], normalize(tail)])
+
+    async def refresh(self) -> None:
+        """Pick up rows written by another process since the last load.
+
+        Runs on the event loop (it only reads the log tail) so concurrent
+        queries never observe a half-applied state.
+        """
+        async with self._lock:
+            try:
+                self._load()
+            except Exception as exc:
+                raise VectorStoreConnectionError(f"Failed to refresh vector index: {exc}") from exc
+
+    async def __aenter__(self) -> Self:
+        try:
+            await asyncio.to_thread(self._load)
+        except VectorStoreConnectionError:
+            raise
+        except Exception as exc:
+            raise VectorStoreConnectionError(f"Failed to open vector index: {exc}") from exc
+        logger.info(
+            "file_store_opened",
+            path=str(self._root),
+            size=len(self._rows),
+            read_only=self._read_only,
+        )
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: Any,
+    ) -> None:
+        self._reset(generation=self._generation)
+        logger.info("file_store_closed", path=str(self._root))
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _check_writable(self, operation: str) -> None:
+        if self._read_only:
+            raise VectorStoreError(f"{operation} failed: store is read-only")
+
+    def _append(self, matrix: npt.NDArray[Any], records: list[dict[str, Any]]) -> int:
+        """Append vector rows, then the log records that reference them.
+
+        Returns:
+            Number of bytes appended to the log.
+        """
+        if matrix.size:
+            with self._vectors_path(self._generation).open("ab") as segment:
+                segment.write(matrix.tobytes())
+        payload = "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+        with self._log_path(self._generation).open("ab") as log:
+            log.write(payload)
+        return len(payload)
+
+    async def _commit(self, matrix: npt.NDArray[Any], records: list[dict[str, Any]]) -> None:
+        """Persist a write batch and apply it to the in-memory state."""
+        written = await asyncio.to_thread(self._append, matrix, records)
+        for record in records:
+            self._apply(record)
+        self._log_offset += written
+        self._remap()
+
+    async def upsert(self, documents: list[Document]) -> list[str]:
+        """Append documents to the index.
+
+        Generates embeddings for documents without pre-computed vectors and
+        assigns content-derived IDs to documents without one. Re-upserting an
+        ID appends a new row and marks the old one dead.
+
+        Args:
+            documents: Documents to upsert.
+
+        Returns:
+            List of document IDs that were upserted.
+
+        Raises:
+            VectorStoreError: If the store is read-only, a vector has the wrong
+                dimensions, or the write fails.
+        """
+        if not documents:
+            return []
+        self._check_writable("Upsert")
+
+        for doc in documents:
+            if doc.id is None:
+                doc.id = content_id(doc)
+
+        docs_to_embed = [doc for doc in documents if doc.vector is None]
+        if docs_to_embed:
+            embeddings = await self._embedding_provider.embed([doc.text for doc in docs_to_embed])
+            for doc, embedding in zip(docs_to_embed, embeddings, strict=True):
+                doc.vector = embedding
+
+        matrix = normalize([doc.vector for doc in documents if doc.vector is not None])
+        if matrix.ndim != 2 or matrix.shape[1] != self._dimensions:
+            raise VectorStoreError(
+                f"Upsert failed: expected {self._dimensions}-dimensional vectors, "
+                f"got shape {matrix.shape}"
+            )
+
+        async with self._lock:
+            start = self._vectors.shape[0]
+            records = [
+                {
+                    "op": "put",
+                    "id": doc.id,
+                    "row": start + offset,
+                    "text": doc.text,
+                    "metadata": doc.metadata,
+                }
+                for offset, doc in enumerate(documents)
+            ]
+            try:
+                await self._commit(matrix.astype(self._dtype, copy=False), records)
+            except Exception as exc:
+                raise VectorStoreError(f"Upsert failed: {exc}") from exc
+
+        logger.info("file_store_upserted", count=len(documents), size=len(self._rows))
+        return [doc.id for doc in documents]  # type: ignore[misc]
+
+    async def delete(self, ids: list[str]) -> None:
+        """Delete documents by ID; unknown IDs are ignored.
+
+        Args:
+            ids: Document IDs to delete.
+        """
+        if not ids:
+            return
+        self._check_writable("Delete")
+
+        async with self._lock:
+            records = [{"op": "delete", "id": doc_id} for doc_id in ids if doc_id in self._rows]
+            if not records:
+                return
+            try:
+                await self._commit(np.empty((0, self._dimensions), dtype=self._dtype), records)
+            except Exception as exc:
+                raise VectorStoreError(f"Delete failed: {exc}") from exc
+
+        logger.info("file_store_deleted", count=len(records), size=len(self._rows))
+
+    def _write_generation(
+        self,
+        generation: int,
+        rows: npt.NDArray[np.intp],
+        records: list[tuple[str, str, dict[str, Any]]],
+    ) -> None:
+        """Write live rows and their records as a fresh generation."""
+        with self._vectors_path(generation).open("wb") as segment:
+            for start in range(0, len(rows), _SCORE_CHUNK_ROWS):
+                segment.write(
+                    np.ascontiguousarray(
+                        self._vectors[rows[start : start + _SCORE_CHUNK_ROWS]]
+                    ).tobytes()
+                )
+            segment.flush()
+            os.fsync(segment.fileno())
+        with self._log_path(generation).open("w", encoding="utf-8") as log:
+            for new_row, (doc_id, text, metadata) in enumerate(records):
+                record = {
+                    "op": "put",
+                    "id": doc_id,
+                    "row": new_row,
+                    "text": text,
+                    "metadata": metadata,
+                }
+                log.write(json.dumps(record) + "\n")
+            log.flush()
+            os.fsync(log.fileno())
+        self._write_manifest(generation)
+
+    async def compact(self) -> int:
+        """Rewrite live rows into a new generation, reclaiming dead space.
+
+        Readers that still map the previous generation keep a valid view
+        until they ``refresh()``.
+
+        Returns:
+            Number of dead rows reclaimed.
+        """
+        self._check_writable("Compaction")
+
+        async with self._lock:
+            reclaimed = self.dead_rows
+            if reclaimed == 0:
+                return 0
+            old_generation = self._generation
+            rows = self._live_rows()
+            records = [self._records[row] for row in rows.tolist()]
+            try:
+                await asyncio.to_thread(self._write_generation, old_generation + 1, rows, records)
+                # Swap state without yielding so queries never see it half-loaded
+                self._reset(generation=old_generation + 1)
+                self._load()
+            except Exception as exc:
+                raise VectorStoreError(f"Compaction failed: {exc}") from exc
+
+            for path in (self._vectors_path(old_generation), self._log_path(old_generation)):
+                path.unlink(missing_ok=True)
+
+        logger.info("file_store_compacted", reclaimed=reclaimed, size=len(self._rows))
+        return reclaimed
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _live_rows(self) -> npt.NDArray[np.intp]:
+        """Sorted array of rows referenced by a live document."""
+        if self._live is None:
+            self._live = np.fromiter(sorted(self._records), dtype=np.intp, count=len(self._records))
+        return self._live
+
+    def _score(
+        self, candidates: npt.NDArray[np.intp], queries: npt.NDArray[np.float32]
+    ) -> npt.NDArray[np.float32]:
+        """Cosine scores of candidate rows against a ``(q, d)`` query matrix.
+
+        Dense candidate sets are scored with a sequential chunked scan of the
+        segment (friendly to the page cache); sparse ones gather their rows.
+
+        Returns:
+            A ``(len(candidates), q)`` score matrix.
+        """
+        total = self._vectors.shape[0]
+        if len(candidates) * 2 < total:
+            return self._vectors[candidates].astype(np.float32, copy=False) @ queries.T
+        scores = np.empty((total, queries.shape[0]), dtype=np.float32)
+        for start in range(0, total, _SCORE_CHUNK_ROWS):
+            chunk = self._vectors[start : start + _SCORE_CHUNK_ROWS]
+            scores[start : start + len(chunk)] = chunk.astype(np.float32, copy=False) @ queries.T
+        return scores[candidates]
+
+    async def query(
+        self,
+        text: str,
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[QueryResult]:
+        """Return the documents most similar to ``text`` by cosine similarity.
+
+        With ``hybrid_search`` enabled, cosine similarity is fused with the
+        BM25 score of ``text`` and results carry the fused score.
+
+        Args:
+            text: Query text (will be embedded automatically).
+            top_k: Number of results to return.
+            filters: Optional Pinecone-style metadata filters.
+
+        Returns:
+            Ranked list of query results.
+        """
+        embeddings = await self._embedding_provider.embed([text])
+        return self._search(normalize(embeddings), top_k, filters, [text])[0]
+
+    async def query_many(
+        self,
+        texts: list[str],
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[list[QueryResult]]:
+        """Search for several texts with one embedding batch and one segment scan.
+
+        Args:
+            texts: Query texts.
+            top_k: Number of results per query.
+            filters: Optional Pinecone-style metadata filters applied to every query.
+
+        Returns:
+            One ranked result list per input text, in input order.
+        """
+        if not texts:
+            return []
+        embeddings = await self._embedding_provider.embed(texts)
+        return self._search(normalize(embeddings), top_k, filters, texts)
+
+    async def query_by_vector(
+        self,
+        vector: npt.ArrayLike,
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[QueryResult]:
+        """Return the documents most similar to a pre-computed embedding.
+
+        Args:
+            vector: Query embedding.
+            top_k: Number of results to return.
+            filters: Optional Pinecone-style metadata filters.
+
+        Returns:
+            Ranked list of query results.
+        """
+        return self._search(normalize(np.atleast_2d(vector)), top_k, filters)[0]
+
+    def _search(
+        self,
+        queries: npt.NDArray[np.float32],
+        top_k: int,
+        filters: dict[str, Any] | None,
+        texts: list[str] | None = None,
+    ) -> list[list[QueryResult]]:
+        """Rank live rows for each row of a normalized ``(q, d)`` query matrix.
+
+        ``texts`` are the query texts, used for hybrid scoring when enabled.
+        """
+        candidates = self._live_rows()
+        if filters:
+            selected = self._metadata_index.select(filters)
+            if selected is None:
+                selected = np.fromiter(
+                    (
+                        r
+                        for r in candidates.tolist()
+                        if matches_filter(self._records[r][2], filters)
+                    ),
+                    dtype=np.intp,
+                )
+            candidates = selected
+        if self._coarse is not None:
+            # Only the shortlisted rows of the full-width segment are read from disk
+            coarse_queries = normalize(queries[:, : self._coarse.shape[1]])
+            scores = two_stage_scores(
+                self._coarse[candidates] @ coarse_queries.T,
+                lambda positions, j: (
+                    self._vectors[candidates[positions]].astype(np.float32, copy=False) @ queries[j]
+                ),
+                max(self._config.coarse_candidates, top_k),
+                # Hybrid fusion still ranks candidates outside the shortlist
+                keep_coarse=texts is not None and self._sparse_index is not None,
+            )
+        else:
+            scores = self._score(candidates, queries)
+
+        batches = []
+        for i, column in enumerate(scores.T):
+            if texts is not None and self._sparse_index is not None:
+                sparse = self._sparse_index.score(texts[i])[candidates]
+                column = fuse_scores(
+                    column,
+                    sparse,
+                    top_k,
+                    method=self._config.hybrid_fusion,
+                    alpha=self._config.hybrid_alpha,
+                )
+            best = select_top_k(column, top_k)
+            results = []
+            for row, score in zip(candidates[best].tolist(), column[best].tolist(), strict=True):
+                doc_id, doc_text, metadata = self._records[row]
+                results.append(
+                    QueryResult.model_construct(
+                        id=doc_id, score=float(score), text=doc_text, metadata=dict(metadata)
+                    )
+                )
+            batches.append(results)
+        logger.info("file_store_queried", queries=len(batches), top_k=top_k)
+        return batches
@@ -0,0 +1,83 @@
+"""Pinecone-compatible metadata filter evaluation for local vector stores.
+
+Supports the operator subset documented by Pinecone: ``$eq``, ``$ne``,
+``$gt``, ``$gte``, ``$lt``, ``$lte``, ``$in``, ``$nin``, ``$exists`` and the
+logical ``$and`` / ``$or`` combinators. A bare value is shorthand for ``$eq``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from py_retrieval.exceptions import VectorStoreError
+
+_COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda value, operand: value == operand,
+    "$ne": lambda value, operand: value != operand,
+    "$gt": lambda value, operand: value > operand,
+    "$gte": lambda value, operand: value >= operand,
+    "$lt": lambda value, operand: value < operand,
+    "$lte": lambda value, operand: value <= operand,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+}
+
+_MISSING = object()
+
+
+def _matches_field(value: Any, condition: Any) -> bool:
+    """Evaluate a single field condition against a metadata value."""
+    if not isinstance(condition, dict):
+        condition = {"$eq": condition}
+
+    for operator, operand in condition.items():
+        if operator == "$exists":
+            if (value is not _MISSING) != bool(operand):
+                return False
+            continue
+
+        compare = _COMPARISONS.get(operator)
+        if compare is None:
+            raise VectorStoreError(f"Unsupported filter operator: '{operator}'")
+        if value is _MISSING:
+            # Pinecone treats a missing field as satisfying only negations
+            if operator not in ("$ne", "$nin"):
+                return False
+            continue
+        try:
+            if not compare(value, operand):
+                return False
+        except TypeError:
+            return False
+    return True
+
+
+def matches_filter(metadata: dict[str, Any], filters: dict[str, Any] | None) -> bool:
+    """Return whether ``metadata`` satisfies a Pinecone-style filter.
+
+    Args:
+        metadata: Document metadata.
+        filters: Filter expression; ``None`` or ``{}`` matches everything.
+
+    Returns:
+        True if every condition in the filter holds.
+
+    Raises:
+        VectorStoreError: If the filter uses an unsupported operator.
+    """
+    if not filters:
+        return True
+
+    for key, condition in filters.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif key.startswith("$"):
+            raise VectorStoreError(f"Unsupported filter operator: '{key}'")
+        elif not _matches_field(metadata.get(key, _MISSING), condition):
+            return False
+    return True
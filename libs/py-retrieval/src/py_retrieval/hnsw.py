@@ -0,0 +1,662 @@
+"""Hierarchical Navigable Small World (HNSW) approximate nearest-neighbour index.
+
+Pure Python/NumPy implementation of Malkov & Yashunin (2016) over cosine
+similarity. Graph traversal is Python, but every node expansion scores all
+of its unvisited neighbours with one vectorized matrix-vector product.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import math
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Self
+
+import numpy as np
+import numpy.typing as npt
+
+from py_core import get_logger
+from py_retrieval.exceptions import VectorStoreConnectionError, VectorStoreError
+from py_retrieval.filters import matches_filter
+from py_retrieval.manifest import content_id
+from py_retrieval.metadata_index import MetadataIndex
+from py_retrieval.models import Document, QueryResult, VectorStoreConfig
+from py_retrieval.protocols import EmbeddingProvider
+from py_retrieval.similarity import normalize, select_top_k
+
+logger = get_logger("hnsw")
+
+_INITIAL_CAPACITY = 1024
+
+# Filtered searches with at most this many candidates skip the graph
+_EXACT_SEARCH_LABELS = 2048
+
+# (similarity, label) pairs, best first
+Neighbours = list[tuple[float, int]]
+
+
+class HNSWIndex:
+    """Incremental HNSW graph over L2-normalized float32 vectors.
+
+    Args:
+        dimensions: Vector dimensionality.
+        m: Links per node on upper layers (layer 0 keeps ``2 * m``).
+        ef_construction: Candidate list size while inserting.
+        ef_search: Default candidate list size while querying.
+        seed: Seed for the level generator (for reproducible graphs).
+    """
+
+    def __init__(
+        self,
+        dimensions: int,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 50,
+        seed: int | None = None,
+    ) -> None:
+        if m < 2:
+            raise ValueError(f"m must be at least 2, got {m}")
+        self.dimensions = dimensions
+        self.m = m
+        self.ef_construction = max(ef_construction, m)
+        self.ef_search = ef_search
+        self._max_links_layer0 = 2 * m
+        self._level_multiplier = 1 / math.log(m)
+        self._rng = np.random.default_rng(seed)
+        self._vectors: npt.NDArray[np.float32] = np.zeros(
+            (_INITIAL_CAPACITY, dimensions), dtype=np.float32
+        )
+        self._deleted: npt.NDArray[np.bool_] = np.zeros(_INITIAL_CAPACITY, dtype=np.bool_)
+        self._size = 0
+        self._deleted_count = 0
+        self._levels: list[int] = []
+        self._links: list[list[list[int]]] = []
+        self._entry = -1
+        self._max_level = -1
+
+    def __len__(self) -> int:
+        """Number of live (non-deleted) vectors."""
+        return self._size - self._deleted_count
+
+    @property
+    def size(self) -> int:
+        """Number of labels ever assigned, including tombstoned ones."""
+        return self._size
+
+    @property
+    def vectors(self) -> npt.NDArray[np.float32]:
+        """Normalized vectors indexed by label (read-only view)."""
+        view = self._vectors[: self._size]
+        view.flags.writeable = False
+        return view
+
+    def is_deleted(self, label: int) -> bool:
+        return bool(self._deleted[label])
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def _grow(self) -> None:
+        capacity = self._vectors.shape[0] * 2
+        vectors = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        vectors[: self._size] = self._vectors[: self._size]
+        deleted = np.zeros(capacity, dtype=np.bool_)
+        deleted[: self._size] = self._deleted[: self._size]
+        self._vectors, self._deleted = vectors, deleted
+
+    def _random_level(self) -> int:
+        return int(-math.log(1.0 - self._rng.random()) * self._level_multiplier)
+
+    def add(self, vector: npt.ArrayLike) -> int:
+        """Insert a vector and return its integer label."""
+        query = normalize(vector)
+        if query.shape != (self.dimensions,):
+            raise ValueError(f"expected a {self.dimensions}-dimensional vector, got {query.shape}")
+
+        if self._size == self._vectors.shape[0]:
+            self._grow()
+        label = self._size
+        self._vectors[label] = query
+        level = self._random_level()
+        self._levels.append(level)
+        self._links.append([[] for _ in range(level + 1)])
+        self._size += 1
+
+        if self._entry < 0:
+            self._entry, self._max_level = label, level
+            return label
+
+        entry = self._entry
+        entry_sim = float(self._vectors[entry] @ query)
+        for layer in range(self._max_level, level, -1):
+            entry, entry_sim = self._greedy(query, entry, entry_sim, layer)
+
+        entry_points: Neighbours = [(entry_sim, entry)]
+        for layer in range(min(level, self._max_level), -1, -1):
+            found = self._search_layer(query, entry_points, self.ef_construction, layer)
+            max_links = self._max_links_layer0 if layer == 0 else self.m
+            neighbours = self._select_neighbours(found, self.m)
+            self._links[label][layer] = neighbours
+            for neighbour in neighbours:
+                links = self._links[neighbour][layer]
+                links.append(label)
+                if len(links) > max_links:
+                    self._links[neighbour][layer] = self._shrink(neighbour, links, max_links)
+            entry_points = found
+
+        if level > self._max_level:
+            self._entry, self._max_level = label, level
+        return label
+
+    def mark_deleted(self, label: int) -> None:
+        """Tombstone a label: it still routes searches but is never returned."""
+        if not self._deleted[label]:
+            self._deleted[label] = True
+            self._deleted_count += 1
+
+    def _select_neighbours(self, candidates: Neighbours, limit: int) -> list[int]:
+        """Pick diverse neighbours (HNSW paper, Algorithm 4).
+
+        A candidate is kept only if it is closer to the base point than to
+        every neighbour already kept, which preserves long-range links.
+        """
+        if len(candidates) <= 1:
+            return [node for _, node in candidates]
+        nodes = [node for _, node in candidates]
+        sims = np.array([sim for sim, _ in candidates], dtype=np.float32)
+        vectors = self._vectors[nodes]
+        pairwise = vectors @ vectors.T
+        # Highest similarity of each candidate to any neighbour kept so far
+        blocked = np.full(len(nodes), -np.inf, dtype=np.float32)
+        selected: list[int] = []
+        start = 0
+        while len(selected) < limit:
+            open_positions = np.flatnonzero(sims[start:] > blocked[start:])
+            if open_positions.size == 0:
+                break
+            position = start + int(open_positions[0])
+            selected.append(nodes[position])
+            np.maximum(blocked, pairwise[position], out=blocked)
+            start = position + 1
+        return selected
+
+    def _shrink(self, node: int, links: list[int], limit: int) -> list[int]:
+        """Re-select a node's neighbour list after it overflowed."""
+        sims = (self._vectors[links] @ self._vectors[node]).tolist()
+        ranked = sorted(zip(sims, links, strict=True), reverse=True)
+        return self._select_neighbours(ranked, limit)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _greedy(
+        self, query: npt.NDArray[np.float32], entry: int, entry_sim: float, layer: int
+    ) -> tuple[int, float]:
+        """Hill-climb to the closest node on one layer."""
+        while True:
+            links = self._links[entry][layer]
+            if not links:
+                return entry, entry_sim
+            sims = self._vectors[links] @ query
+            best = int(np.argmax(sims))
+            if sims[best] <= entry_sim:
+                return entry, entry_sim
+            entry, entry_sim = links[best], float(sims[best])
+
+    def _search_layer(
+        self,
+        query: npt.NDArray[np.float32],
+        entry_points: Neighbours,
+        ef: int,
+        layer: int,
+        accept: Callable[[int], bool] | None = None,
+    ) -> Neighbours:
+        """Best-first beam search on one layer (HNSW paper, Algorithm 2).
+
+        Nodes rejected by ``accept`` are still expanded, so tombstones and
+        filtered-out nodes keep routing the search without being returned.
+        """
+        visited = np.zeros(self._size, dtype=np.bool_)
+        candidates = [(-sim, node) for sim, node in entry_points]
+        heapq.heapify(candidates)
+        results: list[tuple[float, int]] = []
+        for sim, node in entry_points:
+            visited[node] = True
+            if accept is None or accept(node):
+                heapq.heappush(results, (sim, node))
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg_sim, node = heapq.heappop(candidates)
+            full = len(results) >= ef
+            if full and -neg_sim < results[0][0]:
+                break
+            links = np.array(self._links[node][layer], dtype=np.intp)
+            links = links[~visited[links]]
+            if links.size == 0:
+                continue
+            visited[links] = True
+            sims = self._vectors[links] @ query
+            if full:
+                # The admission bound only rises, so prune in bulk first
+                keep = sims > results[0][0]
+                links, sims = links[keep], sims[keep]
+            for neighbour, sim in zip(links.tolist(), sims.tolist(), strict=True):
+                if len(results) < ef or sim > results[0][0]:
+                    heapq.heappush(candidates, (-sim, neighbour))
+                    if accept is None or accept(neighbour):
+                        heapq.heappush(results, (sim, neighbour))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+
+        return sorted(results, reverse=True)
+
+    def search(
+        self,
+        vector: npt.ArrayLike,
+        k: int,
+        ef: int | None = None,
+        accept: Callable[[int], bool] | None = None,
+    ) -> Neighbours:
+        """Approximate top-``k`` live labels by cosine similarity.
+
+        Args:
+            vector: Query vector.
+            k: Number of neighbours to return.
+            ef: Candidate list size (defaults to ``ef_search``, at least ``k``).
+            accept: Optional predicate restricting which labels may be returned.
+
+        Returns:
+            ``(similarity, label)`` pairs, best first.
+        """
+        if self._entry < 0 or k <= 0:
+            return []
+        query = normalize(vector)
+        deleted = self._deleted
+
+        def _accept(label: int) -> bool:
+            return not deleted[label] and (accept is None or accept(label))
+
+        entry = self._entry
+        entry_sim = float(self._vectors[entry] @ query)
+        for layer in range(self._max_level, 0, -1):
+            entry, entry_sim = self._greedy(query, entry, entry_sim, layer)
+
+        beam = max(ef or self.ef_search, k)
+        return self._search_layer(query, [(entry_sim, entry)], beam, 0, _accept)[:k]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str | Path) -> None:
+        """Write the index to a single ``.npz`` file."""
+        link_counts: list[int] = []
+        link_data: list[int] = []
+        for node_links in self._links:
+            for layer_links in node_links:
+                link_counts.append(len(layer_links))
+                link_data.extend(layer_links)
+        params = [self.m, self.ef_construction, self.ef_search, self._entry, self._max_level]
+        with open(path, "wb") as handle:
+            np.savez(
+                handle,
+                params=np.array(params, dtype=np.int64),
+                vectors=self._vectors[: self._size],
+                deleted=self._deleted[: self._size],
+                levels=np.array(self._levels, dtype=np.int32),
+                link_counts=np.array(link_counts, dtype=np.int32),
+                link_data=np.array(link_data, dtype=np.int64),
+            )
+
+    @classmethod
+    def load(cls, path: str | Path) -> HNSWIndex:
+        """Read an index written by ``save``."""
+        with np.load(path, allow_pickle=False) as data:
+            m, ef_construction, ef_search, entry, max_level = data["params"].tolist()
+            vectors = data["vectors"]
+            index = cls(vectors.shape[1], m=m, ef_construction=ef_construction, ef_search=ef_search)
+            size = vectors.shape[0]
+            capacity = max(_INITIAL_CAPACITY, size)
+            index._vectors = np.zeros((capacity, vectors.shape[1]), dtype=np.float32)
+            index._vectors[:size] = vectors
+            index._deleted = np.zeros(capacity, dtype=np.bool_)
+            index._deleted[:size] = data["deleted"]
+            index._levels = data["levels"].tolist()
+            counts = data["link_counts"].tolist()
+            flat = data["link_data"].tolist()
+
+        links: list[list[list[int]]] = []
+        position = cursor = 0
+        for level in index._levels:
+            node_links = []
+            for _ in range(level + 1):
+                count = counts[cursor]
+                node_links.append(flat[position : position + count])
+                position += count
+                cursor += 1
+            links.append(node_links)
+
+        index._links = links
+        index._size = size
+        index._deleted_count = int(index._deleted[:size].sum())
+        index._entry, index._max_level = entry, max_level
+        return index
+
+
+class HNSWVectorStore:
+    """HNSW-backed implementation of the VectorStore protocol.
+
+    Queries are sublinear in corpus size. When ``storage_path`` is set the
+    graph and records are loaded on enter and saved on exit (or ``save()``).
+    Graph inserts run in a worker thread; queries and writes share a lock so
+    a search never walks a half-linked node.
+    """
+
+    def __init__(
+        self,
+        config: VectorStoreConfig,
+        embedding_provider: EmbeddingProvider,
+    ) -> None:
+        self._config = config
+        self._embedding_provider = embedding_provider
+        self._root = Path(config.storage_path) / config.index_name if config.storage_path else None
+        self._lock = asyncio.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._index = HNSWIndex(
+            self._config.embedding_dimensions,
+            m=self._config.hnsw_m,
+            ef_construction=self._config.hnsw_ef_construction,
+            ef_search=self._config.hnsw_ef_search,
+        )
+        self._labels: dict[str, int] = {}
+        self._records: list[tuple[str, str, dict[str, Any]] | None] = []
+        self._metadata_index = MetadataIndex()
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def _load(self) -> None:
+        assert self._root is not None
+        graph_path = self._root / "graph.npz"
+        if not graph_path.exists():
+            if self._config.read_only:
+                raise VectorStoreConnectionError(f"No vector index found at {self._root}")
+            return
+        index = HNSWIndex.load(graph_path)
+        if index.dimensions != self._config.embedding_dimensions:
+            raise VectorStoreConnectionError(
+                f"Index at {self._root} stores {index.dimensions}-d vectors, "
+                f"configured for {self._config.embedding_dimensions}-d"
+            )
+        index.ef_search = self._config.hnsw_ef_search
+        raw = json.loads((self._root / "records.json").read_text(encoding="utf-8"))
+        self._index = index
+        self._records = [(r[0], r[1], r[2]) if r is not None else None for r in raw]
+        self._labels = {r[0]: label for label, r in enumerate(self._records) if r is not None}
+        for label, record in enumerate(self._records):
+            if record is not None:
+                self._metadata_index.set(label, record[2])
+
+    def _save(self) -> None:
+        assert self._root is not None
+        self._root.mkdir(parents=True, exist_ok=True)
+        graph_tmp = self._root / "graph.npz.tmp"
+        records_tmp = self._root / "records.json.tmp"
+        self._index.save(graph_tmp)
+        records_tmp.write_text(json.dumps(self._records), encoding="utf-8")
+        os.replace(graph_tmp, self._root / "graph.npz")
+        os.replace(records_tmp, self._root / "records.json")
+
+    async def save(self) -> None:
+        """Persist the graph and records to ``storage_path``."""
+        if self._root is None:
+            raise VectorStoreError("Save failed: no storage_path configured")
+        async with self._lock:
+            try:
+                await asyncio.to_thread(self._save)
+            except Exception as exc:
+                raise VectorStoreError(f"Save failed: {exc}") from exc
+        logger.info("hnsw_saved", path=str(self._root), size=len(self._labels))
+
+    async def __aenter__(self) -> Self:
+        if self._root is not None:
+            try:
+                await asyncio.to_thread(self._load)
+            except VectorStoreConnectionError:
+                raise
+            except Exception as exc:
+                raise VectorStoreConnectionError(f"Failed to open vector index: {exc}") from exc
+        logger.info("hnsw_opened", index=self._config.index_name, size=len(self._labels))
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: Any,
+    ) -> None:
+        if self._root is not None and not self._config.read_only:
+            await self.save()
+        logger.info("hnsw_closed", index=self._config.index_name, size=len(self._labels))
+
+    def _insert(self, documents: list[Document], vectors: npt.NDArray[np.float32]) -> None:
+        """Link documents into the graph (runs in a worker thread)."""
+        for doc, vector in zip(documents, vectors, strict=True):
+            doc_id: str = doc.id  # type: ignore[assignment]
+            previous = self._labels.get(doc_id)
+            if previous is not None:
+                self._index.mark_deleted(previous)
+                self._records[previous] = None
+                self._metadata_index.remove(previous)
+            label = self._index.add(vector)
+            self._records.append((doc_id, doc.text, dict(doc.metadata)))
+            self._labels[doc_id] = label
+            self._metadata_index.set(label, doc.metadata)
+
+    async def upsert(self, documents: list[Document]) -> list[str]:
+        """Insert documents into the graph.
+
+        Generates embeddings for documents without pre-computed vectors and
+        assigns content-derived IDs to documents without one. Re-upserting an
+        ID tombstones the previous node.
+
+        Args:
+            documents: Documents to upsert.
+
+        Returns:
+            List of document IDs that were upserted.
+        """
+        if not documents:
+            return []
+        if self._config.read_only:
+            raise VectorStoreError("Upsert failed: store is read-only")
+
+        for doc in documents:
+            if doc.id is None:
+                doc.id = content_id(doc)
+
+        docs_to_embed = [doc for doc in documents if doc.vector is None]
+        if docs_to_embed:
+            embeddings = await self._embedding_provider.embed([doc.text for doc in docs_to_embed])
+            for doc, embedding in zip(docs_to_embed, embeddings, strict=True):
+                doc.vector = embedding
+
+        vectors = normalize([doc.vector for doc in documents if doc.vector is not None])
+        if vectors.ndim != 2 or vectors.shape[1] != self._index.dimensions:
+            raise VectorStoreError(
+                f"Upsert failed: expected {self._index.dimensions}-dimensional vectors, "
+                f"got shape {vectors.shape}"
+            )
+
+        async with self._lock:
+            await asyncio.to_thread(self._insert, documents, vectors)
+
+        logger.info("hnsw_upserted", count=len(documents), size=len(self._labels))
+        return [doc.id for doc in documents]  # type: ignore[misc]
+
+    async def query(
+        self,
+        text: str,
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[QueryResult]:
+        """Approximate nearest-neighbour search by cosine similarity.
+
+        Metadata filters are applied during graph traversal. If a selective
+        filter leaves fewer than ``top_k`` hits, the remaining matches are
+        scored exactly instead.
+
+        Args:
+            text: Query text (will be embedded automatically).
+            top_k: Number of results to return.
+            filters: Optional Pinecone-style metadata filters.
+
+        Returns:
+            Ranked list of query results.
+        """
+        embeddings = await self._embedding_provider.embed([text])
+        return (await self._search(normalize(embeddings), top_k, filters))[0]
+
+    async def query_many(
+        self,
+        texts: list[str],
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[list[QueryResult]]:
+        """Search the graph for several texts embedded in a single batch.
+
+        Args:
+            texts: Query texts.
+            top_k: Number of results per query.
+            filters: Optional Pinecone-style metadata filters applied to every query.
+
+        Returns:
+            One ranked result list per input text, in input order.
+        """
+        if not texts:
+            return []
+        embeddings = await self._embedding_provider.embed(texts)
+        return await self._search(normalize(embeddings), top_k, filters)
+
+    async def query_by_vector(
+        self,
+        vector: npt.ArrayLike,
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[QueryResult]:
+        """Approximate nearest-neighbour search for a pre-computed embedding.
+
+        Args:
+            vector: Query embedding.
+            top_k: Number of results to return.
+            filters: Optional Pinecone-style metadata filters.
+
+        Returns:
+            Ranked list of query results.
+        """
+        return (await self._search(normalize(np.atleast_2d(vector)), top_k, filters))[0]
+
+    async def _search(
+        self,
+        queries: npt.NDArray[np.float32],
+        top_k: int,
+        filters: dict[str, Any] | None,
+    ) -> list[list[QueryResult]]:
+        """Search the graph for each row of a normalized ``(q, d)`` query matrix.
+
+        The traversal runs in a worker thread so long batches or a large
+        ``ef_search`` do not block the event loop.
+        """
+        async with self._lock:
+            batches = await asyncio.to_thread(self._search_sync, queries, top_k, filters)
+        logger.info("hnsw_queried", queries=len(batches), top_k=top_k)
+        return batches
+
+    def _search_sync(
+        self,
+        queries: npt.NDArray[np.float32],
+        top_k: int,
+        filters: dict[str, Any] | None,
+    ) -> list[list[QueryResult]]:
+        labels = None
+        accept: Callable[[int], bool] | None = None
+        if filters:
+            labels = self._metadata_index.select(filters)
+            if labels is None:
+                labels = np.fromiter(
+                    (
+                        label
+                        for label, record in enumerate(self._records)
+                        if record is not None and matches_filter(record[2], filters)
+                    ),
+                    dtype=np.intp,
+                )
+            if len(labels) > _EXACT_SEARCH_LABELS:
+                allowed = np.zeros(self._index.size, dtype=np.bool_)
+                allowed[labels] = True
+
+                def accept(label: int) -> bool:
+                    return bool(allowed[label])
+
+        batches = []
+        for query_vector in queries:
+            if labels is not None and accept is None:
+                # A selective filter is cheaper to brute-force than to route around
+                hits = self._exact_search(query_vector, top_k, labels)
+            else:
+                hits = self._index.search(query_vector, top_k, accept=accept)
+                if labels is not None and len(hits) < top_k:
+                    hits = self._exact_search(query_vector, top_k, labels)
+
+            results = []
+            for score, label in hits:
+                doc_id, doc_text, metadata = self._records[label]  # type: ignore[misc]
+                results.append(
+                    QueryResult.model_construct(
+                        id=doc_id, score=score, text=doc_text, metadata=dict(metadata)
+                    )
+                )
+            batches.append(results)
+        return batches
+
+    def _exact_search(
+        self,
+        query_vector: npt.NDArray[np.float32],
+        top_k: int,
+        labels: npt.NDArray[np.intp],
+    ) -> Neighbours:
+        """Brute-force search over the given live labels."""
+        scores = self._index.vectors[labels] @ query_vector
+        best = select_top_k(scores, top_k)
+        return list(zip(scores[best].tolist(), labels[best].tolist(), strict=True))
+
+    async def delete(self, ids: list[str]) -> None:
+        """Tombstone documents by ID; unknown IDs are ignored.
+
+        Args:
+            ids: Document IDs to delete.
+        """
+        if not ids:
+            return
+        if self._config.read_only:
+            raise VectorStoreError("Delete failed: store is read-only")
+
+        async with self._lock:
+            for doc_id in ids:
+                label = self._labels.pop(doc_id, None)
+                if label is not None:
+                    self._index.mark_deleted(label)
+                    self._records[label] = None
+                    self._metadata_index.remove(label)
+
+        logger.info("hnsw_deleted", count=len(ids), size=len(self._labels))
@@ -0,0 +1,195 @@
+"""Content-derived document IDs and manifest-driven incremental indexing.
+
+Re-indexing a corpus where most chunks did not change should not re-embed or
+re-write them. ``sync_documents`` compares each document's content hash with
+a local ``IndexManifest`` from the previous run and only upserts what is new
+or changed, then deletes IDs that disappeared from the corpus.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from py_core import get_logger
+from py_retrieval.exceptions import VectorStoreError
+from py_retrieval.models import Document
+from py_retrieval.protocols import VectorStore
+
+logger = get_logger("manifest")
+
+# Fixed namespace so content IDs are stable across processes and releases
+_CONTENT_ID_NAMESPACE = uuid.UUID("8f5c1a52-4a1e-4d9b-9a53-3c6a2f0e7b14")
+_MANIFEST_FORMAT = 1
+
+
+def content_hash(document: Document) -> str:
+    """SHA-256 over a document's text and canonicalized metadata."""
+    digest = hashlib.sha256(document.text.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(document.metadata, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def content_id(document: Document) -> str:
+    """Deterministic UUID derived from the document content.
+
+    Byte-identical text and metadata always map to the same ID, so
+    re-upserting unchanged content overwrites instead of duplicating.
+    """
+    return str(uuid.uuid5(_CONTENT_ID_NAMESPACE, content_hash(document)))
+
+
+class IndexManifest:
+    """Local record of what an index holds: document ID -> content hash.
+
+    The manifest also records the index version it was built against (e.g.
+    embedding model and dimensions); a different version invalidates every
+    entry. It is stored as JSON and replaced atomically on ``save``.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.index_version: str | None = None
+        self.entries: dict[str, str] = {}
+
+    @classmethod
+    def load(cls, path: str | Path) -> IndexManifest:
+        """Read a manifest, returning an empty one if the file does not exist."""
+        manifest = cls(path)
+        if manifest.path.exists():
+            data = json.loads(manifest.path.read_text(encoding="utf-8"))
+            if data.get("format") != _MANIFEST_FORMAT:
+                raise ValueError(f"Unsupported manifest format in {manifest.path}")
+            manifest.index_version = data["index_version"]
+            manifest.entries = dict(data["entries"])
+        return manifest
+
+    def save(self) -> None:
+        """Write the manifest through a temporary file and an atomic rename."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "format": _MANIFEST_FORMAT,
+            "index_version": self.index_version,
+            "entries": self.entries,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+
+@dataclass
+class SyncResult:
+    """IDs touched by one ``sync_documents`` run."""
+
+    upserted: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+
+
+async def sync_documents(
+    store: VectorStore,
+    documents: list[Document],
+    manifest: IndexManifest,
+    index_version: str,
+    delete_orphans: bool = True,
+) -> SyncResult:
+    """Bring ``store`` in line with ``documents`` using ``manifest`` as the baseline.
+
+    Documents without an ID get ``content_id``. Only documents whose content
+    hash differs from the manifest are upserted (and therefore embedded).
+    With ``delete_orphans``, IDs in the manifest that are absent from
+    ``documents`` are deleted, so ``documents`` must be the complete corpus
+    the manifest tracks. The manifest is saved after each step that
+    succeeds, so a failed run is resumed rather than repeated.
+
+    Args:
+        store: Open vector store to write to.
+        documents: Complete current corpus covered by the manifest.
+        manifest: Manifest from the previous run (empty on the first run).
+        index_version: Version of the index layout, e.g. embedding model and
+            dimensions; a change re-upserts every document.
+        delete_orphans: Delete manifest IDs missing from ``documents``.
+
+    Returns:
+        Upserted, unchanged and deleted IDs.
+
+    Raises:
+        VectorStoreError: If the upsert or delete fails. For a partial upsert
+            failure the manifest keeps the documents that were written.
+    """
+    if manifest.index_version != index_version:
+        if manifest.entries:
+            logger.info(
+                "manifest_version_changed",
+                previous=manifest.index_version,
+                current=index_version,
+                entries=len(manifest.entries),
+            )
+        previous: dict[str, str] = {}
+    else:
+        previous = manifest.entries
+
+    current: dict[str, Document] = {}
+    hashes: dict[str, str] = {}
+    for doc in documents:
+        if doc.id is None:
+            doc.id = content_id(doc)
+        current[doc.id] = doc  # later duplicates win, as they would in the store
+        hashes[doc.id] = content_hash(doc)
+
+    result = SyncResult()
+    changed = []
+    for doc_id, doc in current.items():
+        if previous.get(doc_id) == hashes[doc_id]:
+            result.unchanged.append(doc_id)
+        else:
+            changed.append(doc)
+    orphans = [doc_id for doc_id in manifest.entries if doc_id not in current]
+
+    entries = {doc_id: previous[doc_id] for doc_id in result.unchanged}
+    # Orphans stay tracked until they are actually deleted from the store
+    pending_orphans = {doc_id: manifest.entries[doc_id] for doc_id in orphans}
+
+    async def _save() -> None:
+        manifest.index_version = index_version
+        manifest.entries = {**pending_orphans, **entries}
+        await asyncio.to_thread(manifest.save)
+
+    if changed:
+        try:
+            result.upserted = await store.upsert(changed)
+        except VectorStoreError as exc:
+            succeeded = exc.details.get("succeeded_ids", [])
+            entries.update({doc_id: hashes[doc_id] for doc_id in succeeded})
+            await _save()
+            raise
+        entries.update({doc_id: hashes[doc_id] for doc_id in result.upserted})
+        await _save()
+
+    if delete_orphans and orphans:
+        await store.delete(orphans)
+        result.deleted = orphans
+        pending_orphans.clear()
+        await _save()
+    elif not changed:
+        await _save()
+    logger.info(
+        "manifest_synced",
+        upserted=len(result.upserted),
+        unchanged=len(result.unchanged),
+        deleted=len(result.deleted),
+        index_version=index_version,
+    )
+    return result
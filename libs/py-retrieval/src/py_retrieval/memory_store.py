@@ -0,0 +1,319 @@
+"""In-memory NumPy vector store implementation."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Self
+
+import numpy as np
+import numpy.typing as npt
+
+from py_core import get_logger
+from py_retrieval.exceptions import VectorStoreError
+from py_retrieval.filters import matches_filter
+from py_retrieval.manifest import content_id
+from py_retrieval.metadata_index import MetadataIndex
+from py_retrieval.models import Document, QueryResult, VectorStoreConfig
+from py_retrieval.protocols import EmbeddingProvider
+from py_retrieval.similarity import normalize, select_top_k, two_stage_scores
+from py_retrieval.sparse import SparseIndex, fuse_scores
+
+logger = get_logger("memory_store")
+
+_INITIAL_CAPACITY = 1024
+
+
+class InMemoryVectorStore:
+    """In-process implementation of the VectorStore protocol.
+
+    Vectors live in one contiguous, L2-normalized float32 matrix, so cosine
+    similarity for every row is a single BLAS matrix-vector product followed
+    by ``argpartition`` top-k selection. Intended for tests, benchmarks and
+    small corpora that do not need a hosted index.
+
+    Mutations never await while touching the matrix, so queries always see
+    a consistent snapshot; concurrent writers are serialized by a lock.
+    """
+
+    def __init__(
+        self,
+        config: VectorStoreConfig,
+        embedding_provider: EmbeddingProvider,
+    ) -> None:
+        self._config = config
+        self._embedding_provider = embedding_provider
+        self._dimensions = config.embedding_dimensions
+        self._vectors: npt.NDArray[np.float32] = np.zeros(
+            (_INITIAL_CAPACITY, self._dimensions), dtype=np.float32
+        )
+        # Renormalized vector prefixes scanned first by two-stage search
+        self._coarse_dimensions = config.coarse_dimensions
+        self._coarse: npt.NDArray[np.float32] | None = None
+        if self._coarse_dimensions is not None:
+            self._coarse = np.zeros((_INITIAL_CAPACITY, self._coarse_dimensions), dtype=np.float32)
+        self._size = 0
+        self._ids: list[str] = []
+        self._texts: list[str] = []
+        self._metadata: list[dict[str, Any]] = []
+        self._rows: dict[str, int] = {}
+        self._metadata_index = MetadataIndex()
+        self._sparse_index = SparseIndex() if config.hybrid_search else None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    async def __aenter__(self) -> Self:
+        logger.info("memory_store_opened", index=self._config.index_name, size=self._size)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: Any,
+    ) -> None:
+        logger.info("memory_store_closed", index=self._config.index_name, size=self._size)
+
+    def _ensure_capacity(self, required: int) -> None:
+        """Grow the vector buffer geometrically so appends stay amortized O(1)."""
+        capacity = self._vectors.shape[0]
+        if required <= capacity:
+            return
+        while capacity < required:
+            capacity *= 2
+        grown = np.zeros((capacity, self._dimensions), dtype=np.float32)
+        grown[: self._size] = self._vectors[: self._size]
+        self._vectors = grown
+        if self._coarse is not None:
+            coarse = np.zeros((capacity, self._coarse.shape[1]), dtype=np.float32)
+            coarse[: self._size] = self._coarse[: self._size]
+            self._coarse = coarse
+
+    async def upsert(self, documents: list[Document]) -> list[str]:
+        """Insert or overwrite documents.
+
+        Generates embeddings for documents without pre-computed vectors and
+        assigns content-derived IDs to documents without one.
+
+        Args:
+            documents: Documents to upsert.
+
+        Returns:
+            List of document IDs that were upserted.
+
+        Raises:
+            VectorStoreError: If a vector does not match the configured dimensions.
+        """
+        if not documents:
+            return []
+
+        for doc in documents:
+            if doc.id is None:
+                doc.id = content_id(doc)
+
+        docs_to_embed = [doc for doc in documents if doc.vector is None]
+        if docs_to_embed:
+            embeddings = await self._embedding_provider.embed([doc.text for doc in docs_to_embed])
+            for doc, embedding in zip(docs_to_embed, embeddings, strict=True):
+                doc.vector = embedding
+
+        matrix = normalize([doc.vector for doc in documents if doc.vector is not None])
+        if matrix.ndim != 2 or matrix.shape[1] != self._dimensions:
+            raise VectorStoreError(
+                f"Upsert failed: expected {self._dimensions}-dimensional vectors, "
+                f"got shape {matrix.shape}"
+            )
+
+        async with self._lock:
+            new_ids = {doc.id for doc in documents if doc.id not in self._rows}
+            self._ensure_capacity(self._size + len(new_ids))
+            rows = np.empty(len(documents), dtype=np.intp)
+            for position, (doc, vector) in enumerate(zip(documents, matrix, strict=True)):
+                doc_id: str = doc.id  # type: ignore[assignment]
+                row = self._rows.get(doc_id)
+                if row is None:
+                    row = self._size
+                    self._rows[doc_id] = row
+                    self._ids.append(doc_id)
+                    self._texts.append(doc.text)
+                    self._metadata.append(dict(doc.metadata))
+                    self._size += 1
+                else:
+                    self._texts[row] = doc.text
+                    self._metadata[row] = dict(doc.metadata)
+                self._metadata_index.set(row, doc.metadata)
+                if self._sparse_index is not None:
+                    self._sparse_index.set(row, doc.text)
+                self._vectors[row] = vector
+                rows[position] = row
+            if self._coarse is not None:
+                self._coarse[rows] = normalize(matrix[:, : self._coarse.shape[1]])
+
+        logger.info("memory_store_upserted", count=len(documents), size=self._size)
+        return [doc.id for doc in documents]  # type: ignore[misc]
+
+    async def query(
+        self,
+        text: str,
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[QueryResult]:
+        """Return the documents most similar to ``text`` by cosine similarity.
+
+        With ``hybrid_search`` enabled, cosine similarity is fused with the
+        BM25 score of ``text`` and results carry the fused score.
+
+        Args:
+            text: Query text (will be embedded automatically).
+            top_k: Number of results to return.
+            filters: Optional Pinecone-style metadata filters.
+
+        Returns:
+            Ranked list of query results.
+        """
+        embeddings = await self._embedding_provider.embed([text])
+        return self._search(normalize(embeddings), top_k, filters, [text])[0]
+
+    async def query_many(
+        self,
+        texts: list[str],
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[list[QueryResult]]:
+        """Search for several texts with one embedding batch and one matrix product.
+
+        Args:
+            texts: Query texts.
+            top_k: Number of results per query.
+            filters: Optional Pinecone-style metadata filters applied to every query.
+
+        Returns:
+            One ranked result list per input text, in input order.
+        """
+        if not texts:
+            return []
+        embeddings = await self._embedding_provider.embed(texts)
+        return self._search(normalize(embeddings), top_k, filters, texts)
+
+    async def query_by_vector(
+        self,
+        vector: npt.ArrayLike,
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[QueryResult]:
+        """Return the documents most similar to a pre-computed embedding.
+
+        Args:
+            vector: Query embedding.
+            top_k: Number of results to return.
+            filters: Optional Pinecone-style metadata filters.
+
+        Returns:
+            Ranked list of query results.
+        """
+        return self._search(normalize(np.atleast_2d(vector)), top_k, filters)[0]
+
+    def _search(
+        self,
+        queries: npt.NDArray[np.float32],
+        top_k: int,
+        filters: dict[str, Any] | None,
+        texts: list[str] | None = None,
+    ) -> list[list[QueryResult]]:
+        """Rank stored rows for each row of a normalized ``(q, d)`` query matrix.
+
+        ``texts`` are the query texts, used for hybrid scoring when enabled.
+        """
+        vectors = self._vectors[: self._size]
+        if filters:
+            candidates = self._metadata_index.select(filters)
+            if candidates is None:
+                candidates = np.fromiter(
+                    (i for i in range(self._size) if matches_filter(self._metadata[i], filters)),
+                    dtype=np.intp,
+                )
+        else:
+            candidates = np.arange(self._size)
+
+        if self._coarse is not None:
+            coarse_queries = normalize(queries[:, : self._coarse.shape[1]])
+            prefixes = self._coarse[candidates] if filters else self._coarse[: self._size]
+            scores = two_stage_scores(
+                prefixes @ coarse_queries.T,
+                lambda positions, j: vectors[candidates[positions]] @ queries[j],
+                max(self._config.coarse_candidates, top_k),
+                # Hybrid fusion still ranks candidates outside the shortlist
+                keep_coarse=texts is not None and self._sparse_index is not None,
+            )
+        elif filters:
+            scores = vectors[candidates] @ queries.T
+        else:
+            scores = vectors @ queries.T
+
+        batches = []
+        for i, column in enumerate(scores.T):
+            if texts is not None and self._sparse_index is not None:
+                sparse = self._sparse_index.score(texts[i])[candidates]
+                column = fuse_scores(
+                    column,
+                    sparse,
+                    top_k,
+                    method=self._config.hybrid_fusion,
+                    alpha=self._config.hybrid_alpha,
+                )
+            best = select_top_k(column, top_k)
+            batches.append(
+                [
+                    QueryResult.model_construct(
+                        id=self._ids[row],
+                        score=float(score),
+                        text=self._texts[row],
+                        metadata=dict(self._metadata[row]),
+                    )
+                    for row, score in zip(
+                        candidates[best].tolist(), column[best].tolist(), strict=True
+                    )
+                ]
+            )
+        logger.info("memory_store_queried", queries=len(batches), top_k=top_k)
+        return batches
+
+    async def delete(self, ids: list[str]) -> None:
+        """Delete documents by ID; unknown IDs are ignored.
+
+        Args:
+            ids: Document IDs to delete.
+        """
+        if not ids:
+            return
+
+        async with self._lock:
+            for doc_id in ids:
+                row = self._rows.pop(doc_id, None)
+                if row is None:
+                    continue
+                last = self._size - 1
+                if row != last:
+                    # Move the last row into the hole to keep the matrix dense
+                    moved_id = self._ids[last]
+                    self._vectors[row] = self._vectors[last]
+                    if self._coarse is not None:
+                        self._coarse[row] = self._coarse[last]
+                    self._ids[row] = moved_id
+                    self._texts[row] = self._texts[last]
+                    self._metadata[row] = self._metadata[last]
+                    self._rows[moved_id] = row
+                    self._metadata_index.move(last, row)
+                    if self._sparse_index is not None:
+                        self._sparse_index.move(last, row)
+                else:
+                    self._metadata_index.remove(row)
+                    if self._sparse_index is not None:
+                        self._sparse_index.remove(row)
+                self._ids.pop()
+                self._texts.pop()
+                self._metadata.pop()
+                self._size = last
+
+        logger.info("memory_store_deleted", count=len(ids), size=self._size)
@@ -0,0 +1,408 @@
+"""Inverted metadata index for local vector stores.
+
+Evaluating a filter with ``matches_filter`` costs one Python call per stored
+row. ``MetadataIndex`` keeps every metadata field as columns instead: string
+values are dictionary-encoded with a posting list (sorted row array) per
+distinct value, and numbers are kept in a value-sorted array. Each filter
+leaf resolves to either a short sorted row array (selective conditions, via
+postings or ``searchsorted``) or a boolean bitmap over all rows (broad
+conditions, via one vectorized column comparison). Intersections start from
+the shortest row array, so a selective ``ticker`` filter restricts the
+candidate set in time proportional to that ticker's rows, before any vector
+is scored. ISO-8601 dates stored as strings range-filter through the sorted
+distinct values.
+
+Results are identical to ``matches_filter``. Fields holding values the
+index cannot represent exactly (lists, ``None``, nested objects, integers
+beyond float64 precision) make ``select`` return ``None`` and the caller
+falls back to the row-by-row scan.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from py_retrieval.exceptions import VectorStoreError
+
+_INITIAL_CAPACITY = 1024
+
+# Integers beyond this lose precision as float64 and are not indexed
+_MAX_EXACT_INT = 2**53
+
+# Sentinel codes in the categorical column
+_NOT_STRING = -1
+_OPAQUE = -2
+
+# A leaf matching more than 1/_DENSE_RATIO of the rows becomes a bitmap
+_DENSE_RATIO = 16
+
+_EMPTY: npt.NDArray[np.intp] = np.empty(0, dtype=np.intp)
+_EMPTY.setflags(write=False)
+
+_COMPARE: dict[str, Any] = {
+    "$gt": np.greater,
+    "$gte": np.greater_equal,
+    "$lt": np.less,
+    "$lte": np.less_equal,
+}
+
+# Sorted row array (intp) or bitmap over the index extent (bool)
+Selection = npt.NDArray[Any]
+
+
+class _Unsupported(Exception):
+    """Raised when a filter cannot be answered exactly from the index."""
+
+
+def _as_number(value: Any) -> float | None:
+    """Float form of an indexable number (bools included), else ``None``."""
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, int):
+        return float(value) if abs(value) <= _MAX_EXACT_INT else None
+    if isinstance(value, float) and not math.isnan(value):
+        return value
+    return None
+
+
+def _is_bitmap(selection: Selection) -> bool:
+    return bool(selection.dtype == np.bool_)
+
+
+def _to_bitmap(selection: Selection, extent: int) -> npt.NDArray[np.bool_]:
+    if _is_bitmap(selection):
+        return selection
+    bitmap = np.zeros(extent, dtype=np.bool_)
+    bitmap[selection] = True
+    return bitmap
+
+
+def _intersect(parts: list[Selection], universe: Selection) -> Selection:
+    """AND of selections: filter the shortest row array through the rest."""
+    if not parts:
+        return universe
+    row_parts = sorted((p for p in parts if not _is_bitmap(p)), key=len)
+    bitmaps = [p for p in parts if _is_bitmap(p)]
+    if not row_parts:
+        bitmap: npt.NDArray[np.bool_] = np.logical_and.reduce(bitmaps)
+        return bitmap
+    rows = row_parts[0]
+    for other in row_parts[1:]:
+        rows = np.intersect1d(rows, other, assume_unique=True)
+    for bitmap in bitmaps:
+        rows = rows[bitmap[rows]]
+    return rows
+
+
+def _union(parts: list[Selection], extent: int) -> Selection:
+    """OR of selections; stays a row array only if every part is one."""
+    if len(parts) <= 1:
+        return parts[0] if parts else _EMPTY
+    if any(_is_bitmap(p) for p in parts) or sum(map(len, parts)) * _DENSE_RATIO > extent:
+        bitmaps = [_to_bitmap(p, extent) for p in parts]
+        bitmap: npt.NDArray[np.bool_] = np.logical_or.reduce(bitmaps)
+        return bitmap
+    return np.unique(np.concatenate(parts))
+
+
+def _complement(selection: Selection, live: npt.NDArray[np.bool_]) -> npt.NDArray[np.bool_]:
+    """Live rows outside ``selection``."""
+    if _is_bitmap(selection):
+        return live & ~selection
+    bitmap = live.copy()
+    bitmap[selection] = False
+    return bitmap
+
+
+def _bounds(ordered: Any, operator: str, operand: Any) -> tuple[int, int]:
+    """``[start, stop)`` of the sorted positions satisfying a range operator."""
+    if isinstance(ordered, list):
+        left, right = bisect.bisect_left(ordered, operand), bisect.bisect_right(ordered, operand)
+    else:
+        left = int(np.searchsorted(ordered, operand, side="left"))
+        right = int(np.searchsorted(ordered, operand, side="right"))
+    if operator == "$gt":
+        return right, len(ordered)
+    if operator == "$gte":
+        return left, len(ordered)
+    if operator == "$lt":
+        return 0, left
+    return 0, right
+
+
+class _FieldIndex:
+    """Columns and lazily sorted lookups for one metadata field."""
+
+    def __init__(self, capacity: int) -> None:
+        self.numbers = np.full(capacity, np.nan, dtype=np.float64)
+        self.codes = np.full(capacity, _NOT_STRING, dtype=np.int32)
+        self.categories: dict[str, int] = {}
+        self.opaque = 0
+        self._dirty = True
+        self._sorted_values: npt.NDArray[np.float64] = np.empty(0)
+        self._sorted_rows: npt.NDArray[np.intp] = _EMPTY
+        self._postings_rows: npt.NDArray[np.intp] = _EMPTY
+        self._postings_offsets: npt.NDArray[np.intp] = _EMPTY
+        self._sorted_names: list[str] = []
+        self._sorted_codes: npt.NDArray[np.intp] = _EMPTY
+
+    def grow(self, capacity: int) -> None:
+        numbers = np.full(capacity, np.nan, dtype=np.float64)
+        numbers[: len(self.numbers)] = self.numbers
+        codes = np.full(capacity, _NOT_STRING, dtype=np.int32)
+        codes[: len(self.codes)] = self.codes
+        self.numbers, self.codes = numbers, codes
+
+    def set(self, row: int, value: Any) -> None:
+        self.clear(row)
+        number = _as_number(value)
+        if number is not None:
+            self.numbers[row] = number
+        elif isinstance(value, str):
+            self.codes[row] = self.categories.setdefault(value, len(self.categories))
+        else:
+            self.codes[row] = _OPAQUE
+            self.opaque += 1
+        self._dirty = True
+
+    def clear(self, row: int) -> None:
+        if self.codes[row] == _OPAQUE:
+            self.opaque -= 1
+        self.numbers[row] = np.nan
+        self.codes[row] = _NOT_STRING
+        self._dirty = True
+
+    def copy_row(self, source: int, target: int) -> None:
+        self.clear(target)
+        self.numbers[target] = self.numbers[source]
+        self.codes[target] = self.codes[source]
+        if self.codes[source] == _OPAQUE:
+            self.opaque += 1
+        self._dirty = True
+
+    def _build(self, extent: int) -> None:
+        """Sort the numeric column and group string rows into per-value postings."""
+        numbers = self.numbers[:extent]
+        rows = np.flatnonzero(~np.isnan(numbers))
+        self._sorted_rows = rows[np.argsort(numbers[rows], kind="stable")]
+        self._sorted_values = numbers[self._sorted_rows]
+
+        codes = self.codes[:extent]
+        rows = np.flatnonzero(codes >= 0)
+        self._postings_rows = rows[np.argsort(codes[rows], kind="stable")]
+        self._postings_offsets = np.searchsorted(
+            codes[self._postings_rows], np.arange(len(self.categories) + 1)
+        )
+        self._sorted_names = sorted(self.categories)
+        self._sorted_codes = np.array(
+            [self.categories[name] for name in self._sorted_names], dtype=np.intp
+        )
+        self._dirty = False
+
+    def _ensure_built(self, extent: int) -> None:
+        if self.opaque:
+            raise _Unsupported
+        if self._dirty:
+            self._build(extent)
+
+    def _posting(self, code: int) -> npt.NDArray[np.intp]:
+        return self._postings_rows[self._postings_offsets[code] : self._postings_offsets[code + 1]]
+
+    def present(self, extent: int) -> Selection:
+        if self.opaque:
+            raise _Unsupported
+        return ~np.isnan(self.numbers[:extent]) | (self.codes[:extent] >= 0)
+
+    def equal(self, operand: Any, extent: int) -> Selection:
+        self._ensure_built(extent)
+        number = _as_number(operand)
+        if number is not None:
+            start = int(np.searchsorted(self._sorted_values, number, side="left"))
+            stop = int(np.searchsorted(self._sorted_values, number, side="right"))
+            if (stop - start) * _DENSE_RATIO > extent:
+                equal: npt.NDArray[np.bool_] = self.numbers[:extent] == number
+                return equal
+            return np.sort(self._sorted_rows[start:stop])
+        if isinstance(operand, str):
+            code = self.categories.get(operand)
+            return _EMPTY if code is None else self._posting(code)
+        raise _Unsupported
+
+    def range(self, operator: str, operand: Any, extent: int) -> Selection:
+        self._ensure_built(extent)
+        number = _as_number(operand)
+        if number is not None:
+            start, stop = _bounds(self._sorted_values, operator, number)
+            if (stop - start) * _DENSE_RATIO > extent:
+                compared: npt.NDArray[np.bool_] = _COMPARE[operator](self.numbers[:extent], number)
+                return compared
+            return np.sort(self._sorted_rows[start:stop])
+        if isinstance(operand, str):
+            start, stop = _bounds(self._sorted_names, operator, operand)
+            codes = self._sorted_codes[start:stop]
+            offsets = self._postings_offsets
+            matched = int((offsets[codes + 1] - offsets[codes]).sum())
+            if matched * _DENSE_RATIO > extent:
+                # Lookup table by code; code -1 (not a string) reads the last, unset slot
+                table = np.zeros(len(self.categories) + 1, dtype=np.bool_)
+                table[codes] = True
+                return table[self.codes[:extent]]
+            if not matched:
+                return _EMPTY
+            # Each row holds one value, so the postings are disjoint
+            return np.sort(np.concatenate([self._posting(code) for code in codes.tolist()]))
+        raise _Unsupported
+
+
+class MetadataIndex:
+    """Column-oriented inverted index over the metadata of integer rows.
+
+    Stores call ``set`` when a row is written, ``remove`` when it is deleted
+    and ``move`` when a row is relocated (e.g. swap-remove compaction). Sorted
+    lookups are rebuilt lazily, per field, on the first filtered query after
+    a write, so bulk upserts pay for one sort rather than one per document.
+    """
+
+    def __init__(self) -> None:
+        self._capacity = _INITIAL_CAPACITY
+        self._extent = 0
+        self._live = np.zeros(self._capacity, dtype=np.bool_)
+        self._live_rows: npt.NDArray[np.intp] | None = None
+        self._fields: dict[str, _FieldIndex] = {}
+        # Fields each row has a value for, so removal only touches those
+        self._row_fields: dict[int, tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._row_fields)
+
+    def _ensure_capacity(self, row: int) -> None:
+        if row < self._capacity:
+            return
+        capacity = self._capacity
+        while capacity <= row:
+            capacity *= 2
+        live = np.zeros(capacity, dtype=np.bool_)
+        live[: self._capacity] = self._live
+        self._live = live
+        for field in self._fields.values():
+            field.grow(capacity)
+        self._capacity = capacity
+
+    def set(self, row: int, metadata: dict[str, Any]) -> None:
+        """Index ``metadata`` for ``row``, replacing whatever it held before."""
+        self._ensure_capacity(row)
+        self.remove(row)
+        for key, value in metadata.items():
+            field = self._fields.get(key)
+            if field is None:
+                field = self._fields[key] = _FieldIndex(self._capacity)
+            field.set(row, value)
+        self._row_fields[row] = tuple(metadata)
+        self._live[row] = True
+        self._extent = max(self._extent, row + 1)
+        self._live_rows = None
+
+    def remove(self, row: int) -> None:
+        """Drop ``row`` from the index; unknown rows are ignored."""
+        keys = self._row_fields.pop(row, None)
+        if keys is None:
+            return
+        for key in keys:
+            self._fields[key].clear(row)
+        self._live[row] = False
+        self._live_rows = None
+
+    def move(self, source: int, target: int) -> None:
+        """Relocate ``source``'s entry to ``target``, replacing what ``target`` held."""
+        if source == target:
+            return
+        self.remove(target)
+        keys = self._row_fields.pop(source, None)
+        if keys is None:
+            return
+        for key in keys:
+            field = self._fields[key]
+            field.copy_row(source, target)
+            field.clear(source)
+        self._row_fields[target] = keys
+        self._live[source] = False
+        self._live[target] = True
+        self._live_rows = None
+
+    def rows(self) -> npt.NDArray[np.intp]:
+        """Sorted array of indexed rows."""
+        if self._live_rows is None:
+            self._live_rows = np.flatnonzero(self._live[: self._extent])
+        return self._live_rows
+
+    def select(self, filters: dict[str, Any]) -> npt.NDArray[np.intp] | None:
+        """Rows matching a Pinecone-style filter, in ascending order.
+
+        Args:
+            filters: Filter expression as accepted by ``matches_filter``.
+
+        Returns:
+            Matching rows, or ``None`` if the filter touches values the index
+            cannot evaluate exactly and the caller must scan instead.
+
+        Raises:
+            VectorStoreError: If the filter uses an unsupported operator.
+        """
+        try:
+            selection = self._evaluate(filters)
+        except _Unsupported:
+            return None
+        return np.flatnonzero(selection) if _is_bitmap(selection) else selection
+
+    def _evaluate(self, filters: dict[str, Any]) -> Selection:
+        parts: list[Selection] = []
+        for key, condition in filters.items():
+            if key == "$and":
+                parts.extend(self._evaluate(clause) for clause in condition)
+            elif key == "$or":
+                clauses = [self._evaluate(clause) for clause in condition]
+                parts.append(_union(clauses, self._extent))
+            elif key.startswith("$"):
+                raise VectorStoreError(f"Unsupported filter operator: '{key}'")
+            else:
+                parts.append(self._evaluate_field(key, condition))
+        return _intersect(parts, self.rows())
+
+    def _evaluate_field(self, key: str, condition: Any) -> Selection:
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        field = self._fields.get(key)
+        extent = self._extent
+        live = self._live[:extent]
+        parts: list[Selection] = []
+        for operator, operand in condition.items():
+            if operator == "$exists":
+                present = _EMPTY if field is None else field.present(extent)
+                parts.append(present if operand else _complement(present, live))
+            elif operator in ("$eq", "$in"):
+                parts.append(self._equal_any(field, operator, operand))
+            elif operator in ("$ne", "$nin"):
+                positive = "$eq" if operator == "$ne" else "$in"
+                # Missing fields satisfy negations, so complement against every row
+                parts.append(_complement(self._equal_any(field, positive, operand), live))
+            elif operator in _COMPARE:
+                parts.append(_EMPTY if field is None else field.range(operator, operand, extent))
+            else:
+                raise VectorStoreError(f"Unsupported filter operator: '{operator}'")
+        return _intersect(parts, self.rows())
+
+    def _equal_any(self, field: _FieldIndex | None, operator: str, operand: Any) -> Selection:
+        if operator == "$eq":
+            operands = [operand]
+        elif isinstance(operand, (list, tuple, set, frozenset)):
+            operands = list(operand)
+        else:
+            raise _Unsupported
+        if field is None:
+            return _EMPTY  # a missing field never equals anything
+        return _union([field.equal(o, self._extent) for o in operands], self._extent)
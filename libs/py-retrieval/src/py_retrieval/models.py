@@ -2,9 +2,36 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel, Field, SecretStr
+import numpy as np
+import numpy.typing as npt
+from pydantic import (
+    BaseModel,
+    Field,
+    PlainSerializer,
+    PlainValidator,
+    SecretStr,
+    model_validator,
+)
+
+
+def _as_vector(value: Any) -> npt.NDArray[np.float32]:
+    """Coerce to a 1-D float32 array without copying float32 input."""
+    vector = np.asarray(value, dtype=np.float32)
+    if vector.ndim != 1:
+        raise ValueError(f"vector must be one-dimensional, got shape {vector.shape}")
+    return vector
+
+
+# Embeddings are carried as contiguous float32 arrays. The plain validator
+# replaces pydantic's per-element float checks with one ``np.asarray`` call;
+# lists are produced only when a model is serialized.
+Vector = Annotated[
+    npt.NDArray[np.float32],
+    PlainValidator(_as_vector),
+    PlainSerializer(lambda vector: vector.tolist(), return_type=list[float]),
+]
 
 
 class Document(BaseModel):
@@ -12,7 +39,7 @@ class Document(BaseModel):
 
     id: str | None = None
     text: str
-    vector: list[float] | None = None
+    vector: Vector | None = None
     metadata: dict[str, Any] = Field(default_factory=dict)
 
 
@@ -34,4 +61,39 @@ class VectorStoreConfig(BaseModel):
     namespace: str = ""
     embedding_model: str = "text-embedding-3-small"
     embedding_dimensions: int = 1536
+    # "hashing" selects the deterministic offline HashingEmbeddingProvider
+    embedding_provider: Literal["openai", "hashing"] = "openai"
     host: str | None = None
+    upsert_concurrency: int = Field(default=4, ge=1)
+    # Local file-backed stores
+    storage_path: str | None = None
+    vector_dtype: Literal["float32", "float16"] = "float32"
+    read_only: bool = False
+    # HNSW graph parameters
+    hnsw_m: int = Field(default=16, ge=2)
+    hnsw_ef_construction: int = Field(default=200, ge=1)
+    hnsw_ef_search: int = Field(default=50, ge=1)
+    # Quantized store
+    quantization: Literal["int8", "pq"] = "int8"
+    pq_subvectors: int | None = Field(default=None, ge=1)
+    quantization_train_size: int = Field(default=10_000, ge=1)
+    rescore_factor: int = Field(default=0, ge=0)
+    # Hybrid dense + BM25 search (memory and file stores)
+    hybrid_search: bool = False
+    hybrid_fusion: Literal["rrf", "weighted"] = "rrf"
+    hybrid_alpha: float = Field(default=0.5, ge=0.0, le=1.0)
+    # Matryoshka two-stage search (memory and file stores): scan a renormalized
+    # prefix of each vector, then re-rank the best candidates at full width
+    coarse_dimensions: int | None = Field(default=None, ge=1)
+    coarse_candidates: int = Field(default=100, ge=1)
+
+    @model_validator(mode="after")
+    def _check_coarse_dimensions(self) -> VectorStoreConfig:
+        if self.coarse_dimensions is not None and (
+            self.coarse_dimensions >= self.embedding_dimensions
+        ):
+            raise ValueError(
+                f"coarse_dimensions ({self.coarse_dimensions}) must be smaller than "
+                f"embedding_dimensions ({self.embedding_dimensions})"
+            )
+        return self
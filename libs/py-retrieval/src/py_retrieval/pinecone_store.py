@@ -3,26 +3,126 @@
 from __future__ import annotations
 
 import asyncio
-import uuid
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Self
 
+import numpy as np
+import numpy.typing as npt
+import tenacity
+import urllib3.exceptions
 from pinecone import Pinecone
+from pinecone.exceptions import PineconeApiException
+from tenacity import retry_if_exception, stop_after_attempt, wait_exponential_jitter
 
-from py_core import get_logger
+from py_core import gather_with_concurrency, get_logger
+from py_core.async_utils import RETRYABLE_STATUS_CODES
 from py_retrieval.exceptions import VectorStoreConnectionError, VectorStoreError
+from py_retrieval.manifest import content_id
 from py_retrieval.models import Document, QueryResult, VectorStoreConfig
 from py_retrieval.protocols import EmbeddingProvider
 
 logger = get_logger("pinecone_store")
 
-_UPSERT_BATCH_SIZE = 100
+_MAX_CONCURRENT_QUERIES = 8
+
+# Pinecone request limits: 2 MB per upsert request, 1000 vectors per
+# request and 40 KB of metadata per vector.
+_MAX_REQUEST_BYTES = 2 * 1024 * 1024
+_MAX_BATCH_SIZE = 1000
+_MAX_METADATA_BYTES = 40 * 1024
+# Upper bound for one float in the JSON request body (e.g. "-0.012345678901234567,")
+_BYTES_PER_FLOAT = 24
+_RECORD_OVERHEAD_BYTES = 64
+# Documents embedded per pipeline stage
+_EMBED_CHUNK_SIZE = 1000
+
+# (id, vector, metadata) as accepted by ``Index.upsert``
+_Record = tuple[str, list[float], dict[str, Any]]
+
+# Network failures below the Pinecone client that a later attempt can survive
+_TRANSIENT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    urllib3.exceptions.TimeoutError,
+    urllib3.exceptions.ProtocolError,
+    urllib3.exceptions.MaxRetryError,
+)
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Check if an upsert failure is worth retrying (network, 429 or 5xx).
+
+    Client errors such as bad credentials, a dimension mismatch or an
+    oversized request fail the same way on every attempt.
+    """
+    if isinstance(exc, _TRANSIENT_ERRORS):
+        return True
+    if isinstance(exc, PineconeApiException):
+        # The generated client names it ``status``; newer SDKs ``status_code``
+        status = getattr(exc, "status", None) or getattr(exc, "status_code", None)
+        return status in RETRYABLE_STATUS_CODES
+    return False
+
+
+def _to_records(documents: list[Document]) -> tuple[list[tuple[_Record, int]], list[str]]:
+    """Convert documents to upsert records with their estimated payload size.
+
+    Returns:
+        ``(record, size_in_bytes)`` pairs, and the IDs of documents whose
+        metadata exceeds Pinecone's per-vector limit (these are not sent).
+    """
+    records: list[tuple[_Record, int]] = []
+    oversized: list[str] = []
+    for doc in documents:
+        doc_id: str = doc.id  # type: ignore[assignment]
+        # Merge text into metadata for persistence (Pinecone stores metadata, not raw text)
+        metadata = dict(doc.metadata or {})
+        if doc.text is not None:
+            metadata.setdefault("text", doc.text)
+        metadata_bytes = len(json.dumps(metadata, default=str).encode("utf-8"))
+        if metadata_bytes > _MAX_METADATA_BYTES:
+            oversized.append(doc_id)
+            continue
+        # Arrays become lists only here, at the SDK boundary
+        vector: list[float] = doc.vector.tolist()  # type: ignore[union-attr]
+        size = (
+            len(doc_id.encode("utf-8"))
+            + len(vector) * _BYTES_PER_FLOAT
+            + metadata_bytes
+            + _RECORD_OVERHEAD_BYTES
+        )
+        records.append(((doc_id, vector, metadata), size))
+    return records, oversized
+
+
+def _pack_batches(
+    records: list[tuple[_Record, int]],
+    max_bytes: int,
+    max_items: int,
+) -> list[list[tuple[_Record, int]]]:
+    """Greedily pack records into requests bounded by payload bytes and count."""
+    batches: list[list[tuple[_Record, int]]] = []
+    current: list[tuple[_Record, int]] = []
+    current_bytes = 0
+    for record, size in records:
+        if current and (len(current) >= max_items or current_bytes + size > max_bytes):
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append((record, size))
+        current_bytes += size
+    if current:
+        batches.append(current)
+    return batches
 
 
 class PineconeVectorStore:
     """Pinecone implementation of the VectorStore protocol.
 
     Uses ``asyncio.to_thread`` to wrap the synchronous Pinecone SDK,
-    keeping the async interface non-blocking.
+    keeping the async interface non-blocking. Upserts run on a dedicated
+    thread pool so bulk writes cannot starve the default executor.
     """
 
     def __init__(
@@ -34,6 +134,8 @@ class PineconeVectorStore:
         self._embedding_provider = embedding_provider
         self._client: Pinecone | None = None
         self._index: Any = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._retry_wait: tenacity.wait.wait_base = wait_exponential_jitter(initial=0.5, max=5.0)
 
     async def __aenter__(self) -> Self:
         try:
@@ -59,63 +161,131 @@ class PineconeVectorStore:
         exc_val: BaseException | None,
         exc_tb: Any,
     ) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
         self._index = None
         self._client = None
         logger.info("pinecone_disconnected", index=self._config.index_name)
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the upsert thread pool, creating it on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._config.upsert_concurrency,
+                thread_name_prefix="pinecone-upsert",
+            )
+        return self._executor
+
+    def _retry(self) -> tenacity.AsyncRetrying:
+        """Create the per-batch upsert retry policy (transient errors only)."""
+        return tenacity.AsyncRetrying(
+            stop=stop_after_attempt(3),
+            wait=self._retry_wait,
+            retry=retry_if_exception(_is_transient),
+            reraise=True,
+        )
+
+    async def _send_batch(self, batch: list[_Record]) -> None:
+        """Upsert one request-sized batch on the dedicated executor, with retry."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(
+            self._index.upsert, vectors=batch, namespace=self._config.namespace
+        )
+        async for attempt in self._retry():
+            with attempt:
+                await loop.run_in_executor(self._get_executor(), call)
+
     async def upsert(self, documents: list[Document]) -> list[str]:
-        """Upsert documents into Pinecone.
+        """Upsert documents into Pinecone as an embed-then-write pipeline.
 
-        Generates embeddings for documents without pre-computed vectors,
-        assigns UUIDs to documents without IDs, and batches upserts.
+        Documents are embedded in chunks; as soon as a chunk is embedded it is
+        packed into requests bounded by payload bytes and dispatched to a
+        dedicated thread pool, so network writes overlap with embedding the
+        next chunk. At most ``upsert_concurrency`` requests are in flight, and
+        each request is retried independently on network errors, 429 and 5xx;
+        any other failure is reported on its first attempt.
 
         Args:
             documents: Documents to upsert.
 
         Returns:
             List of document IDs that were upserted.
+
+        Raises:
+            VectorStoreError: If any batch still fails after retries, or a
+                document's metadata exceeds Pinecone's per-vector limit. The
+                error's ``details`` carry ``succeeded_ids`` and ``failed_ids``.
         """
         if not documents:
             return []
 
-        # Assign IDs to documents that don't have one
+        # Content-derived IDs make re-upserting identical documents idempotent
         for doc in documents:
             if doc.id is None:
-                doc.id = str(uuid.uuid4())
+                doc.id = content_id(doc)
 
-        # Generate embeddings for documents without pre-computed vectors
-        docs_to_embed = [doc for doc in documents if doc.vector is None]
-        if docs_to_embed:
-            embeddings = await self._embedding_provider.embed([doc.text for doc in docs_to_embed])
-            for doc, embedding in zip(docs_to_embed, embeddings, strict=True):
-                doc.vector = embedding
+        slots = asyncio.Semaphore(self._config.upsert_concurrency)
+        tasks: list[tuple[list[str], asyncio.Task[None]]] = []
+        rejected: list[str] = []
 
-        # Merge text into metadata for persistence (Pinecone stores metadata, not raw text)
-        vectors = []
-        for doc in documents:
-            metadata = dict(doc.metadata or {})
-            if doc.text is not None:
-                metadata.setdefault("text", doc.text)
-            vectors.append((doc.id, doc.vector, metadata))
+        async def _dispatch(batch: list[_Record]) -> None:
+            try:
+                await self._send_batch(batch)
+            finally:
+                slots.release()
 
         try:
-            for i in range(0, len(vectors), _UPSERT_BATCH_SIZE):
-                batch = vectors[i : i + _UPSERT_BATCH_SIZE]
-                await asyncio.to_thread(
-                    self._index.upsert,
-                    vectors=batch,
-                    namespace=self._config.namespace,
-                )
-
-            ids = [doc.id for doc in documents]
-            logger.info(
-                "pinecone_upserted",
-                count=len(documents),
+            for start in range(0, len(documents), _EMBED_CHUNK_SIZE):
+                chunk = documents[start : start + _EMBED_CHUNK_SIZE]
+
+                # Generate embeddings for documents without pre-computed vectors
+                docs_to_embed = [doc for doc in chunk if doc.vector is None]
+                if docs_to_embed:
+                    embeddings = await self._embedding_provider.embed(
+                        [doc.text for doc in docs_to_embed]
+                    )
+                    for doc, embedding in zip(docs_to_embed, embeddings, strict=True):
+                        doc.vector = embedding
+
+                records, oversized = _to_records(chunk)
+                rejected.extend(oversized)
+                for batch in _pack_batches(records, _MAX_REQUEST_BYTES, _MAX_BATCH_SIZE):
+                    # Backpressure: wait for a free slot before queueing more payload
+                    await slots.acquire()
+                    task = asyncio.create_task(_dispatch([r for r, _ in batch]))
+                    tasks.append(([r[0] for r, _ in batch], task))
+        finally:
+            # Let batches that were already dispatched finish before returning
+            await asyncio.gather(*(task for _, task in tasks), return_exceptions=True)
+
+        failures = [(ids, task.exception()) for ids, task in tasks if task.exception()]
+        ids = [doc.id for doc in documents]
+        if failures or rejected:
+            failed_ids = set(rejected).union(*(set(batch_ids) for batch_ids, _ in failures))
+            succeeded_ids = [doc_id for doc_id in ids if doc_id not in failed_ids]
+            cause = failures[0][1] if failures else None
+            logger.error(
+                "pinecone_upsert_failed",
+                failed=len(failed_ids),
+                succeeded=len(succeeded_ids),
+                failed_batches=len(failures),
+                oversized=len(rejected),
                 namespace=self._config.namespace,
             )
-            return ids  # type: ignore[return-value]
-        except Exception as exc:
-            raise VectorStoreError(f"Upsert failed: {exc}") from exc
+            reason = f": {cause}" if cause else ": metadata exceeds the per-vector limit"
+            raise VectorStoreError(
+                f"Upsert failed for {len(failed_ids)} of {len(ids)} documents{reason}",
+                details={"succeeded_ids": succeeded_ids, "failed_ids": sorted(failed_ids)},
+            ) from cause
+
+        logger.info(
+            "pinecone_upserted",
+            count=len(documents),
+            batches=len(tasks),
+            namespace=self._config.namespace,
+        )
+        return ids  # type: ignore[return-value]
 
     async def query(
         self,
@@ -134,12 +304,55 @@ class PineconeVectorStore:
             Ranked list of query results.
         """
         embeddings = await self._embedding_provider.embed([text])
-        query_vector = embeddings[0]
+        return await self.query_by_vector(embeddings[0], top_k=top_k, filters=filters)
+
+    async def query_many(
+        self,
+        texts: list[str],
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[list[QueryResult]]:
+        """Query Pinecone for several texts at once.
 
+        All texts are embedded in a single batch, then the searches run
+        concurrently (at most ``_MAX_CONCURRENT_QUERIES`` in flight).
+
+        Args:
+            texts: Query texts.
+            top_k: Number of results per query.
+            filters: Optional metadata filters applied to every query.
+
+        Returns:
+            One ranked result list per input text, in input order.
+        """
+        if not texts:
+            return []
+        embeddings = await self._embedding_provider.embed(texts)
+        return await gather_with_concurrency(
+            _MAX_CONCURRENT_QUERIES,
+            *(self.query_by_vector(vector, top_k=top_k, filters=filters) for vector in embeddings),
+        )
+
+    async def query_by_vector(
+        self,
+        vector: npt.ArrayLike,
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[QueryResult]:
+        """Query Pinecone with a pre-computed embedding.
+
+        Args:
+            vector: Query embedding.
+            top_k: Number of results to return.
+            filters: Optional metadata filters.
+
+        Returns:
+            Ranked list of query results.
+        """
         try:
             response = await asyncio.to_thread(
                 self._index.query,
-                vector=query_vector,
+                vector=np.asarray(vector, dtype=np.float32).tolist(),
                 top_k=top_k,
                 include_metadata=True,
                 filter=filters,
@@ -4,6 +4,9 @@ from __future__ import annotations
 
 from typing import Any, Protocol, runtime_checkable
 
+import numpy as np
+import numpy.typing as npt
+
 from py_retrieval.models import Document, QueryResult
 
 
@@ -12,10 +15,24 @@ class EmbeddingProvider(Protocol):
     """Contract for embedding generation providers.
 
     Any class with a matching ``embed`` method satisfies this protocol
-    without explicit inheritance (structural subtyping).
+    without explicit inheritance (structural subtyping). ``embed`` returns
+    one float32 row per input text as a ``(len(texts), dimensions)`` matrix.
     """
 
-    async def embed(self, texts: list[str]) -> list[list[float]]: ...
+    async def embed(self, texts: list[str]) -> npt.NDArray[np.float32]: ...
+
+
+@runtime_checkable
+class EmbeddingCache(Protocol):
+    """Contract for embedding cache backends.
+
+    Keys are opaque strings built by ``embedding_cache_key``; backends only
+    store and return vectors.
+    """
+
+    async def get_many(self, keys: list[str]) -> dict[str, npt.NDArray[np.float32]]: ...
+
+    async def set_many(self, entries: dict[str, npt.NDArray[np.float32]]) -> None: ...
 
 
 @runtime_checkable
@@ -44,4 +61,18 @@ class VectorStore(Protocol):
         filters: dict[str, Any] | None = None,
     ) -> list[QueryResult]: ...
 
+    async def query_by_vector(
+        self,
+        vector: npt.ArrayLike,
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[QueryResult]: ...
+
+    async def query_many(
+        self,
+        texts: list[str],
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[list[QueryResult]]: ...
+
     async def delete(self, ids: list[str]) -> None: ...
@@ -0,0 +1,237 @@
+"""Vector quantization for compact in-memory search.
+
+Both quantizers score queries by asymmetric distance computation (ADC): the
+query stays in float32 and is compared against compressed codes directly, so
+stored vectors are never decompressed during a scan.
+"""
+
+from __future__ import annotations
+
+from typing import Protocol, Self, runtime_checkable
+
+import numpy as np
+import numpy.typing as npt
+
+# Rows scored per block, bounding the float32 temporaries of an ADC scan
+_SCAN_CHUNK_ROWS = 8192
+
+
+@runtime_checkable
+class Quantizer(Protocol):
+    """Trainable codec from float32 vectors to uint8 codes."""
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        ...
+
+    @property
+    def trained(self) -> bool: ...
+
+    def fit(self, vectors: npt.ArrayLike) -> Self:
+        """Learn codec parameters from sample vectors."""
+        ...
+
+    def encode(self, vectors: npt.ArrayLike) -> npt.NDArray[np.uint8]:
+        """Compress an ``(n, dimensions)`` matrix to ``(n, code_size)`` codes."""
+        ...
+
+    def decode(self, codes: npt.NDArray[np.uint8]) -> npt.NDArray[np.float32]:
+        """Reconstruct approximate vectors from codes."""
+        ...
+
+    def score(self, query: npt.ArrayLike, codes: npt.NDArray[np.uint8]) -> npt.NDArray[np.float32]:
+        """Approximate inner products between ``query`` and each encoded row."""
+        ...
+
+
+def _as_matrix(vectors: npt.ArrayLike, dimensions: int) -> npt.NDArray[np.float32]:
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if matrix.shape[1] != dimensions:
+        raise ValueError(f"expected {dimensions}-dimensional vectors, got shape {matrix.shape}")
+    return matrix
+
+
+class ScalarQuantizer:
+    """Per-dimension affine quantization to 8 bits (4x smaller than float32).
+
+    Each dimension is mapped linearly from its trained ``[min, max]`` range
+    onto ``0..255``. Inner products decompose as
+    ``q . x ~= q . offset + (q * scale) . code``, so a scan is one
+    matrix-vector product over the codes.
+    """
+
+    def __init__(self, dimensions: int) -> None:
+        self.dimensions = dimensions
+        self._offset: npt.NDArray[np.float32] | None = None
+        self._scale: npt.NDArray[np.float32] | None = None
+
+    @property
+    def code_size(self) -> int:
+        return self.dimensions
+
+    @property
+    def trained(self) -> bool:
+        return self._offset is not None
+
+    def fit(self, vectors: npt.ArrayLike) -> Self:
+        matrix = _as_matrix(vectors, self.dimensions)
+        if matrix.shape[0] == 0:
+            raise ValueError("cannot train on an empty matrix")
+        low = matrix.min(axis=0)
+        high = matrix.max(axis=0)
+        self._offset = low
+        self._scale = np.maximum(high - low, np.float32(1e-12)) / np.float32(255)
+        return self
+
+    def _params(self) -> tuple[npt.NDArray[np.float32], npt.NDArray[np.float32]]:
+        if self._offset is None or self._scale is None:
+            raise RuntimeError("quantizer is not trained")
+        return self._offset, self._scale
+
+    def encode(self, vectors: npt.ArrayLike) -> npt.NDArray[np.uint8]:
+        offset, scale = self._params()
+        matrix = _as_matrix(vectors, self.dimensions)
+        codes: npt.NDArray[np.uint8] = np.clip(np.rint((matrix - offset) / scale), 0, 255).astype(
+            np.uint8
+        )
+        return codes
+
+    def decode(self, codes: npt.NDArray[np.uint8]) -> npt.NDArray[np.float32]:
+        offset, scale = self._params()
+        return codes.astype(np.float32) * scale + offset
+
+    def score(self, query: npt.ArrayLike, codes: npt.NDArray[np.uint8]) -> npt.NDArray[np.float32]:
+        offset, scale = self._params()
+        vector = np.asarray(query, dtype=np.float32)
+        weights = vector * scale
+        bias = np.float32(vector @ offset)
+        scores = np.empty(codes.shape[0], dtype=np.float32)
+        for start in range(0, codes.shape[0], _SCAN_CHUNK_ROWS):
+            block = codes[start : start + _SCAN_CHUNK_ROWS]
+            scores[start : start + block.shape[0]] = block.astype(np.float32) @ weights + bias
+        return scores
+
+
+class ProductQuantizer:
+    """Product quantization with per-subspace k-means codebooks.
+
+    Vectors are split into ``subvectors`` contiguous slices and each slice is
+    replaced by the index of its nearest centroid, so a vector costs
+    ``subvectors`` bytes (e.g. 1536-d float32 with 192 subvectors is 32x
+    smaller). Queries build a ``(subvectors, 256)`` table of partial inner
+    products once; scoring a row is then ``subvectors`` table lookups. Scans
+    are fastest over column-major (``order="F"``) code matrices.
+
+    Args:
+        dimensions: Vector dimensionality (must be divisible by ``subvectors``).
+        subvectors: Number of subspaces, i.e. bytes per code.
+        bits: Bits per subspace code (at most 8, giving ``2**bits`` centroids).
+        iterations: Lloyd iterations when training each codebook.
+        seed: Seed for centroid initialization.
+    """
+
+    def __init__(
+        self,
+        dimensions: int,
+        subvectors: int,
+        bits: int = 8,
+        iterations: int = 20,
+        seed: int | None = 0,
+    ) -> None:
+        if subvectors <= 0 or dimensions % subvectors:
+            raise ValueError(
+                f"dimensions ({dimensions}) must be divisible by subvectors ({subvectors})"
+            )
+        if not 1 <= bits <= 8:
+            raise ValueError(f"bits must be between 1 and 8, got {bits}")
+        self.dimensions = dimensions
+        self.subvectors = subvectors
+        self.centroids_per_subspace = 2**bits
+        self.iterations = iterations
+        self._subdimensions = dimensions // subvectors
+        self._rng = np.random.default_rng(seed)
+        # (subvectors, centroids_per_subspace, subdimensions)
+        self._codebooks: npt.NDArray[np.float32] | None = None
+
+    @property
+    def code_size(self) -> int:
+        return self.subvectors
+
+    @property
+    def trained(self) -> bool:
+        return self._codebooks is not None
+
+    def _split(self, matrix: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+        """Reshape ``(n, d)`` into ``(subvectors, n, subdimensions)``."""
+        return matrix.reshape(matrix.shape[0], self.subvectors, self._subdimensions).transpose(
+            1, 0, 2
+        )
+
+    def _assign(
+        self, points: npt.NDArray[np.float32], centroids: npt.NDArray[np.float32]
+    ) -> npt.NDArray[np.intp]:
+        """Index of the nearest centroid (squared L2) for each point."""
+        distances = (
+            np.einsum("kd,kd->k", centroids, centroids)[np.newaxis, :] - 2 * points @ centroids.T
+        )
+        nearest: npt.NDArray[np.intp] = np.argmin(distances, axis=1)
+        return nearest
+
+    def _kmeans(self, points: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+        count = self.centroids_per_subspace
+        centroids: npt.NDArray[np.float32] = points[
+            self._rng.choice(points.shape[0], count, replace=False)
+        ].copy()
+        for _ in range(self.iterations):
+            labels = self._assign(points, centroids)
+            sizes = np.bincount(labels, minlength=count)
+            sums = np.stack(
+                [np.bincount(labels, weights=column, minlength=count) for column in points.T],
+                axis=1,
+            )
+            filled = sizes > 0
+            centroids[filled] = sums[filled] / sizes[filled, np.newaxis]
+            empty = np.flatnonzero(~filled)
+            if empty.size:
+                # Re-seed empty clusters on random points so every code is usable
+                centroids[empty] = points[self._rng.choice(points.shape[0], empty.size)]
+        return centroids
+
+    def fit(self, vectors: npt.ArrayLike) -> Self:
+        matrix = _as_matrix(vectors, self.dimensions)
+        if matrix.shape[0] < self.centroids_per_subspace:
+            raise ValueError(
+                f"product quantization needs at least {self.centroids_per_subspace} "
+                f"training vectors, got {matrix.shape[0]}"
+            )
+        self._codebooks = np.stack([self._kmeans(points) for points in self._split(matrix)])
+        return self
+
+    def _books(self) -> npt.NDArray[np.float32]:
+        if self._codebooks is None:
+            raise RuntimeError("quantizer is not trained")
+        return self._codebooks
+
+    def encode(self, vectors: npt.ArrayLike) -> npt.NDArray[np.uint8]:
+        codebooks = self._books()
+        parts = self._split(_as_matrix(vectors, self.dimensions))
+        codes = np.empty((parts.shape[1], self.subvectors), dtype=np.uint8)
+        for sub, (points, centroids) in enumerate(zip(parts, codebooks, strict=True)):
+            codes[:, sub] = self._assign(points, centroids)
+        return codes
+
+    def decode(self, codes: npt.NDArray[np.uint8]) -> npt.NDArray[np.float32]:
+        codebooks = self._books()
+        parts = codebooks[np.arange(self.subvectors), codes]  # (n, subvectors, subdimensions)
+        return parts.reshape(codes.shape[0], self.dimensions)
+
+    def score(self, query: npt.ArrayLike, codes: npt.NDArray[np.uint8]) -> npt.NDArray[np.float32]:
+        codebooks = self._books()
+        vector = np.asarray(query, dtype=np.float32).reshape(self.subvectors, self._subdimensions)
+        table = np.einsum("sd,skd->sk", vector, codebooks)
+        scores = np.zeros(codes.shape[0], dtype=np.float32)
+        # One contiguous gather per subspace; fastest when codes are column-major
+        for subspace in range(self.subvectors):
+            scores += table[subspace].take(codes[:, subspace])
+        return scores
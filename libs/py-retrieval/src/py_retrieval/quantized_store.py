@@ -0,0 +1,452 @@
+"""Quantized in-memory vector store implementation."""
+
+from __future__ import annotations
+
+import asyncio
+import tempfile
+from typing import IO, Any, Literal, Self
+
+import numpy as np
+import numpy.typing as npt
+
+from py_core import get_logger
+from py_retrieval.exceptions import VectorStoreError
+from py_retrieval.filters import matches_filter
+from py_retrieval.manifest import content_id
+from py_retrieval.metadata_index import MetadataIndex
+from py_retrieval.models import Document, QueryResult, VectorStoreConfig
+from py_retrieval.protocols import EmbeddingProvider
+from py_retrieval.quantization import ProductQuantizer, Quantizer, ScalarQuantizer
+from py_retrieval.similarity import normalize, select_top_k
+
+logger = get_logger("quantized_store")
+
+_INITIAL_CAPACITY = 1024
+
+
+def _build_quantizer(config: VectorStoreConfig) -> Quantizer:
+    """Create the quantizer selected by ``config.quantization``.
+
+    Raises:
+        ValueError: If ``embedding_dimensions`` does not split into
+            ``pq_subvectors``, or ``quantization_train_size`` is below the
+            number of PQ codebook centroids (so auto-training could never
+            succeed once documents are already stored).
+    """
+    dimensions = config.embedding_dimensions
+    if config.quantization == "pq":
+        quantizer = ProductQuantizer(dimensions, config.pq_subvectors or max(1, dimensions // 8))
+        if config.quantization_train_size < quantizer.centroids_per_subspace:
+            raise ValueError(
+                f"quantization_train_size ({config.quantization_train_size}) must be at least "
+                f"the {quantizer.centroids_per_subspace} PQ codebook centroids"
+            )
+        return quantizer
+    return ScalarQuantizer(dimensions)
+
+
+class QuantizedVectorStore:
+    """Compressed in-process implementation of the VectorStore protocol.
+
+    Vectors are held at full precision until ``quantization_train_size``
+    documents have arrived (or ``train()`` is called), then the quantizer is
+    fitted and every vector is replaced by its code: ``int8`` keeps one byte
+    per dimension (4x smaller), ``pq`` keeps ``pq_subvectors`` bytes per
+    vector (32x smaller for 1536-d with 192 subvectors). Queries score the
+    codes directly (asymmetric distance computation).
+
+    With ``rescore_factor > 0`` the best ``top_k * rescore_factor`` candidates
+    are re-ranked against full-precision vectors. Those are spilled to a
+    temporary memory-mapped file under ``storage_path`` when one is set, so
+    only the rescored rows are paged into memory; otherwise they stay in RAM.
+    """
+
+    def __init__(
+        self,
+        config: VectorStoreConfig,
+        embedding_provider: EmbeddingProvider,
+    ) -> None:
+        self._config = config
+        self._embedding_provider = embedding_provider
+        self._dimensions = config.embedding_dimensions
+        self._quantizer = _build_quantizer(config)
+        self._rescore_factor = config.rescore_factor
+        self._train_size = config.quantization_train_size
+        self._capacity = _INITIAL_CAPACITY
+        # Full-precision vectors until the quantizer is trained
+        self._pending: npt.NDArray[np.float32] | None = np.zeros(
+            (self._capacity, self._dimensions), dtype=np.float32
+        )
+        self._codes: npt.NDArray[np.uint8] | None = None
+        self._originals: npt.NDArray[np.float32] | None = None
+        self._spill: IO[bytes] | None = None
+        self._size = 0
+        self._ids: list[str] = []
+        self._texts: list[str] = []
+        self._metadata: list[dict[str, Any]] = []
+        self._rows: dict[str, int] = {}
+        self._metadata_index = MetadataIndex()
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def trained(self) -> bool:
+        return self._codes is not None
+
+    @property
+    def vector_bytes(self) -> int:
+        """Resident bytes used by vector data (codes, plus in-RAM originals)."""
+        if self._codes is None:
+            return self._size * self._dimensions * 4
+        total = self._size * self._quantizer.code_size
+        if self._originals is not None and self._spill is None:
+            total += self._size * self._dimensions * 4
+        return total
+
+    async def __aenter__(self) -> Self:
+        logger.info("quantized_store_opened", index=self._config.index_name, size=self._size)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: Any,
+    ) -> None:
+        if self._spill is not None:
+            self._originals = None
+            self._spill.close()
+            self._spill = None
+        logger.info("quantized_store_closed", index=self._config.index_name, size=self._size)
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _map_spill(self, capacity: int) -> npt.NDArray[np.float32]:
+        assert self._spill is not None
+        self._spill.truncate(capacity * self._dimensions * 4)
+        return np.memmap(
+            self._spill, dtype=np.float32, mode="r+", shape=(capacity, self._dimensions)
+        )
+
+    def _ensure_capacity(self, required: int) -> None:
+        """Grow every row buffer geometrically so appends stay amortized O(1)."""
+        if required <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < required:
+            capacity *= 2
+
+        def _grown(array: npt.NDArray[Any]) -> npt.NDArray[Any]:
+            order: Literal["C", "F"] = "C"
+            if array.flags.f_contiguous and not array.flags.c_contiguous:
+                order = "F"
+            grown: npt.NDArray[Any] = np.zeros(
+                (capacity, array.shape[1]), dtype=array.dtype, order=order
+            )
+            grown[: self._size] = array[: self._size]
+            return grown
+
+        if self._pending is not None:
+            self._pending = _grown(self._pending)
+        if self._codes is not None:
+            self._codes = _grown(self._codes)
+        if self._originals is not None:
+            if self._spill is not None:
+                self._originals.flush()  # type: ignore[attr-defined]
+                self._originals = self._map_spill(capacity)
+            else:
+                self._originals = _grown(self._originals)
+        self._capacity = capacity
+
+    def _write(self, rows: npt.NDArray[np.intp], matrix: npt.NDArray[np.float32]) -> None:
+        if self._codes is None:
+            assert self._pending is not None
+            self._pending[rows] = matrix
+            return
+        self._codes[rows] = self._quantizer.encode(matrix)
+        if self._originals is not None:
+            self._originals[rows] = matrix
+
+    def _move(self, source: int, target: int) -> None:
+        for array in (self._pending, self._codes, self._originals):
+            if array is not None:
+                array[target] = array[source]
+
+    # ------------------------------------------------------------------
+    # Training
+    # ------------------------------------------------------------------
+
+    async def train(self) -> None:
+        """Fit the quantizer on the stored vectors and switch to codes.
+
+        Raises:
+            VectorStoreError: If the store is empty, already trained, or holds
+                too few vectors for the configured quantizer.
+        """
+        async with self._lock:
+            await self._train()
+
+    async def _train(self) -> None:
+        if self._codes is not None:
+            raise VectorStoreError("Training failed: store is already trained")
+        if self._size == 0:
+            raise VectorStoreError("Training failed: store is empty")
+        assert self._pending is not None
+        vectors = self._pending[: self._size]
+
+        def _fit_and_encode() -> npt.NDArray[np.uint8]:
+            self._quantizer.fit(vectors)
+            # Column-major codes let scans read each code column contiguously
+            codes = np.zeros((self._capacity, self._quantizer.code_size), dtype=np.uint8, order="F")
+            codes[: self._size] = self._quantizer.encode(vectors)
+            return codes
+
+        try:
+            # Queries keep scanning the full-precision rows while this runs
+            codes = await asyncio.to_thread(_fit_and_encode)
+        except ValueError as exc:
+            raise VectorStoreError(f"Training failed: {exc}") from exc
+
+        if self._rescore_factor > 0:
+            if self._config.storage_path:
+                self._spill = tempfile.TemporaryFile(dir=self._config.storage_path)
+                originals = self._map_spill(self._capacity)
+                originals[: self._size] = vectors
+                self._originals = originals
+            else:
+                self._originals = self._pending
+        self._codes = codes
+        self._pending = None
+        logger.info(
+            "quantized_store_trained",
+            quantization=self._config.quantization,
+            size=self._size,
+            code_size=self._quantizer.code_size,
+        )
+
+    # ------------------------------------------------------------------
+    # VectorStore protocol
+    # ------------------------------------------------------------------
+
+    async def upsert(self, documents: list[Document]) -> list[str]:
+        """Insert or overwrite documents.
+
+        Generates embeddings for documents without pre-computed vectors and
+        assigns content-derived IDs to documents without one. Trains the
+        quantizer once the store reaches ``quantization_train_size`` documents.
+
+        Args:
+            documents: Documents to upsert.
+
+        Returns:
+            List of document IDs that were upserted.
+
+        Raises:
+            VectorStoreError: If a vector does not match the configured dimensions.
+        """
+        if not documents:
+            return []
+
+        for doc in documents:
+            if doc.id is None:
+                doc.id = content_id(doc)
+
+        docs_to_embed = [doc for doc in documents if doc.vector is None]
+        if docs_to_embed:
+            embeddings = await self._embedding_provider.embed([doc.text for doc in docs_to_embed])
+            for doc, embedding in zip(docs_to_embed, embeddings, strict=True):
+                doc.vector = embedding
+
+        matrix = normalize([doc.vector for doc in documents if doc.vector is not None])
+        if matrix.ndim != 2 or matrix.shape[1] != self._dimensions:
+            raise VectorStoreError(
+                f"Upsert failed: expected {self._dimensions}-dimensional vectors, "
+                f"got shape {matrix.shape}"
+            )
+
+        async with self._lock:
+            new_ids = {doc.id for doc in documents if doc.id not in self._rows}
+            self._ensure_capacity(self._size + len(new_ids))
+            rows = np.empty(len(documents), dtype=np.intp)
+            for position, doc in enumerate(documents):
+                doc_id: str = doc.id  # type: ignore[assignment]
+                row = self._rows.get(doc_id)
+                if row is None:
+                    row = self._size
+                    self._rows[doc_id] = row
+                    self._ids.append(doc_id)
+                    self._texts.append(doc.text)
+                    self._metadata.append(dict(doc.metadata))
+                    self._size += 1
+                else:
+                    self._texts[row] = doc.text
+                    self._metadata[row] = dict(doc.metadata)
+                self._metadata_index.set(row, doc.metadata)
+                rows[position] = row
+            self._write(rows, matrix)
+
+            if self._codes is None and self._size >= self._train_size:
+                await self._train()
+
+        logger.info("quantized_store_upserted", count=len(documents), size=self._size)
+        return [doc.id for doc in documents]  # type: ignore[misc]
+
+    def _score(
+        self,
+        query_vector: npt.NDArray[np.float32],
+        candidates: npt.NDArray[np.intp] | None,
+        top_k: int,
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float32]]:
+        """Rank candidate rows (all rows when ``None``), returning best rows and scores."""
+        rows = slice(0, self._size) if candidates is None else candidates
+        if candidates is None:
+            candidates = np.arange(self._size)
+
+        if self._codes is None:
+            assert self._pending is not None
+            scores = self._pending[rows] @ query_vector
+            best = select_top_k(scores, top_k)
+            return candidates[best], scores[best]
+
+        scores = self._quantizer.score(query_vector, self._codes[rows])
+        if self._originals is None:
+            best = select_top_k(scores, top_k)
+            return candidates[best], scores[best]
+
+        shortlist = candidates[select_top_k(scores, top_k * self._rescore_factor)]
+        # Sorted rows keep memory-mapped reads sequential
+        shortlist.sort()
+        exact = self._originals[shortlist] @ query_vector
+        best = select_top_k(exact, top_k)
+        return shortlist[best], exact[best]
+
+    async def query(
+        self,
+        text: str,
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[QueryResult]:
+        """Return the documents most similar to ``text``.
+
+        Scores are approximate cosine similarities unless rescoring is
+        enabled, in which case they are exact.
+
+        Args:
+            text: Query text (will be embedded automatically).
+            top_k: Number of results to return.
+            filters: Optional Pinecone-style metadata filters.
+
+        Returns:
+            Ranked list of query results.
+        """
+        embeddings = await self._embedding_provider.embed([text])
+        return self._search(normalize(embeddings), top_k, filters)[0]
+
+    async def query_many(
+        self,
+        texts: list[str],
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[list[QueryResult]]:
+        """Search for several texts embedded in a single batch.
+
+        Args:
+            texts: Query texts.
+            top_k: Number of results per query.
+            filters: Optional Pinecone-style metadata filters applied to every query.
+
+        Returns:
+            One ranked result list per input text, in input order.
+        """
+        if not texts:
+            return []
+        embeddings = await self._embedding_provider.embed(texts)
+        return self._search(normalize(embeddings), top_k, filters)
+
+    async def query_by_vector(
+        self,
+        vector: npt.ArrayLike,
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[QueryResult]:
+        """Return the documents most similar to a pre-computed embedding.
+
+        Args:
+            vector: Query embedding.
+            top_k: Number of results to return.
+            filters: Optional Pinecone-style metadata filters.
+
+        Returns:
+            Ranked list of query results.
+        """
+        return self._search(normalize(np.atleast_2d(vector)), top_k, filters)[0]
+
+    def _search(
+        self,
+        queries: npt.NDArray[np.float32],
+        top_k: int,
+        filters: dict[str, Any] | None,
+    ) -> list[list[QueryResult]]:
+        """Rank stored rows for each row of a normalized ``(q, d)`` query matrix."""
+        candidates = None
+        if filters:
+            candidates = self._metadata_index.select(filters)
+            if candidates is None:
+                candidates = np.fromiter(
+                    (i for i in range(self._size) if matches_filter(self._metadata[i], filters)),
+                    dtype=np.intp,
+                )
+
+        batches = []
+        for query_vector in queries:
+            ranked, ranked_scores = self._score(query_vector, candidates, top_k)
+            batches.append(
+                [
+                    QueryResult.model_construct(
+                        id=self._ids[row],
+                        score=float(score),
+                        text=self._texts[row],
+                        metadata=dict(self._metadata[row]),
+                    )
+                    for row, score in zip(ranked.tolist(), ranked_scores.tolist(), strict=True)
+                ]
+            )
+        logger.info("quantized_store_queried", queries=len(batches), top_k=top_k)
+        return batches
+
+    async def delete(self, ids: list[str]) -> None:
+        """Delete documents by ID; unknown IDs are ignored.
+
+        Args:
+            ids: Document IDs to delete.
+        """
+        if not ids:
+            return
+
+        async with self._lock:
+            for doc_id in ids:
+                row = self._rows.pop(doc_id, None)
+                if row is None:
+                    continue
+                last = self._size - 1
+                if row != last:
+                    # Move the last row into the hole to keep the buffers dense
+                    moved_id = self._ids[last]
+                    self._move(last, row)
+                    self._ids[row] = moved_id
+                    self._texts[row] = self._texts[last]
+                    self._metadata[row] = self._metadata[last]
+                    self._rows[moved_id] = row
+                    self._metadata_index.move(last, row)
+                else:
+                    self._metadata_index.remove(row)
+                self._ids.pop()
+                self._texts.pop()
+                self._metadata.pop()
+                self._size = last
+
+        logger.info("quantized_store_deleted", count=len(ids), size=self._size)
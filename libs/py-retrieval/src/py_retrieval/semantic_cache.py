@@ -0,0 +1,302 @@
+"""Semantic query-result cache.
+
+Near-duplicate questions ("Apple revenue growth" vs "AAPL revenue growth
+drivers") embed to nearby vectors. ``SemanticQueryCache`` keeps recent query
+embeddings together with their results and serves a hit when a new query is
+within a cosine-similarity threshold of a cached one under identical filters,
+turning a search round trip into one local matrix-vector product.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable
+from typing import Any, Self
+
+import numpy as np
+import numpy.typing as npt
+
+from py_core import gather_with_concurrency, get_logger
+from py_retrieval.models import Document, QueryResult
+from py_retrieval.protocols import EmbeddingProvider, VectorStore
+from py_retrieval.similarity import normalize
+
+logger = get_logger("semantic_cache")
+
+# Concurrent misses forwarded to the wrapped store by ``query_many``
+_MAX_CONCURRENT_QUERIES = 8
+
+
+def _filters_key(filters: dict[str, Any] | None) -> str:
+    """Canonical form of a filter so equal filters compare equal."""
+    return json.dumps(filters or {}, sort_keys=True, default=str)
+
+
+class SemanticQueryCache:
+    """Bounded cache of ``(query embedding, filters, top_k) -> results``.
+
+    Lookups score the query against every cached embedding in one product and
+    take the best entry whose filters match exactly, whose ``top_k`` covers
+    the request and which has not expired. Entries are dropped wholesale when
+    the index changes, either via ``invalidate()`` or when
+    ``set_index_version`` is given a new version.
+
+    Args:
+        threshold: Minimum cosine similarity for a cached query to be served.
+        ttl: Seconds an entry stays valid; ``None`` disables expiry.
+        max_entries: Capacity; the least recently used entry is evicted when
+            full (expired entries go first).
+        clock: Monotonic time source, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        ttl: float | None = 3600.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        if max_entries <= 0:
+            raise ValueError(f"max_entries must be a positive integer, got {max_entries}")
+        self._threshold = threshold
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._clock = clock
+        self._vectors: npt.NDArray[np.float32] | None = None
+        self._filter_codes = np.zeros(max_entries, dtype=np.int64)
+        self._top_ks = np.zeros(max_entries, dtype=np.int64)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._results: list[list[QueryResult]] = []
+        self._filter_keys: list[str] = []
+        self._filter_ids: dict[str, int] = {}
+        self._size = 0
+        self._index_version: str | None = None
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def index_version(self) -> str | None:
+        """Version of the index the cached results were computed against."""
+        return self._index_version
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped on every invalidation.
+
+        Capture it before a slow search and pass it to ``put`` so results
+        computed against an index that changed meanwhile are not cached.
+        """
+        return self._generation
+
+    def set_index_version(self, version: str) -> None:
+        """Record the current index version, invalidating if it changed."""
+        if version != self._index_version:
+            if self._index_version is not None:
+                self.invalidate()
+            self._index_version = version
+
+    def invalidate(self) -> None:
+        """Drop every cached entry."""
+        if self._size:
+            logger.info("semantic_cache_invalidated", entries=self._size)
+        self._size = 0
+        self._results.clear()
+        self._filter_keys.clear()
+        self._filter_ids.clear()
+        self._generation += 1
+
+    def _eligible(self, filters_code: int, top_k: int, now: float) -> npt.NDArray[np.bool_]:
+        """Mask of live entries with the given filters and at least ``top_k`` results."""
+        n = self._size
+        mask: npt.NDArray[np.bool_] = (
+            (self._filter_codes[:n] == filters_code)
+            & (self._top_ks[:n] >= top_k)
+            & (self._expires[:n] > now)
+        )
+        return mask
+
+    def get(
+        self,
+        vector: npt.ArrayLike,
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+    ) -> list[QueryResult] | None:
+        """Return cached results for a semantically equivalent query, if any."""
+        filters_code = self._filter_ids.get(_filters_key(filters))
+        if filters_code is None or self._vectors is None:
+            self.misses += 1
+            return None
+        now = self._clock()
+        mask = self._eligible(filters_code, top_k, now)
+        scores = np.where(mask, self._vectors[: self._size] @ normalize(vector), -np.inf)
+        best = int(np.argmax(scores))
+        if scores[best] < self._threshold:
+            self.misses += 1
+            return None
+        self._last_used[best] = now
+        self.hits += 1
+        return self._results[best][:top_k]
+
+    def put(
+        self,
+        vector: npt.ArrayLike,
+        top_k: int,
+        filters: dict[str, Any] | None,
+        results: list[QueryResult],
+        generation: int | None = None,
+    ) -> None:
+        """Cache results for a query.
+
+        Args:
+            vector: Query embedding.
+            top_k: ``top_k`` the results were computed with.
+            filters: Filters the results were computed with.
+            results: Ranked results to serve on later hits.
+            generation: Value of ``generation`` when the search started; the
+                entry is discarded if the cache was invalidated since.
+        """
+        if generation is not None and generation != self._generation:
+            return
+        query = normalize(vector)
+        if self._vectors is None or self._vectors.shape[1] != query.shape[0]:
+            if self._vectors is not None:
+                self.invalidate()
+            self._vectors = np.zeros((self._max_entries, query.shape[0]), dtype=np.float32)
+        if len(self._filter_ids) >= 2 * self._max_entries:
+            self._compact_filter_ids()
+        filters_key = _filters_key(filters)
+        filters_code = self._filter_ids.setdefault(filters_key, len(self._filter_ids))
+        slot = self._slot_for(self._vectors, query, filters_code)
+        now = self._clock()
+        self._vectors[slot] = query
+        self._filter_codes[slot] = filters_code
+        self._top_ks[slot] = top_k
+        self._expires[slot] = np.inf if self._ttl is None else now + self._ttl
+        self._last_used[slot] = now
+        if slot == self._size:
+            self._results.append(results)
+            self._filter_keys.append(filters_key)
+            self._size += 1
+        else:
+            self._results[slot] = results
+            self._filter_keys[slot] = filters_key
+
+    def _compact_filter_ids(self) -> None:
+        """Renumber filter codes so only filters of cached entries are kept."""
+        self._filter_ids = {}
+        for slot, key in enumerate(self._filter_keys):
+            self._filter_codes[slot] = self._filter_ids.setdefault(key, len(self._filter_ids))
+
+    def _slot_for(
+        self,
+        vectors: npt.NDArray[np.float32],
+        query: npt.NDArray[np.float32],
+        filters_code: int,
+    ) -> int:
+        """Pick the slot to write: a near-duplicate, a free slot, or a victim."""
+        if self._size:
+            mask = self._eligible(filters_code, 0, -np.inf)
+            scores = np.where(mask, vectors[: self._size] @ query, -np.inf)
+            best = int(np.argmax(scores))
+            if scores[best] >= self._threshold:
+                return best
+        if self._size < self._max_entries:
+            return self._size
+        now = self._clock()
+        # Expired entries sort before every live one
+        recency = np.where(self._expires > now, self._last_used, -np.inf)
+        return int(np.argmin(recency))
+
+
+class SemanticCachedVectorStore:
+    """VectorStore wrapper that answers repeated queries from a ``SemanticQueryCache``.
+
+    Queries are embedded once here and searched with ``query_by_vector`` on
+    the wrapped store, so a miss costs no extra embedding call. Writes made
+    through the wrapper invalidate the cache; writes made elsewhere should
+    be signalled with ``SemanticQueryCache.set_index_version``.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        embedding_provider: EmbeddingProvider,
+        cache: SemanticQueryCache,
+    ) -> None:
+        self._store = store
+        self._embedding_provider = embedding_provider
+        self.cache = cache
+
+    async def __aenter__(self) -> Self:
+        await self._store.__aenter__()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: Any,
+    ) -> None:
+        await self._store.__aexit__(exc_type, exc_val, exc_tb)
+
+    async def upsert(self, documents: list[Document]) -> list[str]:
+        """Upsert through the wrapped store and invalidate cached results."""
+        try:
+            return await self._store.upsert(documents)
+        finally:
+            self.cache.invalidate()
+
+    async def delete(self, ids: list[str]) -> None:
+        """Delete through the wrapped store and invalidate cached results."""
+        try:
+            await self._store.delete(ids)
+        finally:
+            self.cache.invalidate()
+
+    async def query(
+        self,
+        text: str,
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[QueryResult]:
+        """Embed ``text`` and serve it from the cache when possible."""
+        embeddings = await self._embedding_provider.embed([text])
+        return await self.query_by_vector(embeddings[0], top_k=top_k, filters=filters)
+
+    async def query_many(
+        self,
+        texts: list[str],
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[list[QueryResult]]:
+        """Embed all texts in one call; only cache misses reach the store."""
+        if not texts:
+            return []
+        embeddings = await self._embedding_provider.embed(texts)
+        return await gather_with_concurrency(
+            _MAX_CONCURRENT_QUERIES,
+            *(self.query_by_vector(vector, top_k=top_k, filters=filters) for vector in embeddings),
+        )
+
+    async def query_by_vector(
+        self,
+        vector: npt.ArrayLike,
+        top_k: int = 5,
+        filters: dict[str, Any] | None = None,
+    ) -> list[QueryResult]:
+        """Return cached results for a near-identical query, else search the store."""
+        cached = self.cache.get(vector, top_k, filters)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation
+        results = await self._store.query_by_vector(vector, top_k=top_k, filters=filters)
+        self.cache.put(vector, top_k, filters, results, generation=generation)
+        return results
@@ -0,0 +1,60 @@
+"""Vectorized similarity helpers shared by the local vector stores."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import numpy as np
+import numpy.typing as npt
+
+
+def normalize(vectors: npt.ArrayLike) -> npt.NDArray[np.float32]:
+    """Return float32 copies of ``vectors`` scaled to unit L2 norm.
+
+    Zero vectors are left as zeros rather than producing NaNs.
+    """
+    matrix = np.array(vectors, dtype=np.float32, ndmin=1)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def select_top_k(scores: npt.NDArray[np.floating], k: int) -> npt.NDArray[np.intp]:
+    """Return indices of the ``k`` highest scores, best first.
+
+    Uses ``argpartition`` so selection is O(n) and only the ``k`` winners
+    are sorted.
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def two_stage_scores(
+    coarse: npt.NDArray[np.float32],
+    exact: Callable[[npt.NDArray[np.intp], int], npt.NDArray[np.float32]],
+    shortlist: int,
+    keep_coarse: bool = False,
+) -> npt.NDArray[np.float32]:
+    """Re-rank the best coarse candidates of each query with exact scores.
+
+    Args:
+        coarse: ``(n, q)`` approximate scores, e.g. from truncated vectors.
+        exact: ``exact(positions, j)`` returns exact scores of the candidates
+            at ``positions`` for query column ``j``.
+        shortlist: Candidates per query re-scored exactly.
+        keep_coarse: Keep coarse scores outside the shortlist instead of
+            excluding those candidates with ``-inf``.
+
+    Returns:
+        ``(n, q)`` scores, exact for every shortlisted candidate.
+    """
+    scores = coarse.copy() if keep_coarse else np.full_like(coarse, -np.inf)
+    for j in range(coarse.shape[1]):
+        positions = select_top_k(coarse[:, j], shortlist)
+        scores[positions, j] = exact(positions, j)
+    return scores
@@ -0,0 +1,210 @@
+"""BM25 sparse term index and score fusion for hybrid search.
+
+Dense embeddings miss exact tokens such as tickers, form names and figures
+that keyword search finds trivially. ``SparseIndex`` keeps a BM25 inverted
+index next to a local store's vectors, built from document text at upsert,
+and ``fuse_scores`` combines its scores with cosine similarity in the same
+pass, either by reciprocal rank fusion or by a weighted sum.
+
+Term frequencies and document lengths are stored rather than final BM25
+weights, so IDF and the average document length always reflect the current
+corpus instead of the corpus at the time each document was written.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Literal
+
+import numpy as np
+import numpy.typing as npt
+
+from py_retrieval.similarity import select_top_k
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+_INITIAL_CAPACITY = 1024
+
+# Ranks beyond this depth contribute nothing to reciprocal rank fusion
+_RRF_MIN_DEPTH = 100
+
+FusionMethod = Literal["rrf", "weighted"]
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased word tokens used for BM25 terms."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class SparseIndex:
+    """BM25 inverted index over the text of integer rows.
+
+    Rows follow the store's row numbering, with the same ``set`` /
+    ``remove`` / ``move`` hooks as ``MetadataIndex``. Postings are rebuilt
+    lazily on the first query after a write, so a bulk upsert pays for one
+    sort rather than one per document.
+
+    Args:
+        k1: Term-frequency saturation.
+        b: Strength of document-length normalization.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self._k1 = k1
+        self._b = b
+        self._vocabulary: dict[str, int] = {}
+        self._row_terms: dict[int, tuple[npt.NDArray[np.int64], npt.NDArray[np.float32]]] = {}
+        self._lengths = np.zeros(_INITIAL_CAPACITY, dtype=np.float32)
+        self._total_length = 0.0
+        self._extent = 0
+        self._dirty = True
+        self._terms: npt.NDArray[np.int64] = np.empty(0, dtype=np.int64)
+        self._offsets: npt.NDArray[np.intp] = np.zeros(1, dtype=np.intp)
+        self._posting_rows: npt.NDArray[np.intp] = np.empty(0, dtype=np.intp)
+        self._posting_tf: npt.NDArray[np.float32] = np.empty(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._row_terms)
+
+    def _ensure_capacity(self, row: int) -> None:
+        capacity = len(self._lengths)
+        if row < capacity:
+            return
+        while capacity <= row:
+            capacity *= 2
+        lengths = np.zeros(capacity, dtype=np.float32)
+        lengths[: len(self._lengths)] = self._lengths
+        self._lengths = lengths
+
+    def set(self, row: int, text: str) -> None:
+        """Index ``text`` for ``row``, replacing whatever it held before."""
+        self._ensure_capacity(row)
+        self.remove(row)
+        counts = Counter(tokenize(text))
+        vocabulary = self._vocabulary
+        terms = np.fromiter(
+            (vocabulary.setdefault(token, len(vocabulary)) for token in counts),
+            dtype=np.int64,
+            count=len(counts),
+        )
+        frequencies = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        self._row_terms[row] = (terms, frequencies)
+        length = float(frequencies.sum())
+        self._lengths[row] = length
+        self._total_length += length
+        self._extent = max(self._extent, row + 1)
+        self._dirty = True
+
+    def remove(self, row: int) -> None:
+        """Drop ``row`` from the index; unknown rows are ignored."""
+        if self._row_terms.pop(row, None) is None:
+            return
+        self._total_length -= float(self._lengths[row])
+        self._lengths[row] = 0.0
+        self._dirty = True
+
+    def move(self, source: int, target: int) -> None:
+        """Relocate ``source``'s entry to ``target``, replacing what ``target`` held."""
+        if source == target:
+            return
+        self.remove(target)
+        entry = self._row_terms.pop(source, None)
+        if entry is None:
+            return
+        self._row_terms[target] = entry
+        self._lengths[target] = self._lengths[source]
+        self._lengths[source] = 0.0
+        self._dirty = True
+
+    def _build(self) -> None:
+        """Group every (term, row, tf) triple by term."""
+        rows = list(self._row_terms)
+        entries = [self._row_terms[row] for row in rows]
+        sizes = np.fromiter((len(terms) for terms, _ in entries), dtype=np.intp, count=len(rows))
+        if entries:
+            terms = np.concatenate([terms for terms, _ in entries])
+            frequencies = np.concatenate([tf for _, tf in entries])
+        else:
+            terms = np.empty(0, dtype=np.int64)
+            frequencies = np.empty(0, dtype=np.float32)
+        owners = np.repeat(np.asarray(rows, dtype=np.intp), sizes)
+        order = np.argsort(terms, kind="stable")
+        terms = terms[order]
+        self._terms, starts = np.unique(terms, return_index=True)
+        self._offsets = np.append(starts, len(terms)).astype(np.intp)
+        self._posting_rows = owners[order]
+        self._posting_tf = frequencies[order]
+        self._dirty = False
+
+    def score(self, text: str) -> npt.NDArray[np.float32]:
+        """BM25 score of ``text`` against every row.
+
+        Returns:
+            Scores indexed by row, zero for rows sharing no term with the
+            query; at least as long as the highest indexed row.
+        """
+        scores = np.zeros(self._extent, dtype=np.float32)
+        count = len(self._row_terms)
+        if count == 0:
+            return scores
+        if self._dirty:
+            self._build()
+        average_length = self._total_length / count or 1.0
+        k1, b = self._k1, self._b
+        for token, weight in Counter(tokenize(text)).items():
+            term = self._vocabulary.get(token)
+            if term is None:
+                continue
+            position = int(np.searchsorted(self._terms, term))
+            if position == len(self._terms) or self._terms[position] != term:
+                continue
+            start, stop = self._offsets[position], self._offsets[position + 1]
+            rows = self._posting_rows[start:stop]
+            tf = self._posting_tf[start:stop]
+            df = stop - start
+            idf = np.log1p((count - df + 0.5) / (df + 0.5))
+            norm = k1 * (1.0 - b + b * self._lengths[rows] / average_length)
+            # Rows are unique within a posting, so fancy-index accumulation is safe
+            scores[rows] += weight * idf * tf * (k1 + 1.0) / (tf + norm)
+        return scores
+
+
+def fuse_scores(
+    dense: npt.NDArray[np.float32],
+    sparse: npt.NDArray[np.float32],
+    top_k: int,
+    method: FusionMethod = "rrf",
+    alpha: float = 0.5,
+    rrf_k: int = 60,
+) -> npt.NDArray[np.float32]:
+    """Combine dense and sparse scores over the same candidates.
+
+    Args:
+        dense: Cosine similarity per candidate.
+        sparse: BM25 score per candidate (zero where no term matched).
+        top_k: Number of results the caller will select; bounds the RRF depth.
+        method: ``"rrf"`` sums ``1 / (rrf_k + rank)`` over both rankings;
+            ``"weighted"`` computes ``alpha * dense + (1 - alpha) * sparse``
+            with sparse scores scaled to ``[0, 1]`` by the best match.
+        alpha: Weight of the dense score for ``"weighted"`` fusion.
+        rrf_k: RRF rank offset; larger values flatten the rank weighting.
+
+    Returns:
+        Fused score per candidate; higher is better.
+    """
+    if method == "weighted":
+        best = float(sparse.max()) if len(sparse) else 0.0
+        fused = alpha * dense
+        if best > 0:
+            fused = fused + (1.0 - alpha) * (sparse / best)
+        return fused.astype(np.float32, copy=False)
+
+    depth = max(top_k, _RRF_MIN_DEPTH)
+    fused = np.zeros(len(dense), dtype=np.float32)
+    ranked_dense = select_top_k(dense, depth)
+    fused[ranked_dense] += 1.0 / (rrf_k + np.arange(1, len(ranked_dense) + 1))
+    matched = np.flatnonzero(sparse > 0)
+    ranked_sparse = matched[select_top_k(sparse[matched], depth)]
+    fused[ranked_sparse] += 1.0 / (rrf_k + np.arange(1, len(ranked_sparse) + 1))
+    return fused
@@ -0,0 +1,52 @@
+"""Tests for the end-to-end store benchmark harness."""
+
+from __future__ import annotations
+
+import pytest
+
+from py_retrieval.benchmarks import benchmark_store, synthetic_corpus, synthetic_queries
+
+
+class TestSyntheticCorpus:
+    def test_is_deterministic(self) -> None:
+        assert synthetic_corpus(20, seed=4) == synthetic_corpus(20, seed=4)
+        assert synthetic_corpus(20, seed=4) != synthetic_corpus(20, seed=5)
+
+    def test_respects_document_length_bounds(self) -> None:
+        corpus = synthetic_corpus(50, min_words=3, max_words=6)
+
+        assert len(corpus) == 50
+        assert all(3 <= len(doc.split()) <= 6 for doc in corpus)
+
+    def test_queries_are_spans_of_documents(self) -> None:
+        corpus = synthetic_corpus(10)
+
+        queries = synthetic_queries(corpus, 5, words=4)
+
+        assert len(queries) == 5
+        assert all(any(query in doc for doc in corpus) for query in queries)
+
+
+class TestBenchmarkStore:
+    @pytest.mark.parametrize("provider", ["memory", "file", "hnsw", "quantized"])
+    async def test_reports_throughput_latency_and_memory(self, provider: str) -> None:
+        corpus = synthetic_corpus(120, seed=2)
+
+        result = await benchmark_store(
+            provider, corpus, synthetic_queries(corpus, 10), dimensions=32, k=5, batch_size=50
+        )
+
+        assert result.provider == provider
+        assert result.corpus_size == 120
+        assert result.docs_per_second > 0
+        assert 0 < result.query_p50_ms <= result.query_p99_ms
+        assert result.memory_bytes is not None and result.memory_bytes > 0
+
+    async def test_memory_measurement_is_optional(self) -> None:
+        corpus = synthetic_corpus(20)
+
+        result = await benchmark_store(
+            "memory", corpus, corpus[:3], dimensions=16, measure_memory=False
+        )
+
+        assert result.memory_bytes is None
@@ -0,0 +1,134 @@
+"""Tests for embedding cache backends."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import fakeredis.aioredis
+import numpy as np
+import pytest
+
+from py_core.redis_client import AsyncRedisClient
+from py_retrieval.embedding_cache import (
+    DiskEmbeddingCache,
+    InMemoryEmbeddingCache,
+    RedisEmbeddingCache,
+    embedding_cache_key,
+)
+from py_retrieval.protocols import EmbeddingCache
+
+
+def _as_lists(found: dict[str, np.ndarray]) -> dict[str, list[float]]:
+    return {key: vector.tolist() for key, vector in found.items()}
+
+
+class TestEmbeddingCacheKey:
+    def test_same_inputs_same_key(self) -> None:
+        assert embedding_cache_key("m", 3, "hello") == embedding_cache_key("m", 3, "hello")
+
+    def test_model_and_dimensions_are_part_of_key(self) -> None:
+        base = embedding_cache_key("m", 3, "hello")
+        assert embedding_cache_key("other", 3, "hello") != base
+        assert embedding_cache_key("m", 4, "hello") != base
+
+    def test_key_does_not_contain_raw_text(self) -> None:
+        assert "secret text" not in embedding_cache_key("m", 3, "secret text")
+
+
+class TestInMemoryEmbeddingCache:
+    async def test_roundtrip(self) -> None:
+        cache = InMemoryEmbeddingCache()
+        await cache.set_many({"a": np.float32([0.1, 0.2])})
+
+        found = await cache.get_many(["a", "missing"])
+
+        assert list(found) == ["a"]
+        assert found["a"].dtype == np.float32
+        assert found["a"].tolist() == pytest.approx([0.1, 0.2])
+
+    async def test_evicts_least_recently_used(self) -> None:
+        cache = InMemoryEmbeddingCache(max_entries=2)
+        await cache.set_many({"a": np.float32([1.0]), "b": np.float32([2.0])})
+        await cache.get_many(["a"])  # "b" is now least recently used
+        await cache.set_many({"c": np.float32([3.0])})
+
+        assert len(cache) == 2
+        assert _as_lists(await cache.get_many(["a", "b", "c"])) == {"a": [1.0], "c": [3.0]}
+
+    async def test_stored_vectors_are_isolated_and_read_only(self) -> None:
+        cache = InMemoryEmbeddingCache()
+        vector = np.float32([1.0])
+        await cache.set_many({"a": vector})
+        vector[0] = 2.0
+        found = (await cache.get_many(["a"]))["a"]
+
+        assert found.tolist() == [1.0]
+        with pytest.raises(ValueError, match="read-only"):
+            found[0] = 3.0
+
+    def test_rejects_non_positive_size(self) -> None:
+        with pytest.raises(ValueError, match="max_entries"):
+            InMemoryEmbeddingCache(max_entries=0)
+
+    def test_satisfies_protocol(self) -> None:
+        assert isinstance(InMemoryEmbeddingCache(), EmbeddingCache)
+
+
+class TestDiskEmbeddingCache:
+    async def test_roundtrip_survives_reopen(self, tmp_path: Path) -> None:
+        path = tmp_path / "cache" / "embeddings.sqlite"
+        cache = DiskEmbeddingCache(path)
+        await cache.set_many({"a": np.float32([0.1, 0.2, 0.3])})
+        cache.close()
+
+        reopened = DiskEmbeddingCache(path)
+        found = await reopened.get_many(["a", "missing"])
+        assert list(found) == ["a"]
+        np.testing.assert_array_equal(found["a"], np.float32([0.1, 0.2, 0.3]))
+        reopened.close()
+
+    async def test_overwrites_existing_entry(self, tmp_path: Path) -> None:
+        cache = DiskEmbeddingCache(tmp_path / "embeddings.sqlite")
+        await cache.set_many({"a": np.float32([1.0])})
+        await cache.set_many({"a": np.float32([2.0])})
+
+        assert _as_lists(await cache.get_many(["a"])) == {"a": [2.0]}
+        cache.close()
+
+    async def test_empty_inputs(self, tmp_path: Path) -> None:
+        cache = DiskEmbeddingCache(tmp_path / "embeddings.sqlite")
+        await cache.set_many({})
+        assert await cache.get_many([]) == {}
+        cache.close()
+
+
+class TestRedisEmbeddingCache:
+    async def test_roundtrip(self) -> None:
+        client = AsyncRedisClient(client=fakeredis.aioredis.FakeRedis(decode_responses=True))
+        async with client:
+            cache = RedisEmbeddingCache(client)
+            await cache.set_many({"a": np.float32([0.1, 0.2])})
+            found = await cache.get_many(["a", "missing"])
+
+        assert list(found) == ["a"]
+        np.testing.assert_array_equal(found["a"], np.float32([0.1, 0.2]))
+
+    async def test_applies_key_prefix(self) -> None:
+        fake = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        client = AsyncRedisClient(client=fake, key_prefix="test:")
+        async with client:
+            await RedisEmbeddingCache(client).set_many({"a": np.float32([1.0])})
+            assert await fake.get("test:emb:f32:a") == "AACAPw=="  # float32 1.0, little-endian
+
+    async def test_malformed_entries_are_misses_per_key(self) -> None:
+        fake = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        client = AsyncRedisClient(client=fake)
+        async with client:
+            cache = RedisEmbeddingCache(client, dimensions=2)
+            await cache.set_many({"good": np.float32([0.1, 0.2])})
+            await fake.set("emb:f32:json", "[0.1, 0.2]")  # pre-f32 JSON format
+            await fake.set("emb:f32:short", "AACAPw==")  # one float, not two
+            await fake.set("emb:f32:ragged", "AACA")  # 3 bytes, not a float32 multiple
+            found = await cache.get_many(["json", "good", "short", "ragged"])
+
+        assert list(found) == ["good"]
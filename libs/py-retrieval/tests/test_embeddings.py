@@ -2,34 +2,58 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
+import numpy as np
+import openai
 import pytest
 from pydantic import SecretStr
 
-from py_retrieval.embeddings import _MAX_BATCH_SIZE, OpenAIEmbeddingProvider
+from py_retrieval.embedding_cache import InMemoryEmbeddingCache, embedding_cache_key
+from py_retrieval.embeddings import (
+    _MAX_BATCH_SIZE,
+    HashingEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    _AdaptiveLimiter,
+    _plan_batches,
+)
 from py_retrieval.exceptions import EmbeddingError
+from py_retrieval.protocols import EmbeddingProvider
+
+
+def _encode(vector: list[float]) -> str:
+    """Encode a vector the way the API does for ``encoding_format="base64"``."""
+    return base64.b64encode(np.asarray(vector, dtype="<f4").tobytes()).decode("ascii")
 
 
 def _make_embedding_response(vectors: list[list[float]]) -> MagicMock:
-    """Build a mock OpenAI embedding response."""
+    """Build a mock OpenAI embedding response with base64 payloads."""
     data = []
     for i, vec in enumerate(vectors):
         item = MagicMock()
         item.index = i
-        item.embedding = vec
+        item.embedding = _encode(vec)
         data.append(item)
     response = MagicMock()
     response.data = data
     return response
 
 
+def _count_chars(texts: list[str]) -> list[int]:
+    """Deterministic token counter: one token per character."""
+    return [len(text) for text in texts]
+
+
 @pytest.fixture
 def provider() -> OpenAIEmbeddingProvider:
     return OpenAIEmbeddingProvider(
         api_key=SecretStr("test-key"),
         model="text-embedding-3-small",
         dimensions=3,
+        token_counter=_count_chars,
     )
 
 
@@ -40,11 +64,13 @@ class TestEmbed:
 
         result = await provider.embed(["hello"])
 
-        assert result == [[0.1, 0.2, 0.3]]
+        assert result.dtype == np.float32
+        np.testing.assert_array_equal(result, np.float32([[0.1, 0.2, 0.3]]))
         provider._client.embeddings.create.assert_called_once_with(
             model="text-embedding-3-small",
             input=["hello"],
             dimensions=3,
+            encoding_format="base64",
         )
 
     async def test_multiple_texts(self, provider: OpenAIEmbeddingProvider) -> None:
@@ -53,25 +79,31 @@ class TestEmbed:
 
         result = await provider.embed(["text1", "text2"])
 
-        assert len(result) == 2
-        assert result[0] == [0.1, 0.2, 0.3]
-        assert result[1] == [0.4, 0.5, 0.6]
+        np.testing.assert_array_equal(result, np.float32([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]))
 
     async def test_empty_list(self, provider: OpenAIEmbeddingProvider) -> None:
         result = await provider.embed([])
-        assert result == []
+        assert result.shape == (0, 3)
 
     async def test_preserves_order_from_api(self, provider: OpenAIEmbeddingProvider) -> None:
         """Response items may arrive out of order; embed() must sort by index."""
-        item_1 = MagicMock(index=1, embedding=[0.4, 0.5, 0.6])
-        item_0 = MagicMock(index=0, embedding=[0.1, 0.2, 0.3])
+        item_1 = MagicMock(index=1, embedding=_encode([0.4, 0.5, 0.6]))
+        item_0 = MagicMock(index=0, embedding=_encode([0.1, 0.2, 0.3]))
         response = MagicMock(data=[item_1, item_0])  # reversed order
         provider._client.embeddings.create = AsyncMock(return_value=response)
 
         result = await provider.embed(["first", "second"])
 
-        assert result[0] == [0.1, 0.2, 0.3]  # index 0
-        assert result[1] == [0.4, 0.5, 0.6]  # index 1
+        assert result[0].tolist() == pytest.approx([0.1, 0.2, 0.3])  # index 0
+        assert result[1].tolist() == pytest.approx([0.4, 0.5, 0.6])  # index 1
+
+    async def test_accepts_float_list_payloads(self, provider: OpenAIEmbeddingProvider) -> None:
+        response = MagicMock(data=[MagicMock(index=0, embedding=[0.5, 0.25, 1.0])])
+        provider._client.embeddings.create = AsyncMock(return_value=response)
+
+        result = await provider.embed(["hello"])
+
+        assert result.tolist() == [[0.5, 0.25, 1.0]]
 
     async def test_batching(self, provider: OpenAIEmbeddingProvider) -> None:
         """Texts exceeding _MAX_BATCH_SIZE are split into multiple API calls."""
@@ -85,7 +117,7 @@ class TestEmbed:
 
         result = await provider.embed(texts)
 
-        assert len(result) == _MAX_BATCH_SIZE + 10
+        assert result.shape == (_MAX_BATCH_SIZE + 10, 1)
         assert provider._client.embeddings.create.call_count == 2
 
     @patch("py_retrieval.embeddings.logger")
@@ -97,7 +129,274 @@ class TestEmbed:
         with pytest.raises(EmbeddingError, match="Failed to generate embeddings"):
             await provider.embed(["hello"])
 
+    async def test_duplicate_texts_embedded_once(self, provider: OpenAIEmbeddingProvider) -> None:
+        mock_response = _make_embedding_response([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]])
+        provider._client.embeddings.create = AsyncMock(return_value=mock_response)
+
+        result = await provider.embed(["a", "b", "a"])
+
+        np.testing.assert_array_equal(
+            result, np.float32([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.1, 0.2, 0.3]])
+        )
+        assert provider._client.embeddings.create.call_args.kwargs["input"] == ["a", "b"]
+
     async def test_api_key_not_leaked(self) -> None:
         provider = OpenAIEmbeddingProvider(api_key=SecretStr("super-secret"))
         assert "super-secret" not in str(provider._model)
         assert "super-secret" not in repr(provider._dimensions)
+
+
+class TestEmbedWithCache:
+    @pytest.fixture
+    def cache(self) -> InMemoryEmbeddingCache:
+        return InMemoryEmbeddingCache()
+
+    @pytest.fixture
+    def cached_provider(self, cache: InMemoryEmbeddingCache) -> OpenAIEmbeddingProvider:
+        return OpenAIEmbeddingProvider(api_key=SecretStr("test-key"), dimensions=3, cache=cache)
+
+    async def test_only_misses_sent_to_api(
+        self, cached_provider: OpenAIEmbeddingProvider, cache: InMemoryEmbeddingCache
+    ) -> None:
+        key = embedding_cache_key("text-embedding-3-small", 3, "cached")
+        await cache.set_many({key: np.float32([9.0, 9.0, 9.0])})
+        mock_response = _make_embedding_response([[0.1, 0.2, 0.3]])
+        cached_provider._client.embeddings.create = AsyncMock(return_value=mock_response)
+
+        result = await cached_provider.embed(["cached", "fresh"])
+
+        np.testing.assert_array_equal(result, np.float32([[9.0, 9.0, 9.0], [0.1, 0.2, 0.3]]))
+        assert cached_provider._client.embeddings.create.call_args.kwargs["input"] == ["fresh"]
+
+    async def test_all_hits_skip_api(
+        self, cached_provider: OpenAIEmbeddingProvider, cache: InMemoryEmbeddingCache
+    ) -> None:
+        await cache.set_many(
+            {embedding_cache_key("text-embedding-3-small", 3, "a"): np.float32([1.0, 2.0, 3.0])}
+        )
+        cached_provider._client.embeddings.create = AsyncMock()
+
+        result = await cached_provider.embed(["a", "a"])
+
+        assert result.tolist() == [[1.0, 2.0, 3.0], [1.0, 2.0, 3.0]]
+        cached_provider._client.embeddings.create.assert_not_called()
+
+    async def test_misses_written_back(
+        self, cached_provider: OpenAIEmbeddingProvider, cache: InMemoryEmbeddingCache
+    ) -> None:
+        mock_response = _make_embedding_response([[0.1, 0.2, 0.3]])
+        cached_provider._client.embeddings.create = AsyncMock(return_value=mock_response)
+
+        await cached_provider.embed(["fresh"])
+        await cached_provider.embed(["fresh"])
+
+        assert cached_provider._client.embeddings.create.call_count == 1
+        assert len(cache) == 1
+
+    async def test_wrong_dimension_hit_treated_as_miss(
+        self, cached_provider: OpenAIEmbeddingProvider, cache: InMemoryEmbeddingCache
+    ) -> None:
+        key = embedding_cache_key("text-embedding-3-small", 3, "stale")
+        await cache.set_many({key: np.float32([1.0, 2.0, 3.0, 4.0, 5.0])})
+        mock_response = _make_embedding_response([[0.1, 0.2, 0.3]])
+        cached_provider._client.embeddings.create = AsyncMock(return_value=mock_response)
+
+        result = await cached_provider.embed(["stale"])
+
+        np.testing.assert_array_equal(result, np.float32([[0.1, 0.2, 0.3]]))
+
+    @patch("py_retrieval.embeddings.logger")
+    async def test_cache_failure_falls_back_to_api(
+        self, _mock_logger: MagicMock, cached_provider: OpenAIEmbeddingProvider
+    ) -> None:
+        broken_cache = MagicMock()
+        broken_cache.get_many = AsyncMock(side_effect=RuntimeError("cache down"))
+        broken_cache.set_many = AsyncMock(side_effect=RuntimeError("cache down"))
+        cached_provider._cache = broken_cache
+        mock_response = _make_embedding_response([[0.1, 0.2, 0.3]])
+        cached_provider._client.embeddings.create = AsyncMock(return_value=mock_response)
+
+        result = await cached_provider.embed(["hello"])
+
+        np.testing.assert_array_equal(result, np.float32([[0.1, 0.2, 0.3]]))
+
+
+class TestPlanBatches:
+    def test_small_input_skips_tokenizer(self) -> None:
+        counter = MagicMock()
+
+        batches = _plan_batches(["a", "b"], counter, max_tokens=100)
+
+        assert batches == [["a", "b"]]
+        counter.assert_not_called()
+
+    def test_splits_on_token_budget(self) -> None:
+        texts = ["aaaa", "bbbb", "cccc"]
+
+        batches = _plan_batches(texts, lambda: _count_chars, max_tokens=8)
+
+        assert batches == [["aaaa", "bbbb"], ["cccc"]]
+
+    def test_splits_on_item_count(self) -> None:
+        texts = [f"t{i}" for i in range(5)]
+
+        batches = _plan_batches(texts, lambda: _count_chars, max_tokens=1000, max_items=2)
+
+        assert batches == [["t0", "t1"], ["t2", "t3"], ["t4"]]
+
+    def test_oversized_text_sent_alone(self) -> None:
+        batches = _plan_batches(["a", "x" * 50, "b"], lambda: _count_chars, max_tokens=10)
+
+        assert batches == [["a"], ["x" * 50], ["b"]]
+
+
+class TestConcurrentDispatch:
+    async def test_long_texts_split_across_requests(self) -> None:
+        provider = OpenAIEmbeddingProvider(
+            api_key=SecretStr("test-key"),
+            dimensions=1,
+            max_tokens_per_request=10,
+            token_counter=_count_chars,
+        )
+
+        async def _create(**kwargs: object) -> MagicMock:
+            batch = kwargs["input"]
+            assert isinstance(batch, list)
+            return _make_embedding_response([[float(len(t))] for t in batch])
+
+        provider._client.embeddings.create = AsyncMock(side_effect=_create)
+
+        result = await provider.embed(["x" * 6, "y" * 6, "z" * 3])
+
+        assert result.tolist() == [[6.0], [6.0], [3.0]]
+        assert provider._client.embeddings.create.call_count == 2
+
+    async def test_preserves_order_when_batches_finish_out_of_order(self) -> None:
+        provider = OpenAIEmbeddingProvider(
+            api_key=SecretStr("test-key"),
+            dimensions=1,
+            max_tokens_per_request=1,
+            token_counter=_count_chars,
+        )
+
+        async def _create(**kwargs: object) -> MagicMock:
+            batch = kwargs["input"]
+            assert isinstance(batch, list)
+            await asyncio.sleep(0.01 if batch == ["a"] else 0)
+            return _make_embedding_response([[float(ord(batch[0]))]])
+
+        provider._client.embeddings.create = AsyncMock(side_effect=_create)
+
+        result = await provider.embed(["a", "b", "c"])
+
+        assert result.tolist() == [[97.0], [98.0], [99.0]]
+
+    async def test_respects_max_concurrency(self) -> None:
+        provider = OpenAIEmbeddingProvider(
+            api_key=SecretStr("test-key"),
+            dimensions=1,
+            max_concurrency=2,
+            max_tokens_per_request=1,
+            token_counter=_count_chars,
+        )
+        in_flight = 0
+        peak = 0
+
+        async def _create(**kwargs: object) -> MagicMock:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _make_embedding_response([[1.0]])
+
+        provider._client.embeddings.create = AsyncMock(side_effect=_create)
+
+        await provider.embed(["a", "b", "c", "d", "e"])
+
+        assert peak == 2
+
+    @patch("py_retrieval.embeddings.logger")
+    async def test_rate_limit_reduces_concurrency(self, _mock_logger: MagicMock) -> None:
+        provider = OpenAIEmbeddingProvider(
+            api_key=SecretStr("test-key"), dimensions=1, max_concurrency=8
+        )
+        rate_limited = openai.RateLimitError(
+            "slow down",
+            response=httpx.Response(429, request=httpx.Request("POST", "https://api.test")),
+            body=None,
+        )
+        provider._client.embeddings.create = AsyncMock(
+            side_effect=[rate_limited, _make_embedding_response([[1.0]])]
+        )
+
+        with patch("asyncio.sleep", new_callable=AsyncMock):
+            result = await provider.embed(["a"])
+
+        assert result.tolist() == [[1.0]]
+        assert provider._concurrency == 5  # halved to 4, then +1 on success
+
+    def test_rejects_non_positive_concurrency(self) -> None:
+        with pytest.raises(ValueError, match="max_concurrency"):
+            OpenAIEmbeddingProvider(api_key=SecretStr("test-key"), max_concurrency=0)
+
+
+class TestAdaptiveLimiter:
+    def test_halves_on_rate_limit_with_floor_of_one(self) -> None:
+        limiter = _AdaptiveLimiter(limit=4, max_limit=4)
+        with patch("py_retrieval.embeddings.logger"):
+            limiter.on_rate_limit()
+            assert limiter.limit == 2
+            limiter.on_rate_limit()
+            limiter.on_rate_limit()
+        assert limiter.limit == 1
+
+    def test_grows_back_to_max(self) -> None:
+        limiter = _AdaptiveLimiter(limit=1, max_limit=2)
+        limiter.on_success()
+        limiter.on_success()
+        assert limiter.limit == 2
+
+
+class TestHashingEmbeddingProvider:
+    async def test_returns_unit_float32_matrix(self) -> None:
+        provider = HashingEmbeddingProvider(dimensions=64)
+
+        result = await provider.embed(["Apple revenue growth", "weather in Paris"])
+
+        assert result.shape == (2, 64)
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(np.linalg.norm(result, axis=1), 1.0, rtol=1e-6)
+
+    async def test_is_deterministic_per_seed(self) -> None:
+        texts = ["AAPL revenue growth drivers"]
+
+        first = await HashingEmbeddingProvider(dimensions=64, seed=1).embed(texts)
+        again = await HashingEmbeddingProvider(dimensions=64, seed=1).embed(texts)
+        other = await HashingEmbeddingProvider(dimensions=64, seed=2).embed(texts)
+
+        np.testing.assert_array_equal(first, again)
+        assert not np.array_equal(first, other)
+
+    async def test_shared_words_mean_higher_similarity(self) -> None:
+        provider = HashingEmbeddingProvider(dimensions=256)
+
+        a, b, c = await provider.embed(
+            ["Apple revenue growth", "apple REVENUE growth drivers", "weather in Paris"]
+        )
+
+        assert a @ b > 0.5
+        assert abs(a @ c) < 0.3
+
+    async def test_text_without_words_is_zero(self) -> None:
+        result = await HashingEmbeddingProvider(dimensions=8).embed(["", "!!"])
+
+        assert not result.any()
+
+    async def test_empty_input(self) -> None:
+        result = await HashingEmbeddingProvider(dimensions=8).embed([])
+
+        assert result.shape == (0, 8)
+
+    def test_satisfies_protocol(self) -> None:
+        assert isinstance(HashingEmbeddingProvider(), EmbeddingProvider)
@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+from pathlib import Path
+
 import pytest
 from pydantic import SecretStr
 
+from py_retrieval.embeddings import HashingEmbeddingProvider
 from py_retrieval.exceptions import VectorStoreError
 from py_retrieval.factory import create_vector_store
+from py_retrieval.file_store import FileVectorStore
+from py_retrieval.memory_store import InMemoryVectorStore
 from py_retrieval.models import VectorStoreConfig
 from py_retrieval.pinecone_store import PineconeVectorStore
 from py_retrieval.protocols import VectorStore
@@ -45,11 +50,38 @@ class TestCreateVectorStore:
             api_key=SecretStr("key"),
             index_name="idx",
         )
-        with pytest.raises(VectorStoreError, match="Supported: pinecone"):
+        with pytest.raises(
+            VectorStoreError, match="Supported: file, hnsw, memory, pinecone, quantized"
+        ):
             create_vector_store(config)
 
+    def test_creates_memory_store(self) -> None:
+        config = VectorStoreConfig(provider="memory", api_key=SecretStr("key"), index_name="idx")
+        store = create_vector_store(config)
+        assert isinstance(store, InMemoryVectorStore)
+        assert isinstance(store, VectorStore)
+
+    def test_creates_file_store(self, tmp_path: Path) -> None:
+        config = VectorStoreConfig(
+            provider="file", api_key=SecretStr("key"), index_name="idx", storage_path=str(tmp_path)
+        )
+        store = create_vector_store(config)
+        assert isinstance(store, FileVectorStore)
+        assert isinstance(store, VectorStore)
+
     def test_passes_config_to_store(self, pinecone_config: VectorStoreConfig) -> None:
         store = create_vector_store(pinecone_config)
         assert isinstance(store, PineconeVectorStore)
         assert store._config.index_name == "test-index"
         assert store._config.embedding_model == "text-embedding-3-small"
+
+    def test_hashing_embedding_provider_runs_offline(self) -> None:
+        config = VectorStoreConfig(
+            provider="memory",
+            api_key=SecretStr("key"),
+            index_name="idx",
+            embedding_provider="hashing",
+        )
+        store = create_vector_store(config)
+        assert isinstance(store, InMemoryVectorStore)
+        assert isinstance(store._embedding_provider, HashingEmbeddingProvider)
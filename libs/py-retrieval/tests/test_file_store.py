@@ -0,0 +1,172 @@
+"""Tests for FileVectorStore."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+from pydantic import SecretStr
+
+from py_retrieval.exceptions import VectorStoreConnectionError, VectorStoreError
+from py_retrieval.file_store import FileVectorStore
+from py_retrieval.models import Document, VectorStoreConfig
+from py_retrieval.protocols import VectorStore
+
+
+def _config(tmp_path: Path, **overrides: object) -> VectorStoreConfig:
+    return VectorStoreConfig(
+        provider="file",
+        api_key=SecretStr("test-key"),
+        index_name="test-index",
+        embedding_dimensions=3,
+        storage_path=str(tmp_path),
+        **overrides,
+    )
+
+
+def _store(tmp_path: Path, **overrides: object) -> FileVectorStore:
+    provider = AsyncMock()
+    provider.embed = AsyncMock(return_value=np.array([[1.0, 0.0, 0.0]], dtype=np.float32))
+    return FileVectorStore(config=_config(tmp_path, **overrides), embedding_provider=provider)
+
+
+def _docs() -> list[Document]:
+    return [
+        Document(id="x", text="x axis", vector=[1.0, 0.0, 0.0], metadata={"ticker": "AAPL"}),
+        Document(id="y", text="y axis", vector=[0.0, 2.0, 0.0], metadata={"ticker": "MSFT"}),
+        Document(id="xy", text="diagonal", vector=[1.0, 1.0, 0.0], metadata={"ticker": "AAPL"}),
+    ]
+
+
+class TestFileVectorStore:
+    def test_satisfies_protocol(self, tmp_path: Path) -> None:
+        assert isinstance(_store(tmp_path), VectorStore)
+
+    def test_requires_storage_path(self) -> None:
+        config = VectorStoreConfig(provider="file", api_key=SecretStr("k"), index_name="idx")
+        with pytest.raises(VectorStoreError, match="requires storage_path"):
+            FileVectorStore(config=config, embedding_provider=AsyncMock())
+
+    async def test_query_ranks_and_filters(self, tmp_path: Path) -> None:
+        async with _store(tmp_path) as store:
+            await store.upsert(_docs())
+            ranked = await store.query("x", top_k=2)
+            filtered = await store.query("x", top_k=5, filters={"ticker": "MSFT"})
+
+        assert [r.id for r in ranked] == ["x", "xy"]
+        assert ranked[0].score == pytest.approx(1.0)
+        assert ranked[0].text == "x axis"
+        assert [r.id for r in filtered] == ["y"]
+
+    async def test_query_many_and_query_by_vector(self, tmp_path: Path) -> None:
+        store = _store(tmp_path)
+        store._embedding_provider.embed.return_value = np.array(
+            [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32
+        )
+        async with store:
+            await store.upsert(_docs())
+            many = await store.query_many(["x", "y"], top_k=1)
+            by_vector = await store.query_by_vector([0.0, 1.0, 0.0], top_k=1)
+
+        assert [[r.id for r in batch] for batch in many] == [["x"], ["y"]]
+        assert [r.id for r in by_vector] == ["y"]
+
+    async def test_persists_across_reopen(self, tmp_path: Path) -> None:
+        async with _store(tmp_path) as store:
+            await store.upsert(_docs())
+
+        async with _store(tmp_path) as reopened:
+            results = await reopened.query("x", top_k=1)
+
+        assert len(reopened) == 0  # state is released on exit
+        assert results[0].id == "x"
+        assert results[0].metadata == {"ticker": "AAPL"}
+
+    async def test_float16_segment(self, tmp_path: Path) -> None:
+        async with _store(tmp_path, vector_dtype="float16") as store:
+            await store.upsert(_docs())
+            results = await store.query("x", top_k=1)
+
+        segment = tmp_path / "test-index" / "vectors-0.bin"
+        assert segment.stat().st_size == 3 * 3 * np.dtype(np.float16).itemsize
+        assert results[0].score == pytest.approx(1.0, abs=1e-3)
+
+    async def test_overwrite_and_delete_leave_dead_rows_until_compaction(
+        self, tmp_path: Path
+    ) -> None:
+        async with _store(tmp_path) as store:
+            await store.upsert(_docs())
+            await store.upsert([Document(id="y", text="moved", vector=[0.0, 0.0, 1.0])])
+            await store.delete(["x", "unknown"])
+
+            assert len(store) == 2
+            assert store.dead_rows == 2
+
+            reclaimed = await store.compact()
+            results = await store.query("x", top_k=5)
+
+            assert reclaimed == 2
+            assert store.dead_rows == 0
+            assert [r.id for r in results] == ["xy", "y"]
+            assert next(r for r in results if r.id == "y").text == "moved"
+
+        files = sorted(p.name for p in (tmp_path / "test-index").iterdir())
+        assert files == ["manifest.json", "records-1.jsonl", "vectors-1.bin"]
+
+    async def test_compact_without_dead_rows_is_noop(self, tmp_path: Path) -> None:
+        async with _store(tmp_path) as store:
+            await store.upsert(_docs())
+            assert await store.compact() == 0
+
+    async def test_read_only_reader_sees_writer_after_refresh(self, tmp_path: Path) -> None:
+        async with _store(tmp_path) as writer:
+            await writer.upsert(_docs()[:1])
+            async with _store(tmp_path, read_only=True) as reader:
+                assert len(reader) == 1
+
+                await writer.upsert(_docs()[1:])
+                await writer.delete(["x"])
+                await reader.refresh()
+
+                assert len(reader) == 2
+                assert [r.id for r in await reader.query("x", top_k=5)] == ["xy", "y"]
+
+    async def test_read_only_rejects_writes(self, tmp_path: Path) -> None:
+        async with _store(tmp_path) as writer:
+            await writer.upsert(_docs())
+
+        async with _store(tmp_path, read_only=True) as reader:
+            with pytest.raises(VectorStoreError, match="read-only"):
+                await reader.upsert(_docs())
+            with pytest.raises(VectorStoreError, match="read-only"):
+                await reader.delete(["x"])
+
+    async def test_read_only_missing_index_raises(self, tmp_path: Path) -> None:
+        with pytest.raises(VectorStoreConnectionError, match="No vector index"):
+            async with _store(tmp_path, read_only=True):
+                pass
+
+    async def test_dimension_mismatch_on_open_raises(self, tmp_path: Path) -> None:
+        async with _store(tmp_path) as store:
+            await store.upsert(_docs())
+
+        config = _config(tmp_path).model_copy(update={"embedding_dimensions": 4})
+        with pytest.raises(VectorStoreConnectionError, match="3-d float32"):
+            async with FileVectorStore(config=config, embedding_provider=AsyncMock()):
+                pass
+
+    async def test_ignores_torn_writes(self, tmp_path: Path) -> None:
+        async with _store(tmp_path) as store:
+            await store.upsert(_docs())
+
+        root = tmp_path / "test-index"
+        with (root / "vectors-0.bin").open("ab") as segment:
+            segment.write(b"\x00\x01")
+        with (root / "records-0.jsonl").open("a") as log:
+            log.write('{"op": "put", "id": "partial"')
+
+        async with _store(tmp_path) as reopened:
+            assert len(reopened) == 3
+            assert reopened.dead_rows == 0
@@ -0,0 +1,61 @@
+"""Tests for Pinecone-style metadata filter evaluation."""
+
+from __future__ import annotations
+
+import pytest
+
+from py_retrieval.exceptions import VectorStoreError
+from py_retrieval.filters import matches_filter
+
+METADATA = {"ticker": "AAPL", "year": 2024, "filing_type": "10-K", "tags": "earnings"}
+
+
+class TestMatchesFilter:
+    @pytest.mark.parametrize("filters", [None, {}])
+    def test_empty_filter_matches(self, filters: dict | None) -> None:
+        assert matches_filter(METADATA, filters)
+
+    def test_bare_value_is_equality(self) -> None:
+        assert matches_filter(METADATA, {"ticker": "AAPL"})
+        assert not matches_filter(METADATA, {"ticker": "MSFT"})
+
+    @pytest.mark.parametrize(
+        ("condition", "expected"),
+        [
+            ({"$eq": 2024}, True),
+            ({"$ne": 2024}, False),
+            ({"$gt": 2023}, True),
+            ({"$gte": 2024}, True),
+            ({"$lt": 2024}, False),
+            ({"$lte": 2024}, True),
+            ({"$in": [2023, 2024]}, True),
+            ({"$nin": [2023, 2024]}, False),
+            ({"$gte": 2020, "$lt": 2025}, True),
+        ],
+    )
+    def test_comparison_operators(self, condition: dict, expected: bool) -> None:
+        assert matches_filter(METADATA, {"year": condition}) is expected
+
+    def test_multiple_fields_are_anded(self) -> None:
+        assert matches_filter(METADATA, {"ticker": "AAPL", "filing_type": "10-K"})
+        assert not matches_filter(METADATA, {"ticker": "AAPL", "filing_type": "10-Q"})
+
+    def test_logical_operators(self) -> None:
+        assert matches_filter(METADATA, {"$or": [{"ticker": "MSFT"}, {"year": {"$gte": 2024}}]})
+        assert not matches_filter(METADATA, {"$and": [{"ticker": "AAPL"}, {"year": 2023}]})
+
+    def test_exists(self) -> None:
+        assert matches_filter(METADATA, {"ticker": {"$exists": True}})
+        assert matches_filter(METADATA, {"source": {"$exists": False}})
+
+    def test_missing_field_only_satisfies_negations(self) -> None:
+        assert not matches_filter(METADATA, {"source": "edgar"})
+        assert matches_filter(METADATA, {"source": {"$ne": "edgar"}})
+        assert matches_filter(METADATA, {"source": {"$nin": ["edgar"]}})
+
+    def test_incomparable_types_do_not_match(self) -> None:
+        assert not matches_filter(METADATA, {"ticker": {"$gt": 5}})
+
+    def test_unknown_operator_raises(self) -> None:
+        with pytest.raises(VectorStoreError, match="Unsupported filter operator"):
+            matches_filter(METADATA, {"year": {"$regex": "20.*"}})
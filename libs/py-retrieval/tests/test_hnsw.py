@@ -0,0 +1,252 @@
+"""Tests for the HNSW index and HNSWVectorStore."""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+from pydantic import SecretStr
+
+from py_retrieval import hnsw
+from py_retrieval.benchmarks import benchmark_hnsw, exact_top_k, recall_at_k, synthetic_vectors
+from py_retrieval.exceptions import VectorStoreConnectionError, VectorStoreError
+from py_retrieval.hnsw import HNSWIndex, HNSWVectorStore
+from py_retrieval.models import Document, VectorStoreConfig
+from py_retrieval.protocols import VectorStore
+
+
+@pytest.fixture(scope="module")
+def corpus() -> np.ndarray:
+    return synthetic_vectors(1200, 32, clusters=16, seed=7)
+
+
+@pytest.fixture(scope="module")
+def index(corpus: np.ndarray) -> HNSWIndex:
+    index = HNSWIndex(32, m=8, ef_construction=64, seed=1)
+    for vector in corpus[:1000]:
+        index.add(vector)
+    return index
+
+
+@pytest.fixture
+def config() -> VectorStoreConfig:
+    return VectorStoreConfig(
+        provider="hnsw",
+        api_key=SecretStr("test-key"),
+        index_name="test-index",
+        embedding_dimensions=3,
+    )
+
+
+@pytest.fixture
+def mock_embedding_provider() -> AsyncMock:
+    provider = AsyncMock()
+    provider.embed = AsyncMock(return_value=np.array([[1.0, 0.0, 0.0]], dtype=np.float32))
+    return provider
+
+
+@pytest.fixture
+def store(config: VectorStoreConfig, mock_embedding_provider: AsyncMock) -> HNSWVectorStore:
+    return HNSWVectorStore(config=config, embedding_provider=mock_embedding_provider)
+
+
+def _docs() -> list[Document]:
+    return [
+        Document(id="x", text="x axis", vector=[1.0, 0.0, 0.0], metadata={"ticker": "AAPL"}),
+        Document(id="y", text="y axis", vector=[0.0, 2.0, 0.0], metadata={"ticker": "MSFT"}),
+        Document(id="xy", text="diagonal", vector=[1.0, 1.0, 0.0], metadata={"ticker": "AAPL"}),
+    ]
+
+
+class TestHNSWIndex:
+    def test_recall_against_brute_force(self, index: HNSWIndex, corpus: np.ndarray) -> None:
+        queries = corpus[1000:]
+        found = [[label for _, label in index.search(q, 10, ef=64)] for q in queries]
+
+        assert recall_at_k(found, exact_top_k(corpus[:1000], queries, 10)) >= 0.95
+
+    def test_results_are_sorted_best_first(self, index: HNSWIndex, corpus: np.ndarray) -> None:
+        hits = index.search(corpus[0], 5)
+
+        assert hits[0] == (pytest.approx(1.0), 0)
+        assert [s for s, _ in hits] == sorted((s for s, _ in hits), reverse=True)
+
+    def test_upper_layers_respect_link_limits(self, index: HNSWIndex) -> None:
+        for node_links in index._links:
+            assert len(node_links[0]) <= 2 * index.m
+            assert all(len(layer) <= index.m for layer in node_links[1:])
+
+    def test_deleted_labels_are_never_returned(self, corpus: np.ndarray) -> None:
+        index = HNSWIndex(32, m=8, ef_construction=32, seed=2)
+        for vector in corpus[:200]:
+            index.add(vector)
+        for label in range(0, 200, 2):
+            index.mark_deleted(label)
+
+        hits = index.search(corpus[0], 10)
+
+        assert len(index) == 100
+        assert len(hits) == 10
+        assert all(label % 2 == 1 for _, label in hits)
+
+    def test_accept_predicate_restricts_results(self, index: HNSWIndex, corpus: np.ndarray) -> None:
+        hits = index.search(corpus[0], 5, accept=lambda label: label >= 500)
+
+        assert hits
+        assert all(label >= 500 for _, label in hits)
+
+    def test_empty_index(self) -> None:
+        assert HNSWIndex(4).search([1.0, 0.0, 0.0, 0.0], 3) == []
+
+    def test_rejects_wrong_dimensions(self) -> None:
+        with pytest.raises(ValueError, match="4-dimensional"):
+            HNSWIndex(4).add([1.0, 0.0])
+
+    def test_save_load_roundtrip(self, corpus: np.ndarray, tmp_path: Path) -> None:
+        index = HNSWIndex(32, m=8, ef_construction=32, seed=3)
+        for vector in corpus[:300]:
+            index.add(vector)
+        index.mark_deleted(5)
+        path = tmp_path / "graph.npz"
+
+        index.save(path)
+        loaded = HNSWIndex.load(path)
+
+        assert len(loaded) == 299
+        assert loaded.is_deleted(5)
+        assert loaded._links == index._links
+        assert loaded.search(corpus[7], 5) == index.search(corpus[7], 5)
+        assert loaded.add(corpus[300]) == 300
+
+
+class TestBenchmark:
+    def test_benchmark_reports_each_ef(self) -> None:
+        data = synthetic_vectors(320, 16, clusters=8)
+
+        results = benchmark_hnsw(data[:300], data[300:], k=5, m=8, ef_search=(8, 32))
+
+        assert [r.ef_search for r in results] == [8, 32]
+        assert results[1].recall >= results[0].recall
+        assert results[1].recall >= 0.9
+
+
+class TestHNSWVectorStore:
+    def test_satisfies_protocol(self, store: HNSWVectorStore) -> None:
+        assert isinstance(store, VectorStore)
+
+    async def test_query_ranks_by_cosine_similarity(self, store: HNSWVectorStore) -> None:
+        await store.upsert(_docs())
+
+        results = await store.query("x", top_k=2)
+
+        assert [r.id for r in results] == ["x", "xy"]
+        assert results[0].score == pytest.approx(1.0)
+        assert results[1].score == pytest.approx(2**-0.5)
+        assert results[0].metadata == {"ticker": "AAPL"}
+
+    async def test_query_applies_filters(self, store: HNSWVectorStore) -> None:
+        await store.upsert(_docs())
+
+        results = await store.query("x", top_k=5, filters={"ticker": "MSFT"})
+
+        assert [r.id for r in results] == ["y"]
+
+    @pytest.mark.parametrize("exact_limit", [0, 2048])
+    async def test_filters_use_current_metadata(
+        self, store: HNSWVectorStore, monkeypatch: pytest.MonkeyPatch, exact_limit: int
+    ) -> None:
+        monkeypatch.setattr(hnsw, "_EXACT_SEARCH_LABELS", exact_limit)
+        await store.upsert(_docs())
+        await store.upsert([Document(id="x", text="x", vector=[1.0, 0.0, 0.0], metadata={})])
+
+        results = await store.query("x", top_k=5, filters={"ticker": "AAPL"})
+
+        assert [r.id for r in results] == ["xy"]
+
+    async def test_query_many_and_query_by_vector(
+        self, store: HNSWVectorStore, mock_embedding_provider: AsyncMock
+    ) -> None:
+        await store.upsert(_docs())
+        mock_embedding_provider.embed.reset_mock()
+        mock_embedding_provider.embed.return_value = np.array(
+            [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32
+        )
+
+        many = await store.query_many(["x", "y"], top_k=1)
+        by_vector = await store.query_by_vector([0.0, 1.0, 0.0], top_k=1)
+
+        mock_embedding_provider.embed.assert_called_once_with(["x", "y"])
+        assert [[r.id for r in batch] for batch in many] == [["x"], ["y"]]
+        assert [r.id for r in by_vector] == ["y"]
+
+    async def test_search_runs_off_the_event_loop(
+        self, store: HNSWVectorStore, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        await store.upsert(_docs())
+        threads: list[threading.Thread] = []
+        search = store._index.search
+
+        def recording_search(*args: Any, **kwargs: Any) -> Any:
+            threads.append(threading.current_thread())
+            return search(*args, **kwargs)
+
+        monkeypatch.setattr(store._index, "search", recording_search)
+
+        results = await store.query("x", top_k=1)
+
+        assert [r.id for r in results] == ["x"]
+        assert threads and threads[0] is not threading.main_thread()
+
+    async def test_upsert_overwrites_existing_id(self, store: HNSWVectorStore) -> None:
+        await store.upsert(_docs())
+        await store.upsert([Document(id="y", text="moved", vector=[1.0, 0.0, 0.0])])
+
+        results = await store.query("x", top_k=3)
+
+        assert len(store) == 3
+        assert next(r for r in results if r.id == "y").text == "moved"
+
+    async def test_delete_hides_documents(self, store: HNSWVectorStore) -> None:
+        await store.upsert(_docs())
+
+        await store.delete(["x", "unknown"])
+        results = await store.query("x", top_k=5)
+
+        assert len(store) == 2
+        assert [r.id for r in results] == ["xy", "y"]
+
+    async def test_upsert_rejects_wrong_dimensions(self, store: HNSWVectorStore) -> None:
+        with pytest.raises(VectorStoreError, match="3-dimensional"):
+            await store.upsert([Document(id="bad", text="bad", vector=[1.0, 0.0])])
+
+    async def test_persists_across_reopen(
+        self, config: VectorStoreConfig, mock_embedding_provider: AsyncMock, tmp_path: Path
+    ) -> None:
+        config.storage_path = str(tmp_path)
+        async with HNSWVectorStore(config, mock_embedding_provider) as store:
+            await store.upsert(_docs())
+            await store.delete(["xy"])
+
+        async with HNSWVectorStore(config, mock_embedding_provider) as reopened:
+            results = await reopened.query("x", top_k=5)
+
+        assert [r.id for r in results] == ["x", "y"]
+        assert (tmp_path / "test-index" / "graph.npz").exists()
+
+    async def test_read_only_requires_existing_index(
+        self, config: VectorStoreConfig, mock_embedding_provider: AsyncMock, tmp_path: Path
+    ) -> None:
+        config.storage_path = str(tmp_path)
+        config.read_only = True
+
+        with pytest.raises(VectorStoreConnectionError, match="No vector index"):
+            async with HNSWVectorStore(config, mock_embedding_provider):
+                pass
+
+    async def test_save_requires_storage_path(self, store: HNSWVectorStore) -> None:
+        with pytest.raises(VectorStoreError, match="no storage_path"):
+            await store.save()
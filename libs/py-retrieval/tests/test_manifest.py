@@ -0,0 +1,176 @@
+"""Tests for content IDs, IndexManifest and sync_documents."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+from pydantic import SecretStr
+
+from py_retrieval.embeddings import HashingEmbeddingProvider
+from py_retrieval.exceptions import VectorStoreError
+from py_retrieval.manifest import IndexManifest, content_hash, content_id, sync_documents
+from py_retrieval.memory_store import InMemoryVectorStore
+from py_retrieval.models import Document, VectorStoreConfig
+
+
+@pytest.fixture
+def provider() -> AsyncMock:
+    hashing = HashingEmbeddingProvider(dimensions=16)
+    provider = AsyncMock()
+    provider.embed = AsyncMock(side_effect=hashing.embed)
+    return provider
+
+
+@pytest.fixture
+def store(provider: AsyncMock) -> InMemoryVectorStore:
+    config = VectorStoreConfig(
+        provider="memory",
+        api_key=SecretStr("test-key"),
+        index_name="test-index",
+        embedding_dimensions=16,
+    )
+    return InMemoryVectorStore(config, provider)
+
+
+@pytest.fixture
+def manifest(tmp_path: Path) -> IndexManifest:
+    return IndexManifest.load(tmp_path / "index" / "manifest.json")
+
+
+def _corpus() -> list[Document]:
+    return [
+        Document(id="a", text="alpha"),
+        Document(id="b", text="beta"),
+        Document(text="gamma", metadata={"page": 1}),
+    ]
+
+
+def _embedded_texts(provider: AsyncMock) -> list[str]:
+    return [text for call in provider.embed.call_args_list for text in call.args[0]]
+
+
+class TestContentIds:
+    def test_same_content_same_id(self) -> None:
+        assert content_id(Document(text="x", metadata={"a": 1, "b": 2})) == content_id(
+            Document(text="x", metadata={"b": 2, "a": 1})
+        )
+
+    def test_text_and_metadata_change_the_id(self) -> None:
+        base = content_id(Document(text="x"))
+
+        assert content_id(Document(text="y")) != base
+        assert content_id(Document(text="x", metadata={"page": 2})) != base
+
+    def test_hash_ignores_id(self) -> None:
+        assert content_hash(Document(id="1", text="x")) == content_hash(Document(text="x"))
+
+
+class TestIndexManifest:
+    def test_missing_file_loads_empty(self, manifest: IndexManifest) -> None:
+        assert manifest.entries == {}
+        assert manifest.index_version is None
+
+    def test_save_load_roundtrip(self, manifest: IndexManifest) -> None:
+        manifest.index_version = "v1"
+        manifest.entries = {"a": "hash"}
+
+        manifest.save()
+        loaded = IndexManifest.load(manifest.path)
+
+        assert loaded.index_version == "v1"
+        assert loaded.entries == {"a": "hash"}
+        assert [p.name for p in manifest.path.parent.iterdir()] == ["manifest.json"]
+
+    def test_rejects_unknown_format(self, tmp_path: Path) -> None:
+        path = tmp_path / "manifest.json"
+        path.write_text(json.dumps({"format": 99}))
+
+        with pytest.raises(ValueError, match="Unsupported manifest format"):
+            IndexManifest.load(path)
+
+
+class TestSyncDocuments:
+    async def test_first_run_indexes_everything(
+        self, store: InMemoryVectorStore, manifest: IndexManifest
+    ) -> None:
+        result = await sync_documents(store, _corpus(), manifest, "v1")
+
+        assert len(result.upserted) == 3
+        assert len(store) == 3
+        assert IndexManifest.load(manifest.path).entries == manifest.entries
+        assert len(manifest.entries) == 3
+
+    async def test_unchanged_corpus_is_not_re_embedded(
+        self, store: InMemoryVectorStore, manifest: IndexManifest, provider: AsyncMock
+    ) -> None:
+        await sync_documents(store, _corpus(), manifest, "v1")
+        provider.embed.reset_mock()
+
+        result = await sync_documents(store, _corpus(), manifest, "v1")
+
+        assert result.upserted == []
+        assert len(result.unchanged) == 3
+        provider.embed.assert_not_called()
+
+    async def test_only_changed_and_new_documents_are_written(
+        self, store: InMemoryVectorStore, manifest: IndexManifest, provider: AsyncMock
+    ) -> None:
+        await sync_documents(store, _corpus(), manifest, "v1")
+        provider.embed.reset_mock()
+        corpus = _corpus()
+        corpus[0] = Document(id="a", text="alpha, revised")
+        corpus.append(Document(id="d", text="delta"))
+
+        result = await sync_documents(store, corpus, manifest, "v1")
+
+        assert result.upserted == ["a", "d"]
+        assert _embedded_texts(provider) == ["alpha, revised", "delta"]
+
+    async def test_orphans_are_deleted(
+        self, store: InMemoryVectorStore, manifest: IndexManifest
+    ) -> None:
+        await sync_documents(store, _corpus(), manifest, "v1")
+
+        result = await sync_documents(store, _corpus()[1:], manifest, "v1")
+
+        assert result.deleted == ["a"]
+        assert len(store) == 2
+        assert "a" not in manifest.entries
+
+    async def test_orphans_stay_tracked_when_not_deleted(
+        self, store: InMemoryVectorStore, manifest: IndexManifest
+    ) -> None:
+        await sync_documents(store, _corpus(), manifest, "v1")
+
+        result = await sync_documents(store, _corpus()[1:], manifest, "v1", delete_orphans=False)
+
+        assert result.deleted == []
+        assert len(store) == 3
+        assert "a" in manifest.entries
+
+    async def test_new_index_version_re_upserts_everything(
+        self, store: InMemoryVectorStore, manifest: IndexManifest
+    ) -> None:
+        await sync_documents(store, _corpus(), manifest, "v1")
+
+        result = await sync_documents(store, _corpus(), manifest, "v2")
+
+        assert len(result.upserted) == 3
+        assert manifest.index_version == "v2"
+
+    async def test_partial_failure_records_written_documents(self, manifest: IndexManifest) -> None:
+        failing = AsyncMock()
+        failing.upsert = AsyncMock(
+            side_effect=VectorStoreError(
+                "Upsert failed for 1 of 2 documents",
+                details={"succeeded_ids": ["a"], "failed_ids": ["b"]},
+            )
+        )
+
+        with pytest.raises(VectorStoreError):
+            await sync_documents(failing, _corpus()[:2], manifest, "v1")
+
+        assert list(IndexManifest.load(manifest.path).entries) == ["a"]
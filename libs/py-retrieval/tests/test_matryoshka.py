@@ -0,0 +1,149 @@
+"""Tests for Matryoshka two-stage search in the memory and file stores."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+from pydantic import SecretStr, ValidationError
+
+from py_retrieval.exceptions import VectorStoreError
+from py_retrieval.factory import create_vector_store
+from py_retrieval.file_store import FileVectorStore
+from py_retrieval.memory_store import InMemoryVectorStore
+from py_retrieval.models import Document, VectorStoreConfig
+from py_retrieval.similarity import normalize, two_stage_scores
+
+DIMENSIONS = 64
+
+
+def _config(provider: str = "memory", **overrides: object) -> VectorStoreConfig:
+    return VectorStoreConfig(
+        provider=provider,
+        api_key=SecretStr("test-key"),
+        index_name="test-index",
+        embedding_dimensions=DIMENSIONS,
+        **overrides,
+    )
+
+
+def _vectors(count: int, seed: int = 0) -> np.ndarray:
+    # Decaying per-dimension scale mimics Matryoshka embeddings front-loading information
+    rng = np.random.default_rng(seed)
+    scale = np.geomspace(1.0, 0.05, DIMENSIONS)
+    return (rng.standard_normal((count, DIMENSIONS)) * scale).astype(np.float32)
+
+
+def _docs(vectors: np.ndarray) -> list[Document]:
+    return [
+        Document(id=f"doc-{i}", text=f"document {i}", vector=vector, metadata={"odd": i % 2})
+        for i, vector in enumerate(vectors)
+    ]
+
+
+def _exact_ids(vectors: np.ndarray, ids: list[str], query: np.ndarray, top_k: int) -> list[str]:
+    scores = normalize(vectors) @ normalize(query)
+    return [ids[i] for i in np.argsort(-scores)[:top_k]]
+
+
+class TestTwoStageScores:
+    def test_rescores_only_the_shortlist(self) -> None:
+        coarse = np.float32([[0.1], [0.9], [0.5], [0.7]])
+        calls = []
+
+        def exact(positions: np.ndarray, j: int) -> np.ndarray:
+            calls.append(sorted(positions.tolist()))
+            return np.float32([10.0] * len(positions))
+
+        scores = two_stage_scores(coarse, exact, shortlist=2)
+
+        assert calls == [[1, 3]]
+        assert scores[:, 0].tolist() == [-np.inf, 10.0, -np.inf, 10.0]
+
+    def test_keep_coarse_fills_unranked_rows(self) -> None:
+        coarse = np.float32([[0.1], [0.9]])
+
+        scores = two_stage_scores(coarse, lambda p, j: np.float32([2.0]), 1, keep_coarse=True)
+
+        np.testing.assert_allclose(scores[:, 0], [0.1, 2.0])
+
+
+class TestTwoStageStores:
+    async def test_memory_store_recalls_exact_ranking(self) -> None:
+        vectors = _vectors(500)
+        store = InMemoryVectorStore(
+            _config(coarse_dimensions=16, coarse_candidates=50), AsyncMock()
+        )
+        await store.upsert(_docs(vectors))
+        ids = [f"doc-{i}" for i in range(len(vectors))]
+
+        hits = 0
+        for query in _vectors(20, seed=1):
+            results = await store.query_by_vector(query, top_k=5)
+            hits += len({r.id for r in results} & set(_exact_ids(vectors, ids, query, 5)))
+            # Returned scores are full-width cosine similarities, not prefix scores
+            for result in results:
+                row = vectors[int(result.id.split("-")[1])]
+                expected = float(normalize(row) @ normalize(query))
+                assert result.score == pytest.approx(expected, rel=1e-5)
+
+        assert hits / 100 >= 0.9
+
+    async def test_memory_store_keeps_prefixes_aligned_through_deletes(self) -> None:
+        vectors = _vectors(300)
+        store = InMemoryVectorStore(
+            _config(coarse_dimensions=16, coarse_candidates=40), AsyncMock()
+        )
+        await store.upsert(_docs(vectors))
+
+        await store.delete([f"doc-{i}" for i in range(0, 300, 3)])
+        kept = [i for i in range(300) if i % 3]
+        query = _vectors(1, seed=2)[0]
+        results = await store.query_by_vector(query, top_k=5, filters={"odd": 1})
+
+        odd = [i for i in kept if i % 2]
+        assert [r.id for r in results] == _exact_ids(
+            vectors[odd], [f"doc-{i}" for i in odd], query, 5
+        )
+        for result in results:
+            expected = normalize(vectors[int(result.id.split("-")[1])]) @ normalize(query)
+            assert result.score == pytest.approx(float(expected), rel=1e-5)
+
+    async def test_file_store_rebuilds_prefixes_on_reopen(self, tmp_path: Path) -> None:
+        vectors = _vectors(400)
+        overrides = {"coarse_dimensions": 16, "coarse_candidates": 50}
+        config = _config(provider="file", storage_path=str(tmp_path), **overrides)
+        async with FileVectorStore(config, AsyncMock()) as store:
+            await store.upsert(_docs(vectors[:200]))
+            await store.upsert(_docs(vectors)[200:])
+        memory = InMemoryVectorStore(_config(**overrides), AsyncMock())
+        await memory.upsert(_docs(vectors))
+
+        async with FileVectorStore(config, AsyncMock()) as reopened:
+            for query in _vectors(5, seed=3):
+                results = await reopened.query_by_vector(query, top_k=5)
+                expected = await memory.query_by_vector(query, top_k=5)
+                assert [r.id for r in results] == [r.id for r in expected]
+
+    async def test_file_store_prefixes_follow_compaction(self, tmp_path: Path) -> None:
+        vectors = _vectors(200)
+        config = _config(provider="file", storage_path=str(tmp_path), coarse_dimensions=16)
+        async with FileVectorStore(config, AsyncMock()) as store:
+            await store.upsert(_docs(vectors))
+            await store.delete([f"doc-{i}" for i in range(100)])
+            await store.compact()
+            query = vectors[150]
+            results = await store.query_by_vector(query, top_k=1)
+
+        assert results[0].id == "doc-150"
+        assert results[0].score == pytest.approx(1.0, rel=1e-5)
+
+    def test_config_rejects_prefix_wider_than_embedding(self) -> None:
+        with pytest.raises(ValidationError, match="coarse_dimensions"):
+            _config(coarse_dimensions=DIMENSIONS)
+
+    def test_factory_rejects_unsupported_store(self) -> None:
+        with pytest.raises(VectorStoreError, match="Two-stage search is not supported by 'hnsw'"):
+            create_vector_store(_config(provider="hnsw", coarse_dimensions=16))
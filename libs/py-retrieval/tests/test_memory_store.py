@@ -0,0 +1,176 @@
+"""Tests for InMemoryVectorStore."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+from pydantic import SecretStr
+
+from py_retrieval.exceptions import VectorStoreError
+from py_retrieval.memory_store import InMemoryVectorStore
+from py_retrieval.models import Document, VectorStoreConfig
+from py_retrieval.protocols import VectorStore
+from py_retrieval.similarity import normalize, select_top_k
+
+
+@pytest.fixture
+def config() -> VectorStoreConfig:
+    return VectorStoreConfig(
+        provider="memory",
+        api_key=SecretStr("test-key"),
+        index_name="test-index",
+        embedding_dimensions=3,
+    )
+
+
+@pytest.fixture
+def mock_embedding_provider() -> AsyncMock:
+    provider = AsyncMock()
+    provider.embed = AsyncMock(return_value=np.array([[1.0, 0.0, 0.0]], dtype=np.float32))
+    return provider
+
+
+@pytest.fixture
+def store(config: VectorStoreConfig, mock_embedding_provider: AsyncMock) -> InMemoryVectorStore:
+    return InMemoryVectorStore(config=config, embedding_provider=mock_embedding_provider)
+
+
+def _docs() -> list[Document]:
+    return [
+        Document(id="x", text="x axis", vector=[1.0, 0.0, 0.0], metadata={"ticker": "AAPL"}),
+        Document(id="y", text="y axis", vector=[0.0, 2.0, 0.0], metadata={"ticker": "MSFT"}),
+        Document(id="xy", text="diagonal", vector=[1.0, 1.0, 0.0], metadata={"ticker": "AAPL"}),
+    ]
+
+
+class TestSimilarityHelpers:
+    def test_normalize_unit_length_and_zero_safe(self) -> None:
+        matrix = normalize([[3.0, 4.0], [0.0, 0.0]])
+        assert matrix.dtype == np.float32
+        np.testing.assert_allclose(matrix, [[0.6, 0.8], [0.0, 0.0]])
+
+    def test_select_top_k_orders_best_first(self) -> None:
+        scores = np.array([0.1, 0.9, 0.5, 0.7])
+        assert select_top_k(scores, 2).tolist() == [1, 3]
+        assert select_top_k(scores, 10).tolist() == [1, 3, 2, 0]
+        assert select_top_k(scores, 0).tolist() == []
+
+
+class TestInMemoryVectorStore:
+    def test_satisfies_protocol(self, store: InMemoryVectorStore) -> None:
+        assert isinstance(store, VectorStore)
+
+    async def test_query_ranks_by_cosine_similarity(self, store: InMemoryVectorStore) -> None:
+        await store.upsert(_docs())
+
+        results = await store.query("x", top_k=2)
+
+        assert [r.id for r in results] == ["x", "xy"]
+        assert results[0].score == pytest.approx(1.0)
+        assert results[1].score == pytest.approx(2**-0.5)
+        assert results[0].text == "x axis"
+        assert results[0].metadata == {"ticker": "AAPL"}
+
+    async def test_query_applies_filters(self, store: InMemoryVectorStore) -> None:
+        await store.upsert(_docs())
+
+        results = await store.query("x", top_k=5, filters={"ticker": {"$in": ["MSFT"]}})
+
+        assert [r.id for r in results] == ["y"]
+
+    async def test_query_many_matches_single_queries(
+        self, store: InMemoryVectorStore, mock_embedding_provider: AsyncMock
+    ) -> None:
+        await store.upsert(_docs())
+        mock_embedding_provider.embed.return_value = np.array(
+            [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32
+        )
+
+        results = await store.query_many(["x", "y"], top_k=2, filters={"ticker": "AAPL"})
+
+        mock_embedding_provider.embed.assert_called_once_with(["x", "y"])
+        assert [[r.id for r in batch] for batch in results] == [["x", "xy"], ["xy", "x"]]
+        assert results[1][0].score == pytest.approx(2**-0.5)
+
+    async def test_query_by_vector(
+        self, store: InMemoryVectorStore, mock_embedding_provider: AsyncMock
+    ) -> None:
+        await store.upsert(_docs())
+
+        results = await store.query_by_vector([0.0, 3.0, 0.0], top_k=1)
+
+        mock_embedding_provider.embed.assert_not_called()
+        assert results[0].id == "y"
+        assert results[0].score == pytest.approx(1.0)
+
+    async def test_query_empty_store(self, store: InMemoryVectorStore) -> None:
+        assert await store.query("x") == []
+
+    async def test_upsert_embeds_missing_vectors_and_assigns_ids(
+        self, store: InMemoryVectorStore, mock_embedding_provider: AsyncMock
+    ) -> None:
+        ids = await store.upsert([Document(text="hello")])
+
+        mock_embedding_provider.embed.assert_called_once_with(["hello"])
+        assert len(ids[0]) == 36
+        assert len(store) == 1
+
+    async def test_upsert_overwrites_existing_id(self, store: InMemoryVectorStore) -> None:
+        await store.upsert(_docs())
+        await store.upsert([Document(id="y", text="moved", vector=[1.0, 0.0, 0.0])])
+
+        results = await store.query("x", top_k=3)
+
+        assert len(store) == 3
+        assert {r.id for r in results if r.score == pytest.approx(1.0)} == {"x", "y"}
+        assert next(r for r in results if r.id == "y").text == "moved"
+
+    async def test_upsert_grows_beyond_initial_capacity(self, config: VectorStoreConfig) -> None:
+        store = InMemoryVectorStore(config=config, embedding_provider=AsyncMock())
+        docs = [Document(id=str(i), text=str(i), vector=[1.0, float(i), 0.0]) for i in range(3000)]
+
+        await store.upsert(docs)
+
+        assert len(store) == 3000
+
+    async def test_upsert_rejects_wrong_dimensions(self, store: InMemoryVectorStore) -> None:
+        with pytest.raises(VectorStoreError, match="3-dimensional"):
+            await store.upsert([Document(id="bad", text="bad", vector=[1.0, 0.0])])
+
+    async def test_delete_keeps_remaining_rows_queryable(self, store: InMemoryVectorStore) -> None:
+        await store.upsert(_docs())
+
+        await store.delete(["x", "unknown"])
+        results = await store.query("x", top_k=5)
+
+        assert len(store) == 2
+        assert [r.id for r in results] == ["xy", "y"]
+        assert results[0].metadata == {"ticker": "AAPL"}
+
+    async def test_filters_follow_rows_moved_by_delete(self, store: InMemoryVectorStore) -> None:
+        await store.upsert(_docs())
+        await store.upsert([Document(id="y", text="y", vector=[0.0, 1.0, 0.0], metadata={})])
+
+        await store.delete(["x"])  # "xy" moves into the freed row
+        aapl = await store.query("x", top_k=5, filters={"ticker": "AAPL"})
+        untagged = await store.query("x", top_k=5, filters={"ticker": {"$exists": False}})
+
+        assert [r.id for r in aapl] == ["xy"]
+        assert [r.id for r in untagged] == ["y"]
+
+    async def test_concurrent_upserts(self, store: InMemoryVectorStore) -> None:
+        batches = [
+            [Document(id=f"{b}-{i}", text="t", vector=[1.0, b, i]) for i in range(50)]
+            for b in range(10)
+        ]
+
+        await asyncio.gather(*(store.upsert(batch) for batch in batches))
+
+        assert len(store) == 500
+
+    async def test_context_manager_returns_store(self, store: InMemoryVectorStore) -> None:
+        async with store as entered:
+            assert entered is store
@@ -0,0 +1,152 @@
+"""Tests for the inverted MetadataIndex."""
+
+from __future__ import annotations
+
+import random
+from typing import Any
+
+import pytest
+
+from py_retrieval.exceptions import VectorStoreError
+from py_retrieval.filters import matches_filter
+from py_retrieval.metadata_index import MetadataIndex
+
+FILTERS: list[dict[str, Any]] = [
+    {"ticker": "AAPL"},
+    {"ticker": {"$ne": "AAPL"}},
+    {"ticker": {"$in": ["MSFT", "NVDA"]}, "filing_type": "10-K"},
+    {"ticker": {"$nin": ["MSFT", "NVDA"]}},
+    {"year": {"$gte": 2021, "$lt": 2023}},
+    {"year": {"$gt": 2022.5}},
+    {"year": {"$lte": 2020}},
+    {"year": 2022},
+    {"date": {"$gte": "2023-03-01", "$lte": "2023-09-30"}},
+    {"date": {"$gt": "2023-06-15"}},
+    {"date": {"$lt": "2023"}},
+    {"source": {"$exists": True}},
+    {"source": {"$exists": False}},
+    {"source": {"$ne": "sec"}},
+    {"amended": True},
+    {"amended": {"$ne": False}},
+    {"$or": [{"ticker": "AAPL"}, {"year": {"$lt": 2021}}]},
+    {"$and": [{"ticker": {"$in": ["AAPL", "MSFT"]}}, {"date": {"$gte": "2023-06-01"}}]},
+    {"$or": []},
+    {"$and": []},
+    {"ticker": {"$gt": 5}},
+    {"year": {"$gt": "2021"}},
+    {"rating": 1},
+    {"rating": {"$gte": 2}},
+    {"rating": {"$in": ["high", 3]}},
+    {"rating": {"$lt": "m"}},
+    {"missing": {"$nin": ["x"]}},
+    {"missing": "x"},
+]
+
+
+def _corpus(count: int, seed: int = 0) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        metadata: dict[str, Any] = {
+            "ticker": rng.choice(["AAPL", "MSFT", "NVDA", "TSLA"]),
+            "filing_type": rng.choice(["10-K", "10-Q", "8-K"]),
+            "year": rng.choice([2019, 2020, 2021, 2022, 2023]),
+            "date": f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "amended": rng.random() < 0.2,
+            "rating": rng.choice([1, 2.5, 3, "high", "low", True]),
+        }
+        if rng.random() < 0.5:
+            metadata["source"] = rng.choice(["sec", "news"])
+        corpus.append(metadata)
+    return corpus
+
+
+def _expected(rows: dict[int, dict[str, Any]], filters: dict[str, Any]) -> list[int]:
+    return sorted(row for row, metadata in rows.items() if matches_filter(metadata, filters))
+
+
+def _select(index: MetadataIndex, filters: dict[str, Any]) -> list[int]:
+    selected = index.select(filters)
+    assert selected is not None
+    return list(selected.tolist())
+
+
+@pytest.fixture
+def rows() -> dict[int, dict[str, Any]]:
+    return dict(enumerate(_corpus(3000)))
+
+
+@pytest.fixture
+def index(rows: dict[int, dict[str, Any]]) -> MetadataIndex:
+    index = MetadataIndex()
+    for row, metadata in rows.items():
+        index.set(row, metadata)
+    return index
+
+
+class TestMetadataIndex:
+    @pytest.mark.parametrize("filters", FILTERS)
+    def test_matches_row_by_row_evaluation(
+        self, index: MetadataIndex, rows: dict[int, dict[str, Any]], filters: dict[str, Any]
+    ) -> None:
+        assert _select(index, filters) == _expected(rows, filters)
+
+    def test_stays_consistent_through_writes(
+        self, index: MetadataIndex, rows: dict[int, dict[str, Any]]
+    ) -> None:
+        rng = random.Random(1)
+        replacements = _corpus(500, seed=2)
+        for i, metadata in enumerate(replacements):
+            row = rng.randrange(3000)
+            if i % 3 == 0:
+                index.remove(row)
+                rows.pop(row, None)
+            elif i % 3 == 1:
+                index.set(row, metadata)
+                rows[row] = metadata
+            else:
+                target = rng.randrange(3000)
+                index.move(row, target)
+                if row != target:
+                    rows.pop(target, None)
+                    if row in rows:
+                        rows[target] = rows.pop(row)
+            if i % 50 == 0:
+                for filters in FILTERS:
+                    assert _select(index, filters) == _expected(rows, filters)
+
+        assert len(index) == len(rows)
+        assert index.rows().tolist() == sorted(rows)
+
+    def test_unindexable_values_fall_back(self) -> None:
+        index = MetadataIndex()
+        index.set(0, {"tags": ["a", "b"], "ticker": "AAPL"})
+        index.set(1, {"tags": None, "ticker": "MSFT"})
+
+        assert index.select({"tags": {"$exists": True}}) is None
+        assert index.select({"ticker": {"$in": "AAPL"}}) is None
+        assert _select(index, {"ticker": "AAPL"}) == [0]
+
+        index.set(0, {"tags": "a"})
+        index.remove(1)
+        assert _select(index, {"tags": "a"}) == [0]
+
+    def test_large_integers_are_not_rounded(self) -> None:
+        index = MetadataIndex()
+        index.set(0, {"n": 2**60})
+        index.set(1, {"n": 2**60 + 1})
+
+        assert index.select({"n": 2**60}) is None
+
+    def test_grows_past_initial_capacity(self) -> None:
+        index = MetadataIndex()
+        index.set(5000, {"ticker": "AAPL"})
+
+        assert _select(index, {"ticker": "AAPL"}) == [5000]
+        assert _select(index, {"ticker": {"$ne": "AAPL"}}) == []
+
+    def test_rejects_unsupported_operator(self, index: MetadataIndex) -> None:
+        with pytest.raises(VectorStoreError, match="Unsupported filter operator"):
+            index.select({"ticker": {"$regex": "A.*"}})
+        with pytest.raises(VectorStoreError, match="Unsupported filter operator"):
+            index.select({"$not": {"ticker": "AAPL"}})
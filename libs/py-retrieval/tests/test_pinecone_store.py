@@ -2,14 +2,31 @@
 
 from __future__ import annotations
 
+import threading
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
+import tenacity
+from pinecone.exceptions import PineconeApiException
 from pydantic import SecretStr
 
 from py_retrieval.exceptions import VectorStoreConnectionError, VectorStoreError
 from py_retrieval.models import Document, VectorStoreConfig
-from py_retrieval.pinecone_store import PineconeVectorStore
+from py_retrieval.pinecone_store import (
+    PineconeVectorStore,
+    _is_transient,
+    _pack_batches,
+    _to_records,
+)
+
+
+def _api_error(status: int) -> PineconeApiException:
+    # Built without __init__, whose signature differs across SDK versions
+    exc = PineconeApiException.__new__(PineconeApiException)
+    exc.status = status
+    return exc
 
 
 @pytest.fixture
@@ -26,7 +43,7 @@ def config() -> VectorStoreConfig:
 @pytest.fixture
 def mock_embedding_provider() -> AsyncMock:
     provider = AsyncMock()
-    provider.embed = AsyncMock(return_value=[[0.1, 0.2, 0.3]])
+    provider.embed = AsyncMock(return_value=np.array([[0.1, 0.2, 0.3]], dtype=np.float32))
     return provider
 
 
@@ -48,6 +65,7 @@ def store(
     s = PineconeVectorStore(config=config, embedding_provider=mock_embedding_provider)
     s._index = mock_index
     s._client = MagicMock()
+    s._retry_wait = tenacity.wait_none()
     return s
 
 
@@ -55,7 +73,7 @@ class TestUpsert:
     async def test_upsert_generates_embeddings(
         self, store: PineconeVectorStore, mock_embedding_provider: AsyncMock
     ) -> None:
-        mock_embedding_provider.embed.return_value = [[0.1, 0.2, 0.3]]
+        mock_embedding_provider.embed.return_value = np.array([[0.1, 0.2, 0.3]], dtype=np.float32)
         docs = [Document(id="doc-1", text="hello")]
 
         ids = await store.upsert(docs)
@@ -73,17 +91,18 @@ class TestUpsert:
         assert ids == ["doc-1"]
         mock_embedding_provider.embed.assert_not_called()
 
-    async def test_upsert_assigns_uuid_when_id_is_none(
+    async def test_upsert_assigns_content_id_when_id_is_none(
         self, store: PineconeVectorStore, mock_embedding_provider: AsyncMock
     ) -> None:
-        mock_embedding_provider.embed.return_value = [[0.1, 0.2, 0.3]]
-        docs = [Document(text="no id")]
+        mock_embedding_provider.embed.return_value = np.float32([[0.1, 0.2, 0.3]])
 
-        ids = await store.upsert(docs)
+        first = await store.upsert([Document(text="no id")])
+        second = await store.upsert([Document(text="no id")])
+        other = await store.upsert([Document(text="no id", metadata={"page": 2})])
 
-        assert len(ids) == 1
-        assert ids[0] is not None
-        assert len(ids[0]) == 36  # UUID format
+        assert len(first[0]) == 36  # UUID format
+        assert first == second
+        assert other != first
 
     async def test_upsert_empty_list(self, store: PineconeVectorStore) -> None:
         ids = await store.upsert([])
@@ -92,7 +111,7 @@ class TestUpsert:
     async def test_upsert_calls_pinecone(
         self, store: PineconeVectorStore, mock_index: MagicMock, mock_embedding_provider: AsyncMock
     ) -> None:
-        mock_embedding_provider.embed.return_value = [[0.1, 0.2, 0.3]]
+        mock_embedding_provider.embed.return_value = np.array([[0.1, 0.2, 0.3]], dtype=np.float32)
         docs = [Document(id="doc-1", text="hello")]
 
         await store.upsert(docs)
@@ -101,13 +120,13 @@ class TestUpsert:
         call_kwargs = mock_index.upsert.call_args
         vectors = call_kwargs.kwargs.get("vectors") or call_kwargs[1].get("vectors")
         assert vectors[0][0] == "doc-1"
-        assert vectors[0][1] == [0.1, 0.2, 0.3]
+        assert vectors[0][1] == pytest.approx([0.1, 0.2, 0.3])
         assert vectors[0][2]["text"] == "hello"
 
     async def test_upsert_preserves_existing_text_in_metadata(
         self, store: PineconeVectorStore, mock_index: MagicMock, mock_embedding_provider: AsyncMock
     ) -> None:
-        mock_embedding_provider.embed.return_value = [[0.1, 0.2, 0.3]]
+        mock_embedding_provider.embed.return_value = np.array([[0.1, 0.2, 0.3]], dtype=np.float32)
         docs = [Document(id="doc-1", text="hello", metadata={"text": "custom text"})]
 
         await store.upsert(docs)
@@ -122,13 +141,122 @@ class TestUpsert:
         mock_index: MagicMock,
         mock_embedding_provider: AsyncMock,
     ) -> None:
-        mock_embedding_provider.embed.return_value = [[0.1, 0.2, 0.3]]
+        mock_embedding_provider.embed.return_value = np.array([[0.1, 0.2, 0.3]], dtype=np.float32)
         mock_index.upsert.side_effect = RuntimeError("connection lost")
 
         with pytest.raises(VectorStoreError, match="Upsert failed"):
             await store.upsert([Document(id="doc-1", text="hello")])
 
 
+class TestUpsertPipeline:
+    def test_batches_are_bounded_by_payload_bytes(self) -> None:
+        docs = [Document(id=str(i), text="t", vector=[0.0] * 1536) for i in range(200)]
+        records, oversized = _to_records(docs)
+
+        batches = _pack_batches(records, 2 * 1024 * 1024, 1000)
+
+        assert oversized == []
+        assert sum(len(batch) for batch in batches) == 200
+        assert all(sum(size for _, size in batch) <= 2 * 1024 * 1024 for batch in batches)
+        assert len(batches) > 2  # 100-vector batches would exceed the request limit
+
+    def test_batches_are_bounded_by_count(self) -> None:
+        records = [((str(i), [0.0], {}), 10) for i in range(5)]
+
+        assert [len(b) for b in _pack_batches(records, max_bytes=1000, max_items=2)] == [2, 2, 1]
+
+    async def test_embeds_in_chunks_and_writes_on_dedicated_executor(
+        self, store: PineconeVectorStore, mock_index: MagicMock, mock_embedding_provider: AsyncMock
+    ) -> None:
+        mock_embedding_provider.embed.side_effect = lambda texts: np.tile(
+            np.float32([0.1, 0.2, 0.3]), (len(texts), 1)
+        )
+        threads: list[str] = []
+        mock_index.upsert.side_effect = lambda **_: threads.append(threading.current_thread().name)
+        docs = [Document(id=str(i), text=f"doc {i}") for i in range(5)]
+
+        with patch("py_retrieval.pinecone_store._EMBED_CHUNK_SIZE", 2):
+            ids = await store.upsert(docs)
+
+        assert ids == [str(i) for i in range(5)]
+        assert mock_embedding_provider.embed.call_count == 3
+        assert mock_index.upsert.call_count == 3
+        assert all(name.startswith("pinecone-upsert") for name in threads)
+
+    async def test_retries_a_failed_batch(
+        self, store: PineconeVectorStore, mock_index: MagicMock
+    ) -> None:
+        mock_index.upsert.side_effect = [ConnectionError("reset"), _api_error(503), None]
+
+        ids = await store.upsert([Document(id="a", text="a", vector=[0.1, 0.2, 0.3])])
+
+        assert ids == ["a"]
+        assert mock_index.upsert.call_count == 3
+
+    async def test_client_error_fails_without_retry(
+        self, store: PineconeVectorStore, mock_index: MagicMock
+    ) -> None:
+        mock_index.upsert.side_effect = _api_error(400)
+
+        with pytest.raises(VectorStoreError) as exc_info:
+            await store.upsert([Document(id="a", text="a", vector=[0.1, 0.2, 0.3])])
+
+        assert mock_index.upsert.call_count == 1
+        assert exc_info.value.details["failed_ids"] == ["a"]
+
+    @pytest.mark.parametrize(
+        ("exc", "expected"),
+        [
+            (ConnectionError("reset"), True),
+            (TimeoutError(), True),
+            (_api_error(429), True),
+            (_api_error(500), True),
+            (_api_error(400), False),
+            (_api_error(401), False),
+            (_api_error(404), False),
+            (ValueError("dimension mismatch"), False),
+        ],
+    )
+    def test_only_transient_errors_are_retried(self, exc: BaseException, expected: bool) -> None:
+        assert _is_transient(exc) is expected
+
+    async def test_reports_partial_failure(
+        self, store: PineconeVectorStore, mock_index: MagicMock
+    ) -> None:
+        def _upsert(vectors: list[Any], **_: Any) -> None:
+            if vectors[0][0] == "bad":
+                raise RuntimeError("rejected")
+
+        mock_index.upsert.side_effect = _upsert
+        docs = [
+            Document(id="good", text="g", vector=[0.1, 0.2, 0.3]),
+            Document(id="bad", text="b", vector=[0.1, 0.2, 0.3]),
+        ]
+
+        with (
+            patch("py_retrieval.pinecone_store._MAX_BATCH_SIZE", 1),
+            pytest.raises(VectorStoreError, match="Upsert failed for 1 of 2") as exc_info,
+        ):
+            await store.upsert(docs)
+
+        assert exc_info.value.details == {"succeeded_ids": ["good"], "failed_ids": ["bad"]}
+
+    async def test_rejects_oversized_metadata_without_sending(
+        self, store: PineconeVectorStore, mock_index: MagicMock
+    ) -> None:
+        docs = [
+            Document(id="ok", text="ok", vector=[0.1, 0.2, 0.3]),
+            Document(id="huge", text="x" * 50_000, vector=[0.1, 0.2, 0.3]),
+        ]
+
+        with pytest.raises(VectorStoreError, match="metadata") as exc_info:
+            await store.upsert(docs)
+
+        assert exc_info.value.details["failed_ids"] == ["huge"]
+        sent = mock_index.upsert.call_args.kwargs["vectors"]
+        assert [record[0] for record in sent] == ["ok"]
+
+
 class TestQuery:
     async def test_query_returns_results(
         self,
@@ -136,7 +264,7 @@ class TestQuery:
         mock_index: MagicMock,
         mock_embedding_provider: AsyncMock,
     ) -> None:
-        mock_embedding_provider.embed.return_value = [[0.1, 0.2, 0.3]]
+        mock_embedding_provider.embed.return_value = np.array([[0.1, 0.2, 0.3]], dtype=np.float32)
         match = MagicMock(
             id="vec-1", score=0.95, metadata={"source": "test", "text": "hello world"}
         )
@@ -156,7 +284,7 @@ class TestQuery:
         mock_index: MagicMock,
         mock_embedding_provider: AsyncMock,
     ) -> None:
-        mock_embedding_provider.embed.return_value = [[0.1, 0.2, 0.3]]
+        mock_embedding_provider.embed.return_value = np.array([[0.1, 0.2, 0.3]], dtype=np.float32)
         mock_index.query.return_value = MagicMock(matches=[])
 
         await store.query("hello", top_k=5, filters={"category": "finance"})
@@ -172,12 +300,47 @@ class TestQuery:
         mock_index: MagicMock,
         mock_embedding_provider: AsyncMock,
     ) -> None:
-        mock_embedding_provider.embed.return_value = [[0.1, 0.2, 0.3]]
+        mock_embedding_provider.embed.return_value = np.array([[0.1, 0.2, 0.3]], dtype=np.float32)
         mock_index.query.side_effect = RuntimeError("timeout")
 
         with pytest.raises(VectorStoreError, match="Query failed"):
             await store.query("hello")
 
+    async def test_query_by_vector_skips_embedding(
+        self,
+        store: PineconeVectorStore,
+        mock_index: MagicMock,
+        mock_embedding_provider: AsyncMock,
+    ) -> None:
+        mock_index.query.return_value = MagicMock(matches=[])
+
+        await store.query_by_vector([0.3, 0.2, 0.1], top_k=2)
+
+        mock_embedding_provider.embed.assert_not_called()
+        assert mock_index.query.call_args.kwargs["vector"] == pytest.approx([0.3, 0.2, 0.1])
+
+    async def test_query_many_embeds_once_and_keeps_order(
+        self,
+        store: PineconeVectorStore,
+        mock_index: MagicMock,
+        mock_embedding_provider: AsyncMock,
+    ) -> None:
+        mock_embedding_provider.embed.return_value = np.array(
+            [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32
+        )
+        mock_index.query.side_effect = lambda vector, **_: MagicMock(
+            matches=[MagicMock(id=str(vector.index(1.0)), score=1.0, metadata={})]
+        )
+
+        results = await store.query_many(["a", "b"], top_k=1, filters={"k": "v"})
+
+        mock_embedding_provider.embed.assert_called_once_with(["a", "b"])
+        assert [[r.id for r in batch] for batch in results] == [["0"], ["1"]]
+        assert all(c.kwargs["filter"] == {"k": "v"} for c in mock_index.query.call_args_list)
+
+    async def test_query_many_empty(self, store: PineconeVectorStore) -> None:
+        assert await store.query_many([]) == []
+
 
 class TestDelete:
     async def test_delete_calls_pinecone(
@@ -0,0 +1,226 @@
+"""Tests for vector quantizers and QuantizedVectorStore."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+from pydantic import SecretStr
+
+from py_retrieval.benchmarks import benchmark_quantization, synthetic_vectors
+from py_retrieval.exceptions import VectorStoreError
+from py_retrieval.models import Document, VectorStoreConfig
+from py_retrieval.protocols import VectorStore
+from py_retrieval.quantization import ProductQuantizer, Quantizer, ScalarQuantizer
+from py_retrieval.quantized_store import QuantizedVectorStore
+
+
+@pytest.fixture(scope="module")
+def corpus() -> np.ndarray:
+    return synthetic_vectors(2000, 32, clusters=16, seed=3)
+
+
+@pytest.fixture
+def config() -> VectorStoreConfig:
+    return VectorStoreConfig(
+        provider="quantized",
+        api_key=SecretStr("test-key"),
+        index_name="test-index",
+        embedding_dimensions=32,
+        quantization_train_size=300,
+    )
+
+
+def _docs(vectors: np.ndarray) -> list[Document]:
+    return [
+        Document(id=str(i), text=f"doc {i}", vector=v.tolist(), metadata={"even": i % 2 == 0})
+        for i, v in enumerate(vectors)
+    ]
+
+
+def _embedder(vector: np.ndarray) -> AsyncMock:
+    provider = AsyncMock()
+    provider.embed = AsyncMock(return_value=vector[np.newaxis])
+    return provider
+
+
+class TestScalarQuantizer:
+    def test_roundtrip_error_is_within_one_step(self, corpus: np.ndarray) -> None:
+        quantizer = ScalarQuantizer(32).fit(corpus)
+        codes = quantizer.encode(corpus)
+        step = (corpus.max(axis=0) - corpus.min(axis=0)) / 255
+
+        assert codes.dtype == np.uint8
+        assert codes.shape == (2000, 32)
+        assert np.all(np.abs(quantizer.decode(codes) - corpus) <= step / 2 + 1e-6)
+
+    def test_score_matches_decoded_inner_product(self, corpus: np.ndarray) -> None:
+        quantizer = ScalarQuantizer(32).fit(corpus)
+        codes = quantizer.encode(corpus)
+
+        np.testing.assert_allclose(
+            quantizer.score(corpus[0], codes), quantizer.decode(codes) @ corpus[0], atol=1e-5
+        )
+
+    def test_requires_training(self) -> None:
+        with pytest.raises(RuntimeError, match="not trained"):
+            ScalarQuantizer(4).encode(np.zeros((1, 4)))
+
+    def test_satisfies_protocol(self) -> None:
+        assert isinstance(ScalarQuantizer(4), Quantizer)
+
+
+class TestProductQuantizer:
+    def test_codes_are_one_byte_per_subvector(self, corpus: np.ndarray) -> None:
+        quantizer = ProductQuantizer(32, 4, iterations=5).fit(corpus)
+
+        codes = quantizer.encode(corpus[:10])
+
+        assert quantizer.code_size == 4
+        assert codes.shape == (10, 4)
+        assert codes.dtype == np.uint8
+
+    def test_score_matches_decoded_inner_product(self, corpus: np.ndarray) -> None:
+        quantizer = ProductQuantizer(32, 8, iterations=5).fit(corpus)
+        codes = np.asfortranarray(quantizer.encode(corpus))
+
+        np.testing.assert_allclose(
+            quantizer.score(corpus[0], codes), quantizer.decode(codes) @ corpus[0], atol=1e-5
+        )
+
+    def test_reconstruction_beats_random_codes(self, corpus: np.ndarray) -> None:
+        quantizer = ProductQuantizer(32, 8, iterations=10).fit(corpus)
+        codes = quantizer.encode(corpus)
+        random_codes = np.random.default_rng(0).integers(0, 256, codes.shape, dtype=np.uint8)
+
+        error = np.linalg.norm(quantizer.decode(codes) - corpus, axis=1).mean()
+        baseline = np.linalg.norm(quantizer.decode(random_codes) - corpus, axis=1).mean()
+
+        assert error < baseline / 3
+
+    def test_rejects_indivisible_dimensions(self) -> None:
+        with pytest.raises(ValueError, match="divisible"):
+            ProductQuantizer(30, 4)
+
+    def test_requires_enough_training_vectors(self) -> None:
+        with pytest.raises(ValueError, match="at least 256"):
+            ProductQuantizer(8, 2).fit(np.zeros((10, 8)))
+
+
+class TestBenchmark:
+    def test_rescoring_improves_recall(self, corpus: np.ndarray) -> None:
+        results = benchmark_quantization(
+            corpus[:1900], corpus[1900:], ProductQuantizer(32, 4, iterations=5), k=5
+        )
+
+        assert [r.rescore_factor for r in results] == [0, 4]
+        assert results[0].compression == pytest.approx(32.0)
+        assert results[1].recall > results[0].recall
+
+
+class TestQuantizedVectorStore:
+    def test_satisfies_protocol(self, config: VectorStoreConfig) -> None:
+        assert isinstance(QuantizedVectorStore(config, AsyncMock()), VectorStore)
+
+    async def test_exact_before_training(
+        self, config: VectorStoreConfig, corpus: np.ndarray
+    ) -> None:
+        store = QuantizedVectorStore(config, _embedder(corpus[5]))
+        await store.upsert(_docs(corpus[:100]))
+
+        results = await store.query("q", top_k=1)
+
+        assert not store.trained
+        assert results[0].id == "5"
+        assert results[0].score == pytest.approx(1.0)
+
+    async def test_trains_at_threshold_and_shrinks_memory(
+        self, config: VectorStoreConfig, corpus: np.ndarray
+    ) -> None:
+        store = QuantizedVectorStore(config, _embedder(corpus[5]))
+        await store.upsert(_docs(corpus[:400]))
+
+        results = await store.query("q", top_k=3)
+
+        assert store.trained
+        assert store.vector_bytes == 400 * 32
+        assert results[0].id == "5"
+
+    async def test_pq_with_rescoring_returns_exact_scores(
+        self, config: VectorStoreConfig, corpus: np.ndarray, tmp_path: Path
+    ) -> None:
+        config.quantization = "pq"
+        config.pq_subvectors = 8
+        config.rescore_factor = 10
+        config.storage_path = str(tmp_path)
+        async with QuantizedVectorStore(config, _embedder(corpus[7])) as store:
+            await store.upsert(_docs(corpus[:1500]))
+            results = await store.query("q", top_k=3)
+
+            assert store.vector_bytes == 1500 * 8
+            assert results[0].id == "7"
+            exact = corpus[:1500] @ corpus[7]
+            assert [r.score for r in results] == pytest.approx(np.sort(exact)[::-1][:3].tolist())
+
+    async def test_filters_and_deletes_after_training(
+        self, config: VectorStoreConfig, corpus: np.ndarray
+    ) -> None:
+        store = QuantizedVectorStore(config, _embedder(corpus[4]))
+        await store.upsert(_docs(corpus[:400]))
+
+        await store.delete(["4"])
+        results = await store.query("q", top_k=5, filters={"even": True})
+
+        assert len(store) == 399
+        assert "4" not in {r.id for r in results}
+        assert all(r.metadata["even"] for r in results)
+
+    async def test_query_many_and_query_by_vector(
+        self, config: VectorStoreConfig, corpus: np.ndarray
+    ) -> None:
+        provider = AsyncMock()
+        provider.embed = AsyncMock(return_value=corpus[1:3])
+        store = QuantizedVectorStore(config, provider)
+        await store.upsert(_docs(corpus[:400]))
+
+        many = await store.query_many(["a", "b"], top_k=1)
+        by_vector = await store.query_by_vector(corpus[3].tolist(), top_k=1)
+
+        assert [[r.id for r in batch] for batch in many] == [["1"], ["2"]]
+        assert [r.id for r in by_vector] == ["3"]
+
+    async def test_upsert_after_training_is_encoded(
+        self, config: VectorStoreConfig, corpus: np.ndarray
+    ) -> None:
+        store = QuantizedVectorStore(config, _embedder(corpus[1999]))
+        await store.upsert(_docs(corpus[:300]))
+        await store.upsert([Document(id="late", text="late", vector=corpus[1999].tolist())])
+
+        results = await store.query("q", top_k=1)
+
+        assert results[0].id == "late"
+
+    async def test_explicit_train_rejects_too_few_vectors_for_pq(
+        self, config: VectorStoreConfig, corpus: np.ndarray
+    ) -> None:
+        config.quantization = "pq"
+        config.pq_subvectors = 8
+        store = QuantizedVectorStore(config, AsyncMock())
+        await store.upsert(_docs(corpus[:50]))
+
+        with pytest.raises(VectorStoreError, match="Training failed"):
+            await store.train()
+
+    def test_pq_config_validated_before_any_write(self, config: VectorStoreConfig) -> None:
+        config.quantization = "pq"
+        config.pq_subvectors = 8
+        config.quantization_train_size = 100
+        with pytest.raises(ValueError, match="at least the 256 PQ codebook centroids"):
+            QuantizedVectorStore(config, AsyncMock())
+
+        config.quantization_train_size = 300
+        config.pq_subvectors = 5
+        with pytest.raises(ValueError, match="divisible by subvectors"):
+            QuantizedVectorStore(config, AsyncMock())
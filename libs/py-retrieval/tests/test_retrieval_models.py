@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import numpy as np
 import pytest
 from pydantic import SecretStr, ValidationError
 
@@ -24,9 +25,23 @@ class TestDocument:
             metadata={"source": "test"},
         )
         assert doc.id == "doc-1"
-        assert doc.vector == [0.1, 0.2, 0.3]
+        assert doc.vector is not None
+        assert doc.vector.dtype == np.float32
+        assert doc.vector.tolist() == pytest.approx([0.1, 0.2, 0.3])
         assert doc.metadata["source"] == "test"
 
+    def test_vector_array_is_kept_without_copy(self) -> None:
+        vector = np.ones(3, dtype=np.float32)
+
+        doc = Document(text="t", vector=vector)
+
+        assert doc.vector is vector
+        assert doc.model_dump()["vector"] == [1.0, 1.0, 1.0]
+
+    def test_vector_must_be_one_dimensional(self) -> None:
+        with pytest.raises(ValidationError, match="one-dimensional"):
+            Document(text="t", vector=[[1.0, 2.0]])
+
     def test_document_requires_text(self) -> None:
         with pytest.raises(ValidationError):
             Document()  # type: ignore[call-arg]
@@ -70,6 +85,9 @@ class TestVectorStoreConfig:
         assert config.embedding_model == "text-embedding-3-small"
         assert config.embedding_dimensions == 1536
         assert config.host is None
+        assert config.storage_path is None
+        assert config.vector_dtype == "float32"
+        assert config.read_only is False
 
     def test_api_key_is_secret(self) -> None:
         config = VectorStoreConfig(
@@ -0,0 +1,204 @@
+"""Tests for SemanticQueryCache and SemanticCachedVectorStore."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+from pydantic import SecretStr
+
+from py_retrieval.factory import create_vector_store
+from py_retrieval.memory_store import InMemoryVectorStore
+from py_retrieval.models import Document, QueryResult, VectorStoreConfig
+from py_retrieval.protocols import VectorStore
+from py_retrieval.semantic_cache import SemanticCachedVectorStore, SemanticQueryCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _results(*ids: str) -> list[QueryResult]:
+    return [QueryResult(id=doc_id, score=1.0) for doc_id in ids]
+
+
+@pytest.fixture
+def clock() -> _Clock:
+    return _Clock()
+
+
+@pytest.fixture
+def cache(clock: _Clock) -> SemanticQueryCache:
+    return SemanticQueryCache(threshold=0.9, ttl=60.0, max_entries=4, clock=clock)
+
+
+class TestSemanticQueryCache:
+    def test_serves_near_duplicate_query(self, cache: SemanticQueryCache) -> None:
+        cache.put([1.0, 0.0, 0.0], 5, None, _results("a", "b"))
+
+        hit = cache.get([0.95, 0.1, 0.0], 5)
+        miss = cache.get([0.5, 0.5, 0.0], 5)
+
+        assert hit is not None
+        assert [r.id for r in hit] == ["a", "b"]
+        assert miss is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_filters_must_match_exactly(self, cache: SemanticQueryCache) -> None:
+        cache.put([1.0, 0.0], 5, {"ticker": "AAPL", "year": 2024}, _results("a"))
+
+        assert cache.get([1.0, 0.0], 5, {"year": 2024, "ticker": "AAPL"}) is not None
+        assert cache.get([1.0, 0.0], 5, {"ticker": "MSFT"}) is None
+        assert cache.get([1.0, 0.0], 5) is None
+
+    def test_larger_top_k_serves_smaller_requests(self, cache: SemanticQueryCache) -> None:
+        cache.put([1.0, 0.0], 3, None, _results("a", "b", "c"))
+
+        hit = cache.get([1.0, 0.0], 2)
+
+        assert hit is not None
+        assert [r.id for r in hit] == ["a", "b"]
+        assert cache.get([1.0, 0.0], 5) is None
+
+    def test_entries_expire_after_ttl(self, cache: SemanticQueryCache, clock: _Clock) -> None:
+        cache.put([1.0, 0.0], 5, None, _results("a"))
+
+        clock.now = 59.0
+        assert cache.get([1.0, 0.0], 5) is not None
+        clock.now = 61.0
+        assert cache.get([1.0, 0.0], 5) is None
+
+    def test_new_index_version_invalidates(self, cache: SemanticQueryCache) -> None:
+        cache.set_index_version("v1")
+        cache.put([1.0, 0.0], 5, None, _results("a"))
+
+        cache.set_index_version("v1")
+        assert len(cache) == 1
+        cache.set_index_version("v2")
+
+        assert len(cache) == 0
+        assert cache.index_version == "v2"
+        assert cache.get([1.0, 0.0], 5) is None
+
+    def test_evicts_least_recently_used_when_full(
+        self, cache: SemanticQueryCache, clock: _Clock
+    ) -> None:
+        axes = np.eye(5, dtype=np.float32)
+        for i in range(4):
+            clock.now = float(i)
+            cache.put(axes[i], 5, None, _results(str(i)))
+        clock.now = 10.0
+        cache.get(axes[0], 5)  # entry 1 is now least recently used
+
+        cache.put(axes[4], 5, None, _results("4"))
+
+        assert len(cache) == 4
+        assert cache.get(axes[1], 5) is None
+        assert cache.get(axes[0], 5) is not None
+        assert cache.get(axes[4], 5) is not None
+
+    def test_near_duplicate_put_replaces_entry(self, cache: SemanticQueryCache) -> None:
+        cache.put([1.0, 0.0], 2, None, _results("a", "b"))
+        cache.put([0.99, 0.01], 5, None, _results("c"))
+
+        hit = cache.get([1.0, 0.0], 5)
+
+        assert len(cache) == 1
+        assert hit is not None
+        assert [r.id for r in hit] == ["c"]
+
+    def test_stale_generation_is_not_cached(self, cache: SemanticQueryCache) -> None:
+        generation = cache.generation
+        cache.invalidate()
+
+        cache.put([1.0, 0.0], 5, None, _results("a"), generation=generation)
+
+        assert len(cache) == 0
+
+    def test_rejects_invalid_threshold(self) -> None:
+        with pytest.raises(ValueError, match="threshold"):
+            SemanticQueryCache(threshold=0.0)
+
+
+class TestSemanticCachedVectorStore:
+    @pytest.fixture
+    def provider(self) -> AsyncMock:
+        provider = AsyncMock()
+        provider.embed = AsyncMock(return_value=np.float32([[1.0, 0.0, 0.0]]))
+        return provider
+
+    @pytest.fixture
+    def inner(self, provider: AsyncMock) -> InMemoryVectorStore:
+        config = VectorStoreConfig(
+            provider="memory",
+            api_key=SecretStr("test-key"),
+            index_name="test-index",
+            embedding_dimensions=3,
+        )
+        return InMemoryVectorStore(config, provider)
+
+    @pytest.fixture
+    def store(
+        self, inner: InMemoryVectorStore, provider: AsyncMock, cache: SemanticQueryCache
+    ) -> SemanticCachedVectorStore:
+        return SemanticCachedVectorStore(inner, provider, cache)
+
+    def test_satisfies_protocol(self, store: SemanticCachedVectorStore) -> None:
+        assert isinstance(store, VectorStore)
+
+    async def test_repeated_query_skips_store(
+        self, store: SemanticCachedVectorStore, inner: InMemoryVectorStore
+    ) -> None:
+        await store.upsert([Document(id="x", text="x", vector=[1.0, 0.0, 0.0])])
+        inner.query_by_vector = AsyncMock(wraps=inner.query_by_vector)  # type: ignore[method-assign]
+
+        first = await store.query("apple revenue")
+        second = await store.query("AAPL revenue")
+
+        assert [r.id for r in first] == [r.id for r in second] == ["x"]
+        inner.query_by_vector.assert_called_once()
+
+    async def test_writes_invalidate_cache(
+        self, store: SemanticCachedVectorStore, cache: SemanticQueryCache
+    ) -> None:
+        await store.upsert([Document(id="x", text="x", vector=[1.0, 0.0, 0.0])])
+        await store.query("q")
+
+        await store.upsert([Document(id="y", text="y", vector=[1.0, 0.1, 0.0])])
+        results = await store.query("q", top_k=2)
+        await store.delete(["x"])
+
+        assert [r.id for r in results] == ["x", "y"]
+        assert len(cache) == 0
+
+    async def test_query_many_embeds_once(
+        self, store: SemanticCachedVectorStore, provider: AsyncMock
+    ) -> None:
+        await store.upsert(
+            [
+                Document(id="x", text="x", vector=[1.0, 0.0, 0.0]),
+                Document(id="y", text="y", vector=[0.0, 1.0, 0.0]),
+            ]
+        )
+        provider.embed.reset_mock()
+        provider.embed.return_value = np.float32([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+
+        batches = await store.query_many(["a", "b"], top_k=1)
+
+        provider.embed.assert_called_once_with(["a", "b"])
+        assert [[r.id for r in batch] for batch in batches] == [["x"], ["y"]]
+
+    def test_factory_wraps_store(self, cache: SemanticQueryCache) -> None:
+        config = VectorStoreConfig(
+            provider="memory", api_key=SecretStr("test-key"), index_name="test-index"
+        )
+
+        store = create_vector_store(config, query_cache=cache)
+
+        assert isinstance(store, SemanticCachedVectorStore)
+        assert store.cache is cache
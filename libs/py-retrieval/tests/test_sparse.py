@@ -0,0 +1,162 @@
+"""Tests for the BM25 SparseIndex, score fusion and hybrid store queries."""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+from pydantic import SecretStr
+
+from py_retrieval.exceptions import VectorStoreError
+from py_retrieval.factory import create_vector_store
+from py_retrieval.file_store import FileVectorStore
+from py_retrieval.memory_store import InMemoryVectorStore
+from py_retrieval.models import Document, VectorStoreConfig
+from py_retrieval.semantic_cache import SemanticQueryCache
+from py_retrieval.sparse import SparseIndex, fuse_scores, tokenize
+
+TEXTS = [
+    "Apple revenue grew on iPhone sales",
+    "NVDA data center revenue doubled",
+    "Microsoft cloud revenue and Azure growth",
+    "apple apple apple orchard",
+]
+
+
+def _bm25(texts: list[str], query: str, k1: float = 1.2, b: float = 0.75) -> list[float]:
+    docs = [tokenize(text) for text in texts]
+    average = sum(map(len, docs)) / len(docs)
+    scores = []
+    for doc in docs:
+        score = 0.0
+        for term in tokenize(query):
+            df = sum(term in d for d in docs)
+            tf = doc.count(term)
+            if tf:
+                idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+                score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / average))
+        scores.append(score)
+    return scores
+
+
+@pytest.fixture
+def index() -> SparseIndex:
+    index = SparseIndex()
+    for row, text in enumerate(TEXTS):
+        index.set(row, text)
+    return index
+
+
+class TestSparseIndex:
+    @pytest.mark.parametrize("query", ["apple revenue", "NVDA", "azure cloud growth", "missing"])
+    def test_matches_reference_bm25(self, index: SparseIndex, query: str) -> None:
+        np.testing.assert_allclose(index.score(query), _bm25(TEXTS, query), rtol=1e-5)
+
+    def test_writes_update_statistics(self, index: SparseIndex) -> None:
+        index.score("apple")  # build postings before the writes
+        index.set(1, "apple pie")
+        index.remove(2)
+        index.move(3, 2)
+
+        texts = [TEXTS[0], "apple pie", TEXTS[3]]
+        np.testing.assert_allclose(index.score("apple pie")[:3], _bm25(texts, "apple pie"))
+        assert len(index) == 3
+        assert index.score("apple")[3] == 0.0
+
+    def test_empty_index_scores_nothing(self) -> None:
+        assert len(SparseIndex().score("apple")) == 0
+
+
+class TestFuseScores:
+    def test_rrf_rewards_agreement(self) -> None:
+        dense = np.float32([0.9, 0.8, 0.1])
+        sparse = np.float32([0.0, 5.0, 1.0])
+
+        fused = fuse_scores(dense, sparse, top_k=3)
+
+        assert int(np.argmax(fused)) == 1
+        assert fused[0] == pytest.approx(1 / 61)
+
+    def test_weighted_scales_sparse_to_unit_range(self) -> None:
+        dense = np.float32([0.5, 0.4])
+        sparse = np.float32([0.0, 8.0])
+
+        fused = fuse_scores(dense, sparse, top_k=2, method="weighted", alpha=0.5)
+
+        np.testing.assert_allclose(fused, [0.25, 0.7])
+
+    def test_weighted_without_sparse_matches_is_scaled_dense(self) -> None:
+        fused = fuse_scores(np.float32([0.5]), np.float32([0.0]), 1, method="weighted", alpha=0.8)
+
+        np.testing.assert_allclose(fused, [0.4])
+
+
+def _docs() -> list[Document]:
+    # The dense vectors all favour "cloud"; only BM25 knows the query says NVDA
+    return [
+        Document(id="cloud", text=TEXTS[2], vector=[1.0, 0.0, 0.0]),
+        Document(id="apple", text=TEXTS[0], vector=[0.9, 0.1, 0.0]),
+        Document(id="nvda", text=TEXTS[1], vector=[0.6, 0.4, 0.0]),
+    ]
+
+
+def _config(provider: str = "memory", **overrides: object) -> VectorStoreConfig:
+    return VectorStoreConfig(
+        provider=provider,
+        api_key=SecretStr("test-key"),
+        index_name="test-index",
+        embedding_dimensions=3,
+        **overrides,
+    )
+
+
+def _provider() -> AsyncMock:
+    provider = AsyncMock()
+    provider.embed = AsyncMock(return_value=np.float32([[1.0, 0.0, 0.0]]))
+    return provider
+
+
+class TestHybridStores:
+    async def test_memory_store_fuses_keyword_matches(self) -> None:
+        dense_only = InMemoryVectorStore(_config(), _provider())
+        hybrid = InMemoryVectorStore(_config(hybrid_search=True), _provider())
+        for store in (dense_only, hybrid):
+            await store.upsert(_docs())
+
+        assert (await dense_only.query("NVDA", top_k=1))[0].id == "cloud"
+        assert (await hybrid.query("NVDA", top_k=1))[0].id == "nvda"
+        by_vector = await hybrid.query_by_vector([1.0, 0.0, 0.0], top_k=1)
+        assert by_vector[0].id == "cloud"
+
+    async def test_memory_store_keeps_terms_through_deletes(self) -> None:
+        store = InMemoryVectorStore(
+            _config(hybrid_search=True, hybrid_fusion="weighted"), _provider()
+        )
+        await store.upsert(_docs())
+
+        await store.delete(["cloud"])  # "nvda" moves into the freed row
+        results = await store.query("NVDA", top_k=1)
+
+        assert results[0].id == "nvda"
+        assert results[0].score == pytest.approx(0.5 * 0.6 / math.hypot(0.6, 0.4) + 0.5)
+
+    async def test_file_store_rebuilds_terms_on_reopen(self, tmp_path: Path) -> None:
+        config = _config(provider="file", storage_path=str(tmp_path), hybrid_search=True)
+        async with FileVectorStore(config, _provider()) as store:
+            await store.upsert(_docs())
+
+        async with FileVectorStore(config, _provider()) as reopened:
+            results = await reopened.query("NVDA", top_k=1)
+
+        assert results[0].id == "nvda"
+
+    def test_factory_rejects_unsupported_hybrid_store(self) -> None:
+        with pytest.raises(VectorStoreError, match="Hybrid search is not supported by 'hnsw'"):
+            create_vector_store(_config(provider="hnsw", hybrid_search=True))
+
+    def test_factory_rejects_hybrid_with_query_cache(self) -> None:
+        with pytest.raises(VectorStoreError, match="semantic query cache"):
+            create_vector_store(_config(hybrid_search=True), query_cache=SemanticQueryCache())